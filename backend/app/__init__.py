@@ -24,6 +24,7 @@ def create_app():
     app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'postgresql://localhost/fitcompass_dev')
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'jwt-secret-key')
+    app.config['SQL_DEBUG_ENDPOINT'] = os.getenv('SQL_DEBUG_ENDPOINT', 'false').lower() in ('1', 'true', 'yes')
 
     # Initialize extensions with app
     db.init_app(app)
@@ -35,7 +36,7 @@ def create_app():
     # Register blueprints (routes)
     from app.routes import (
         auth_bp, clients_bp, workouts_bp, assignments_bp,
-        analytics_bp, trainers_bp, clients_analytics_bp, workout_logs_bp
+        analytics_bp, trainers_bp, clients_analytics_bp, workout_logs_bp, exercises_bp, sync_bp, debug_bp
     )
     from app.routes.health import health_bp
 
@@ -48,9 +49,14 @@ def create_app():
     app.register_blueprint(trainers_bp)  # FASE 5 spec
     app.register_blueprint(clients_analytics_bp)  # FASE 5 spec
     app.register_blueprint(workout_logs_bp)
+    app.register_blueprint(exercises_bp)  # F-012 exercise library
+    app.register_blueprint(sync_bp)  # Delta sync feed
+    app.register_blueprint(debug_bp)  # SQL metrics (DEBUG / SQL_DEBUG_ENDPOINT only)
 
-    # Create tables (for development only)
+    # Create tables (for development only) and per-request SQL metrics
+    from app.services.sql_metrics import sql_metrics
     with app.app_context():
         db.create_all()
+        sql_metrics.init_app(app, db.engine)
 
     return app
@@ -8,6 +8,13 @@ from app.models.exercise import Exercise
 from app.models.workout_exercise import WorkoutExercise
 from app.models.workout_assignment import WorkoutAssignment
 from app.models.workout_log import WorkoutLog
+from app.models.client_daily_activity import ClientDailyActivity
+from app.models.idempotency_key import IdempotencyKey
+from app.models.sync_tombstone import SyncTombstone
+from app.models.client_adherence import ClientAdherence
+from app.models.exercise_progress import ExerciseProgress
+from app.models.user_identity import UserIdentity
+from app.models.outbox_email import OutboxEmail
 
 __all__ = [
     'Trainer',
@@ -16,5 +23,12 @@ __all__ = [
     'Exercise',
     'WorkoutExercise',
     'WorkoutAssignment',
-    'WorkoutLog'
+    'WorkoutLog',
+    'ClientDailyActivity',
+    'IdempotencyKey',
+    'SyncTombstone',
+    'ClientAdherence',
+    'ExerciseProgress',
+    'UserIdentity',
+    'OutboxEmail'
 ]
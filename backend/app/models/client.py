@@ -2,13 +2,16 @@
 Client Model - Represents a client/athlete being trained
 """
 from app import db
-from datetime import datetime, timedelta
-import bcrypt
+from datetime import datetime
+from app.services.password_hasher import password_hasher
 
 
 class Client(db.Model):
     """Client/Athlete user model"""
     __tablename__ = 'clients'
+    __table_args__ = (
+        db.Index('idx_clients_trainer_updated', 'trainer_id', 'updated_at'),  # Delta sync feed
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(120), unique=True, nullable=False, index=True)
@@ -28,7 +31,7 @@ class Client(db.Model):
     avatar_url = db.Column('avatar_url', db.String(500))  # URL to avatar image (matches schema.sql)
 
     # Invitation tracking
-    invite_token = db.Column(db.String(255))  # JWT token for registration link
+    invite_token = db.Column(db.Text)  # JWT token for registration link (longer than 255 chars)
     invite_sent_at = db.Column(db.DateTime)
     registered_at = db.Column(db.DateTime)
 
@@ -41,44 +44,35 @@ class Client(db.Model):
     # Note: workout_logs accessed via assignments.workout_logs (schema.sql structure)
 
     def set_password(self, password: str):
-        """Hash and set password using bcrypt with cost factor 12"""
-        salt = bcrypt.gensalt(rounds=12)
-        self.password_hash = bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+        """Hash and set password using bcrypt with cost factor PASSWORD_HASH_ROUNDS (hashing pool)"""
+        self.password_hash = password_hasher.hash(password)
 
     def verify_password(self, password: str) -> bool:
-        """Verify password against stored hash"""
-        if not self.password_hash:
-            return False
-        return bcrypt.checkpw(password.encode('utf-8'), self.password_hash.encode('utf-8'))
+        """Verify password against stored hash (hashing pool)"""
+        return password_hasher.verify(password, self.password_hash)
 
-    def to_dict(self, include_stats=False, stats_period_days=None):
+    def password_needs_rehash(self) -> bool:
+        """True if the stored hash uses a cost factor other than PASSWORD_HASH_ROUNDS"""
+        return bool(self.password_hash) and password_hasher.needs_rehash(self.password_hash)
+
+    def to_dict(self, include_stats=False, stats_period_days=None, stats=None):
         """
         Convert client to dictionary representation
 
         Args:
             include_stats: Include workout statistics
             stats_period_days: Period for stats calculation (None = all time, e.g. 7, 30)
+            stats: Precomputed stats from ClientStatsLoader (skips per-client queries)
         """
         # Calculate stats
         if include_stats:
-            # Import here to avoid circular imports
-            from app.models.workout_assignment import WorkoutAssignment
-
-            # Filter by period if specified (for FASE 5 analytics compatibility)
-            if stats_period_days:
-                period_start = datetime.utcnow() - timedelta(days=stats_period_days)
-                total_assigned = self.assignments.filter(
-                    WorkoutAssignment.assigned_date >= period_start
-                ).count()
-                completed_assigned = self.assignments.filter_by(
-                    status='completed'
-                ).filter(
-                    WorkoutAssignment.assigned_date >= period_start
-                ).count()
-            else:
-                # All time stats (default for FASE 1 compatibility)
-                total_assigned = self.assignments.count()
-                completed_assigned = self.assignments.filter_by(status='completed').count()
+            if stats is None:
+                # Import here to avoid circular imports
+                from app.services.client_stats import client_stats_loader
+                stats = client_stats_loader.load([self.id], stats_period_days)[self.id]
+
+            total_assigned = stats['total_assigned']
+            completed_assigned = stats['completed']
 
             # total_logs same as completed_assigned (schema.sql structure)
             total_logs = completed_assigned
@@ -87,26 +81,7 @@ class Client(db.Model):
             adherence = (completed_assigned / total_assigned * 100) if total_assigned > 0 else 0
 
             # Get last activity from completed assignments (compatible with FASE 5 analytics)
-            last_assignment = self.assignments.filter(
-                WorkoutAssignment.completed_at.isnot(None)
-            ).order_by(
-                WorkoutAssignment.completed_at.desc()
-            ).first()
-
-            if last_assignment and last_assignment.completed_at:
-                delta = datetime.utcnow() - last_assignment.completed_at
-                if delta.days == 0:
-                    hours = delta.seconds // 3600
-                    if hours == 0:
-                        last_activity = "Hace minutos"
-                    else:
-                        last_activity = "Hace {} horas".format(hours)
-                elif delta.days == 1:
-                    last_activity = "Hace 1 día"
-                else:
-                    last_activity = "Hace {} días".format(delta.days)
-            else:
-                last_activity = "Nunca"
+            last_activity = self.format_last_activity(stats['last_completed_at'])
         else:
             total_logs = 0
             total_assigned = 0
@@ -141,5 +116,21 @@ class Client(db.Model):
 
         return data
 
+    @staticmethod
+    def format_last_activity(last_completed_at):
+        """Human readable (Spanish) time since the last completed workout"""
+        if not last_completed_at:
+            return "Nunca"
+
+        delta = datetime.utcnow() - last_completed_at
+        if delta.days == 0:
+            hours = delta.seconds // 3600
+            if hours == 0:
+                return "Hace minutos"
+            return "Hace {} horas".format(hours)
+        elif delta.days == 1:
+            return "Hace 1 día"
+        return "Hace {} días".format(delta.days)
+
     def __repr__(self):
         return f'<Client {self.email}>'
@@ -0,0 +1,81 @@
+"""
+ClientAdherence Model - Materialized client_adherence view (docs/schema.sql)
+Refreshed by app/services/analytics_views.py (refresh_views.py scheduler); the
+accessors refresh rows older than ANALYTICS_VIEWS_MAX_STALENESS, or with writes since
+their last refresh, before reading.
+"""
+from sqlalchemy.orm import joinedload
+from app import db
+
+
+class ClientAdherence(db.Model):
+    """Adherence over the last 30 days - one row per client"""
+    __tablename__ = 'client_adherence'
+    __table_args__ = (
+        db.Index('idx_client_adherence_trainer', 'trainer_id', 'adherence_percentage'),
+        db.Index('idx_client_adherence_refreshed', 'refreshed_at'),
+    )
+
+    client_id = db.Column(db.Integer, db.ForeignKey('clients.id', ondelete='CASCADE'), primary_key=True)
+    trainer_id = db.Column(db.Integer, db.ForeignKey('trainers.id', ondelete='CASCADE'), nullable=False)
+
+    total_assigned = db.Column(db.Integer, nullable=False, default=0)
+    total_completed = db.Column(db.Integer, nullable=False, default=0)
+    adherence_percentage = db.Column(db.Numeric(5, 2), nullable=False, default=0)
+    last_workout_completed = db.Column(db.DateTime)
+
+    refreshed_at = db.Column(db.DateTime, nullable=False)
+    # Bumped by every rollup write of the client; the scheduler only re-aggregates
+    # exercise_progress when it is ahead of the version the rows were built from
+    data_version = db.Column(db.Integer, nullable=False, default=0)
+    progress_version = db.Column(db.Integer, nullable=False, default=0)
+
+    # Relationships
+    client = db.relationship('Client')
+
+    @classmethod
+    def for_trainer(cls, trainer_id, below=None):
+        """
+        Adherence rows of a trainer's clients, lowest first (clients at risk)
+
+        Args:
+            trainer_id: Trainer ID
+            below: Only clients under this adherence percentage
+
+        Returns:
+            list[ClientAdherence]
+        """
+        from app.services.analytics_views import analytics_views
+        analytics_views.ensure_fresh(trainer_id=trainer_id)
+
+        query = cls.query.options(joinedload(cls.client)).filter_by(trainer_id=trainer_id)
+        if below is not None:
+            query = query.filter(cls.adherence_percentage < below)
+        return query.order_by(cls.adherence_percentage, cls.client_id).all()
+
+    @classmethod
+    def for_client(cls, client_id):
+        """Adherence row of one client (None if the client does not exist)"""
+        from app.services.analytics_views import analytics_views
+        analytics_views.ensure_fresh(client_ids=[client_id])
+        return db.session.get(cls, client_id)
+
+    @property
+    def adherence(self):
+        return float(self.adherence_percentage or 0)
+
+    def to_dict(self):
+        """Convert adherence row to dictionary representation"""
+        return {
+            'clientId': self.client_id,
+            'name': self.client.name if self.client else None,
+            'trainerId': self.trainer_id,
+            'totalAssigned': self.total_assigned,
+            'totalCompleted': self.total_completed,
+            'adherence': self.adherence,
+            'lastWorkoutCompleted': self.last_workout_completed.isoformat() if self.last_workout_completed else None,
+            'refreshedAt': self.refreshed_at.isoformat() if self.refreshed_at else None,
+        }
+
+    def __repr__(self):
+        return f'<ClientAdherence client={self.client_id} {self.adherence_percentage}%>'
@@ -0,0 +1,49 @@
+"""
+ClientDailyActivity Model - Per-client, per-day rollup of assignment and log activity
+Maintained incrementally by the write paths (see app/services/activity_rollup.py)
+and rebuildable with backfill_rollup.py
+"""
+from app import db
+
+
+class ClientDailyActivity(db.Model):
+    """Daily activity rollup - one row per (trainer, client, day)"""
+    __tablename__ = 'client_daily_activity'
+    __table_args__ = (
+        db.UniqueConstraint('client_id', 'trainer_id', 'day', name='uq_client_daily_activity'),
+        db.Index('idx_client_daily_activity_trainer_day', 'trainer_id', 'day'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    trainer_id = db.Column(db.Integer, db.ForeignKey('trainers.id', ondelete='CASCADE'), nullable=False)
+    client_id = db.Column(db.Integer, db.ForeignKey('clients.id', ondelete='CASCADE'), nullable=False)
+    day = db.Column(db.Date, nullable=False)
+
+    # Assignments whose assigned_date falls on this day, by current status
+    assigned = db.Column(db.Integer, nullable=False, default=0)
+    completed = db.Column(db.Integer, nullable=False, default=0)
+    skipped = db.Column(db.Integer, nullable=False, default=0)
+
+    # Assignments completed on this day (by completed_at)
+    completions = db.Column(db.Integer, nullable=False, default=0)
+
+    # Workout logs (sets) logged on this day and their volume (reps × kg)
+    sets_logged = db.Column(db.Integer, nullable=False, default=0)
+    volume = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+
+    def to_dict(self):
+        """Convert rollup row to dictionary representation"""
+        return {
+            'trainer_id': self.trainer_id,
+            'client_id': self.client_id,
+            'day': self.day.isoformat() if self.day else None,
+            'assigned': self.assigned,
+            'completed': self.completed,
+            'skipped': self.skipped,
+            'completions': self.completions,
+            'setsLogged': self.sets_logged,
+            'volume': float(self.volume) if self.volume is not None else 0.0,
+        }
+
+    def __repr__(self):
+        return f'<ClientDailyActivity client={self.client_id} day={self.day}>'
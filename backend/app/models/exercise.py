@@ -8,6 +8,14 @@ from datetime import datetime
 class Exercise(db.Model):
     """Exercise model - populated from ExerciseDB API"""
     __tablename__ = 'exercises'
+    __table_args__ = (
+        # Same indexes as docs/schema.sql - used by the local catalog search (ExerciseCatalog)
+        db.Index('idx_exercises_body_part', 'body_part'),
+        db.Index('idx_exercises_equipment', 'equipment'),
+        db.Index('idx_exercises_target_muscle', 'target_muscle'),
+        db.Index('idx_exercises_name_search', db.text("to_tsvector('spanish', name)"), postgresql_using='gin'),
+        db.Index('idx_exercises_updated_at', 'updated_at'),  # Delta sync feed
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     external_id = db.Column(db.String(50), unique=True)  # ID from ExerciseDB API
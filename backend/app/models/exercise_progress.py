@@ -0,0 +1,59 @@
+"""
+ExerciseProgress Model - Materialized exercise_progress view (docs/schema.sql)
+Refreshed together with client_adherence (see app/services/analytics_views.py)
+"""
+from sqlalchemy.orm import joinedload
+from app import db
+
+
+class ExerciseProgress(db.Model):
+    """Per-client, per-exercise, per-day training totals"""
+    __tablename__ = 'exercise_progress'
+
+    client_id = db.Column(db.Integer, db.ForeignKey('clients.id', ondelete='CASCADE'), primary_key=True)
+    exercise_id = db.Column(db.Integer, db.ForeignKey('exercises.id', ondelete='CASCADE'), primary_key=True)
+    workout_date = db.Column(db.Date, primary_key=True)
+
+    avg_weight = db.Column(db.Numeric(7, 2))
+    max_weight = db.Column(db.Numeric(5, 2))
+    total_reps = db.Column(db.Integer, nullable=False, default=0)
+    sets = db.Column(db.Integer, nullable=False, default=0)
+
+    # Relationships
+    exercise = db.relationship('Exercise')
+
+    @classmethod
+    def for_client(cls, client_id, exercise_id=None, since=None):
+        """
+        Progress rows of a client, oldest first, with their exercise loaded
+
+        Args:
+            client_id: Client ID
+            exercise_id: Only this exercise
+            since: Only days on or after this date
+
+        Returns:
+            list[ExerciseProgress]
+        """
+        from app.services.analytics_views import analytics_views
+        analytics_views.ensure_fresh(client_ids=[client_id])
+
+        query = cls.query.options(joinedload(cls.exercise)).filter_by(client_id=client_id)
+        if exercise_id is not None:
+            query = query.filter_by(exercise_id=exercise_id)
+        if since is not None:
+            query = query.filter(cls.workout_date >= since)
+        return query.order_by(cls.exercise_id, cls.workout_date).all()
+
+    def to_dict(self):
+        """Convert progress row to dictionary representation"""
+        return {
+            'date': self.workout_date.isoformat(),
+            'avgWeight': float(self.avg_weight) if self.avg_weight is not None else None,
+            'maxWeight': float(self.max_weight) if self.max_weight is not None else None,
+            'totalReps': self.total_reps,
+            'sets': self.sets,
+        }
+
+    def __repr__(self):
+        return f'<ExerciseProgress client={self.client_id} exercise={self.exercise_id} {self.workout_date}>'
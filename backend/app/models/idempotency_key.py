@@ -0,0 +1,32 @@
+"""
+IdempotencyKey Model - Responses of accepted requests, keyed by the client-supplied Idempotency-Key
+Lets retried log uploads replay the original response instead of writing again
+(see app/services/idempotency.py)
+"""
+from app import db
+from datetime import datetime
+
+
+class IdempotencyKey(db.Model):
+    """One accepted request per (user_type, user_id, key)"""
+    __tablename__ = 'idempotency_keys'
+    __table_args__ = (
+        db.UniqueConstraint('user_type', 'user_id', 'key', name='uq_idempotency_keys_scope_key'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_type = db.Column(db.String(20), nullable=False)  # 'trainer' | 'client' | 'anonymous'
+    user_id = db.Column(db.Integer, nullable=False)  # 0 for anonymous requests
+    key = db.Column(db.String(255), nullable=False)
+
+    endpoint = db.Column(db.String(100), nullable=False)
+    request_hash = db.Column(db.String(64), nullable=False)  # sha256 of the request body
+
+    # NULL until the original request has finished
+    status_code = db.Column(db.Integer)
+    response_body = db.Column(db.Text)
+
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f'<IdempotencyKey {self.user_type}:{self.user_id} {self.key}>'
@@ -0,0 +1,33 @@
+"""
+OutboxEmail Model - Emails waiting to be sent (transactional outbox)
+Rows are added in the same transaction as the change that triggers them and sent
+by app/services/email_dispatcher.py.
+"""
+from app import db
+from datetime import datetime
+
+
+class OutboxEmail(db.Model):
+    """One queued email with its delivery state"""
+    __tablename__ = 'email_outbox'
+    __table_args__ = (
+        # Claim query: pending rows due for an attempt, oldest first
+        db.Index('idx_email_outbox_due', 'next_attempt_at', postgresql_where=db.text("status = 'pending'")),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(30), nullable=False)  # 'client_invitation'
+    to_email = db.Column(db.String(120), nullable=False)
+    subject = db.Column(db.String(200), nullable=False)
+    html_content = db.Column(db.Text, nullable=False)
+
+    status = db.Column(db.String(10), nullable=False, default='pending')  # 'pending' | 'sent' | 'failed'
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_error = db.Column(db.Text)
+
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+
+    def __repr__(self):
+        return f'<OutboxEmail {self.id} {self.kind} to={self.to_email} {self.status}>'
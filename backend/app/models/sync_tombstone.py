@@ -0,0 +1,28 @@
+"""
+SyncTombstone Model - Deleted rows reported by the delta sync feed
+Written automatically when a synced model is deleted (see app/services/change_feed.py)
+"""
+from app import db
+from datetime import datetime
+
+
+class SyncTombstone(db.Model):
+    """One row per deleted client / workout / assignment / exercise / trainer"""
+    __tablename__ = 'sync_tombstones'
+    __table_args__ = (
+        db.Index('idx_sync_tombstones_trainer_deleted', 'trainer_id', 'deleted_at'),
+        db.Index('idx_sync_tombstones_client_deleted', 'client_id', 'deleted_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    resource = db.Column(db.String(30), nullable=False)  # 'clients' | 'workouts' | 'assignments' | ...
+    resource_id = db.Column(db.Integer, nullable=False)
+
+    # Who may see the deletion (no FKs - the owners may be deleted too)
+    trainer_id = db.Column(db.Integer)
+    client_id = db.Column(db.Integer)
+
+    deleted_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<SyncTombstone {self.resource}:{self.resource_id}>'
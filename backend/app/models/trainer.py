@@ -3,7 +3,7 @@ Trainer Model - Represents a fitness trainer/coach
 """
 from app import db
 from datetime import datetime
-import bcrypt
+from app.services.password_hasher import password_hasher
 
 
 class Trainer(db.Model):
@@ -16,7 +16,7 @@ class Trainer(db.Model):
     name = db.Column(db.String(100), nullable=False)
     business_name = db.Column(db.String(200))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
     # Relationships
     clients = db.relationship('Client', back_populates='trainer', lazy='dynamic', cascade='all, delete-orphan')
@@ -24,15 +24,16 @@ class Trainer(db.Model):
     assignments = db.relationship('WorkoutAssignment', back_populates='trainer', lazy='dynamic', cascade='all, delete-orphan')
 
     def set_password(self, password: str):
-        """Hash and set password using bcrypt with cost factor 12"""
-        salt = bcrypt.gensalt(rounds=12)
-        self.password_hash = bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+        """Hash and set password using bcrypt with cost factor PASSWORD_HASH_ROUNDS (hashing pool)"""
+        self.password_hash = password_hasher.hash(password)
 
     def verify_password(self, password: str) -> bool:
-        """Verify password against stored hash"""
-        if not self.password_hash:
-            return False
-        return bcrypt.checkpw(password.encode('utf-8'), self.password_hash.encode('utf-8'))
+        """Verify password against stored hash (hashing pool)"""
+        return password_hasher.verify(password, self.password_hash)
+
+    def password_needs_rehash(self) -> bool:
+        """True if the stored hash uses a cost factor other than PASSWORD_HASH_ROUNDS"""
+        return bool(self.password_hash) and password_hasher.needs_rehash(self.password_hash)
 
     def to_dict(self, include_stats=False):
         """Convert trainer to dictionary representation"""
@@ -0,0 +1,34 @@
+"""
+UserIdentity Model - One row per login (trainer or client), keyed by email
+Maintained by ORM events on Trainer / Client (see app/services/identity_index.py);
+deletes cascade from the user tables.
+"""
+from app import db
+
+
+class UserIdentity(db.Model):
+    """email -> (user_type, user) for both roles - login is a single indexed probe"""
+    __tablename__ = 'user_identities'
+    __table_args__ = (
+        # Leading email column serves the login probe; same email allowed once per role
+        db.UniqueConstraint('email', 'user_type', name='uq_user_identities_email_type'),
+        db.CheckConstraint('(trainer_id IS NULL) <> (client_id IS NULL)', name='ck_user_identities_one_user'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    email = db.Column(db.String(120), nullable=False)
+    user_type = db.Column(db.String(10), nullable=False)  # 'trainer' | 'client'
+
+    trainer_id = db.Column(db.Integer, db.ForeignKey('trainers.id', ondelete='CASCADE'), unique=True)
+    client_id = db.Column(db.Integer, db.ForeignKey('clients.id', ondelete='CASCADE'), unique=True)
+
+    # Relationships
+    trainer = db.relationship('Trainer')
+    client = db.relationship('Client')
+
+    @property
+    def user(self):
+        return self.trainer if self.user_type == 'trainer' else self.client
+
+    def __repr__(self):
+        return f'<UserIdentity {self.user_type}:{self.email}>'
@@ -8,6 +8,9 @@ from datetime import datetime
 class Workout(db.Model):
     """Workout template model"""
     __tablename__ = 'workouts'
+    __table_args__ = (
+        db.Index('idx_workouts_trainer_updated', 'trainer_id', 'updated_at'),  # Delta sync feed
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(200), nullable=False)
@@ -34,8 +37,15 @@ class Workout(db.Model):
     assignments = db.relationship('WorkoutAssignment', back_populates='workout', lazy='dynamic', cascade='all, delete-orphan')
     # Note: workout_logs accessed via assignments.workout_logs.join(workout_exercises) (schema.sql structure)
 
-    def to_dict(self, include_exercises=False):
-        """Convert workout to dictionary representation"""
+    def to_dict(self, include_exercises=False, workout_exercises=None, include_exercise_details=True):
+        """
+        Convert workout to dictionary representation
+
+        Args:
+            include_exercises: Include the workout's exercise prescriptions
+            workout_exercises: Preloaded WorkoutExercise rows (see WorkoutLoader)
+            include_exercise_details: Embed the full exercise object in each prescription
+        """
         data = {
             'id': self.id,
             'name': self.name,
@@ -52,7 +62,11 @@ class Workout(db.Model):
         }
 
         if include_exercises:
-            exercises_list = [we.to_dict() for we in self.exercises.all()]
+            if workout_exercises is None:
+                # Import here to avoid circular imports
+                from app.models.workout_exercise import WorkoutExercise
+                workout_exercises = self.exercises.order_by(WorkoutExercise.order_index, WorkoutExercise.id).all()
+            exercises_list = [we.to_dict(include_exercise=include_exercise_details) for we in workout_exercises]
             data['exercises'] = exercises_list
             data['exerciseCount'] = len(exercises_list)  # FASE 2 compatibility
 
@@ -8,6 +8,11 @@ from datetime import datetime, timedelta
 class WorkoutAssignment(db.Model):
     """Workout assignment model - links workouts to clients with status tracking"""
     __tablename__ = 'workout_assignments'
+    __table_args__ = (
+        # Delta sync feed (trainer and client views)
+        db.Index('idx_assignments_trainer_updated', 'trainer_id', 'updated_at'),
+        db.Index('idx_assignments_client_updated', 'client_id', 'updated_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     workout_id = db.Column(db.Integer, db.ForeignKey('workouts.id'), nullable=False, index=True)
@@ -15,7 +20,7 @@ class WorkoutAssignment(db.Model):
     trainer_id = db.Column(db.Integer, db.ForeignKey('trainers.id'), nullable=False, index=True)
 
     # Assignment details
-    assigned_date = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    assigned_date = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
     due_date = db.Column(db.DateTime)  # Optional deadline
 
     # Status tracking
@@ -26,7 +31,7 @@ class WorkoutAssignment(db.Model):
     )  # pending, in_progress, completed, skipped
 
     started_at = db.Column(db.DateTime)
-    completed_at = db.Column(db.DateTime)
+    completed_at = db.Column(db.DateTime, index=True)
 
     # Notes from trainer
     notes = db.Column(db.Text)
@@ -70,38 +75,33 @@ class WorkoutAssignment(db.Model):
         if self.start_date:
             self.end_date = self.start_date + timedelta(weeks=self.workout.program_duration_weeks)
 
+    def get_program_metrics(self):
+        """Completed sessions, adherence and time progress (see ProgramMetricsCalculator)"""
+        # Import here to avoid circular imports
+        from app.services.program_metrics import ProgramMetricsCalculator
+        return ProgramMetricsCalculator().for_assignment(self)
+
     def get_adherence_percentage(self):
         """Calculate program adherence (completed_sessions / expected_sessions × 100)"""
-        if not self.expected_sessions or self.expected_sessions == 0:
-            return None
-
-        # Count completed workout logs for this assignment
-        # WorkoutLog has status field: 'completed', 'in_progress', 'skipped'
-        completed_count = self.workout_logs.filter_by(status='completed').count()
-
-        if completed_count == 0:
-            return 0.0
-
-        return round((completed_count / self.expected_sessions) * 100, 1)
+        return self.get_program_metrics()['adherence_percentage']
 
     def get_time_progress_percentage(self):
         """Calculate time progress (elapsed_days / total_days × 100)"""
-        if not self.start_date or not self.end_date:
-            return None
-
-        now = datetime.utcnow()
-        total_days = (self.end_date - self.start_date).days
-        elapsed_days = (now - self.start_date).days
+        # Import here to avoid circular imports
+        from app.services.program_metrics import ProgramMetricsCalculator
+        return ProgramMetricsCalculator().time_progress_percentage(self.start_date, self.end_date)
 
-        if total_days == 0:
-            return 0.0
+    def to_dict(self, include_workout=True, metrics=None):
+        """
+        Convert assignment to dictionary representation
 
-        # Clamp between 0 and 100
-        progress = (elapsed_days / total_days) * 100
-        return round(min(max(progress, 0), 100), 1)
+        Args:
+            include_workout: Embed the workout with its exercises
+            metrics: Precomputed ProgramMetricsCalculator.for_assignment() values
+        """
+        if metrics is None:
+            metrics = self.get_program_metrics()
 
-    def to_dict(self, include_workout=True):
-        """Convert assignment to dictionary representation"""
         # Get scheduled days - use own value or inherit from workout
         days = self.scheduled_days
         if days is None and self.workout:
@@ -124,8 +124,9 @@ class WorkoutAssignment(db.Model):
             'startDate': self.start_date.isoformat() if self.start_date else None,
             'endDate': self.end_date.isoformat() if self.end_date else None,
             'expectedSessions': self.expected_sessions,
-            'adherencePercentage': self.get_adherence_percentage(),
-            'timeProgressPercentage': self.get_time_progress_percentage(),
+            'completedSessions': metrics['completed_sessions'],
+            'adherencePercentage': metrics['adherence_percentage'],
+            'timeProgressPercentage': metrics['time_progress_percentage'],
         }
 
         if include_workout and self.workout:
@@ -7,6 +7,9 @@ from app.routes.workouts import workouts_bp, assignments_bp
 from app.routes.analytics import analytics_bp, trainers_bp
 from app.routes.clients_analytics import clients_analytics_bp
 from app.routes.workout_logs import workout_logs_bp
+from app.routes.exercises import exercises_bp
+from app.routes.sync import sync_bp
+from app.routes.debug import debug_bp
 
 __all__ = [
     'auth_bp',
@@ -16,5 +19,8 @@ __all__ = [
     'analytics_bp',
     'trainers_bp',  # FASE 5 spec
     'clients_analytics_bp',  # FASE 5 spec
-    'workout_logs_bp'
+    'workout_logs_bp',
+    'exercises_bp',  # F-012 exercise library
+    'sync_bp',  # Delta sync feed
+    'debug_bp'  # SQL metrics (debug only)
 ]
@@ -3,14 +3,20 @@ Analytics Routes - Dashboard stats and client metrics (FASE 5)
 Endpoints según especificación FASE 5:
 - GET /api/trainers/me/analytics
 - GET /api/clients/:id/analytics
+Adherence and exercise progress (materialized client_adherence / exercise_progress):
+- GET /api/analytics/adherence
+- GET /api/analytics/progress/:clientId
 """
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from datetime import datetime, timedelta
 from app import db
-from app.models import Client, WorkoutAssignment, Trainer
+from app.models import Client, ClientAdherence, ExerciseProgress, WorkoutAssignment, Trainer
 from sqlalchemy import func
+from app.services.activity_rollup import activity_rollup
 from app.utils.auth_helpers import require_trainer, verify_client_access
+from app.services.analytics_engine import analytics_engine
+from app.services.analytics_views import analytics_views
 
 # FASE 5: trainers blueprint (no analytics blueprint)
 trainers_bp = Blueprint('trainers', __name__, url_prefix='/api/trainers')
@@ -42,112 +48,11 @@ def get_trainer_analytics():
 
     try:
         trainer_id = get_jwt_identity()
-        seven_days_ago = datetime.utcnow() - timedelta(days=7)
-
-        # Total clients
-        total_clients = Client.query.filter_by(
-            trainer_id=trainer_id,
-            is_active=True
-        ).count()
-
-        # Active clients (completed at least one workout in last 7 days)
-        # Use WorkoutAssignment instead of WorkoutLog (schema.sql compliant)
-        active_clients = db.session.query(
-            func.count(func.distinct(WorkoutAssignment.client_id))
-        ).filter(
-            WorkoutAssignment.trainer_id == trainer_id,
-            WorkoutAssignment.status == 'completed',
-            WorkoutAssignment.completed_at >= seven_days_ago
-        ).scalar() or 0
-
-        # Workouts completed this week
-        # Use WorkoutAssignment instead of WorkoutLog
-        workouts_this_week = WorkoutAssignment.query.filter_by(
-            trainer_id=trainer_id,
-            status='completed'
-        ).filter(
-            WorkoutAssignment.completed_at >= seven_days_ago
-        ).count()
-
-        # Average adherence calculation
-        # Adherence = (completed assignments / total assignments) * 100
-        total_assignments = WorkoutAssignment.query.filter_by(
-            trainer_id=trainer_id
-        ).filter(
-            WorkoutAssignment.assigned_date >= seven_days_ago
-        ).count()
-
-        completed_assignments = WorkoutAssignment.query.filter_by(
-            trainer_id=trainer_id,
-            status='completed'
-        ).filter(
-            WorkoutAssignment.assigned_date >= seven_days_ago
-        ).count()
-
-        avg_adherence = (completed_assignments / total_assignments * 100) if total_assignments > 0 else 0
-
-        # Weekly activity (workouts per day)
-        # Use WorkoutAssignment instead of WorkoutLog (schema.sql compliant)
-        weekly_activity = []
-        for i in range(7):
-            day = datetime.utcnow() - timedelta(days=i)
-            day_start = day.replace(hour=0, minute=0, second=0, microsecond=0)
-            day_end = day_start + timedelta(days=1)
-
-            count = WorkoutAssignment.query.filter_by(
-                trainer_id=trainer_id,
-                status='completed'
-            ).filter(
-                WorkoutAssignment.completed_at >= day_start,
-                WorkoutAssignment.completed_at < day_end
-            ).count()
-
-            weekly_activity.append({
-                'date': day_start.isoformat(),
-                'completed': count
-            })
-
-        # Client adherence breakdown
-        clients = Client.query.filter_by(trainer_id=trainer_id, is_active=True).all()
-        clients_adherence = []
-
-        for client in clients:
-            assigned = WorkoutAssignment.query.filter_by(
-                client_id=client.id
-            ).filter(
-                WorkoutAssignment.assigned_date >= seven_days_ago
-            ).count()
-
-            completed = WorkoutAssignment.query.filter_by(
-                client_id=client.id,
-                status='completed'
-            ).filter(
-                WorkoutAssignment.assigned_date >= seven_days_ago
-            ).count()
-
-            adherence = (completed / assigned * 100) if assigned > 0 else 0
-
-            clients_adherence.append({
-                'clientId': client.id,
-                'name': client.name,
-                'adherence': round(adherence, 1),
-                'workoutsCompleted': completed,
-                'workoutsAssigned': assigned
-            })
-
-        # Sort by adherence (lowest first - clients at risk)
-        clients_adherence.sort(key=lambda x: x['adherence'])
 
+        # All fields come from a fixed number of grouped queries (see AnalyticsEngine)
         return jsonify({
             'success': True,
-            'data': {
-                'totalClients': total_clients,
-                'activeClients': active_clients,
-                'avgAdherence': round(avg_adherence, 1),
-                'workoutsThisWeek': workouts_this_week,
-                'weeklyActivity': list(reversed(weekly_activity)),  # Oldest first
-                'clientsAdherence': clients_adherence
-            }
+            'data': analytics_engine.trainer_dashboard(trainer_id)
         }), 200
 
     except Exception as e:
@@ -186,23 +91,14 @@ def get_client_analytics(client_id):
                 'error': 'Client not found'
             }), 404
 
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
+        now = datetime.utcnow()
+        thirty_days_ago = now - timedelta(days=30)
 
-        # Assignments stats
-        total_assignments = WorkoutAssignment.query.filter_by(
-            client_id=client_id
-        ).filter(
-            WorkoutAssignment.assigned_date >= thirty_days_ago
-        ).count()
-
-        completed_assignments = WorkoutAssignment.query.filter_by(
-            client_id=client_id,
-            status='completed'
-        ).filter(
-            WorkoutAssignment.assigned_date >= thirty_days_ago
-        ).count()
-
-        adherence = (completed_assignments / total_assignments * 100) if total_assignments > 0 else 0
+        # Last-30-days adherence from the materialized client_adherence table
+        client_adherence = ClientAdherence.for_client(client_id)
+        total_assignments = client_adherence.total_assigned
+        completed_assignments = client_adherence.total_completed
+        adherence = client_adherence.adherence
 
         # Average workout duration - calculate from completed assignments
         # Since WorkoutLog no longer tracks duration_seconds (schema.sql structure),
@@ -228,15 +124,13 @@ def get_client_analytics(client_id):
         # Use WorkoutAssignment instead of WorkoutLog
         progress_data = []
         for i in range(4):  # Last 4 weeks
-            week_start = datetime.utcnow() - timedelta(weeks=i+1)
-            week_end = datetime.utcnow() - timedelta(weeks=i)
+            week_start = now - timedelta(weeks=i+1)
+            week_end = now - timedelta(weeks=i)
 
-            workouts = WorkoutAssignment.query.filter(
-                WorkoutAssignment.client_id == client_id,
-                WorkoutAssignment.status == 'completed',
-                WorkoutAssignment.completed_at >= week_start,
-                WorkoutAssignment.completed_at < week_end
-            ).count()
+            week_totals = activity_rollup.sum_totals(
+                activity_rollup.window_totals(week_start, week_end, client_ids=[client_id])
+            )
+            workouts = week_totals['completions']
 
             progress_data.append({
                 'week': f'Week {4-i}',
@@ -261,3 +155,105 @@ def get_client_analytics(client_id):
             'success': False,
             'error': f'Failed to get client analytics: {str(e)}'
         }), 500
+
+
+@analytics_bp.route('/adherence', methods=['GET'])
+@jwt_required()
+def get_adherence():
+    """
+    Last-30-days adherence of the trainer's clients, lowest first (materialized client_adherence)
+
+    Query params:
+        below: Only clients under this adherence percentage (e.g. 40 = clients at risk)
+
+    Response:
+    {
+        "avgAdherence": 68.2,
+        "windowDays": 30,
+        "clients": [{"clientId": 3, "name": "...", "adherence": 25.0, ...}]
+    }
+    """
+    error_response = require_trainer()
+    if error_response:
+        return error_response
+
+    try:
+        trainer_id = get_jwt_identity()
+        below = request.args.get('below', None, type=float)
+
+        rows = ClientAdherence.for_trainer(trainer_id, below=below)
+        total_assigned = sum(row.total_assigned for row in rows)
+        total_completed = sum(row.total_completed for row in rows)
+
+        return jsonify({
+            'success': True,
+            'data': {
+                'avgAdherence': round(total_completed / total_assigned * 100, 1) if total_assigned else 0,
+                'windowDays': analytics_views.ADHERENCE_WINDOW_DAYS,
+                'clients': [row.to_dict() for row in rows]
+            }
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Failed to get adherence: {str(e)}'
+        }), 500
+
+
+@analytics_bp.route('/progress/<int:client_id>', methods=['GET'])
+@jwt_required()
+def get_client_progress(client_id):
+    """
+    Per-exercise daily progress of a client (materialized exercise_progress)
+
+    Query params:
+        exercise_id: Only this exercise
+        since: ISO date, only days on or after it
+
+    Response:
+    {
+        "clientId": 12,
+        "exercises": [{"exerciseId": 4, "name": "Bench Press", "history": [{"date", "avgWeight", "maxWeight", "totalReps", "sets"}]}]
+    }
+    """
+    error_response = verify_client_access(client_id)
+    if error_response:
+        return error_response
+
+    try:
+        since = request.args.get('since')
+        try:
+            since = datetime.fromisoformat(since).date() if since else None
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': 'since must be an ISO date'
+            }), 400
+
+        rows = ExerciseProgress.for_client(
+            client_id, exercise_id=request.args.get('exercise_id', None, type=int), since=since
+        )
+
+        exercises = {}
+        for row in rows:
+            exercise = exercises.setdefault(row.exercise_id, {
+                'exerciseId': row.exercise_id,
+                'name': row.exercise.name if row.exercise else None,
+                'history': []
+            })
+            exercise['history'].append(row.to_dict())
+
+        return jsonify({
+            'success': True,
+            'data': {
+                'clientId': client_id,
+                'exercises': list(exercises.values())
+            }
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Failed to get client progress: {str(e)}'
+        }), 500
@@ -10,12 +10,27 @@ from flask_jwt_extended import (
     get_jwt
 )
 from datetime import timedelta
+import logging
 from app import db
 from app.models import Trainer, Client
+from app.services.identity_index import identity_index
+from app.services.password_hasher import HasherBusy
+
+logger = logging.getLogger(__name__)
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
 
+def _hasher_busy_response():
+    """503 with Retry-After when the password hashing pool is saturated"""
+    response = jsonify({
+        'success': False,
+        'error': 'Too many logins in progress, please retry in a moment'
+    })
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
     """
@@ -45,8 +60,7 @@ def register():
         business_name = data.get('business_name', '').strip()
 
         # Check if email already exists
-        existing_trainer = Trainer.query.filter_by(email=email).first()
-        if existing_trainer:
+        if identity_index.find(email, 'trainer'):
             return jsonify({
                 'success': False,
                 'error': 'Email already registered'
@@ -83,6 +97,9 @@ def register():
             'user': trainer.to_dict()
         }), 201
 
+    except HasherBusy:
+        db.session.rollback()
+        return _hasher_busy_response()
     except Exception as e:
         db.session.rollback()
         return jsonify({
@@ -116,11 +133,8 @@ def login():
         password = data['password']
         user_type = data.get('user_type', 'trainer')
 
-        # Find user based on type
-        if user_type == 'client':
-            user = Client.query.filter_by(email=email).first()
-        else:
-            user = Trainer.query.filter_by(email=email).first()
+        # Single probe on the identity index (user row joined in)
+        user = identity_index.find(email, 'client' if user_type == 'client' else 'trainer')
 
         # Verify credentials
         if not user or not user.verify_password(password):
@@ -129,6 +143,15 @@ def login():
                 'error': 'Invalid email or password'
             }), 401
 
+        # Rehash transparently when PASSWORD_HASH_ROUNDS changed since the hash was made
+        if user.password_needs_rehash():
+            try:
+                user.set_password(password)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logger.warning(f'Password rehash failed for {user_type} {user.id}, retrying next login: {e}')
+
         # Generate tokens
         access_token = create_access_token(
             identity=user.id,
@@ -150,6 +173,8 @@ def login():
             'user_type': user_type
         }), 200
 
+    except HasherBusy:
+        return _hasher_busy_response()
     except Exception as e:
         return jsonify({
             'success': False,
@@ -202,11 +227,8 @@ def get_current_user():
         claims = get_jwt()
         user_type = claims.get('type', 'trainer')
 
-        # Get user based on type
-        if user_type == 'client':
-            user = Client.query.get(identity)
-        else:
-            user = Trainer.query.get(identity)
+        # Primary key lookup - the token already carries the user type
+        user = db.session.get(Client if user_type == 'client' else Trainer, identity)
 
         if not user:
             return jsonify({
@@ -255,7 +277,7 @@ def register_client():
         invite_token = data.get('invite_token')
 
         # Check if email already exists
-        existing_client = Client.query.filter_by(email=email).first()
+        existing_client = identity_index.find(email, 'client')
 
         if existing_client:
             # If client exists with invite but no password, allow password setup
@@ -298,6 +320,9 @@ def register_client():
             'error': 'Client registration requires an invitation from a trainer'
         }), 400
 
+    except HasherBusy:
+        db.session.rollback()
+        return _hasher_busy_response()
     except Exception as e:
         db.session.rollback()
         return jsonify({
@@ -5,20 +5,29 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from datetime import datetime
 from app import db
-from app.models import Client, Trainer
+from app.models import Client, Trainer, WorkoutAssignment
 from app.utils.auth_helpers import require_trainer, verify_resource_ownership
+from app.services.assignment_writer import assignment_writer
+from app.services.bulk_invite import BulkInviteError, bulk_inviter, invite_link, invite_token_for
+from app.services.client_stats import client_stats_loader
+from app.services.email_dispatcher import email_dispatcher
+from app.services.email_service import email_service
+from app.services.identity_index import identity_index
+from app.services.sql_metrics import query_budget
 
 clients_bp = Blueprint('clients', __name__, url_prefix='/api/clients')
 
 
 @clients_bp.route('', methods=['GET'])
 @jwt_required()
+@query_budget(5)
 def get_clients():
     """
     Get all clients for the authenticated trainer
 
     Query params:
     - active: true/false (filter by is_active status)
+    - stats_period_days: period for workout stats (optional, default all time)
     """
     error_response = require_trainer()
     if error_response:
@@ -34,11 +43,19 @@ def get_clients():
             is_active = active_filter.lower() == 'true'
             query = query.filter_by(is_active=is_active)
 
+        stats_period_days = request.args.get('stats_period_days', type=int)
+
         clients = query.all()
 
+        # Stats for every listed client in a fixed number of grouped queries
+        stats = client_stats_loader.load([client.id for client in clients], stats_period_days)
+
         return jsonify({
             'success': True,
-            'data': [client.to_dict(include_stats=True) for client in clients]
+            'data': [
+                client.to_dict(include_stats=True, stats_period_days=stats_period_days, stats=stats[client.id])
+                for client in clients
+            ]
         }), 200
 
     except Exception as e:
@@ -110,8 +127,7 @@ def create_client():
         name = data['name'].strip()
 
         # Check if client email already exists
-        existing_client = Client.query.filter_by(email=email).first()
-        if existing_client:
+        if identity_index.find(email, 'client'):
             return jsonify({
                 'success': False,
                 'error': 'Client with this email already exists'
@@ -235,6 +251,8 @@ def delete_client(client_id):
                 'error': 'Client not found'
             }), 404
 
+        # Assignments and their logs go first with set-based DELETEs (no per-assignment cascade)
+        assignment_writer.delete_where(WorkoutAssignment.client_id == client.id)
         db.session.delete(client)
         db.session.commit()
 
@@ -264,10 +282,6 @@ def invite_client(client_id):
         return error_response
 
     try:
-        from flask_jwt_extended import create_access_token
-        from datetime import timedelta
-        import os
-
         trainer_id = get_jwt_identity()
         trainer = Trainer.query.get(trainer_id)
         client = Client.query.filter_by(id=client_id, trainer_id=trainer_id).first()
@@ -279,30 +293,24 @@ def invite_client(client_id):
             }), 404
 
         # Generate invite token (7 days expiry)
-        invite_token = create_access_token(
-            identity=client.id,
-            expires_delta=timedelta(days=7),
-            additional_claims={'type': 'invite', 'client_id': client.id, 'trainer_id': trainer_id}
-        )
+        invite_token = invite_token_for(client.id, trainer_id)
 
         # Store invite token and timestamp
         client.invite_token = invite_token
         client.invite_sent_at = datetime.utcnow()
-        db.session.commit()
 
         # Build registration link
-        frontend_url = os.getenv('FRONTEND_MOBILE_URL', 'exp://localhost:8081')
-        registration_link = f"{frontend_url}/register?token={invite_token}"
+        registration_link = invite_link(invite_token)
 
-        # Send invitation email
-        from app.services.email_service import EmailService
-        email_service = EmailService()
-        email_sent = email_service.send_client_invitation(
+        # Queue the invitation email in the same transaction; it is sent in the background
+        queued_email = email_service.queue_client_invitation(
             client_email=client.email,
             client_name=client.name,
             trainer_name=trainer.name,
             invite_link=registration_link
         )
+        db.session.commit()
+        email_dispatcher.notify()
 
         # Return response
         response = {
@@ -310,13 +318,14 @@ def invite_client(client_id):
             'client': client.to_dict()
         }
 
-        if email_sent:
+        if queued_email:
             response['message'] = f'Invitación enviada a {client.email}'
+            response['email_id'] = queued_email.id
         else:
-            # If SendGrid is not configured, return the link for manual sharing
+            # If no email transport is configured, return the link for manual sharing
             response['message'] = f'Invitación preparada (email no configurado)'
             response['invite_link'] = registration_link  # For development/testing
-            response['note'] = 'SendGrid no está configurado. Comparte este link manualmente.'
+            response['note'] = 'El envío de emails no está configurado. Comparte este link manualmente.'
 
         return jsonify(response), 200
 
@@ -326,3 +335,67 @@ def invite_client(client_id):
             'success': False,
             'error': f'Failed to send invitation: {str(e)}'
         }), 500
+
+
+@clients_bp.route('/invite', methods=['POST'])
+@jwt_required()
+def bulk_invite_clients():
+    """
+    Invite many clients at once - existing clients by ID and/or new clients (created here)
+
+    Request body (JSON):
+    {
+        "client_ids": [1, 2, 3] (optional),
+        "clients": [{"email": "...", "name": "...", "phone": "..."}] (optional)
+    }
+    or a CSV of new clients (header email,name[,phone,notes,gender,age,goals]) as a
+    text/csv body or a multipart "file" upload.
+
+    Returns a status per row: invited, not_found, already_registered, duplicate,
+    invalid or email_taken ("created": true marks clients created by this request).
+    """
+    error_response = require_trainer()
+    if error_response:
+        return error_response
+
+    try:
+        trainer = db.session.get(Trainer, int(get_jwt_identity()))
+
+        if 'file' in request.files:
+            data = {'clients': bulk_inviter.parse_csv(request.files['file'].read().decode('utf-8-sig'))}
+        elif request.mimetype == 'text/csv':
+            data = {'clients': bulk_inviter.parse_csv(request.get_data(as_text=True))}
+        else:
+            data = request.get_json(silent=True) or {}
+
+        client_ids, new_clients = data.get('client_ids') or [], data.get('clients') or []
+        if not isinstance(client_ids, list) or not isinstance(new_clients, list) \
+                or not all(isinstance(row, dict) for row in new_clients):
+            return jsonify({
+                'success': False,
+                'error': 'client_ids and clients must be lists'
+            }), 400
+
+        results = bulk_inviter.invite(trainer, client_ids, new_clients)
+        db.session.commit()
+        email_dispatcher.notify()
+
+        return jsonify({
+            'success': True,
+            'invited': sum(1 for result in results if result['status'] == 'invited'),
+            'created': sum(1 for result in results if result.get('created')),
+            'results': results
+        }), 200
+
+    except (BulkInviteError, UnicodeDecodeError) as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': f'Failed to send invitations: {str(e)}'
+        }), 500
@@ -7,8 +7,9 @@ from flask import Blueprint, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from datetime import datetime, timedelta
 from app import db
-from app.models import Client, WorkoutAssignment
+from app.models import Client, ClientAdherence, WorkoutAssignment
 from sqlalchemy import func
+from app.services.activity_rollup import activity_rollup
 
 clients_analytics_bp = Blueprint('clients_analytics', __name__)
 
@@ -55,23 +56,13 @@ def get_client_analytics_fase5(client_id):
                 'error': 'Client not found'
             }), 404
 
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
+        now = datetime.utcnow()
 
-        # Assignments stats
-        total_assignments = WorkoutAssignment.query.filter_by(
-            client_id=client_id
-        ).filter(
-            WorkoutAssignment.assigned_date >= thirty_days_ago
-        ).count()
-
-        completed_assignments = WorkoutAssignment.query.filter_by(
-            client_id=client_id,
-            status='completed'
-        ).filter(
-            WorkoutAssignment.assigned_date >= thirty_days_ago
-        ).count()
-
-        adherence = (completed_assignments / total_assignments * 100) if total_assignments > 0 else 0
+        # Last-30-days adherence from the materialized client_adherence table
+        client_adherence = ClientAdherence.for_client(client_id)
+        total_assignments = client_adherence.total_assigned
+        completed_assignments = client_adherence.total_completed
+        adherence = client_adherence.adherence
 
         # Average workout duration (simplified - uses default 45 minutes)
         # For production: join with Workout table and calculate avg(workout.duration)
@@ -80,15 +71,13 @@ def get_client_analytics_fase5(client_id):
         # Progress over time (weekly aggregation)
         progress_data = []
         for i in range(4):  # Last 4 weeks
-            week_start = datetime.utcnow() - timedelta(weeks=i+1)
-            week_end = datetime.utcnow() - timedelta(weeks=i)
-
-            workouts = WorkoutAssignment.query.filter(
-                WorkoutAssignment.client_id == client_id,
-                WorkoutAssignment.status == 'completed',
-                WorkoutAssignment.completed_at >= week_start,
-                WorkoutAssignment.completed_at < week_end
-            ).count()
+            week_start = now - timedelta(weeks=i+1)
+            week_end = now - timedelta(weeks=i)
+
+            week_totals = activity_rollup.sum_totals(
+                activity_rollup.window_totals(week_start, week_end, client_ids=[client_id])
+            )
+            workouts = week_totals['completions']
 
             progress_data.append({
                 'week': f'Week {4-i}',
@@ -0,0 +1,37 @@
+"""
+Debug Routes - Per-request SQL metrics (only when DEBUG or SQL_DEBUG_ENDPOINT is enabled)
+"""
+from flask import Blueprint, current_app, request, jsonify
+from app.services.sql_metrics import sql_metrics
+
+debug_bp = Blueprint('debug', __name__, url_prefix='/api/debug')
+
+
+@debug_bp.route('/sql', methods=['GET'])
+def sql_metrics_report():
+    """
+    Recent requests with query count, DB time and slowest statements (newest first)
+
+    Query params:
+        endpoint: Only requests to this endpoint (e.g. workouts.get_workouts)
+        over_budget: true to list only requests that exceeded their query budget
+    """
+    if not (current_app.debug or current_app.config.get('SQL_DEBUG_ENDPOINT')):
+        return jsonify({
+            'success': False,
+            'error': 'Not found'
+        }), 404
+
+    endpoint = request.args.get('endpoint')
+    over_budget = request.args.get('over_budget', 'false').lower() == 'true'
+
+    requests_seen = [
+        summary for summary in reversed(sql_metrics.recent)
+        if (not endpoint or summary['endpoint'] == endpoint)
+        and (not over_budget or summary['queries'] > summary['budget'])
+    ]
+
+    return jsonify({
+        'success': True,
+        'data': requests_seen
+    }), 200
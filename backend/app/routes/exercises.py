@@ -2,25 +2,66 @@
 Exercise routes - F-012
 """
 from flask import Blueprint, request, jsonify
+from flask_jwt_extended import get_jwt, get_jwt_identity, jwt_required, verify_jwt_in_request
 from app import db
 from app.models import Exercise
 from app.services.exercisedb import exercise_db_service
-import uuid
+from app.services.exercise_catalog import exercise_catalog
+from app.utils.auth_helpers import require_trainer
+from app.services.sql_metrics import query_budget
+import os
 
 exercises_bp = Blueprint('exercises', __name__, url_prefix='/api/exercises')
 
 
 @exercises_bp.route('', methods=['GET'])
+@query_budget(3)
 def list_exercises():
-    """List exercises with search and filters"""
+    """
+    List exercises with search and filters
+
+    Served from the local catalog (exercises table) unless EXERCISES_SOURCE=remote.
+
+    Query params:
+        search, bodyPart, target, equipment: Filters (combinable in local mode)
+        limit, offset: Offset pagination
+        after: Keyset pagination - pass the X-Next-Cursor header of the previous page
+    """
     # Get query parameters
     search = request.args.get('search', '')
     body_part = request.args.get('bodyPart', '')
     target = request.args.get('target', '')
     equipment = request.args.get('equipment', '')
-    limit = int(request.args.get('limit', 50))
-    offset = int(request.args.get('offset', 0))
+    limit = request.args.get('limit', 50, type=int)
+    offset = request.args.get('offset', 0, type=int)
+    after_id = request.args.get('after', None, type=int)
+
+    # Custom exercises of the authenticated trainer (optional auth)
+    verify_jwt_in_request(optional=True)
+    trainer_id = get_jwt_identity() if get_jwt().get('type') == 'trainer' else None
+
+    if os.getenv('EXERCISES_SOURCE', 'local') == 'remote':
+        return _list_remote_exercises(search, body_part, target, equipment, limit, offset, trainer_id)
+
+    exercises, next_after_id = exercise_catalog.search(
+        search=search,
+        body_part=body_part,
+        target=target,
+        equipment=equipment,
+        limit=limit,
+        offset=offset,
+        after_id=after_id,
+        trainer_id=trainer_id
+    )
+
+    response = jsonify([exercise_catalog.format_exercise(ex) for ex in exercises])
+    if next_after_id is not None:
+        response.headers['X-Next-Cursor'] = str(next_after_id)
+    return response, 200
 
+
+def _list_remote_exercises(search, body_part, target, equipment, limit, offset, trainer_id):
+    """Legacy mode - query ExerciseDB (through its cache) and append custom exercises"""
     exercises = []
 
     # Search by name
@@ -40,58 +81,52 @@ def list_exercises():
         exercises = exercise_db_service.get_exercises(limit=limit, offset=offset)
 
     # Also include custom exercises from trainer
-    trainer_id = request.headers.get('X-Trainer-Id', 'trainer-demo-1')
-    custom_exercises = Exercise.query.filter_by(
-        trainer_id=trainer_id,
-        is_custom=True
-    ).all()
-
-    for ex in custom_exercises:
-        exercises.append({
-            'id': ex.id,
-            'externalId': ex.external_id,
-            'name': ex.name,
-            'bodyPart': ex.body_part,
-            'equipment': ex.equipment,
-            'target': ex.target,
-            'gifUrl': ex.gif_url,
-            'instructions': ex.instructions.split('\n') if ex.instructions else [],
-            'isCustom': True
-        })
+    if trainer_id is not None:
+        custom_exercises = Exercise.query.filter_by(
+            trainer_id=trainer_id,
+            is_custom=True
+        ).all()
+        exercises.extend(exercise_catalog.format_exercise(ex) for ex in custom_exercises)
 
     return jsonify(exercises), 200
 
 
 @exercises_bp.route('/filters', methods=['GET'])
 def get_filters():
-    """Get available filters (body parts, targets, equipment)"""
-    body_parts = exercise_db_service.get_body_parts()
-    targets = exercise_db_service.get_target_muscles()
-    equipment = exercise_db_service.get_equipment_list()
+    """
+    Get available filters (body parts, targets, equipment)
+
+    The three lists are fetched concurrently within EXERCISEDB_FILTERS_DEADLINE;
+    lists that missed it are served from cache (or empty) and named in X-Partial-Result.
+    """
+    filters, missing = exercise_db_service.get_filters()
 
-    return jsonify({
-        'bodyParts': body_parts,
-        'targets': targets,
-        'equipment': equipment
-    }), 200
+    response = jsonify(filters)
+    if missing:
+        response.headers['X-Partial-Result'] = ','.join(missing)
+    return response, 200
 
 
 @exercises_bp.route('/custom', methods=['POST'])
+@jwt_required()
 def create_custom_exercise():
-    """Create a custom exercise"""
-    trainer_id = request.headers.get('X-Trainer-Id', 'trainer-demo-1')
-    data = request.get_json()
+    """Create a custom exercise (trainer only)"""
+    error = require_trainer()
+    if error:
+        return error
+
+    trainer_id = get_jwt_identity()
+    data = request.get_json() or {}
 
     # Validation
     if not data.get('name'):
         return jsonify({'error': 'Name is required'}), 400
 
     exercise = Exercise(
-        id=f"custom-{uuid.uuid4().hex[:8]}",
         name=data['name'],
         body_part=data.get('bodyPart', ''),
         equipment=data.get('equipment', ''),
-        target=data.get('target', ''),
+        target_muscle=data.get('target', ''),
         gif_url=data.get('gifUrl', ''),
         instructions='\n'.join(data.get('instructions', [])),
         is_custom=True,
@@ -101,35 +136,19 @@ def create_custom_exercise():
     db.session.add(exercise)
     db.session.commit()
 
-    return jsonify({
-        'id': exercise.id,
-        'name': exercise.name,
-        'bodyPart': exercise.body_part,
-        'equipment': exercise.equipment,
-        'target': exercise.target,
-        'gifUrl': exercise.gif_url,
-        'instructions': exercise.instructions.split('\n') if exercise.instructions else [],
-        'isCustom': True
-    }), 201
+    return jsonify(exercise_catalog.format_exercise(exercise)), 201
 
 
 @exercises_bp.route('/<exercise_id>', methods=['GET'])
 def get_exercise(exercise_id):
-    """Get exercise details"""
-    # Check if it's a custom exercise
-    if exercise_id.startswith('custom-'):
-        exercise = Exercise.query.get_or_404(exercise_id)
-        return jsonify({
-            'id': exercise.id,
-            'name': exercise.name,
-            'bodyPart': exercise.body_part,
-            'equipment': exercise.equipment,
-            'target': exercise.target,
-            'gifUrl': exercise.gif_url,
-            'instructions': exercise.instructions.split('\n') if exercise.instructions else [],
-            'isCustom': True
-        }), 200
+    """Get exercise details ('exercisedb-<externalId>' or a custom exercise ID)"""
+    if exercise_id.startswith('exercisedb-'):
+        exercise = Exercise.query.filter_by(
+            external_id=exercise_id[len('exercisedb-'):]
+        ).first_or_404()
+    elif exercise_id.isdigit():
+        exercise = Exercise.query.get_or_404(int(exercise_id))
     else:
-        # It's from ExerciseDB - could fetch from API or cache
-        # For now, return a simple response
-        return jsonify({'error': 'Exercise details not implemented for ExerciseDB exercises'}), 501
+        return jsonify({'error': 'Exercise not found'}), 404
+
+    return jsonify(exercise_catalog.format_exercise(exercise)), 200
@@ -3,6 +3,8 @@ Health Check Routes
 """
 from flask import Blueprint, jsonify
 from app import db
+from app.services.email_dispatcher import email_dispatcher
+from app.services.password_hasher import password_hasher
 
 health_bp = Blueprint('health', __name__)
 
@@ -30,7 +32,7 @@ def health_check():
 @health_bp.route('/api/health', methods=['GET'])
 def api_health_check():
     """
-    API health check endpoint with version info
+    API health check endpoint with version info, password hashing pool and email outbox stats
     """
     try:
         # Test database connection
@@ -43,5 +45,8 @@ def api_health_check():
         'status': 'healthy',
         'database': db_status,
         'service': 'FitCompass Pro API',
-        'version': '1.0.0'
+        'version': '1.0.0',
+        'password_hasher': password_hasher.stats(),
+        # Outbox backlog needs the database
+        'email_dispatcher': email_dispatcher.stats() if db_status == 'connected' else None
     }), 200
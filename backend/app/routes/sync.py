@@ -0,0 +1,77 @@
+"""
+Sync Routes - Delta sync feed for the mobile app and web frontend
+"""
+from datetime import datetime, timezone
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from app import db
+from app.services.change_feed import change_feed
+from app.services.sql_metrics import query_budget
+
+sync_bp = Blueprint('sync', __name__, url_prefix='/api/sync')
+
+
+def _parse_watermark(value):
+    """ISO 8601 watermark from a previous response (UTC if no offset)"""
+    watermark = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if watermark.tzinfo is not None:
+        watermark = watermark.astimezone(timezone.utc).replace(tzinfo=None)
+    return watermark
+
+
+@sync_bp.route('/changes', methods=['GET'])
+@jwt_required()
+@query_budget(12)
+def get_changes():
+    """
+    Get rows created, updated or deleted since a watermark
+
+    Query params:
+        since: Watermark returned by the previous call (omit for a full sync)
+        resources: Comma-separated subset of clients, workouts, assignments, exercises, trainers
+                   (default: clients, workouts, assignments)
+
+    Response data:
+        watermark: Pass as `since` on the next call
+        reset: True for a full sync - replace local data instead of merging
+        changes: {resource: [rows]} (same shapes as the list endpoints)
+        deleted: {resource: [ids]}
+    """
+    try:
+        user_id = get_jwt_identity()
+        user_type = get_jwt().get('type', 'client')
+
+        since = None
+        if request.args.get('since'):
+            try:
+                since = _parse_watermark(request.args['since'])
+            except ValueError:
+                return jsonify({
+                    'success': False,
+                    'error': 'since must be an ISO 8601 timestamp'
+                }), 400
+
+        resources = None
+        if request.args.get('resources'):
+            resources = [name.strip() for name in request.args['resources'].split(',') if name.strip()]
+            unknown = [name for name in resources if name not in change_feed.RESOURCES]
+            if unknown:
+                return jsonify({
+                    'success': False,
+                    'error': f'Unknown resources: {", ".join(unknown)}'
+                }), 400
+
+        data = change_feed.changes(user_type, user_id, since=since, resources=resources)
+        db.session.commit()  # Tombstone purge, when due
+
+        return jsonify({
+            'success': True,
+            'data': data
+        }), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': f'Failed to get changes: {str(e)}'
+        }), 500
@@ -3,19 +3,28 @@ Workout Logs Routes - CRUD operations for workout completion tracking
 """
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
-from datetime import datetime
+from sqlalchemy.orm import joinedload
 from app import db
 from app.models import WorkoutLog, WorkoutAssignment, WorkoutExercise
+from app.services.activity_rollup import activity_rollup
+from app.services.workout_log_writer import workout_log_writer, WorkoutLogValidationError
+from app.services.idempotency import idempotent
+from app.services.set_buffer import set_buffer
+from app.utils.auth_helpers import verify_client_resource_access
 
 workout_logs_bp = Blueprint('workout_logs', __name__, url_prefix='/api/workout-logs')
 
 
 @workout_logs_bp.route('', methods=['POST'])
 @jwt_required()
+@idempotent
 def create_workout_log():
     """
     Log a completed workout (creates multiple WorkoutLog entries for each set)
 
+    Send an Idempotency-Key header to make retries safe: a repeated key replays
+    the original response without logging the sets again.
+
     Request body:
     {
         "assignment_id": 1,
@@ -61,36 +70,27 @@ def create_workout_log():
                 'error': 'Unauthorized'
             }), 403
 
-        # Create workout logs for each set
-        logs_created = []
-        for exercise_data in exercises:
-            workout_exercise_id = exercise_data.get('workout_exercise_id')
-            sets = exercise_data.get('sets', [])
-
-            for set_data in sets:
-                workout_log = WorkoutLog(
-                    assignment_id=assignment_id,
-                    workout_exercise_id=workout_exercise_id,
-                    set_number=set_data.get('set_number'),
-                    reps_completed=set_data.get('reps_completed'),
-                    weight_used=set_data.get('weight_used'),
-                    rpe=set_data.get('rpe'),
-                    notes=set_data.get('notes')
-                )
-                db.session.add(workout_log)
-                logs_created.append(workout_log)
-
-        # Update assignment status to completed
-        assignment.status = 'completed'
-        assignment.completed_at = datetime.utcnow()
+        # Completing flushes the session's write-behind buffered sets in the same transaction
+        buffered_rows, buffered_entry_ids = set_buffer.take([assignment.id])[assignment.id]
+
+        # Validate the whole payload, then insert every set in one statement
+        try:
+            rows = workout_log_writer.log_session(assignment, exercises, buffered=buffered_rows)
+        except WorkoutLogValidationError as e:
+            db.session.rollback()
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
 
         db.session.commit()
+        set_buffer.acknowledge(buffered_entry_ids)
 
         return jsonify({
             'success': True,
-            'message': f'Logged {len(logs_created)} sets successfully',
+            'message': f'Logged {len(rows)} sets successfully',
             'data': {
-                'logs_count': len(logs_created),
+                'logs_count': len(rows),
                 'assignment': assignment.to_dict()
             }
         }), 201
@@ -103,6 +103,166 @@ def create_workout_log():
         }), 500
 
 
+@workout_logs_bp.route('/batch', methods=['POST'])
+@jwt_required()
+@idempotent
+def sync_workout_logs():
+    """
+    Upload several completed workouts at once (offline sync)
+
+    Request body:
+    {
+        "sessions": [
+            {
+                "assignment_id": 1,
+                "completed_at": "2025-01-15T18:30:00Z",  // optional, defaults to now
+                "exercises": [{"workout_exercise_id": 1, "sets": [...]}]  // as POST /api/workout-logs
+            }
+        ]
+    }
+
+    Valid sessions are written in one transaction; invalid ones are reported per item.
+    """
+    try:
+        user_id = get_jwt_identity()
+        claims = get_jwt()
+        user_type = claims.get('type', 'client')
+
+        data = request.get_json(silent=True) or {}
+        sessions = data.get('sessions')
+
+        if not isinstance(sessions, list) or not sessions:
+            return jsonify({
+                'success': False,
+                'error': 'sessions must be a non-empty list'
+            }), 400
+
+        if len(sessions) > workout_log_writer.MAX_BATCH_SESSIONS:
+            return jsonify({
+                'success': False,
+                'error': f'At most {workout_log_writer.MAX_BATCH_SESSIONS} sessions per batch'
+            }), 400
+
+        # Write-behind buffered sets of the completed sessions go in the same transaction
+        taken = set_buffer.take({
+            session['assignment_id'] for session in sessions
+            if isinstance(session, dict) and isinstance(session.get('assignment_id'), int)
+            and not isinstance(session['assignment_id'], bool)
+        })
+        results = workout_log_writer.log_sessions(
+            sessions, user_type, user_id, buffered={assignment_id: rows for assignment_id, (rows, _) in taken.items()}
+        )
+        db.session.commit()
+
+        # Sets of sessions that failed validation stay buffered
+        set_buffer.acknowledge(
+            entry_id for result in results if result['success'] for entry_id in taken[result['assignment_id']][1]
+        )
+
+        synced = sum(1 for result in results if result['success'])
+        return jsonify({
+            'success': True,
+            'message': f'Synced {synced} of {len(results)} sessions',
+            'data': {
+                'synced': synced,
+                'failed': len(results) - synced,
+                'results': results
+            }
+        }), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': f'Failed to sync workouts: {str(e)}'
+        }), 500
+
+
+@workout_logs_bp.route('/sets', methods=['POST'])
+@jwt_required()
+@idempotent
+def log_set():
+    """
+    Log one set during a live session (retry-safe with an Idempotency-Key header)
+
+    With SET_BUFFER_ENABLED the set of a pending / in-progress assignment goes to the
+    write-behind buffer (202, "pending": true) and reaches workout_logs when the
+    assignment is completed; otherwise it is written right away (201).
+
+    Request body:
+    {
+        "assignment_id": 1,
+        "workout_exercise_id": 1,
+        "set_number": 1,
+        "reps_completed": 10,
+        "weight_used": 50 (optional),
+        "rpe": 7 (optional),
+        "notes": "..." (optional)
+    }
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+
+        if not data.get('assignment_id'):
+            return jsonify({
+                'success': False,
+                'error': 'assignment_id is required'
+            }), 400
+
+        assignment = WorkoutAssignment.query.get(data['assignment_id'])
+        if not assignment:
+            return jsonify({
+                'success': False,
+                'error': 'Assignment not found'
+            }), 404
+
+        auth_error = verify_client_resource_access(assignment)
+        if auth_error:
+            return auth_error
+
+        try:
+            row = workout_log_writer.build_set(assignment, data)
+        except WorkoutLogValidationError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+
+        buffered = set_buffer.enabled and assignment.status in ('pending', 'in_progress')
+
+        # The first set starts the session
+        if assignment.status == 'pending':
+            assignment.status = 'in_progress'
+            assignment.started_at = row['logged_at']
+
+        # Keep daily activity rollup in sync - buffered sets are counted when they are flushed
+        activity_rollup.track_assignment(assignment, logs=None if buffered else [row])
+        log_id = None if buffered else workout_log_writer.insert_row(row)
+        db.session.commit()
+
+        if buffered:
+            set_buffer.append(row)
+            set_buffer.maybe_flush_due()
+            return jsonify({
+                'success': True,
+                'message': 'Set buffered',
+                'data': set_buffer.as_log(row)
+            }), 202
+
+        return jsonify({
+            'success': True,
+            'message': 'Set logged',
+            'data': dict(row, id=log_id, logged_at=row['logged_at'].isoformat())
+        }), 201
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': f'Failed to log set: {str(e)}'
+        }), 500
+
+
 @workout_logs_bp.route('/assignment/<int:assignment_id>', methods=['GET'])
 @jwt_required()
 def get_assignment_logs(assignment_id):
@@ -132,11 +292,21 @@ def get_assignment_logs(assignment_id):
                 'error': 'Unauthorized'
             }), 403
 
-        logs = WorkoutLog.query.filter_by(assignment_id=assignment_id).all()
+        # Exercise details are joined in (to_dict) instead of two lazy loads per exercise
+        logs = WorkoutLog.query.options(
+            joinedload(WorkoutLog.workout_exercise).joinedload(WorkoutExercise.exercise)
+        ).filter_by(assignment_id=assignment_id).all()
+
+        # Sets still in the write-behind buffer (id None, pending True)
+        logged = {(log.workout_exercise_id, log.set_number) for log in logs}
+        pending = [
+            log for log in set_buffer.pending_logs(assignment_id)
+            if (log['workout_exercise_id'], log['set_number']) not in logged
+        ]
 
         return jsonify({
             'success': True,
-            'data': [log.to_dict() for log in logs]
+            'data': [log.to_dict() for log in logs] + pending
         }), 200
 
     except Exception as e:
@@ -169,6 +339,9 @@ def update_workout_log(log_id):
         if 'notes' in data:
             log.notes = data['notes']
 
+        # Keep daily activity rollup in sync
+        activity_rollup.track_log_update(log)
+
         db.session.commit()
 
         return jsonify({
@@ -197,6 +370,8 @@ def delete_workout_log(log_id):
                 'error': 'Log not found'
             }), 404
 
+        activity_rollup.track_logs(log.assignment, [log], sign=-1)
+
         db.session.delete(log)
         db.session.commit()
 
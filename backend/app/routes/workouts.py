@@ -7,6 +7,12 @@ from datetime import datetime
 from app import db
 from app.models import Workout, WorkoutExercise, WorkoutAssignment, Client, Exercise
 from app.utils.auth_helpers import require_trainer, verify_resource_ownership, verify_client_resource_access
+from app.services.activity_rollup import activity_rollup
+from app.services.workout_loader import workout_loader
+from app.services.assignment_serializer import assignment_serializer
+from app.services.set_buffer import set_buffer
+from app.services.assignment_writer import assignment_writer
+from app.services.sql_metrics import query_budget
 
 workouts_bp = Blueprint('workouts', __name__, url_prefix='/api/workouts')
 assignments_bp = Blueprint('assignments', __name__, url_prefix='/api/assignments')
@@ -16,19 +22,29 @@ assignments_bp = Blueprint('assignments', __name__, url_prefix='/api/assignments
 
 @workouts_bp.route('', methods=['GET'])
 @jwt_required()
+@query_budget(5)
 def get_workouts():
-    """Get all workouts for the authenticated trainer"""
+    """
+    Get all workouts for the authenticated trainer
+
+    Query params:
+    - include_exercise_details: true/false (default true). false leaves out the
+      nested exercise objects, keeping prescriptions and exerciseCount
+    """
     error_response = require_trainer()
     if error_response:
         return error_response
 
     try:
         trainer_id = get_jwt_identity()
+        include_details = request.args.get('include_exercise_details', 'true').lower() != 'false'
+
         workouts = Workout.query.filter_by(trainer_id=trainer_id).all()
 
+        # Workouts, exercise rows and exercises in 3 queries (see WorkoutLoader)
         return jsonify({
             'success': True,
-            'data': [workout.to_dict(include_exercises=True) for workout in workouts]
+            'data': workout_loader.serialize(workouts, include_exercise_details=include_details)
         }), 200
 
     except Exception as e:
@@ -58,7 +74,7 @@ def get_workout(workout_id):
 
         return jsonify({
             'success': True,
-            'data': workout.to_dict(include_exercises=True)
+            'data': workout_loader.serialize([workout])[0]
         }), 200
 
     except Exception as e:
@@ -230,7 +246,15 @@ def delete_workout(workout_id):
                 'error': 'Workout not found'
             }), 404
 
+        # Assignments go with the workout (set-based) - rebuild the rollup for affected clients
+        affected_client_ids = assignment_writer.delete_where(WorkoutAssignment.workout_id == workout.id)
+
         db.session.delete(workout)
+        db.session.flush()
+
+        if affected_client_ids:
+            activity_rollup.rebuild(client_ids=affected_client_ids)
+
         db.session.commit()
 
         return jsonify({
@@ -307,6 +331,9 @@ def create_assignment():
         # NEW: Calculate program metrics (end_date, expected_sessions)
         assignment.calculate_program_metrics()
 
+        # Keep daily activity rollup in sync
+        activity_rollup.track_assignment(assignment, created=True)
+
         db.session.commit()
 
         return jsonify({
@@ -325,9 +352,18 @@ def create_assignment():
 
 @assignments_bp.route('/client/<int:client_id>', methods=['GET'])
 @jwt_required()
+@query_budget(8)
 def get_client_assignments(client_id):
-    """Get all assignments for a specific client"""
+    """
+    Get all assignments for a specific client
+
+    Query params:
+    - sideload: true/false (default false). true returns each workout and exercise
+      once in `included` (keyed by id) instead of embedding them in every assignment
+    """
     try:
+        sideload = request.args.get('sideload', 'false').lower() == 'true'
+
         # Can be accessed by trainer or the client themselves
         user_id = get_jwt_identity()
         claims = get_jwt()
@@ -347,10 +383,17 @@ def get_client_assignments(client_id):
                 }), 403
             assignments = WorkoutAssignment.query.filter_by(client_id=client_id).all()
 
-        return jsonify({
+        # Workouts and exercises batch-loaded once for the whole list
+        data, included = assignment_serializer.serialize(assignments, sideload=sideload)
+
+        response = {
             'success': True,
-            'data': [assignment.to_dict() for assignment in assignments]
-        }), 200
+            'data': data
+        }
+        if included is not None:
+            response['included'] = included
+
+        return jsonify(response), 200
 
     except Exception as e:
         return jsonify({
@@ -369,8 +412,13 @@ def update_assignment_status(assignment_id):
     {
         "status": "in_progress" | "completed" | "skipped"
     }
+
+    Query params:
+    - sideload: true/false (default false), same response mode as GET /client/<id>
     """
     try:
+        sideload = request.args.get('sideload', 'false').lower() == 'true'
+
         data = request.get_json()
 
         if not data or not data.get('status'):
@@ -392,6 +440,11 @@ def update_assignment_status(assignment_id):
         if auth_error:
             return auth_error
 
+        # Completing flushes the session's write-behind buffered sets in the same transaction
+        buffered_rows, buffered_entry_ids = [], []
+        if data['status'] == 'completed':
+            buffered_rows, buffered_entry_ids = set_buffer.write(assignment)
+
         # Update status
         assignment.status = data['status']
 
@@ -400,13 +453,23 @@ def update_assignment_status(assignment_id):
         elif data['status'] == 'completed' and not assignment.completed_at:
             assignment.completed_at = datetime.utcnow()
 
+        # Keep daily activity rollup in sync
+        activity_rollup.track_assignment(assignment, logs=buffered_rows)
+
         db.session.commit()
+        set_buffer.acknowledge(buffered_entry_ids)
 
-        return jsonify({
+        data, included = assignment_serializer.serialize([assignment], sideload=sideload)
+
+        response = {
             'success': True,
             'message': 'Status updated successfully',
-            'data': assignment.to_dict()
-        }), 200
+            'data': data[0]
+        }
+        if included is not None:
+            response['included'] = included
+
+        return jsonify(response), 200
 
     except Exception as e:
         db.session.rollback()
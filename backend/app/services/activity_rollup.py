@@ -0,0 +1,413 @@
+"""
+Activity Rollup Service - Maintains and reads the client_daily_activity table
+
+Write paths report assignment/log changes here (in the same transaction) and the
+deltas are applied with INSERT ... ON CONFLICT DO UPDATE. Reads combine whole days
+from the rollup with a live query over the partial days at the edges of a time
+range, so results match the raw workout_assignments queries exactly while the
+cost depends on the number of days instead of the number of assignments.
+
+Deltas of modified rows come from the unit-of-work attribute history, which a
+flush resets: track_assignment / track_log_update must run before the change is
+flushed (no autoflushing query in between). Tracking a change that was already
+flushed raises RollupOrderError instead of silently dropping the delta.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import func, and_, or_, cast, literal, union_all, select, inspect, event
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session, object_session
+from app import db
+from app.models import ClientDailyActivity, WorkoutAssignment, WorkoutLog
+from app.services.analytics_views import analytics_views
+
+ASSIGNMENT_METRICS = ('assigned', 'completed', 'skipped', 'completions')
+LOG_METRICS = ('sets_logged', 'volume')
+
+# Attributes whose changes feed the rollup, per model
+TRACKED_ATTRIBUTES = {
+    WorkoutAssignment: ('status', 'assigned_date', 'completed_at'),
+    WorkoutLog: ('reps_completed', 'weight_used'),
+}
+
+
+class RollupOrderError(RuntimeError):
+    """A tracked change was flushed before the rollup read its attribute history"""
+
+
+def _floor_day(value):
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _ceil_day(value):
+    floor = _floor_day(value)
+    return floor if floor == value else floor + timedelta(days=1)
+
+
+def _attr_change(obj, attr):
+    """(old, new) value of an attribute from the unit-of-work history"""
+    history = inspect(obj).attrs[attr].history
+    if not (history.added or history.unchanged or history.deleted):
+        # Expired/unloaded attribute - treat as unchanged
+        value = getattr(obj, attr)
+        return value, value
+    new = history.added[0] if history.added else (history.unchanged[0] if history.unchanged else None)
+    old = history.deleted[0] if history.deleted else (history.unchanged[0] if history.unchanged else new)
+    return old, new
+
+
+def _log_volume(reps_completed, weight_used):
+    if not reps_completed or weight_used is None:
+        return Decimal('0')
+    return Decimal(str(reps_completed)) * Decimal(str(weight_used))
+
+
+class ActivityRollupService:
+    """Incremental maintenance and range reads for ClientDailyActivity"""
+
+    # ==================== WRITE PATHS ====================
+
+    def track_assignment(self, assignment, created=False, deleted=False, logs=None):
+        """
+        Apply the rollup delta for an assignment change (call before commit)
+
+        Args:
+            assignment: WorkoutAssignment that was created, modified or is being deleted
+            created: True for a new assignment (its current state is added as a whole)
+            deleted: True when the assignment is being deleted (its state is removed)
+            logs: Optional logs added with this change (folded into the same upsert as track_logs)
+        """
+        deltas = self._assignment_deltas(assignment, created, deleted, logs)
+        self._apply(assignment.trainer_id, assignment.client_id, deltas)
+
+    def track_assignments(self, changes):
+        """
+        Apply several assignment changes (and their new logs) with a single upsert
+
+        Args:
+            changes: Iterable of (assignment, logs) tuples - modified assignments only
+        """
+        deltas_by_pair = defaultdict(lambda: defaultdict(lambda: defaultdict(int)))
+        for assignment, logs in changes:
+            pair_deltas = deltas_by_pair[(assignment.trainer_id, assignment.client_id)]
+            for day, metrics in self._assignment_deltas(assignment, logs=logs).items():
+                for metric, value in metrics.items():
+                    pair_deltas[day][metric] += value
+
+        self._apply_many(deltas_by_pair)
+
+    def _assignment_deltas(self, assignment, created=False, deleted=False, logs=None):
+        """Rollup deltas of an assignment change plus its new logs -> {day: {metric: delta}}"""
+        if created or deleted:
+            state = (assignment.status, assignment.assigned_date, assignment.completed_at)
+            old, new = (None, state) if created else (state, None)
+        else:
+            self._check_history(assignment)
+            status = _attr_change(assignment, 'status')
+            assigned_date = _attr_change(assignment, 'assigned_date')
+            completed_at = _attr_change(assignment, 'completed_at')
+            old = (status[0], assigned_date[0], completed_at[0])
+            new = (status[1], assigned_date[1], completed_at[1])
+
+        deltas = self._log_deltas(logs or [])
+        for sign, state in ((-1, old), (1, new)):
+            if state is None:
+                continue
+            for day, metrics in self._assignment_contribution(*state).items():
+                for metric, value in metrics.items():
+                    deltas[day][metric] += sign * value
+        return deltas
+
+    def track_logs(self, assignment, logs, sign=1):
+        """
+        Apply the rollup delta for logs added (sign=1) or removed (sign=-1)
+
+        Args:
+            assignment: WorkoutAssignment the logs belong to
+            logs: Iterable of WorkoutLog objects or dicts with logged_at/reps_completed/weight_used
+        """
+        self._apply(assignment.trainer_id, assignment.client_id, self._log_deltas(logs, sign))
+
+    def _log_deltas(self, logs, sign=1):
+        """sets_logged/volume deltas for logs -> {day: {metric: delta}}"""
+        deltas = defaultdict(lambda: defaultdict(int))
+        for log in logs:
+            get = log.get if isinstance(log, dict) else lambda key: getattr(log, key)
+            day = (get('logged_at') or datetime.utcnow()).date()
+            deltas[day]['sets_logged'] += sign
+            deltas[day]['volume'] += sign * _log_volume(get('reps_completed'), get('weight_used'))
+        return deltas
+
+    def track_log_update(self, log):
+        """Apply the volume delta for an edited log (reps_completed / weight_used changes, call before any flush)"""
+        self._check_history(log)
+        old_reps, new_reps = _attr_change(log, 'reps_completed')
+        old_weight, new_weight = _attr_change(log, 'weight_used')
+        delta = _log_volume(new_reps, new_weight) - _log_volume(old_reps, old_weight)
+        assignment = log.assignment
+        if not delta:
+            if (old_reps, old_weight) != (new_reps, new_weight):
+                analytics_views.mark_changed([assignment.client_id])  # e.g. reps edited on a bodyweight set
+            return
+
+        day = (log.logged_at or datetime.utcnow()).date()
+        self._apply(assignment.trainer_id, assignment.client_id, {day: {'volume': delta}})
+
+    def _assignment_contribution(self, status, assigned_date, completed_at):
+        """Rollup metrics contributed by one assignment state -> {day: {metric: value}}"""
+        contribution = defaultdict(dict)
+        if assigned_date:
+            contribution[assigned_date.date()] = {
+                'assigned': 1,
+                'completed': 1 if status == 'completed' else 0,
+                'skipped': 1 if status == 'skipped' else 0,
+            }
+        if status == 'completed' and completed_at:
+            contribution[completed_at.date()]['completions'] = 1
+        return contribution
+
+    def _apply(self, trainer_id, client_id, deltas):
+        """Upsert {day: {metric: delta}} for one (trainer, client) pair"""
+        self._apply_many({(trainer_id, client_id): deltas})
+
+    def _apply_many(self, deltas_by_pair):
+        """Upsert {(trainer_id, client_id): {day: {metric: delta}}} in one statement"""
+        rows = []
+        for (trainer_id, client_id), deltas in deltas_by_pair.items():
+            for day, metrics in deltas.items():
+                if not any(metrics.values()):
+                    continue
+                row = {'trainer_id': trainer_id, 'client_id': client_id, 'day': day}
+                for metric in ASSIGNMENT_METRICS + LOG_METRICS:
+                    row[metric] = metrics.get(metric, 0)
+                rows.append(row)
+
+        if not rows:
+            return
+
+        table = ClientDailyActivity.__table__
+        stmt = insert(table).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['client_id', 'trainer_id', 'day'],
+            set_={
+                metric: table.c[metric] + stmt.excluded[metric]
+                for metric in ASSIGNMENT_METRICS + LOG_METRICS
+            }
+        ).returning(table.c.client_id, table.c.trainer_id)
+        # Same statement marks the clients' materialized analytics as changed
+        db.session.execute(analytics_views.with_version_bump(stmt))
+
+    # ==================== FLUSH ORDER ====================
+
+    def _check_history(self, obj):
+        """Raise if the object's tracked changes were already flushed (their history is gone)"""
+        session = object_session(obj)
+        if session is None:
+            return
+        if obj in session.info.get('rollup_flushed', ()):
+            raise RollupOrderError(
+                f'{obj!r} was flushed before its rollup delta was tracked - '
+                f'call activity_rollup.track_* before anything flushes the session'
+            )
+        session.info.setdefault('rollup_tracked', set()).add(obj)
+
+    def _before_flush(self, session, flush_context, instances):
+        """Remember modified rows flushed with untracked changes to rollup attributes"""
+        tracked = session.info.get('rollup_tracked', set())
+        for obj in session.dirty:
+            attributes = TRACKED_ATTRIBUTES.get(type(obj))
+            if not attributes:
+                continue
+            state = inspect(obj)
+            if not any(state.attrs[attr].history.has_changes() for attr in attributes):
+                continue
+            if obj in tracked:
+                tracked.discard(obj)
+            else:
+                session.info.setdefault('rollup_flushed', set()).add(obj)
+
+    @staticmethod
+    def _reset(session, *args):
+        session.info.pop('rollup_tracked', None)
+        session.info.pop('rollup_flushed', None)
+
+    def register_events(self):
+        """Detect write paths that flush a tracked change before reporting it"""
+        event.listen(Session, 'before_flush', self._before_flush)
+        event.listen(Session, 'after_commit', self._reset)
+        event.listen(Session, 'after_soft_rollback', self._reset)
+
+    # ==================== BACKFILL ====================
+
+    def rebuild(self, client_ids=None):
+        """
+        Recompute rollup rows from workout_assignments / workout_logs
+
+        Args:
+            client_ids: Optional list of client IDs to rebuild (None = whole table)
+
+        Returns:
+            int: Number of rollup rows written
+        """
+        table = ClientDailyActivity.__table__
+        wa = WorkoutAssignment.__table__
+        wl = WorkoutLog.__table__
+        zero = literal(0)
+
+        assigned = select(
+            wa.c.trainer_id, wa.c.client_id, cast(wa.c.assigned_date, db.Date).label('day'),
+            literal(1).label('assigned'),
+            cast(wa.c.status == 'completed', db.Integer).label('completed'),
+            cast(wa.c.status == 'skipped', db.Integer).label('skipped'),
+            zero.label('completions'), zero.label('sets_logged'),
+            cast(zero, db.Numeric(12, 2)).label('volume'),
+        )
+        completions = select(
+            wa.c.trainer_id, wa.c.client_id, cast(wa.c.completed_at, db.Date),
+            zero, zero, zero, literal(1), zero, cast(zero, db.Numeric(12, 2)),
+        ).where(wa.c.status == 'completed', wa.c.completed_at.isnot(None))
+        logs = select(
+            wa.c.trainer_id, wa.c.client_id, cast(wl.c.logged_at, db.Date),
+            zero, zero, zero, zero, literal(1),
+            cast(wl.c.reps_completed * func.coalesce(wl.c.weight_used, 0), db.Numeric(12, 2)),
+        ).select_from(wl.join(wa, wa.c.id == wl.c.assignment_id)).where(wl.c.logged_at.isnot(None))
+
+        if client_ids is not None:
+            assigned = assigned.where(wa.c.client_id.in_(client_ids))
+            completions = completions.where(wa.c.client_id.in_(client_ids))
+            logs = logs.where(wa.c.client_id.in_(client_ids))
+
+        activity = union_all(assigned, completions, logs).subquery('activity')
+        aggregated = select(
+            activity.c.trainer_id, activity.c.client_id, activity.c.day,
+            *[func.sum(activity.c[metric]) for metric in ASSIGNMENT_METRICS + LOG_METRICS]
+        ).group_by(activity.c.trainer_id, activity.c.client_id, activity.c.day)
+
+        delete = table.delete()
+        if client_ids is not None:
+            delete = delete.where(table.c.client_id.in_(client_ids))
+        db.session.execute(delete)
+        analytics_views.mark_changed(client_ids)
+
+        result = db.session.execute(
+            table.insert().from_select(
+                ['trainer_id', 'client_id', 'day'] + list(ASSIGNMENT_METRICS + LOG_METRICS),
+                aggregated
+            )
+        )
+        return result.rowcount
+
+    # ==================== READS ====================
+
+    def window_totals(self, start=None, end=None, trainer_id=None, client_ids=None):
+        """
+        Assignment metrics for [start, end) grouped by (trainer_id, client_id)
+
+        assigned/completed/skipped are keyed by assigned_date and completions by
+        completed_at, exactly like filtering workout_assignments on those columns.
+
+        Args:
+            start: Inclusive lower bound (None = all time)
+            end: Exclusive upper bound (None = open-ended)
+            trainer_id: Include rows for this trainer
+            client_ids: Include rows for these clients (list or subquery); OR-ed with trainer_id
+
+        Returns:
+            dict {(trainer_id, client_id): {'assigned', 'completed', 'skipped', 'completions'}}
+        """
+        rollup = ClientDailyActivity
+        full_start = _ceil_day(start) if start else None
+        full_end = _floor_day(end) if end else None
+
+        edges = []
+        if start and end and full_end < full_start:
+            # Range inside a single day - nothing comes from the rollup
+            edges.append((start, end))
+            full_start = full_end = None
+            read_rollup = False
+        else:
+            read_rollup = True
+            if start and start < full_start:
+                edges.append((start, full_start))
+            if end and full_end < end:
+                edges.append((full_end, end))
+
+        totals = defaultdict(lambda: dict.fromkeys(ASSIGNMENT_METRICS, 0))
+
+        if read_rollup:
+            query = db.session.query(
+                rollup.trainer_id, rollup.client_id,
+                *[func.sum(getattr(rollup, metric)) for metric in ASSIGNMENT_METRICS]
+            ).filter(self._scope(rollup, trainer_id, client_ids))
+            if full_start:
+                query = query.filter(rollup.day >= full_start.date())
+            if full_end:
+                query = query.filter(rollup.day < full_end.date())
+
+            for row in query.group_by(rollup.trainer_id, rollup.client_id):
+                for metric, value in zip(ASSIGNMENT_METRICS, row[2:]):
+                    totals[(row[0], row[1])][metric] += int(value or 0)
+
+        if edges:
+            for row in self._edge_query(edges, trainer_id, client_ids):
+                for metric, value in zip(ASSIGNMENT_METRICS, row[2:]):
+                    totals[(row[0], row[1])][metric] += int(value or 0)
+
+        return dict(totals)
+
+    def _edge_query(self, edges, trainer_id, client_ids):
+        """Live counts over the partial days of a range (bounded by the edge ranges)"""
+        wa = WorkoutAssignment
+        assigned_in = or_(*[and_(wa.assigned_date >= lo, wa.assigned_date < hi) for lo, hi in edges])
+        completed_in = and_(
+            wa.status == 'completed',
+            or_(*[and_(wa.completed_at >= lo, wa.completed_at < hi) for lo, hi in edges])
+        )
+
+        return db.session.query(
+            wa.trainer_id, wa.client_id,
+            func.count(wa.id).filter(assigned_in),
+            func.count(wa.id).filter(assigned_in, wa.status == 'completed'),
+            func.count(wa.id).filter(assigned_in, wa.status == 'skipped'),
+            func.count(wa.id).filter(completed_in),
+        ).filter(
+            or_(assigned_in, completed_in),
+            self._scope(wa, trainer_id, client_ids)
+        ).group_by(wa.trainer_id, wa.client_id).all()
+
+    def _scope(self, model, trainer_id, client_ids):
+        conditions = []
+        if trainer_id is not None:
+            conditions.append(model.trainer_id == trainer_id)
+        if client_ids is not None:
+            conditions.append(model.client_id.in_(client_ids))
+        return or_(*conditions) if conditions else literal(True)
+
+    def daily_completions(self, trainer_id, since_day):
+        """Completed workouts per day for a trainer since since_day -> {date: count}"""
+        rows = db.session.query(
+            ClientDailyActivity.day,
+            func.sum(ClientDailyActivity.completions)
+        ).filter(
+            ClientDailyActivity.trainer_id == trainer_id,
+            ClientDailyActivity.day >= since_day
+        ).group_by(ClientDailyActivity.day).all()
+
+        return {day: int(count or 0) for day, count in rows}
+
+    @staticmethod
+    def sum_totals(totals, key_filter=None):
+        """Collapse window_totals() output into a single metrics dict"""
+        summed = dict.fromkeys(ASSIGNMENT_METRICS, 0)
+        for key, metrics in totals.items():
+            if key_filter and not key_filter(key):
+                continue
+            for metric in ASSIGNMENT_METRICS:
+                summed[metric] += metrics[metric]
+        return summed
+
+
+# Singleton instance
+activity_rollup = ActivityRollupService()
+activity_rollup.register_events()
@@ -0,0 +1,101 @@
+"""
+Analytics Engine - Grouped aggregation queries for trainer dashboards
+Computes the FASE 5 analytics payloads with a fixed number of queries over the
+client_daily_activity rollup, independent of how many clients or assignments
+a trainer has.
+"""
+from datetime import datetime, timedelta
+from app.models import Client
+from app.services.activity_rollup import activity_rollup
+
+
+class AnalyticsEngine:
+    """Builds dashboard payloads from conditional aggregates grouped by day and client"""
+
+    WINDOW_DAYS = 7
+
+    def trainer_dashboard(self, trainer_id, now=None):
+        """
+        Compute GET /api/trainers/me/analytics data in four queries:
+        1. Active clients of the trainer
+        2. Rollup sums for the whole days of the 7-day window (grouped by trainer, client)
+        3. Live counts for the partial first day of the window
+        4. Completed workouts per day from the rollup
+
+        Args:
+            trainer_id: Trainer ID from the JWT identity
+            now: Reference time (defaults to datetime.utcnow())
+
+        Returns:
+            dict with the same keys and values as the legacy loop implementation
+        """
+        now = now or datetime.utcnow()
+        window_start = now - timedelta(days=self.WINDOW_DAYS)
+
+        # Day buckets, newest first (same order the legacy loop produced)
+        day_starts = [
+            (now - timedelta(days=i)).replace(hour=0, minute=0, second=0, microsecond=0)
+            for i in range(self.WINDOW_DAYS)
+        ]
+
+        clients = Client.query.with_entities(Client.id, Client.name).filter_by(
+            trainer_id=trainer_id,
+            is_active=True
+        ).order_by(Client.id).all()
+
+        # Trainer-level rows (trainer_id) plus the active clients' rows under any trainer
+        client_ids = [client.id for client in clients]
+        totals = activity_rollup.window_totals(window_start, trainer_id=trainer_id, client_ids=client_ids)
+        completed_by_day = activity_rollup.daily_completions(trainer_id, day_starts[-1].date())
+
+        trainer_totals = activity_rollup.sum_totals(totals, lambda key: key[0] == trainer_id)
+        active_clients = len({
+            key[1] for key, metrics in totals.items()
+            if key[0] == trainer_id and metrics['completions'] > 0
+        })
+
+        total_assignments = trainer_totals['assigned']
+        completed_assignments = trainer_totals['completed']
+        avg_adherence = (completed_assignments / total_assignments * 100) if total_assignments > 0 else 0
+
+        weekly_activity = [
+            {
+                'date': day_start.isoformat(),
+                'completed': completed_by_day.get(day_start.date(), 0)
+            }
+            for day_start in day_starts
+        ]
+
+        per_client = {}
+        for (_, client_id), metrics in totals.items():
+            assigned, completed = per_client.get(client_id, (0, 0))
+            per_client[client_id] = (assigned + metrics['assigned'], completed + metrics['completed'])
+
+        clients_adherence = []
+        for client in clients:
+            assigned, completed = per_client.get(client.id, (0, 0))
+            adherence = (completed / assigned * 100) if assigned > 0 else 0
+
+            clients_adherence.append({
+                'clientId': client.id,
+                'name': client.name,
+                'adherence': round(adherence, 1),
+                'workoutsCompleted': completed,
+                'workoutsAssigned': assigned
+            })
+
+        # Sort by adherence (lowest first - clients at risk)
+        clients_adherence.sort(key=lambda x: x['adherence'])
+
+        return {
+            'totalClients': len(clients),
+            'activeClients': active_clients,
+            'avgAdherence': round(avg_adherence, 1),
+            'workoutsThisWeek': trainer_totals['completions'],
+            'weeklyActivity': list(reversed(weekly_activity)),  # Oldest first
+            'clientsAdherence': clients_adherence
+        }
+
+
+# Singleton instance
+analytics_engine = AnalyticsEngine()
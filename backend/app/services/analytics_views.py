@@ -0,0 +1,236 @@
+"""
+Analytics Views - Refresh of the materialized client_adherence / exercise_progress tables
+
+Both tables hold the rows of the docs/schema.sql views, so the adherence and
+progress endpoints read a handful of stored rows instead of aggregating
+workout_assignments / workout_logs on every request. Rows are refreshed per
+client: the scheduler (refresh_views.py) keeps them younger than half the
+staleness bound, and the model accessors refresh inline any client older than
+ANALYTICS_VIEWS_MAX_STALENESS or with writes since its last refresh, so a
+response never lags a tracked write (and is never staler than that bound).
+
+Adherence is cheap and slides with the 30-day window, so every stale client gets
+it recomputed. exercise_progress aggregates the client's whole log history, so it
+is only rebuilt when client_adherence.data_version - bumped by the activity rollup
+in the same statement as each write - is ahead of progress_version.
+"""
+import os
+from datetime import datetime, time, timedelta
+from sqlalchemy import and_, case, cast, func, literal, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from app import db
+from app.models import Client, ClientAdherence, ExerciseProgress, WorkoutAssignment, WorkoutExercise, WorkoutLog
+
+
+class AnalyticsViewsService:
+    """Per-client refresh and staleness checks for the materialized analytics tables"""
+
+    ADHERENCE_WINDOW_DAYS = 30  # same window as the client_adherence view
+    BATCH_SIZE = 1000  # clients per scheduler transaction
+    NEVER = datetime(1970, 1, 1)  # refreshed_at of rows created by a write, before the first refresh
+
+    def __init__(self):
+        self.max_staleness = timedelta(seconds=int(os.getenv('ANALYTICS_VIEWS_MAX_STALENESS', 300)))
+
+    def refresh(self, client_ids=None, now=None, progress_ids=None):
+        """
+        Recompute the rows of some clients (or all) - the caller commits
+
+        Args:
+            client_ids: Client IDs to refresh (None = every client)
+            now: Refresh time stamped on the rows (defaults to datetime.utcnow())
+            progress_ids: Subset of client_ids whose exercise_progress is rebuilt (None = all of them)
+
+        Returns:
+            dict {'client_adherence': rows, 'exercise_progress': rows}
+        """
+        now = now or datetime.utcnow()
+        if progress_ids is None:
+            progress_ids = client_ids
+        # Adherence first: the data_version it records as progress_version must be
+        # read no later than the snapshot exercise_progress is aggregated from
+        adherence = self._refresh_adherence(client_ids, progress_ids, now)
+        progress = self._refresh_progress(progress_ids, now) if progress_ids != [] else 0
+        return {'client_adherence': adherence, 'exercise_progress': progress}
+
+    def _refresh_adherence(self, client_ids, progress_ids, now):
+        clients = Client.__table__
+        wa = WorkoutAssignment.__table__
+        ca = ClientAdherence.__table__
+        # CURRENT_DATE - INTERVAL '30 days', as in the view
+        window_start = datetime.combine(now.date() - timedelta(days=self.ADHERENCE_WINDOW_DAYS), time.min)
+
+        total = func.count(wa.c.id)
+        completed = func.count(wa.c.id).filter(wa.c.status == 'completed')
+        rows = select(
+            clients.c.id, clients.c.trainer_id, total, completed,
+            func.coalesce(func.round(cast(completed, db.Numeric) * 100 / func.nullif(total, 0), 2), 0),
+            func.max(wa.c.completed_at),
+            literal(now, db.DateTime),
+            func.coalesce(func.max(ca.c.data_version), 0),
+        ).select_from(
+            clients.outerjoin(
+                wa, and_(wa.c.client_id == clients.c.id, wa.c.assigned_date >= window_start)
+            ).outerjoin(ca, ca.c.client_id == clients.c.id)
+        ).group_by(clients.c.id)
+        if client_ids is not None:
+            rows = rows.where(clients.c.id.in_(client_ids))
+
+        columns = ['client_id', 'trainer_id', 'total_assigned', 'total_completed', 'adherence_percentage',
+                   'last_workout_completed', 'refreshed_at', 'progress_version']
+        statement = insert(ca).from_select(columns, rows)
+        set_ = {column: statement.excluded[column] for column in columns[1:]}
+        if progress_ids is not client_ids:
+            # Keep the recorded version of clients whose progress is not rebuilt
+            set_['progress_version'] = case(
+                (statement.excluded.client_id.in_(progress_ids), statement.excluded.progress_version),
+                else_=ca.c.progress_version,
+            )
+        statement = statement.on_conflict_do_update(index_elements=['client_id'], set_=set_)
+        return db.session.execute(statement).rowcount
+
+    def _refresh_progress(self, client_ids, now):
+        table = ExerciseProgress.__table__
+        wa = WorkoutAssignment.__table__
+        wl = WorkoutLog.__table__
+        we = WorkoutExercise.__table__
+
+        day = cast(wl.c.logged_at, db.Date)
+        rows = select(
+            wa.c.client_id, we.c.exercise_id, day,
+            func.avg(wl.c.weight_used), func.max(wl.c.weight_used),
+            func.coalesce(func.sum(wl.c.reps_completed), 0), func.count(wl.c.id),
+        ).select_from(
+            wl.join(wa, wa.c.id == wl.c.assignment_id).join(we, we.c.id == wl.c.workout_exercise_id)
+        ).where(
+            wl.c.logged_at.isnot(None), we.c.exercise_id.isnot(None)
+        ).group_by(wa.c.client_id, we.c.exercise_id, day)
+
+        delete = table.delete()
+        if client_ids is not None:
+            rows = rows.where(wa.c.client_id.in_(client_ids))
+            delete = delete.where(table.c.client_id.in_(client_ids))
+        db.session.execute(delete)
+
+        columns = ['client_id', 'exercise_id', 'workout_date', 'avg_weight', 'max_weight', 'total_reps', 'sets']
+        statement = insert(table).from_select(columns, rows)
+        # A concurrent refresh of the same client may have inserted the rows first
+        statement = statement.on_conflict_do_update(
+            index_elements=columns[:3],
+            set_={column: statement.excluded[column] for column in columns[3:]}
+        )
+        return db.session.execute(statement).rowcount
+
+    def stale_client_ids(self, client_ids=None, trainer_id=None, max_age=None, now=None, limit=None,
+                         include_changed=False):
+        """
+        Clients in scope whose rows are missing or older than max_age
+
+        Args:
+            client_ids: Restrict to these clients
+            trainer_id: Restrict to this trainer's clients
+            max_age: timedelta (defaults to max_staleness)
+            limit: Maximum number of IDs returned
+            include_changed: Also clients with writes since their last refresh
+
+        Returns:
+            list[int]
+        """
+        return list(self._stale(client_ids, trainer_id, max_age, now, limit, include_changed))
+
+    def _stale(self, client_ids=None, trainer_id=None, max_age=None, now=None, limit=None, include_changed=False):
+        """Stale clients in scope -> {client_id: True if its exercise_progress is behind its writes}"""
+        now = now or datetime.utcnow()
+        cutoff = now - (self.max_staleness if max_age is None else max_age)
+
+        changed = or_(
+            ClientAdherence.client_id.is_(None), ClientAdherence.data_version > ClientAdherence.progress_version
+        )
+        stale = or_(ClientAdherence.refreshed_at.is_(None), ClientAdherence.refreshed_at < cutoff)
+        if include_changed:
+            stale = or_(stale, changed)
+        query = db.session.query(Client.id, changed).outerjoin(
+            ClientAdherence, ClientAdherence.client_id == Client.id
+        ).filter(stale)
+        if client_ids is not None:
+            query = query.filter(Client.id.in_(client_ids))
+        if trainer_id is not None:
+            query = query.filter(Client.trainer_id == trainer_id)
+        return dict(query.order_by(Client.id).limit(limit).all())
+
+    def _refresh_stale(self, stale, now=None, rebuild=False):
+        """Refresh the clients of a _stale() result, rebuilding progress only where it changed"""
+        progress_ids = None if rebuild else [client_id for client_id, changed in stale.items() if changed]
+        self.refresh(list(stale), now=now, progress_ids=progress_ids)
+
+    def ensure_fresh(self, client_ids=None, trainer_id=None):
+        """
+        Refresh (and commit) the clients in scope older than max_staleness or with writes since
+        their last refresh - used by the model accessors
+
+        Returns:
+            int: Number of clients refreshed
+        """
+        stale = self._stale(client_ids=client_ids, trainer_id=trainer_id, include_changed=True)
+        if stale:
+            self._refresh_stale(stale)
+            db.session.commit()
+        return len(stale)
+
+    def refresh_stale(self, max_age=None, now=None, rebuild=False):
+        """
+        Scheduler pass: refresh every client older than max_age, BATCH_SIZE clients per commit
+
+        Args:
+            max_age: timedelta (defaults to half of max_staleness; timedelta(0) refreshes everything)
+            rebuild: Rebuild exercise_progress even for clients without new writes
+
+        Returns:
+            int: Number of clients refreshed
+        """
+        now = now or datetime.utcnow()
+        max_age = self.max_staleness / 2 if max_age is None else max_age
+
+        refreshed = 0
+        while True:
+            stale = self._stale(max_age=max_age, now=now, limit=self.BATCH_SIZE)
+            if not stale:
+                return refreshed
+            self._refresh_stale(stale, now=now, rebuild=rebuild)
+            db.session.commit()
+            refreshed += len(stale)
+
+    # ==================== WRITE TRACKING ====================
+
+    def with_version_bump(self, statement):
+        """
+        Combine a write RETURNING (client_id, trainer_id) with the data_version bump of those clients
+
+        Used by the activity rollup so tracking a write stays a single statement. Clients
+        without a row get one stamped NEVER, which the next read or scheduler pass refreshes.
+        """
+        written = statement.cte('written')
+        zero = literal(0)
+        versions = select(
+            written.c.client_id, func.min(written.c.trainer_id), literal(self.NEVER, db.DateTime), literal(1),
+            zero, zero, zero, zero,
+        ).group_by(written.c.client_id)
+
+        columns = ['client_id', 'trainer_id', 'refreshed_at', 'data_version',
+                   'total_assigned', 'total_completed', 'adherence_percentage', 'progress_version']
+        bump = insert(ClientAdherence.__table__).from_select(columns, versions, include_defaults=False)
+        return bump.on_conflict_do_update(
+            index_elements=['client_id'],
+            set_={'data_version': ClientAdherence.__table__.c.data_version + 1}
+        )
+
+    def mark_changed(self, client_ids=None):
+        """Bump data_version of some clients (None = all) after writes the rollup deltas do not cover"""
+        statement = update(ClientAdherence.__table__).values(data_version=ClientAdherence.data_version + 1)
+        if client_ids is not None:
+            statement = statement.where(ClientAdherence.client_id.in_(client_ids))
+        db.session.execute(statement)
+
+
+# Singleton instance
+analytics_views = AnalyticsViewsService()
@@ -0,0 +1,68 @@
+"""
+Assignment Serializer - Batch serialization for lists of workout assignments
+
+Embedded mode (default) keeps the legacy shape, where each assignment carries its
+full workout tree, but builds each distinct workout only once. Side-loaded mode
+returns every workout and exercise once in an `included` map keyed by id, and
+assignments reference them through workout_id / exercise_id.
+"""
+from app.models import Workout
+from app.services.workout_loader import workout_loader
+from app.services.program_metrics import ProgramMetricsCalculator
+
+
+class AssignmentSerializer:
+    """Serializes assignments with batch-loaded workouts, exercises and program metrics (4 queries)"""
+
+    def serialize(self, assignments, sideload=False):
+        """
+        Serialize a list of assignments
+
+        Args:
+            assignments: List of WorkoutAssignment instances
+            sideload: Return workouts/exercises in an `included` map instead of embedding them
+
+        Returns:
+            tuple (data, included) - included is None in embedded mode
+        """
+        workout_ids = {assignment.workout_id for assignment in assignments}
+        workouts = Workout.query.filter(Workout.id.in_(workout_ids)).all() if workout_ids else []
+        by_workout = workout_loader.load_exercises(workouts, include_exercise_details=True)
+        metrics = ProgramMetricsCalculator().load(assignments)
+
+        if sideload:
+            included = {'workouts': {}, 'exercises': {}}
+            for workout in workouts:
+                workout_exercises = by_workout.get(workout.id, [])
+                included['workouts'][str(workout.id)] = workout.to_dict(
+                    include_exercises=True,
+                    workout_exercises=workout_exercises,
+                    include_exercise_details=False
+                )
+                for workout_exercise in workout_exercises:
+                    if workout_exercise.exercise:
+                        included['exercises'][str(workout_exercise.exercise_id)] = workout_exercise.exercise.to_dict()
+
+            data = [
+                assignment.to_dict(include_workout=False, metrics=metrics.for_assignment(assignment))
+                for assignment in assignments
+            ]
+            return data, included
+
+        workout_data = {
+            workout.id: workout.to_dict(include_exercises=True, workout_exercises=by_workout.get(workout.id, []))
+            for workout in workouts
+        }
+
+        data = []
+        for assignment in assignments:
+            assignment_data = assignment.to_dict(include_workout=False, metrics=metrics.for_assignment(assignment))
+            if assignment.workout_id in workout_data:
+                assignment_data['workout'] = workout_data[assignment.workout_id]
+            data.append(assignment_data)
+
+        return data, None
+
+
+# Singleton instance
+assignment_serializer = AssignmentSerializer()
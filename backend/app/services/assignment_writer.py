@@ -0,0 +1,46 @@
+"""
+Assignment Writer - Set-based deletes of workout assignments
+Deleting a workout or a client used to go through the ORM cascade, which loads
+every assignment and then every assignment's logs (one query each). Here the
+assignments and their logs go with a fixed number of statements, recording the
+sync tombstones through the change feed.
+"""
+from sqlalchemy import delete, select
+from app import db
+from app.models import WorkoutAssignment, WorkoutLog
+from app.services.change_feed import change_feed
+
+
+class AssignmentWriter:
+    """Bulk write paths for workout_assignments"""
+
+    def delete_where(self, *criteria):
+        """
+        Delete assignments (and their logs) matching criteria - the caller commits
+
+        Four statements whatever the number of rows: assignment tombstones, logs DELETE,
+        assignments DELETE and the tombstones of workouts that left a client's scope.
+        The caller rebuilds the activity rollup of the affected clients if they remain.
+
+        Args:
+            criteria: WorkoutAssignment filter expressions
+
+        Returns:
+            list of affected client IDs
+        """
+        change_feed.tombstone_assignments(*criteria)
+        db.session.execute(delete(WorkoutLog.__table__).where(
+            WorkoutLog.assignment_id.in_(select(WorkoutAssignment.id).where(*criteria))
+        ))
+        pairs = db.session.execute(
+            delete(WorkoutAssignment).where(*criteria).returning(
+                WorkoutAssignment.client_id, WorkoutAssignment.workout_id
+            ),
+            execution_options={'synchronize_session': False}
+        ).all()
+        change_feed.tombstone_removed_scope(pairs)
+        return sorted({client_id for client_id, _ in pairs})
+
+
+# Singleton instance
+assignment_writer = AssignmentWriter()
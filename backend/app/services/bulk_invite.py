@@ -0,0 +1,204 @@
+"""
+Bulk Invite - Invite many clients (existing IDs and/or new rows from JSON or CSV) in one request
+
+The work is set-based, so the number of queries does not grow with the number of rows:
+one identity lookup for the new emails, one bulk INSERT of the missing clients, one
+UPDATE ... FROM (VALUES ...) for the invite tokens and one INSERT of the outbox
+emails, which the email dispatcher sends in batches. Each input row gets its own
+status in the result.
+"""
+import csv
+import io
+import os
+from datetime import datetime, timedelta
+from flask_jwt_extended import create_access_token
+from sqlalchemy import Integer, Text, column, insert, update, values
+from app import db
+from app.models import Client
+from app.services.email_dispatcher import email_dispatcher
+from app.services.email_service import email_service
+from app.services.identity_index import identity_index, normalize_email
+from app.services.ownership_cache import ownership_cache
+
+NEW_CLIENT_FIELDS = ('name', 'phone', 'notes', 'gender', 'age', 'goals')
+
+
+def _is_id(value):
+    # JSON true / false are bools, which Python treats as ints 1 / 0
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+class BulkInviteError(ValueError):
+    """The request as a whole is invalid (bad CSV, too many rows, nothing to invite)"""
+
+
+def invite_token_for(client_id, trainer_id):
+    """Registration JWT of a client invitation (7 days)"""
+    return create_access_token(
+        identity=client_id,
+        expires_delta=timedelta(days=7),
+        additional_claims={'type': 'invite', 'client_id': client_id, 'trainer_id': trainer_id}
+    )
+
+
+def invite_link(token):
+    """Registration link of an invite token"""
+    frontend_url = os.getenv('FRONTEND_MOBILE_URL', 'exp://localhost:8081')
+    return f"{frontend_url}/register?token={token}"
+
+
+class BulkInviter:
+    """Set-based client invitations"""
+
+    MAX_ROWS = int(os.getenv('BULK_INVITE_MAX_ROWS', 500))
+
+    def parse_csv(self, text):
+        """
+        New clients from CSV text with a header row (email,name[,phone,notes,gender,age,goals])
+
+        Returns:
+            list[dict]
+        """
+        reader = csv.DictReader(io.StringIO(text.lstrip('﻿')))
+        if not reader.fieldnames or 'email' not in [field.strip().lower() for field in reader.fieldnames]:
+            raise BulkInviteError('CSV must have a header row with an email column')
+        return [
+            {(key or '').strip().lower(): (value or '').strip() for key, value in row.items()}
+            for row in reader
+        ]
+
+    def invite(self, trainer, client_ids=(), new_clients=()):
+        """
+        Invite existing clients by ID and create + invite new ones - the caller commits
+
+        Args:
+            trainer: Trainer sending the invitations
+            client_ids: IDs of the trainer's existing clients
+            new_clients: Dicts with email and name (plus optional NEW_CLIENT_FIELDS)
+
+        Returns:
+            list[dict]: Per-row result, existing IDs first then new clients in input order
+                        (status: invited | not_found | already_registered | duplicate | invalid |
+                        email_taken; created: True for clients inserted here)
+        """
+        client_ids, new_clients = list(client_ids or []), list(new_clients or [])
+        if not client_ids and not new_clients:
+            raise BulkInviteError('client_ids or clients are required')
+        if len(client_ids) + len(new_clients) > self.MAX_ROWS:
+            raise BulkInviteError(f'At most {self.MAX_ROWS} invitations per request')
+
+        results, to_invite = [], []  # to_invite: (result, Client)
+
+        # Existing clients - one query for every ID
+        owned = {}
+        valid_ids = [client_id for client_id in client_ids if _is_id(client_id)]
+        if valid_ids:
+            owned = {client.id: client for client in Client.query.filter(
+                Client.id.in_(valid_ids), Client.trainer_id == trainer.id
+            )}
+        seen_ids = set()
+        for client_id in client_ids:
+            result = {'clientId': client_id}
+            results.append(result)
+            client = owned.get(client_id) if _is_id(client_id) else None
+            if _is_id(client_id) and client_id in seen_ids:
+                result['status'] = 'duplicate'
+            elif client is None:
+                result['status'] = 'not_found'
+            elif client.password_hash:
+                result.update(status='already_registered', email=client.email)
+            else:
+                to_invite.append((result, client))
+            if _is_id(client_id):
+                seen_ids.add(client_id)
+
+        # New clients - one identity lookup, one bulk INSERT
+        existing = identity_index.find_many(
+            [row['email'] for row in new_clients if isinstance(row.get('email'), str)], 'client'
+        )
+        invited_ids = {client.id for _, client in to_invite}
+        rows, pending = [], []
+        seen_emails = set()
+        for row in new_clients:
+            email = normalize_email(row.get('email') or '') if isinstance(row.get('email'), str) else ''
+            name = str(row.get('name') or '').strip()
+            result = {'email': email or row.get('email')}
+            results.append(result)
+
+            if not email or '@' not in email or not name and email not in existing:
+                result.update(status='invalid', error='email and name are required')
+            elif email in seen_emails:
+                result['status'] = 'duplicate'
+            elif email in existing:
+                client = existing[email]
+                result['clientId'] = client.id
+                if client.trainer_id != trainer.id:
+                    result['status'] = 'email_taken'
+                elif client.password_hash:
+                    result['status'] = 'already_registered'
+                elif client.id in invited_ids:
+                    result['status'] = 'duplicate'
+                else:
+                    to_invite.append((result, client))
+            else:
+                rows.append(self._new_client_row(trainer.id, email, name, row))
+                pending.append(result)
+            seen_emails.add(email)
+
+        if rows:
+            created = db.session.execute(insert(Client).returning(Client, sort_by_parameter_order=True), rows).scalars().all()
+            identity_index.add_many('client', created)
+            ownership_cache.add_many('clients', trainer.id, [client.id for client in created])
+            for result, client in zip(pending, created):
+                result['created'] = True
+                to_invite.append((result, client))
+
+        self._send_invitations(trainer, to_invite)
+        return results
+
+    @staticmethod
+    def _new_client_row(trainer_id, email, name, row):
+        # Same keys on every row, so the INSERT goes out as a single batch
+        data = {'email': email, 'name': name, 'trainer_id': trainer_id, 'is_active': True}
+        for field in NEW_CLIENT_FIELDS[1:]:
+            data[field] = row.get(field) if row.get(field) not in (None, '') else None
+        try:
+            data['age'] = int(data['age']) if data['age'] is not None else None
+        except (TypeError, ValueError):
+            data['age'] = None
+        return data
+
+    def _send_invitations(self, trainer, to_invite):
+        """Mint tokens, store them with one UPDATE and queue the emails with one INSERT"""
+        if not to_invite:
+            return
+        now = datetime.utcnow()
+        tokens = {client.id: invite_token_for(client.id, trainer.id) for _, client in to_invite}
+
+        invites = values(column('id', Integer), column('token', Text), name='invites').data(list(tokens.items()))
+        clients = Client.__table__
+        db.session.execute(
+            update(clients).where(clients.c.id == invites.c.id).values(
+                invite_token=invites.c.token, invite_sent_at=now, updated_at=now
+            ),
+            execution_options={'synchronize_session': False}
+        )
+
+        emails = []
+        for result, client in to_invite:
+            result['status'] = 'invited'
+            link = invite_link(tokens[client.id])
+            result.update(clientId=client.id, email=client.email)
+            email = email_service.client_invitation_email(client.email, client.name, trainer.name, link)
+            if email is None:
+                result['invite_link'] = link  # no transport configured - share manually
+            else:
+                emails.append((result, email))
+
+        outbox_ids = email_dispatcher.enqueue_many([email for _, email in emails])
+        for (result, _), outbox_id in zip(emails, outbox_ids):
+            result['emailId'] = outbox_id
+
+
+# Singleton instance
+bulk_inviter = BulkInviter()
@@ -0,0 +1,281 @@
+"""
+Change Feed - Delta sync over updated_at watermarks
+Returns the rows a user can see that were created or updated since a watermark,
+plus tombstones for deleted rows, so clients stop re-downloading full lists.
+
+Deletes of synced models are recorded in sync_tombstones by ORM events (including
+rows removed through relationship cascades); bulk deletes that bypass the ORM record
+theirs through tombstone_assignments() / tombstone_removed_scope(). A workout
+also gets a tombstone for a client when the client's last assignment of it is
+deleted, since it leaves that client's scope.
+
+A workout is served with its exercises, so its change is detected through its own
+updated_at (bumped whenever its workout_exercises rows are written) or the
+updated_at of the exercises it references; a client also gets a workout again
+when a new assignment brings it into their scope.
+"""
+import os
+from datetime import datetime, timedelta
+from sqlalchemy import Integer, column, event, exists, insert, literal, null, or_, select, update, values
+from sqlalchemy.orm import Session, object_session
+from app import db
+from app.models import Client, Exercise, SyncTombstone, Trainer, Workout, WorkoutAssignment, WorkoutExercise
+from app.services.assignment_serializer import assignment_serializer
+from app.services.workout_loader import workout_loader
+
+TOMBSTONES_KEY = 'sync_tombstones'
+REMOVED_SCOPE_KEY = 'sync_removed_workout_scope'
+TOUCHED_WORKOUTS_KEY = 'sync_touched_workouts'
+CREATED_WORKOUTS_KEY = 'sync_created_workouts'
+
+
+def _trainer_of_client(client_id):
+    return select(Client.trainer_id).where(Client.id == client_id).scalar_subquery()
+
+
+class ChangeFeed:
+    """Per-resource scoped queries, serializers and tombstone owners for the delta sync"""
+
+    # Rows whose transaction committed slightly after the watermark was issued are
+    # still picked up: every read looks back this far (clients upsert by id)
+    LAG = timedelta(seconds=int(os.getenv('SYNC_WATERMARK_LAG', 10)))
+
+    # Tombstones older than this are purged; older watermarks get a full resync
+    RETENTION = timedelta(days=int(os.getenv('SYNC_TOMBSTONE_RETENTION_DAYS', 30)))
+    PURGE_EVERY = 500  # feed reads per process between tombstone purges
+
+    DEFAULT_RESOURCES = ('clients', 'workouts', 'assignments')
+
+    RESOURCES = {
+        'clients': {
+            'model': Client,
+            'scope': {
+                'trainer': lambda user_id: Client.trainer_id == user_id,
+                'client': lambda user_id: Client.id == user_id,
+            },
+            'serialize': lambda rows: [client.to_dict() for client in rows],
+            'owners': lambda client: (client.trainer_id, client.id),
+        },
+        'workouts': {
+            'model': Workout,
+            'scope': {
+                'trainer': lambda user_id: Workout.trainer_id == user_id,
+                'client': lambda user_id: Workout.id.in_(
+                    select(WorkoutAssignment.workout_id).where(WorkoutAssignment.client_id == user_id)
+                ),
+            },
+            'changed': lambda cutoff, scope_type, user_id: or_(
+                # Own row, or one of the exercises embedded in it
+                Workout.updated_at > cutoff,
+                Workout.id.in_(
+                    select(WorkoutExercise.workout_id)
+                    .join(Exercise, Exercise.id == WorkoutExercise.exercise_id)
+                    .where(Exercise.updated_at > cutoff)
+                ),
+                # Entered the client's scope through a new assignment (leaving it is a tombstone)
+                *([Workout.id.in_(
+                    select(WorkoutAssignment.workout_id)
+                    .where(WorkoutAssignment.client_id == user_id, WorkoutAssignment.created_at > cutoff)
+                )] if scope_type == 'client' else [])
+            ),
+            'serialize': lambda rows: workout_loader.serialize(rows),
+            'owners': lambda workout: (workout.trainer_id, None),
+        },
+        'assignments': {
+            'model': WorkoutAssignment,
+            'scope': {
+                'trainer': lambda user_id: WorkoutAssignment.trainer_id == user_id,
+                'client': lambda user_id: WorkoutAssignment.client_id == user_id,
+            },
+            'serialize': lambda rows: assignment_serializer.serialize(rows)[0],
+            'owners': lambda assignment: (assignment.trainer_id, assignment.client_id),
+        },
+        'exercises': {
+            'model': Exercise,
+            'scope': {
+                'trainer': lambda user_id: or_(Exercise.is_custom.isnot(True), Exercise.trainer_id == user_id),
+                'client': lambda user_id: or_(
+                    Exercise.is_custom.isnot(True), Exercise.trainer_id == _trainer_of_client(user_id)
+                ),
+            },
+            'serialize': lambda rows: [exercise.to_dict() for exercise in rows],
+            'owners': lambda exercise: (exercise.trainer_id, None),
+        },
+        'trainers': {
+            'model': Trainer,
+            'scope': {
+                'trainer': lambda user_id: Trainer.id == user_id,
+                'client': lambda user_id: Trainer.id == _trainer_of_client(user_id),
+            },
+            'serialize': lambda rows: [trainer.to_dict() for trainer in rows],
+            'owners': lambda trainer: (trainer.id, None),
+        },
+    }
+
+    def __init__(self):
+        self._reads = 0
+
+    def changes(self, user_type, user_id, since=None, resources=None, now=None):
+        """
+        Rows changed since a watermark, scoped to the user
+
+        Args:
+            user_type: 'trainer' or 'client'
+            user_id: JWT identity
+            since: Watermark from a previous response (None = initial full sync)
+            resources: Resource names (default DEFAULT_RESOURCES)
+
+        Returns:
+            dict {'watermark', 'reset', 'changes': {resource: [rows]}, 'deleted': {resource: [ids]}}
+            reset=True means a full sync (no watermark, or one older than the tombstone retention):
+            the caller should replace its local copy instead of merging
+        """
+        # The new watermark is taken before reading, so nothing written meanwhile is lost
+        watermark = now or datetime.utcnow()
+        resources = list(resources or self.DEFAULT_RESOURCES)
+        if since and since < watermark - self.RETENTION:
+            since = None
+        self._maybe_purge(watermark)
+
+        scope_type = 'trainer' if user_type == 'trainer' else 'client'
+        cutoff = since - self.LAG if since else None
+
+        changes = {}
+        for name in resources:
+            spec = self.RESOURCES[name]
+            model = spec['model']
+            query = model.query.filter(spec['scope'][scope_type](user_id))
+            if cutoff:
+                changed = spec.get('changed', lambda cutoff, scope_type, user_id: model.updated_at > cutoff)
+                query = query.filter(changed(cutoff, scope_type, user_id))
+            changes[name] = spec['serialize'](query.order_by(model.updated_at, model.id).all())
+
+        deleted = {name: [] for name in resources}
+        if cutoff:
+            owner_column = SyncTombstone.trainer_id if scope_type == 'trainer' else SyncTombstone.client_id
+            tombstones = SyncTombstone.query.with_entities(SyncTombstone.resource, SyncTombstone.resource_id).filter(
+                owner_column == user_id,
+                SyncTombstone.deleted_at > cutoff,
+                SyncTombstone.resource.in_(resources)
+            ).order_by(SyncTombstone.deleted_at, SyncTombstone.id)
+            for resource, resource_id in tombstones:
+                deleted[resource].append(resource_id)
+
+        return {
+            'watermark': watermark.isoformat(),
+            'reset': since is None,
+            'changes': changes,
+            'deleted': deleted
+        }
+
+    # ==================== TOMBSTONES ====================
+
+    def purge_tombstones(self, now=None):
+        """Delete tombstones older than RETENTION; returns the number of rows removed"""
+        cutoff = (now or datetime.utcnow()) - self.RETENTION
+        return SyncTombstone.query.filter(SyncTombstone.deleted_at < cutoff).delete(synchronize_session=False)
+
+    def _maybe_purge(self, now):
+        self._reads += 1
+        if self._reads % self.PURGE_EVERY == 0:
+            self.purge_tombstones(now)
+
+    def tombstone_assignments(self, *criteria):
+        """
+        Tombstones for assignments about to be deleted with a bulk DELETE (no ORM events fire)
+
+        One INSERT ... SELECT; call before the DELETE, then tombstone_removed_scope() with
+        the (client_id, workout_id) pairs it returned.
+
+        Args:
+            criteria: WorkoutAssignment filter expressions of the DELETE
+        """
+        db.session.execute(insert(SyncTombstone.__table__).from_select(
+            ['resource', 'resource_id', 'trainer_id', 'client_id', 'deleted_at'],
+            select(
+                literal('assignments'), WorkoutAssignment.id, WorkoutAssignment.trainer_id,
+                WorkoutAssignment.client_id, literal(datetime.utcnow())
+            ).where(*criteria)
+        ))
+
+    def tombstone_removed_scope(self, pairs, connection=None):
+        """
+        Workout tombstones for clients whose last assignment of the workout was deleted
+
+        Args:
+            pairs: (client_id, workout_id) of deleted assignments
+            connection: Connection to write with (default the session's)
+        """
+        pairs = sorted(set(pairs))
+        if not pairs:
+            return
+        removed = values(column('client_id', Integer), column('workout_id', Integer), name='removed').data(pairs)
+        wa = WorkoutAssignment.__table__
+        (connection or db.session.connection()).execute(insert(SyncTombstone.__table__).from_select(
+            ['resource', 'resource_id', 'trainer_id', 'client_id', 'deleted_at'],
+            select(
+                literal('workouts'), removed.c.workout_id, null(), removed.c.client_id, literal(datetime.utcnow())
+            ).where(~exists().where(wa.c.client_id == removed.c.client_id, wa.c.workout_id == removed.c.workout_id))
+        ))
+
+    def register_events(self):
+        """Record a tombstone for every deleted row of a synced model, bump workouts on nested writes"""
+        for name, spec in self.RESOURCES.items():
+            event.listen(spec['model'], 'after_delete', self._make_delete_listener(name, spec['owners']))
+        for event_name in ('after_insert', 'after_update', 'after_delete'):
+            event.listen(WorkoutExercise, event_name, self._touch_workout)
+        event.listen(Session, 'after_flush', self._after_flush)
+        event.listen(Session, 'after_commit', self._reset)
+        event.listen(Session, 'after_soft_rollback', self._reset)
+
+    @staticmethod
+    def _make_delete_listener(name, owners):
+        def after_delete(mapper, connection, target):
+            session = object_session(target)
+            if session is None:
+                return
+            trainer_id, client_id = owners(target)
+            session.info.setdefault(TOMBSTONES_KEY, []).append({
+                'resource': name,
+                'resource_id': target.id,
+                'trainer_id': trainer_id,
+                'client_id': client_id,
+                'deleted_at': datetime.utcnow(),
+            })
+            if name == 'assignments':
+                session.info.setdefault(REMOVED_SCOPE_KEY, set()).add((target.client_id, target.workout_id))
+        return after_delete
+
+    @staticmethod
+    def _touch_workout(mapper, connection, target):
+        session = object_session(target)
+        if session is not None and target.workout_id is not None:
+            session.info.setdefault(TOUCHED_WORKOUTS_KEY, set()).add(target.workout_id)
+
+    def _after_flush(self, session, flush_context):
+        connection = session.connection()
+        rows = session.info.pop(TOMBSTONES_KEY, None)
+        if rows:
+            connection.execute(insert(SyncTombstone.__table__), rows)
+        self.tombstone_removed_scope(session.info.pop(REMOVED_SCOPE_KEY, ()), connection)
+
+        # Workouts inserted in this transaction already carry a fresh updated_at, deleted ones are gone
+        created = session.info.setdefault(CREATED_WORKOUTS_KEY, set())
+        created.update(obj.id for obj in session.new if isinstance(obj, Workout))
+        touched = session.info.pop(TOUCHED_WORKOUTS_KEY, set()) - created - {
+            obj.id for obj in session.deleted if isinstance(obj, Workout)
+        }
+        if touched:
+            workouts = Workout.__table__
+            connection.execute(
+                update(workouts).where(workouts.c.id.in_(touched)).values(updated_at=datetime.utcnow())
+            )
+
+    @staticmethod
+    def _reset(session, *args):
+        session.info.pop(CREATED_WORKOUTS_KEY, None)
+
+
+# Singleton instance
+change_feed = ChangeFeed()
+change_feed.register_events()
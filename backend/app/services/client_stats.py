@@ -0,0 +1,59 @@
+"""
+Client Stats Loader - Batched workout statistics for client lists
+Loads assigned/completed counts and the last completed workout for many clients
+at once, so GET /api/clients costs the same number of queries for 2 or 200 clients.
+"""
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from app import db
+from app.models import WorkoutAssignment
+from app.services.activity_rollup import activity_rollup
+
+
+class ClientStatsLoader:
+    """Batch loader for the stats embedded by Client.to_dict(include_stats=True)"""
+
+    def load(self, client_ids, stats_period_days=None):
+        """
+        Load stats for a list of clients
+
+        Args:
+            client_ids: List of client IDs
+            stats_period_days: Period for assigned/completed counts (None = all time, e.g. 7, 30)
+
+        Returns:
+            dict {client_id: {'total_assigned', 'completed', 'last_completed_at'}}
+        """
+        client_ids = list(client_ids)
+        stats = {
+            client_id: {'total_assigned': 0, 'completed': 0, 'last_completed_at': None}
+            for client_id in client_ids
+        }
+        if not client_ids:
+            return stats
+
+        # Assigned/completed counts from the daily activity rollup (grouped by client)
+        period_start = datetime.utcnow() - timedelta(days=stats_period_days) if stats_period_days else None
+        totals = activity_rollup.window_totals(period_start, client_ids=client_ids)
+        for (_, client_id), metrics in totals.items():
+            if client_id in stats:
+                stats[client_id]['total_assigned'] += metrics['assigned']
+                stats[client_id]['completed'] += metrics['completed']
+
+        # Last activity - one grouped MAX(completed_at) for every listed client
+        last_completed = db.session.query(
+            WorkoutAssignment.client_id,
+            func.max(WorkoutAssignment.completed_at)
+        ).filter(
+            WorkoutAssignment.client_id.in_(client_ids),
+            WorkoutAssignment.completed_at.isnot(None)
+        ).group_by(WorkoutAssignment.client_id).all()
+
+        for client_id, completed_at in last_completed:
+            stats[client_id]['last_completed_at'] = completed_at
+
+        return stats
+
+
+# Singleton instance
+client_stats_loader = ClientStatsLoader()
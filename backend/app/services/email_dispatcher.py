@@ -0,0 +1,285 @@
+"""
+Email Dispatcher - Background delivery of the email_outbox table
+
+Requests only insert an OutboxEmail row (same transaction as the change that
+triggers it) and call notify(). A per-process background thread then claims due
+rows in batches of EMAIL_BATCH_SIZE (FOR UPDATE SKIP LOCKED, so several processes
+or send_emails.py never pick the same row) and sends each batch on a pool of
+EMAIL_WORKERS threads through one reused transport. Failed sends are retried with
+exponential backoff up to EMAIL_MAX_ATTEMPTS; a claimed row that is never
+reported back (crashed worker) becomes due again after EMAIL_SEND_LEASE seconds.
+
+EMAIL_TRANSPORT selects the transport: 'sendgrid' (default when SENDGRID_API_KEY
+is set), 'stub' (records messages locally, for tests and benchmarks) or 'none'.
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import bindparam, insert, select, update
+from app import db
+from app.models import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+
+class EmailSendError(Exception):
+    """The transport did not accept a message"""
+
+
+class SendGridTransport:
+    """SendGrid Web API - one client reused for every send"""
+
+    def __init__(self, api_key, from_email):
+        from sendgrid import SendGridAPIClient
+        self.client = SendGridAPIClient(api_key)
+        self.from_email = from_email
+
+    def send(self, message):
+        from sendgrid.helpers.mail import Mail
+        response = self.client.send(Mail(
+            from_email=self.from_email,
+            to_emails=message['to_email'],
+            subject=message['subject'],
+            html_content=message['html_content']
+        ))
+        if response.status_code not in (200, 201, 202):
+            raise EmailSendError(f'SendGrid answered {response.status_code}')
+
+
+class StubTransport:
+    """Local transport for tests and benchmarks - records messages, optional latency and failures"""
+
+    def __init__(self, latency=0.0, fail=None):
+        """
+        Args:
+            latency: Seconds each send takes (simulated network round trip)
+            fail: Optional callable(message) -> bool, True to fail that send
+        """
+        self.latency = latency
+        self.fail = fail
+        self.sent = []
+        self._lock = threading.Lock()
+
+    def send(self, message):
+        if self.latency:
+            time.sleep(self.latency)
+        if self.fail and self.fail(message):
+            raise EmailSendError(f'stub failure for {message["to_email"]}')
+        with self._lock:
+            self.sent.append(message)
+
+
+def transport_from_env():
+    """Transport configured by EMAIL_TRANSPORT / SENDGRID_API_KEY (None = email disabled)"""
+    api_key = os.getenv('SENDGRID_API_KEY')
+    name = os.getenv('EMAIL_TRANSPORT', 'sendgrid' if api_key else 'none').lower()
+    if name == 'stub':
+        return StubTransport()
+    if name == 'sendgrid' and api_key:
+        return SendGridTransport(api_key, os.getenv('FROM_EMAIL', 'noreply@fitcompass.com'))
+    return None
+
+
+class EmailDispatcher:
+    """Claims due outbox rows in batches and sends them on a worker pool"""
+
+    def __init__(self, transport=None):
+        self.transport = transport
+        self.batch_size = int(os.getenv('EMAIL_BATCH_SIZE', 50))
+        self.workers = int(os.getenv('EMAIL_WORKERS', 4))
+        self.max_attempts = int(os.getenv('EMAIL_MAX_ATTEMPTS', 5))
+        self.backoff = timedelta(seconds=float(os.getenv('EMAIL_RETRY_BACKOFF', 30)))
+        self.max_backoff = timedelta(seconds=float(os.getenv('EMAIL_RETRY_MAX_BACKOFF', 3600)))
+        self.lease = timedelta(seconds=float(os.getenv('EMAIL_SEND_LEASE', 120)))
+        self.poll_interval = float(os.getenv('EMAIL_POLL_INTERVAL', 15))
+        self.background = os.getenv('EMAIL_BACKGROUND_WORKER', 'true').lower() in ('1', 'true', 'yes')
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._executor = None
+        self._pid = None
+        self._counters = {'sent': 0, 'retried': 0, 'failed': 0, 'batches': 0, 'send_seconds': 0.0}
+
+    @property
+    def enabled(self):
+        return self.transport is not None
+
+    # ==================== ENQUEUE ====================
+
+    def enqueue(self, kind, to_email, subject, html_content):
+        """
+        Add an email to the outbox - the caller commits, then calls notify()
+
+        Returns:
+            OutboxEmail
+        """
+        email = OutboxEmail(kind=kind, to_email=to_email, subject=subject, html_content=html_content,
+                            next_attempt_at=datetime.utcnow())
+        db.session.add(email)
+        return email
+
+    def enqueue_many(self, emails):
+        """
+        Add many emails to the outbox with one INSERT - the caller commits, then calls notify()
+
+        Args:
+            emails: List of dicts with kind, to_email, subject, html_content
+
+        Returns:
+            list[int]: Outbox IDs, in input order
+        """
+        if not emails:
+            return []
+        now = datetime.utcnow()
+        rows = [dict(email, next_attempt_at=now, created_at=now) for email in emails]
+        table = OutboxEmail.__table__
+        return list(db.session.execute(insert(table).values(rows).returning(table.c.id)).scalars())
+
+    def notify(self):
+        """Wake this process's background sender (started on first use)"""
+        if not (self.background and self.enabled):
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive() or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._executor = None
+                self._thread = threading.Thread(
+                    target=self._run, args=(current_app._get_current_object(),),
+                    name='email-dispatcher', daemon=True
+                )
+                self._thread.start()
+        self._wake.set()
+
+    def _run(self, app):
+        while True:
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            try:
+                with app.app_context():
+                    self.dispatch_pending()
+            except Exception:
+                logger.exception('Email dispatch pass failed')
+
+    # ==================== DISPATCH ====================
+
+    def dispatch_pending(self, now=None, max_batches=None):
+        """
+        Send every due outbox row, one claimed batch at a time
+
+        Args:
+            now: Clock used for due/backoff times (defaults to datetime.utcnow())
+            max_batches: Stop after this many batches
+
+        Returns:
+            dict {'sent', 'retried', 'failed'}
+        """
+        totals = {'sent': 0, 'retried': 0, 'failed': 0}
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            messages = self._claim(now or datetime.utcnow())
+            if not messages:
+                break
+            for outcome, count in self._send_batch(messages, now).items():
+                totals[outcome] += count
+            batches += 1
+        return totals
+
+    def _claim(self, now):
+        """Lease up to batch_size due rows (committed, so other dispatchers skip them)"""
+        table = OutboxEmail.__table__
+        due = select(table.c.id).where(
+            table.c.status == 'pending', table.c.next_attempt_at <= now
+        ).order_by(table.c.next_attempt_at).limit(self.batch_size).with_for_update(skip_locked=True)
+
+        claimed = db.session.execute(
+            update(table).where(table.c.id.in_(due.scalar_subquery())).values(
+                attempts=table.c.attempts + 1, next_attempt_at=now + self.lease
+            ).returning(table.c.id, table.c.to_email, table.c.subject, table.c.html_content, table.c.attempts)
+        ).mappings().all()
+        db.session.commit()
+        return [dict(message) for message in claimed]
+
+    def _send_batch(self, messages, now=None):
+        started = time.perf_counter()
+        errors = list(self._pool().map(self._send_one, messages))
+        elapsed = time.perf_counter() - started
+
+        now = now or datetime.utcnow()
+        table = OutboxEmail.__table__
+        sent = [message['id'] for message, error in zip(messages, errors) if error is None]
+        retries, failures = [], []
+        for message, error in zip(messages, errors):
+            if error is None:
+                continue
+            if message['attempts'] >= self.max_attempts:
+                failures.append({'b_id': message['id'], 'b_error': error})
+            else:
+                delay = min(self.backoff * 2 ** (message['attempts'] - 1), self.max_backoff)
+                retries.append({'b_id': message['id'], 'b_error': error, 'b_next': now + delay})
+
+        if sent:
+            db.session.execute(update(table).where(table.c.id.in_(sent)).values(
+                status='sent', sent_at=now, last_error=None
+            ))
+        if retries:
+            db.session.execute(
+                update(table).where(table.c.id == bindparam('b_id')).values(
+                    next_attempt_at=bindparam('b_next'), last_error=bindparam('b_error')
+                ).execution_options(synchronize_session=False), retries
+            )
+        if failures:
+            db.session.execute(
+                update(table).where(table.c.id == bindparam('b_id')).values(
+                    status='failed', last_error=bindparam('b_error')
+                ).execution_options(synchronize_session=False), failures
+            )
+            logger.error(f'{len(failures)} emails failed after {self.max_attempts} attempts')
+        db.session.commit()
+
+        outcome = {'sent': len(sent), 'retried': len(retries), 'failed': len(failures)}
+        with self._lock:
+            for key, count in outcome.items():
+                self._counters[key] += count
+            self._counters['batches'] += 1
+            self._counters['send_seconds'] += elapsed
+        return outcome
+
+    def _send_one(self, message):
+        """Send through the transport -> None or the error text"""
+        try:
+            self.transport.send(message)
+            return None
+        except Exception as e:
+            logger.warning(f'Email {message["id"]} to {message["to_email"]} failed: {e}')
+            return str(e)[:500]
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='email')
+                self._pid = os.getpid()
+            return self._executor
+
+    def stats(self):
+        """Delivery totals since the process started, plus the outbox backlog"""
+        with self._lock:
+            counters = dict(self._counters)
+        pending = db.session.query(OutboxEmail.id).filter(OutboxEmail.status == 'pending').count()
+        return {
+            'transport': type(self.transport).__name__ if self.transport else None,
+            'pending': pending,
+            'sent': counters['sent'],
+            'retried': counters['retried'],
+            'failed': counters['failed'],
+            'batches': counters['batches'],
+            'avg_batch_ms': round(counters['send_seconds'] * 1000 / (counters['batches'] or 1), 2),
+        }
+
+
+# Singleton instance
+email_dispatcher = EmailDispatcher(transport_from_env())
@@ -1,29 +1,28 @@
 """
-Email Service - Handles email sending via SendGrid
+Email Service - Builds emails and queues them in the outbox
+Delivery (SendGrid, retries, batching) happens in the background, see
+app/services/email_dispatcher.py.
 """
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
-import os
 import logging
+from app.services.email_dispatcher import email_dispatcher
 
 logger = logging.getLogger(__name__)
 
 
 class EmailService:
-    """Service for sending emails using SendGrid"""
+    """Service for queueing transactional emails"""
 
-    def __init__(self):
-        self.api_key = os.getenv('SENDGRID_API_KEY')
-        self.from_email = os.getenv('FROM_EMAIL', 'noreply@fitcompass.com')
-        self.enabled = bool(self.api_key)
+    def __init__(self, dispatcher=email_dispatcher):
+        self.dispatcher = dispatcher
 
-        if not self.enabled:
-            logger.warning('SendGrid API key not configured - emails will not be sent')
+    @property
+    def enabled(self):
+        return self.dispatcher.enabled
 
-    def send_client_invitation(self, client_email: str, client_name: str,
-                               trainer_name: str, invite_link: str) -> bool:
+    def queue_client_invitation(self, client_email: str, client_name: str,
+                                trainer_name: str, invite_link: str):
         """
-        Send invitation email to a client
+        Queue the invitation email of a client - the caller commits, then calls dispatcher.notify()
 
         Args:
             client_email: Client's email address
@@ -32,37 +31,33 @@ class EmailService:
             invite_link: Registration link with invite token
 
         Returns:
-            bool: True if email was sent successfully, False otherwise
+            OutboxEmail | None: Queued email, None if no email transport is configured
+        """
+        email = self.client_invitation_email(client_email, client_name, trainer_name, invite_link)
+        return self.dispatcher.enqueue(**email) if email else None
+
+    def client_invitation_email(self, client_email: str, client_name: str,
+                                trainer_name: str, invite_link: str):
+        """
+        Build the invitation email of a client (for dispatcher.enqueue / enqueue_many)
+
+        Returns:
+            dict | None: kind, to_email, subject, html_content - None if no email transport is configured
         """
         if not self.enabled:
-            logger.warning(f'Email not sent to {client_email} - SendGrid not configured')
-            return False
-
-        try:
-            message = Mail(
-                from_email=self.from_email,
-                to_emails=client_email,
-                subject=f'{trainer_name} te invitó a FitCompass Pro',
-                html_content=self._get_invitation_template(
-                    client_name=client_name,
-                    trainer_name=trainer_name,
-                    invite_link=invite_link
-                )
-            )
-
-            sg = SendGridAPIClient(self.api_key)
-            response = sg.send(message)
-
-            if response.status_code in [200, 201, 202]:
-                logger.info(f'Invitation email sent to {client_email}')
-                return True
-            else:
-                logger.error(f'Failed to send email to {client_email}: {response.status_code}')
-                return False
-
-        except Exception as e:
-            logger.error(f'Error sending email to {client_email}: {str(e)}')
-            return False
+            logger.warning(f'Email not queued for {client_email} - no email transport configured')
+            return None
+
+        return {
+            'kind': 'client_invitation',
+            'to_email': client_email,
+            'subject': f'{trainer_name} te invitó a FitCompass Pro',
+            'html_content': self._get_invitation_template(
+                client_name=client_name,
+                trainer_name=trainer_name,
+                invite_link=invite_link
+            ),
+        }
 
     def _get_invitation_template(self, client_name: str, trainer_name: str,
                                  invite_link: str) -> str:
@@ -186,3 +181,7 @@ class EmailService:
 </body>
 </html>
         '''
+
+
+# Singleton instance
+email_service = EmailService()
@@ -0,0 +1,215 @@
+"""
+ExerciseDB Cache - In-process LRU with TTL, backed by a local SQLite file
+
+Entries written by one gunicorn worker are visible to the others and survive
+restarts. The store is created on the first set(), by default under the Flask
+app's instance folder. Expired entries are still served for a grace period (stale-while-
+revalidate) while a background thread refreshes them from the API.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, has_app_context
+
+
+class ExerciseCache:
+    """Two-level cache (memory LRU + persistent SQLite store) with stale-while-revalidate"""
+
+    def __init__(self, path=None, ttl=86400, stale_ttl=604800, max_entries=512, instance_file=None):
+        """
+        Args:
+            path: SQLite file for the persistent store (None = memory only, unless instance_file is set)
+            ttl: Seconds an entry is fresh
+            stale_ttl: Extra seconds an expired entry may be served while it is refreshed
+            max_entries: In-process LRU capacity
+            instance_file: Store file name inside app.instance_path, used when path is None
+        """
+        self.path = path
+        self.instance_file = instance_file
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+
+        self._memory = OrderedDict()  # key -> (value, fetched_at)
+        self._lock = threading.Lock()
+        self._refreshing = {}  # key -> Thread
+        self._created = False
+
+    @classmethod
+    def from_env(cls):
+        """Build the cache from EXERCISEDB_CACHE_* environment variables (unset path = app instance folder)"""
+        path = os.getenv('EXERCISEDB_CACHE_PATH')
+        return cls(
+            path=path or None,
+            ttl=int(os.getenv('EXERCISEDB_CACHE_TTL', 86400)),
+            stale_ttl=int(os.getenv('EXERCISEDB_CACHE_STALE_TTL', 604800)),
+            max_entries=int(os.getenv('EXERCISEDB_CACHE_MAX_ENTRIES', 512)),
+            instance_file='exercisedb_cache.sqlite3' if path is None else None,
+        )
+
+    @staticmethod
+    def make_key(path, params=None):
+        """Cache key for an API path + query params"""
+        if not params:
+            return path
+        query = '&'.join(f'{name}={params[name]}' for name in sorted(params))
+        return f'{path}?{query}'
+
+    # ==================== LOOKUP / STORE ====================
+
+    def get(self, key):
+        """
+        Look up an entry (memory first, then the persistent store)
+
+        Returns:
+            tuple (value, fetched_at) or None
+        """
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry
+
+        entry = self._load(key)
+        if entry is not None:
+            self._remember(key, entry)
+        return entry
+
+    def set(self, key, value, fetched_at=None):
+        """Store an entry in memory and in the persistent store"""
+        entry = (value, fetched_at if fetched_at is not None else time.time())
+        self._remember(key, entry)
+        self._store(key, entry)
+
+    def clear(self):
+        """Drop every entry (memory and persistent store)"""
+        with self._lock:
+            self._memory.clear()
+        if self._exists():
+            with self._connect() as conn:
+                conn.execute('DELETE FROM cache_entries')
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _connect(self):
+        # One short-lived connection per operation - sqlite3 connections are not thread-safe
+        return sqlite3.connect(self.path, timeout=5)
+
+    def _resolve_path(self):
+        """Store file, resolving instance_file against the app instance folder on first use"""
+        if self.path is None and self.instance_file and has_app_context():
+            self.path = os.path.join(current_app.instance_path, self.instance_file)
+        return self.path
+
+    def _exists(self):
+        """True once the store file exists (lookups never create it)"""
+        return bool(self._resolve_path()) and (self._created or os.path.exists(self.path))
+
+    def _create(self):
+        """Create the store on the first write"""
+        with self._lock:
+            if self._created:
+                return
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with self._connect() as conn:
+                conn.execute(
+                    'CREATE TABLE IF NOT EXISTS cache_entries ('
+                    'key TEXT PRIMARY KEY, value TEXT NOT NULL, fetched_at REAL NOT NULL)'
+                )
+            self._created = True
+
+    def _load(self, key):
+        if not self._exists():
+            return None
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    'SELECT value, fetched_at FROM cache_entries WHERE key = ?', (key,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"ExerciseDB cache read failed: {e}")
+            return None
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def _store(self, key, entry):
+        if not self._resolve_path():
+            return
+        try:
+            self._create()
+            with self._connect() as conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO cache_entries (key, value, fetched_at) VALUES (?, ?, ?)',
+                    (key, json.dumps(entry[0]), entry[1])
+                )
+        except sqlite3.Error as e:
+            print(f"ExerciseDB cache write failed: {e}")
+
+    # ==================== STALE-WHILE-REVALIDATE ====================
+
+    def get_or_fetch(self, key, fetch, ttl=None, serve_expired=True):
+        """
+        Return a cached value, refreshing it with fetch() as needed
+
+        - fresh entry: returned as is
+        - stale entry (within stale_ttl): returned immediately, refreshed in the background
+        - missing/expired entry: fetched synchronously (an expired entry is served if fetch fails)
+
+        Args:
+            key: Cache key (see make_key)
+            fetch: Callable returning the value; raises on failure
+            ttl: Freshness override for this key (default self.ttl)
+            serve_expired: False re-raises a failed fetch even when an expired entry exists
+        """
+        ttl = self.ttl if ttl is None else ttl
+        entry = self.get(key)
+        if entry is not None:
+            value, fetched_at = entry
+            age = time.time() - fetched_at
+            if age < ttl:
+                return value
+            if age < ttl + self.stale_ttl:
+                self._refresh_async(key, fetch)
+                return value
+
+        try:
+            value = fetch()
+        except Exception:
+            if entry is not None and serve_expired:
+                return entry[0]
+            raise
+
+        self.set(key, value)
+        return value
+
+    def _refresh_async(self, key, fetch):
+        """Start one background refresh per key"""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            thread = threading.Thread(target=self._refresh, args=(key, fetch), daemon=True)
+            self._refreshing[key] = thread
+        thread.start()
+
+    def _refresh(self, key, fetch):
+        try:
+            self.set(key, fetch())
+        except Exception as e:
+            print(f"ExerciseDB background refresh failed for {key}: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.pop(key, None)
+
+    def wait_for_refreshes(self, timeout=None):
+        """Block until in-flight background refreshes finish (tests / graceful shutdown)"""
+        with self._lock:
+            threads = list(self._refreshing.values())
+        for thread in threads:
+            thread.join(timeout)
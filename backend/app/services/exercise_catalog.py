@@ -0,0 +1,107 @@
+"""
+Exercise Catalog - Local-first exercise search over the exercises table
+The catalog is mirrored from ExerciseDB by exercisedb_service.sync_exercises_to_database,
+so GET /api/exercises no longer waits on RapidAPI.
+"""
+import re
+from sqlalchemy import and_, func, or_
+from app.models import Exercise
+
+
+class ExerciseCatalog:
+    """Indexed search and pagination over synced + custom exercises"""
+
+    MAX_LIMIT = 200
+
+    def search(self, search=None, body_part=None, target=None, equipment=None,
+               limit=50, offset=0, after_id=None, trainer_id=None):
+        """
+        Search the local catalog
+
+        - search: full-text prefix match on name (GIN index idx_exercises_name_search)
+        - body_part / target / equipment: exact match on indexed columns (can be combined)
+        - pagination: offset, or keyset with after_id (id of the last row of the previous page)
+
+        Args:
+            trainer_id: Include this trainer's custom exercises (None = ExerciseDB exercises only)
+
+        Returns:
+            tuple (list of Exercise, next_after_id or None)
+        """
+        limit = max(1, min(int(limit), self.MAX_LIMIT))
+
+        if trainer_id is not None:
+            query = Exercise.query.filter(or_(
+                Exercise.is_custom.isnot(True),
+                and_(Exercise.is_custom.is_(True), Exercise.trainer_id == trainer_id)
+            ))
+        else:
+            query = Exercise.query.filter(Exercise.is_custom.isnot(True))
+
+        tsquery = self._prefix_tsquery(search)
+        if search and not tsquery:
+            return [], None
+        if tsquery:
+            # Same expression as the GIN index so the planner can use it
+            query = query.filter(
+                func.to_tsvector('spanish', Exercise.name).op('@@')(func.to_tsquery('spanish', tsquery))
+            )
+        if body_part:
+            query = query.filter(Exercise.body_part == body_part)
+        if target:
+            query = query.filter(Exercise.target_muscle == target)
+        if equipment:
+            query = query.filter(Exercise.equipment == equipment)
+
+        query = query.order_by(Exercise.id)
+        if after_id is not None:
+            query = query.filter(Exercise.id > after_id)
+        elif offset:
+            query = query.offset(offset)
+
+        # One extra row tells whether there is a next page
+        rows = query.limit(limit + 1).all()
+        next_after_id = rows[limit - 1].id if len(rows) > limit else None
+        return rows[:limit], next_after_id
+
+    @staticmethod
+    def _prefix_tsquery(search):
+        """'sit up' -> 'sit:* & up:*' (every word, prefix match); None if no words"""
+        if not search:
+            return None
+        words = re.findall(r'\w+', search)
+        return ' & '.join(f'{word}:*' for word in words) or None
+
+    @staticmethod
+    def format_exercise(exercise):
+        """Format an exercise like ExerciseDBService._format_exercises (custom ones keep their DB id)"""
+        instructions = exercise.instructions.split('\n') if exercise.instructions else []
+
+        if exercise.is_custom:
+            return {
+                'id': exercise.id,
+                'externalId': exercise.external_id,
+                'name': exercise.name,
+                'bodyPart': exercise.body_part,
+                'equipment': exercise.equipment,
+                'target': exercise.target_muscle,
+                'gifUrl': exercise.gif_url,
+                'instructions': instructions,
+                'isCustom': True
+            }
+
+        return {
+            'id': f"exercisedb-{exercise.external_id}",
+            'externalId': exercise.external_id,
+            'name': exercise.name.title(),
+            'bodyPart': exercise.body_part or '',
+            'equipment': exercise.equipment or '',
+            'target': exercise.target_muscle or '',
+            'gifUrl': exercise.gif_url or '',
+            'instructions': instructions,
+            'isCustom': False
+        }
+
+
+# Singleton instance
+exercise_catalog = ExerciseCatalog()
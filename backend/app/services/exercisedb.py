@@ -3,130 +3,166 @@ ExerciseDB API Integration - F-012
 """
 import requests
 import os
-from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import List, Dict, Optional, Tuple
+from requests.adapters import HTTPAdapter
+from app.services.exercise_cache import ExerciseCache
 
 
 class ExerciseDBService:
     """Service for fetching exercises from ExerciseDB API"""
 
     BASE_URL = "https://exercisedb.p.rapidapi.com"
+    POOL_SIZE = 10
 
-    def __init__(self):
+    # Filter lists (body parts, targets, equipment) almost never change
+    FILTER_LISTS_TTL = int(os.getenv('EXERCISEDB_FILTERS_TTL', 604800))
+    FILTERS_DEADLINE = float(os.getenv('EXERCISEDB_FILTERS_DEADLINE', 3.0))
+
+    def __init__(self, base_url: Optional[str] = None, cache: Optional[ExerciseCache] = None):
         self.api_key = os.getenv('EXERCISEDB_API_KEY', '')
+        self.base_url = (base_url or os.getenv('EXERCISEDB_API_URL') or self.BASE_URL).rstrip('/')
         self.headers = {
             'X-RapidAPI-Key': self.api_key,
             'X-RapidAPI-Host': 'exercisedb.p.rapidapi.com'
         }
+        self.cache = cache if cache is not None else ExerciseCache.from_env()
 
-    def get_exercises(self, limit: int = 50, offset: int = 0) -> List[Dict]:
-        """Fetch exercises with pagination"""
-        try:
-            url = f"{self.BASE_URL}/exercises"
-            params = {'limit': limit, 'offset': offset}
+        # Shared keep-alive connection pool (also used by background cache refreshes)
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.POOL_SIZE)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
 
-            response = requests.get(url, headers=self.headers, params=params, timeout=10)
-            response.raise_for_status()
+        self._executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix='exercisedb')
 
-            exercises = response.json()
-            return self._format_exercises(exercises)
-        except Exception as e:
-            print(f"Error fetching exercises: {e}")
-            return []
+    def get_exercises(self, limit: int = 50, offset: int = 0) -> List[Dict]:
+        """Fetch exercises with pagination"""
+        return self._cached_get(
+            'exercises', {'limit': limit, 'offset': offset},
+            formatter=self._format_exercises, error_label="Error fetching exercises"
+        )
 
     def search_exercises(self, query: str, limit: int = 20) -> List[Dict]:
         """Search exercises by name"""
-        try:
-            url = f"{self.BASE_URL}/exercises/name/{query}"
-            params = {'limit': limit}
-
-            response = requests.get(url, headers=self.headers, params=params, timeout=10)
-
-            if response.status_code == 404:
-                return []
-
-            response.raise_for_status()
-            exercises = response.json()
-            return self._format_exercises(exercises)
-        except Exception as e:
-            print(f"Error searching exercises: {e}")
-            return []
+        return self._cached_get(
+            f"exercises/name/{query}", {'limit': limit},
+            formatter=self._format_exercises, not_found_empty=True,
+            error_label="Error searching exercises"
+        )
 
     def get_by_body_part(self, body_part: str, limit: int = 50) -> List[Dict]:
         """Get exercises by body part"""
-        try:
-            url = f"{self.BASE_URL}/exercises/bodyPart/{body_part}"
-            params = {'limit': limit}
-
-            response = requests.get(url, headers=self.headers, params=params, timeout=10)
-            response.raise_for_status()
-
-            exercises = response.json()
-            return self._format_exercises(exercises)
-        except Exception as e:
-            print(f"Error fetching exercises by body part: {e}")
-            return []
+        return self._cached_get(
+            f"exercises/bodyPart/{body_part}", {'limit': limit},
+            formatter=self._format_exercises, error_label="Error fetching exercises by body part"
+        )
 
     def get_by_target(self, target: str, limit: int = 50) -> List[Dict]:
         """Get exercises by target muscle"""
-        try:
-            url = f"{self.BASE_URL}/exercises/target/{target}"
-            params = {'limit': limit}
-
-            response = requests.get(url, headers=self.headers, params=params, timeout=10)
-            response.raise_for_status()
-
-            exercises = response.json()
-            return self._format_exercises(exercises)
-        except Exception as e:
-            print(f"Error fetching exercises by target: {e}")
-            return []
+        return self._cached_get(
+            f"exercises/target/{target}", {'limit': limit},
+            formatter=self._format_exercises, error_label="Error fetching exercises by target"
+        )
 
     def get_by_equipment(self, equipment: str, limit: int = 50) -> List[Dict]:
         """Get exercises by equipment"""
-        try:
-            url = f"{self.BASE_URL}/exercises/equipment/{equipment}"
-            params = {'limit': limit}
-
-            response = requests.get(url, headers=self.headers, params=params, timeout=10)
-            response.raise_for_status()
-
-            exercises = response.json()
-            return self._format_exercises(exercises)
-        except Exception as e:
-            print(f"Error fetching exercises by equipment: {e}")
-            return []
+        return self._cached_get(
+            f"exercises/equipment/{equipment}", {'limit': limit},
+            formatter=self._format_exercises, error_label="Error fetching exercises by equipment"
+        )
 
     def get_body_parts(self) -> List[str]:
         """Get list of available body parts"""
-        try:
-            url = f"{self.BASE_URL}/exercises/bodyPartList"
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            print(f"Error fetching body parts: {e}")
-            return []
+        return self._cached_get(
+            "exercises/bodyPartList", ttl=self.FILTER_LISTS_TTL, error_label="Error fetching body parts"
+        )
 
     def get_target_muscles(self) -> List[str]:
         """Get list of available target muscles"""
-        try:
-            url = f"{self.BASE_URL}/exercises/targetList"
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            print(f"Error fetching target muscles: {e}")
-            return []
+        return self._cached_get(
+            "exercises/targetList", ttl=self.FILTER_LISTS_TTL, error_label="Error fetching target muscles"
+        )
 
     def get_equipment_list(self) -> List[str]:
         """Get list of available equipment"""
+        return self._cached_get(
+            "exercises/equipmentList", ttl=self.FILTER_LISTS_TTL, error_label="Error fetching equipment list"
+        )
+
+    def get_filters(self, deadline: Optional[float] = None) -> Tuple[Dict[str, List[str]], List[str]]:
+        """
+        Fetch the three filter lists concurrently
+
+        Lists that failed or were not ready within the deadline fall back to any cached
+        value (even expired) or []; a slow fetch keeps running and fills the cache for
+        later calls.
+
+        Args:
+            deadline: Overall time budget in seconds (default FILTERS_DEADLINE)
+
+        Returns:
+            tuple (filters dict with bodyParts/targets/equipment, list of keys that fell back)
+        """
+        sources = {
+            'bodyParts': ("exercises/bodyPartList", "Error fetching body parts"),
+            'targets': ("exercises/targetList", "Error fetching target muscles"),
+            'equipment': ("exercises/equipmentList", "Error fetching equipment list"),
+        }
+        # Failed fetches raise here instead of returning [], so they fall back like timeouts
+        futures = {
+            name: self._executor.submit(
+                self._cached_get, path, ttl=self.FILTER_LISTS_TTL, error_label=label, raise_errors=True
+            )
+            for name, (path, label) in sources.items()
+        }
+        wait(futures.values(), timeout=self.FILTERS_DEADLINE if deadline is None else deadline)
+
+        filters = {}
+        missing = []
+        for name, future in futures.items():
+            if future.done() and future.exception() is None:
+                filters[name] = future.result()
+            else:
+                entry = self.cache.get(self.cache.make_key(sources[name][0]))
+                filters[name] = entry[0] if entry else []
+                missing.append(name)
+
+        return filters, missing
+
+    def _fetch(self, path: str, params: Optional[Dict] = None, not_found_empty: bool = False):
+        """Call the API (raises on network/HTTP errors)"""
+        url = f"{self.base_url}/{path}"
+        response = self.session.get(url, params=params, timeout=10)
+
+        if not_found_empty and response.status_code == 404:
+            return []
+
+        response.raise_for_status()
+        return response.json()
+
+    def _cached_get(self, path: str, params: Optional[Dict] = None, formatter=None, ttl: Optional[int] = None,
+                    not_found_empty: bool = False, error_label: str = "Error calling ExerciseDB",
+                    raise_errors: bool = False):
+        """
+        Fetch through the cache (fresh hit, stale hit + background refresh, or API call)
+
+        Failed calls are not cached; they return [] like before (or an expired entry), or
+        re-raise with raise_errors so the caller can fall back and report it.
+        """
+        def fetch():
+            data = self._fetch(path, params, not_found_empty)
+            return formatter(data) if formatter else data
+
         try:
-            url = f"{self.BASE_URL}/exercises/equipmentList"
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            return response.json()
+            return self.cache.get_or_fetch(
+                self.cache.make_key(path, params), fetch, ttl=ttl, serve_expired=not raise_errors
+            )
         except Exception as e:
-            print(f"Error fetching equipment list: {e}")
+            print(f"{error_label}: {e}")
+            if raise_errors:
+                raise
             return []
 
     def _format_exercises(self, exercises: List[Dict]) -> List[Dict]:
@@ -2,18 +2,29 @@
 ExerciseDB Service - Integration with ExerciseDB API
 F-012: Integración ExerciseDB API + Cache
 """
-import requests
+import hashlib
+import json
 import os
+import time
+import requests
+from sqlalchemy.dialects.postgresql import insert
 from app import db
 from app.models import Exercise
 from datetime import datetime
 
+# Columns owned by the ExerciseDB sync (compared by content hash, written by the upsert)
+SYNC_COLUMNS = (
+    'external_id', 'name', 'body_part', 'equipment', 'gif_url',
+    'target_muscle', 'secondary_muscles', 'instructions', 'is_custom'
+)
+SYNC_BATCH_SIZE = 500
+
 
 class ExerciseDBService:
     """Service to interact with ExerciseDB API (RapidAPI)"""
 
-    def __init__(self):
-        self.api_url = os.getenv('EXERCISEDB_API_URL', 'https://exercisedb.p.rapidapi.com')
+    def __init__(self, api_url=None):
+        self.api_url = api_url or os.getenv('EXERCISEDB_API_URL', 'https://exercisedb.p.rapidapi.com')
         self.api_key = os.getenv('EXERCISEDB_API_KEY', '')
         self.headers = {
             'X-RapidAPI-Key': self.api_key,
@@ -60,76 +71,109 @@ class ExerciseDBService:
     def sync_exercises_to_database(self, limit=None):
         """
         Fetch exercises from API and sync to local database
+
+        Bulk pipeline: one query loads the existing catalog, rows whose content
+        hash is unchanged are skipped, and inserts/updates are written with
+        batched multi-row INSERT ... ON CONFLICT (external_id) DO UPDATE.
+
         Args:
             limit: Optional limit on number of exercises to sync (for testing)
         Returns:
-            dict with sync statistics
+            dict with sync statistics and fetch/diff/write timings (seconds)
         """
+        timings = {}
         try:
+            started = time.perf_counter()
             exercises_data = self.fetch_all_exercises()
-
             if limit:
                 exercises_data = exercises_data[:limit]
+            timings['fetch'] = time.perf_counter() - started
+
+            # Diff - existing content hashes in one query
+            started = time.perf_counter()
+            existing = {
+                row.external_id: self._content_hash(row._mapping)
+                for row in db.session.query(*(Exercise.__table__.c[name] for name in SYNC_COLUMNS)).filter(
+                    Exercise.external_id.isnot(None)
+                )
+            }
 
-            synced_count = 0
-            updated_count = 0
+            rows = {}
             error_count = 0
-
             for ex_data in exercises_data:
                 try:
-                    # Check if exercise already exists
-                    existing = Exercise.query.filter_by(external_id=ex_data['id']).first()
-
-                    if existing:
-                        # Update existing exercise
-                        existing.name = ex_data.get('name', existing.name)
-                        existing.body_part = ex_data.get('bodyPart', existing.body_part)
-                        existing.equipment = ex_data.get('equipment', existing.equipment)
-                        existing.gif_url = ex_data.get('gifUrl', existing.gif_url)
-                        existing.target_muscle = ex_data.get('target', existing.target_muscle)
-                        existing.secondary_muscles = ex_data.get('secondaryMuscles', [])
-                        existing.instructions = ', '.join(ex_data.get('instructions', []))
-                        existing.updated_at = datetime.utcnow()
-                        updated_count += 1
-                    else:
-                        # Create new exercise
-                        exercise = Exercise(
-                            external_id=ex_data['id'],
-                            name=ex_data['name'],
-                            body_part=ex_data.get('bodyPart'),
-                            equipment=ex_data.get('equipment'),
-                            gif_url=ex_data.get('gifUrl'),
-                            target_muscle=ex_data.get('target'),
-                            secondary_muscles=ex_data.get('secondaryMuscles', []),
-                            instructions=', '.join(ex_data.get('instructions', [])) if ex_data.get('instructions') else None,
-                            is_custom=False
-                        )
-                        db.session.add(exercise)
-                        synced_count += 1
-
-                    # Commit every 100 exercises to avoid memory issues
-                    if (synced_count + updated_count) % 100 == 0:
-                        db.session.commit()
-
-                except Exception as e:
+                    row = self._row_from_api(ex_data)
+                    rows[row['external_id']] = row  # last one wins on duplicated IDs
+                except (KeyError, TypeError) as e:
                     error_count += 1
                     print(f"Error syncing exercise {ex_data.get('id', 'unknown')}: {str(e)}")
 
-            # Final commit
+            new_rows = [row for external_id, row in rows.items() if external_id not in existing]
+            changed_rows = [
+                row for external_id, row in rows.items()
+                if external_id in existing and existing[external_id] != self._content_hash(row)
+            ]
+            timings['diff'] = time.perf_counter() - started
+
+            # Write - batched multi-row upserts in one transaction
+            started = time.perf_counter()
+            self._bulk_upsert(new_rows + changed_rows)
             db.session.commit()
+            timings['write'] = time.perf_counter() - started
 
             return {
                 'success': True,
-                'synced': synced_count,
-                'updated': updated_count,
+                'synced': len(new_rows),
+                'updated': len(changed_rows),
+                'unchanged': len(rows) - len(new_rows) - len(changed_rows),
                 'errors': error_count,
-                'total': synced_count + updated_count
+                'total': len(new_rows) + len(changed_rows),
+                'timings': {step: round(seconds, 3) for step, seconds in timings.items()}
             }
 
         except Exception as e:
             db.session.rollback()
             raise Exception(f"Failed to sync exercises: {str(e)}")
 
+    def _bulk_upsert(self, rows):
+        """INSERT ... ON CONFLICT (external_id) DO UPDATE, SYNC_BATCH_SIZE rows per statement"""
+        table = Exercise.__table__
+        now = datetime.utcnow()
+
+        for start in range(0, len(rows), SYNC_BATCH_SIZE):
+            batch = [dict(row, created_at=now, updated_at=now) for row in rows[start:start + SYNC_BATCH_SIZE]]
+            statement = insert(table).values(batch)
+            statement = statement.on_conflict_do_update(
+                index_elements=[table.c.external_id],
+                set_={
+                    **{name: statement.excluded[name] for name in SYNC_COLUMNS if name != 'external_id'},
+                    'updated_at': statement.excluded.updated_at
+                }
+            )
+            db.session.execute(statement)
+
+    @staticmethod
+    def _row_from_api(ex_data):
+        """Map an ExerciseDB payload to exercises table columns"""
+        instructions = ex_data.get('instructions') or []
+        return {
+            'external_id': str(ex_data['id']),
+            'name': ex_data['name'],
+            'body_part': ex_data.get('bodyPart'),
+            'equipment': ex_data.get('equipment'),
+            'gif_url': ex_data.get('gifUrl'),
+            'target_muscle': ex_data.get('target'),
+            'secondary_muscles': list(ex_data.get('secondaryMuscles') or []),
+            'instructions': '\n'.join(instructions) if instructions else None,
+            'is_custom': False
+        }
+
+    @staticmethod
+    def _content_hash(row):
+        """Stable hash of the synced columns (API row dict or DB row mapping)"""
+        values = [row[name] for name in SYNC_COLUMNS]
+        return hashlib.sha1(json.dumps(values, default=list).encode()).hexdigest()
+
     def get_body_parts(self):
         """Get list of available body parts"""
         return self._make_request('exercises/bodyPartList')
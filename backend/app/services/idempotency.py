@@ -0,0 +1,168 @@
+"""
+Idempotency Service - Retry-safe POST endpoints with client-supplied Idempotency-Key headers
+
+The key is claimed with one INSERT ... ON CONFLICT on the (user_type, user_id, key)
+unique index inside the request's own transaction, so it commits (or rolls back)
+together with the writes it protects. A retry with the same key replays the stored
+response without running the endpoint again; keys expire after IDEMPOTENCY_KEY_TTL.
+"""
+import hashlib
+import os
+from datetime import datetime, timedelta
+from functools import wraps
+from flask import request, jsonify, make_response
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity, get_jwt
+from sqlalchemy import delete, update
+from sqlalchemy.dialects.postgresql import insert
+from app import db
+from app.models import IdempotencyKey
+
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyService:
+    """Claims keys, stores responses and replays them for duplicate requests"""
+
+    TTL_SECONDS = int(os.getenv('IDEMPOTENCY_KEY_TTL', 86400))
+    PURGE_EVERY = 500  # claims per process between expired-key purges
+
+    def __init__(self):
+        self._claims = 0
+
+    def claim(self, user_type, user_id, key, endpoint, request_hash):
+        """
+        Claim a key for a new request (pending in the current transaction)
+
+        Expired rows for the same key are taken over in the same statement.
+
+        Returns:
+            tuple (claimed record ID or None, existing IdempotencyKey or None)
+        """
+        now = datetime.utcnow()
+        table = IdempotencyKey.__table__
+        values = {
+            'user_type': user_type,
+            'user_id': user_id,
+            'key': key,
+            'endpoint': endpoint,
+            'request_hash': request_hash,
+            'status_code': None,
+            'response_body': None,
+            'created_at': now,
+        }
+        stmt = insert(table).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            constraint='uq_idempotency_keys_scope_key',
+            set_={name: stmt.excluded[name] for name in values if name not in ('user_type', 'user_id', 'key')},
+            where=table.c.created_at < now - timedelta(seconds=self.TTL_SECONDS)
+        ).returning(table.c.id)
+
+        record_id = db.session.execute(stmt).scalar()
+        if record_id is not None:
+            self._maybe_purge(now)
+            return record_id, None
+
+        existing = IdempotencyKey.query.filter_by(user_type=user_type, user_id=user_id, key=key).first()
+        return None, existing
+
+    def store_response(self, record_id, response):
+        """Save the response of a successful request (after the endpoint committed)"""
+        db.session.execute(
+            update(IdempotencyKey.__table__)
+            .where(IdempotencyKey.__table__.c.id == record_id)
+            .values(status_code=response.status_code, response_body=response.get_data(as_text=True))
+        )
+        db.session.commit()
+
+    def release(self, record_id):
+        """Forget a claim whose request failed, so the client can retry with the same key"""
+        db.session.rollback()
+        db.session.execute(delete(IdempotencyKey.__table__).where(IdempotencyKey.__table__.c.id == record_id))
+        db.session.commit()
+
+    def purge_expired(self, now=None):
+        """Delete expired keys (created_at index); returns the number of rows removed"""
+        cutoff = (now or datetime.utcnow()) - timedelta(seconds=self.TTL_SECONDS)
+        result = db.session.execute(
+            delete(IdempotencyKey.__table__).where(IdempotencyKey.__table__.c.created_at < cutoff)
+        )
+        return result.rowcount
+
+    def _maybe_purge(self, now):
+        self._claims += 1
+        if self._claims % self.PURGE_EVERY == 0:
+            self.purge_expired(now)
+
+
+# Singleton instance
+idempotency_service = IdempotencyService()
+
+
+def _current_scope():
+    """(user_type, user_id) of the caller - JWT identity when present"""
+    verify_jwt_in_request(optional=True)
+    user_id = get_jwt_identity()
+    if user_id is None:
+        return 'anonymous', 0
+    return get_jwt().get('type', 'client'), user_id
+
+
+def idempotent(view):
+    """
+    Make a POST endpoint retry-safe when the client sends an Idempotency-Key header
+
+    - new key: the endpoint runs; 2xx responses are stored with the key
+    - same key + same body: the stored response is replayed (Idempotent-Replayed: true)
+    - same key + different body or endpoint: 422
+    - same key while the first request is still running: 409
+    Requests without the header behave as before.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return view(*args, **kwargs)
+
+        if len(key) > MAX_KEY_LENGTH:
+            return jsonify({
+                'success': False,
+                'error': f'{HEADER} must be at most {MAX_KEY_LENGTH} characters'
+            }), 400
+
+        user_type, user_id = _current_scope()
+        request_hash = hashlib.sha256(request.get_data()).hexdigest()
+        record_id, existing = idempotency_service.claim(user_type, user_id, key, request.endpoint, request_hash)
+
+        if record_id is None:
+            if existing is not None and (
+                existing.endpoint != request.endpoint or existing.request_hash != request_hash
+            ):
+                return jsonify({
+                    'success': False,
+                    'error': f'{HEADER} was already used for a different request'
+                }), 422
+            if existing is None or existing.status_code is None:
+                return jsonify({
+                    'success': False,
+                    'error': 'A request with this Idempotency-Key is still being processed'
+                }), 409
+
+            replay = make_response(existing.response_body, existing.status_code)
+            replay.mimetype = 'application/json'
+            replay.headers['Idempotent-Replayed'] = 'true'
+            return replay
+
+        try:
+            response = make_response(view(*args, **kwargs))
+        except Exception:
+            idempotency_service.release(record_id)
+            raise
+
+        if response.status_code < 400:
+            idempotency_service.store_response(record_id, response)
+        else:
+            idempotency_service.release(record_id)
+        return response
+
+    return wrapper
@@ -0,0 +1,154 @@
+"""
+Identity Index - Unified email lookup over trainers and clients
+
+user_identities holds one row per trainer and per client. Login, registration and
+client creation resolve an email with a single probe on its (email, user_type)
+index, with the user row joined into the same query, instead of querying the
+trainers and clients tables separately. Rows are written by ORM events in the same
+flush as the user and removed by the foreign key cascades; rebuild() backfills
+users loaded outside the ORM (bulk COPY, SQL migrations).
+"""
+from sqlalchemy import event, func, insert, literal, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import attributes, joinedload
+from app import db
+from app.models import Client, Trainer, UserIdentity
+
+USER_TYPES = {
+    'trainer': (Trainer, 'trainer_id'),
+    'client': (Client, 'client_id'),
+}
+
+
+def normalize_email(email):
+    return email.lower().strip()
+
+
+class IdentityCollisionError(ValueError):
+    """Users of one type whose emails only differ in case / surrounding spaces"""
+
+    def __init__(self, collisions):
+        self.collisions = collisions
+        details = '; '.join(
+            f'{user_type} {email}: ids {", ".join(map(str, ids))}'
+            for user_type, emails in collisions.items() for email, ids in emails.items()
+        )
+        super().__init__(f'Emails collide once normalized, resolve them before indexing: {details}')
+
+
+class IdentityIndex:
+    """Lookups and write-time maintenance of user_identities"""
+
+    def find(self, email, user_type):
+        """
+        The trainer or client registered with an email (None if there is none)
+
+        Args:
+            email: Email address (normalized here)
+            user_type: 'trainer' or 'client'
+        """
+        identity = self._query(email).filter(UserIdentity.user_type == user_type).first()
+        return identity.user if identity else None
+
+    def find_many(self, emails, user_type):
+        """
+        Users of one type registered with any of the emails, in one query
+
+        Returns:
+            dict {normalized email: Trainer | Client}
+        """
+        emails = {normalize_email(email) for email in emails}
+        if not emails:
+            return {}
+        identities = UserIdentity.query.options(
+            joinedload(UserIdentity.trainer), joinedload(UserIdentity.client)
+        ).filter(UserIdentity.email.in_(emails), UserIdentity.user_type == user_type).all()
+        return {identity.email: identity.user for identity in identities}
+
+    def add_many(self, user_type, users):
+        """Index users inserted in bulk (ORM events do not fire for bulk inserts)"""
+        if not users:
+            return
+        column = USER_TYPES[user_type][1]
+        db.session.execute(insert(UserIdentity.__table__), [
+            {'email': normalize_email(user.email), 'user_type': user_type, column: user.id} for user in users
+        ])
+
+    def _query(self, email):
+        return UserIdentity.query.options(
+            joinedload(UserIdentity.trainer), joinedload(UserIdentity.client)
+        ).filter(UserIdentity.email == normalize_email(email))
+
+    def collisions(self):
+        """
+        Users of the same type whose emails are equal once normalized (A@x.com and a@x.com)
+
+        Only one of them could be indexed, so the others could no longer log in.
+
+        Returns:
+            dict {user_type: {normalized email: [user IDs]}} (empty when there are none)
+        """
+        collisions = {}
+        for user_type, (model, _) in USER_TYPES.items():
+            users = model.__table__
+            email = func.lower(func.trim(users.c.email))
+            rows = db.session.execute(
+                select(email, func.array_agg(users.c.id)).group_by(email).having(func.count() > 1).order_by(email)
+            ).all()
+            if rows:
+                collisions[user_type] = {email: sorted(ids) for email, ids in rows}
+        return collisions
+
+    def rebuild(self):
+        """
+        Insert the identities missing for existing trainers / clients
+
+        Returns:
+            int: Number of identities written
+
+        Raises:
+            IdentityCollisionError: some emails collide once normalized (nothing is written)
+        """
+        collisions = self.collisions()
+        if collisions:
+            raise IdentityCollisionError(collisions)
+
+        written = 0
+        for user_type, (model, column) in USER_TYPES.items():
+            users = model.__table__
+            rows = select(func.lower(func.trim(users.c.email)), literal(user_type), users.c.id)
+            statement = pg_insert(UserIdentity.__table__).from_select(['email', 'user_type', column], rows)
+            written += db.session.execute(statement.on_conflict_do_nothing()).rowcount
+        return written
+
+    # ==================== ORM EVENTS ====================
+
+    def register_events(self):
+        """Keep user_identities in step with inserts and email changes of trainers / clients"""
+        for user_type, (model, column) in USER_TYPES.items():
+            event.listen(model, 'after_insert', self._make_insert_listener(user_type, column))
+            event.listen(model, 'after_update', self._make_update_listener(column))
+
+    @staticmethod
+    def _make_insert_listener(user_type, column):
+        def after_insert(mapper, connection, target):
+            connection.execute(insert(UserIdentity.__table__).values(
+                email=normalize_email(target.email), user_type=user_type, **{column: target.id}
+            ))
+        return after_insert
+
+    @staticmethod
+    def _make_update_listener(column):
+        def after_update(mapper, connection, target):
+            if not attributes.get_history(target, 'email').has_changes():
+                return
+            table = UserIdentity.__table__
+            connection.execute(
+                update(table).where(table.c[column] == target.id).values(email=normalize_email(target.email))
+            )
+        return after_update
+
+
+# Singleton instance
+identity_index = IdentityIndex()
+identity_index.register_events()
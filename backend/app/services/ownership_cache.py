@@ -0,0 +1,135 @@
+"""
+Ownership Cache - Per-trainer sets of owned client IDs for authorization checks
+
+Guarded routes used to load a Client row just to compare trainer_id. The IDs a
+trainer owns are now loaded once per kind into an in-process set (kept for
+OWNERSHIP_CACHE_TTL seconds, at most OWNERSHIP_CACHE_MAX_TRAINERS trainers), so a
+check is a membership test. ORM events add created rows to the sets and remove
+deleted ones. An ID missing from the set falls back to a point query, which covers
+rows created by another worker process. A row deleted by another process stays in
+that process's set until the TTL expires. This is harmless because IDs come from
+sequences and are never reused, so the route still answers 404 when it loads the row.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import event, select
+from app import db
+from app.models import Client, Trainer
+
+# Workout routes load the workout row anyway (filtered by trainer_id), so only
+# clients - checked before loading other resources - are cached
+KINDS = {
+    'clients': Client,
+}
+
+
+class OwnershipCache:
+    """trainer_id -> {kind: set of owned IDs}, with TTL, LRU bound and DB fallback"""
+
+    def __init__(self):
+        self.ttl = float(os.getenv('OWNERSHIP_CACHE_TTL', 60))
+        self.max_trainers = int(os.getenv('OWNERSHIP_CACHE_MAX_TRAINERS', 1000))
+        self._entries = OrderedDict()  # (trainer_id, kind) -> (loaded_at, set of IDs)
+        self._lock = threading.Lock()
+
+    def owns_client(self, trainer_id, client_id):
+        """True if the client belongs to the trainer"""
+        return self.owns('clients', trainer_id, client_id)
+
+    def owns(self, kind, trainer_id, resource_id):
+        """
+        Membership test against the trainer's cached set, with a point query on a miss
+
+        Args:
+            kind: Key of KINDS ('clients')
+            trainer_id: Trainer ID (JWT identity)
+            resource_id: ID to check (non-integer IDs are never owned)
+
+        Returns:
+            bool
+        """
+        try:
+            resource_id = int(resource_id)
+        except (TypeError, ValueError):
+            return False
+
+        ids, fresh = self._ids(kind, trainer_id)
+        if resource_id in ids:
+            return True
+        if fresh:
+            return False
+
+        # Created after the set was loaded (possibly by another process)
+        model = KINDS[kind]
+        owned = db.session.execute(
+            select(model.id).where(model.id == resource_id, model.trainer_id == trainer_id)
+        ).first() is not None
+        if owned:
+            self._add(kind, trainer_id, resource_id)
+        return owned
+
+    def _ids(self, kind, trainer_id):
+        """(owned IDs, True if they were just loaded from the database)"""
+        key = (trainer_id, kind)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and time.monotonic() - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                return entry[1], False
+
+        model = KINDS[kind]
+        ids = set(db.session.execute(select(model.id).where(model.trainer_id == trainer_id)).scalars())
+        with self._lock:
+            self._entries[key] = (time.monotonic(), ids)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_trainers * len(KINDS):
+                self._entries.popitem(last=False)
+        return ids, True
+
+    def add_many(self, kind, trainer_id, resource_ids):
+        """Record rows created in bulk (ORM events do not fire for bulk inserts)"""
+        for resource_id in resource_ids:
+            self._add(kind, trainer_id, resource_id)
+
+    def _add(self, kind, trainer_id, resource_id):
+        with self._lock:
+            entry = self._entries.get((trainer_id, kind))
+            if entry:
+                entry[1].add(resource_id)
+
+    def _discard(self, kind, trainer_id, resource_id):
+        with self._lock:
+            entry = self._entries.get((trainer_id, kind))
+            if entry:
+                entry[1].discard(resource_id)
+
+    def invalidate(self, trainer_id=None):
+        """Drop the cached sets of one trainer (None = everyone)"""
+        with self._lock:
+            if trainer_id is None:
+                self._entries.clear()
+                return
+            for kind in KINDS:
+                self._entries.pop((trainer_id, kind), None)
+
+    # ==================== ORM EVENTS ====================
+
+    def register_events(self):
+        """Keep cached sets in step with creates / deletes of clients"""
+        for kind, model in KINDS.items():
+            event.listen(model, 'after_insert', self._make_listener(self._add, kind))
+            event.listen(model, 'after_delete', self._make_listener(self._discard, kind))
+        event.listen(Trainer, 'after_delete', lambda mapper, connection, target: self.invalidate(target.id))
+
+    @staticmethod
+    def _make_listener(apply, kind):
+        def listener(mapper, connection, target):
+            apply(kind, target.trainer_id, target.id)
+        return listener
+
+
+# Singleton instance
+ownership_cache = OwnershipCache()
+ownership_cache.register_events()
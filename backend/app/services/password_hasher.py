@@ -0,0 +1,164 @@
+"""
+Password Hasher - bcrypt hashing and verification on a bounded worker pool
+
+bcrypt is slow on purpose (~250ms at cost 12). Calls are handed to a small
+thread pool instead of running inline: bcrypt releases the GIL, so the other
+threads of a gthread worker keep serving requests, and at most
+PASSWORD_HASH_WORKERS hashes burn CPU at once per process. When more than
+PASSWORD_HASH_MAX_QUEUE calls are already waiting, new ones fail fast with
+HasherBusy (the routes answer 503) instead of stalling the worker.
+
+The cost factor is PASSWORD_HASH_ROUNDS (pick it with calibrate_bcrypt.py);
+hashes stored with another cost are rehashed on the next successful login.
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+import bcrypt
+
+logger = logging.getLogger(__name__)
+
+
+class HasherBusy(Exception):
+    """The hashing queue is full (or the call timed out waiting) - retry later"""
+
+
+class PasswordHasher:
+    """bcrypt on a bounded thread pool, with queue-depth metrics"""
+
+    def __init__(self):
+        self.rounds = int(os.getenv('PASSWORD_HASH_ROUNDS', 12))
+        self.workers = int(os.getenv('PASSWORD_HASH_WORKERS', 2))
+        self.max_queue = int(os.getenv('PASSWORD_HASH_MAX_QUEUE', 32))
+        self.timeout = float(os.getenv('PASSWORD_HASH_TIMEOUT', 10))
+
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self._pending = 0  # submitted and not finished (queued + running)
+        self._running = 0
+        self._counters = {'completed': 0, 'rejected': 0, 'timed_out': 0, 'max_queue_depth': 0,
+                          'wait_seconds': 0.0, 'run_seconds': 0.0}
+
+    # ==================== PASSWORDS ====================
+
+    def hash(self, password):
+        """Hash a password with the configured cost factor"""
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        return self._run(bcrypt.hashpw, password.encode('utf-8'), salt).decode('utf-8')
+
+    def verify(self, password, password_hash):
+        """Check a password against a stored hash (False when there is no hash)"""
+        if not password_hash:
+            return False
+        return self._run(bcrypt.checkpw, password.encode('utf-8'), password_hash.encode('utf-8'))
+
+    def needs_rehash(self, password_hash):
+        """True if the hash was made with a cost factor other than PASSWORD_HASH_ROUNDS"""
+        try:
+            return int(password_hash.split('$')[2]) != self.rounds
+        except (AttributeError, IndexError, ValueError):
+            return False
+
+    # ==================== POOL ====================
+
+    def _pool(self):
+        # Created lazily and per process: gunicorn forks after the app is imported
+        if self._executor is None or self._pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='bcrypt')
+            self._pid = os.getpid()
+        return self._executor
+
+    def _run(self, fn, *args):
+        with self._lock:
+            queued = self._pending - self._running
+            if queued >= self.max_queue:
+                self._counters['rejected'] += 1
+                logger.warning(f'Password hashing queue full ({queued} waiting) - rejecting')
+                raise HasherBusy('Password hashing queue is full')
+            self._pending += 1
+            self._counters['max_queue_depth'] = max(self._counters['max_queue_depth'], queued + 1)
+            executor = self._pool()
+
+        submitted = time.perf_counter()
+        future = executor.submit(self._task, fn, args, submitted)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            # Drop it if still queued, so no worker hashes for a caller that gave up
+            cancelled = future.cancel()
+            with self._lock:
+                self._counters['timed_out'] += 1
+                if cancelled:
+                    self._pending -= 1  # _task never runs to count it as finished
+            raise HasherBusy(f'Password hashing took longer than {self.timeout:g}s')
+
+    def _task(self, fn, args, submitted):
+        started = time.perf_counter()
+        with self._lock:
+            self._running += 1
+        try:
+            return fn(*args)
+        finally:
+            finished = time.perf_counter()
+            with self._lock:
+                self._running -= 1
+                self._pending -= 1
+                self._counters['completed'] += 1
+                self._counters['wait_seconds'] += started - submitted
+                self._counters['run_seconds'] += finished - started
+
+    def stats(self):
+        """Pool configuration, current queue depth and totals since the process started"""
+        with self._lock:
+            counters = dict(self._counters)
+            running, queued = self._running, self._pending - self._running
+        completed = counters['completed'] or 1
+        return {
+            'rounds': self.rounds,
+            'workers': self.workers,
+            'max_queue': self.max_queue,
+            'running': running,
+            'queue_depth': queued,
+            'max_queue_depth': counters['max_queue_depth'],
+            'completed': counters['completed'],
+            'rejected': counters['rejected'],
+            'timed_out': counters['timed_out'],
+            'avg_wait_ms': round(counters['wait_seconds'] * 1000 / completed, 2),
+            'avg_run_ms': round(counters['run_seconds'] * 1000 / completed, 2),
+        }
+
+    # ==================== CALIBRATION ====================
+
+    def calibrate(self, target_ms, min_rounds=10, max_rounds=16, samples=3):
+        """
+        Highest cost factor whose median hash time stays within target_ms on this host
+
+        Args:
+            target_ms: Latency budget for one hash
+            min_rounds: Lowest cost considered (returned even if it is over the target)
+            max_rounds: Highest cost considered
+            samples: Hashes timed per cost factor
+
+        Returns:
+            tuple (rounds, {rounds: median ms}) - stops timing once a cost exceeds the target
+        """
+        timings = {}
+        chosen = min_rounds
+        for rounds in range(min_rounds, max_rounds + 1):
+            durations = []
+            for _ in range(samples):
+                started = time.perf_counter()
+                bcrypt.hashpw(b'calibration-password', bcrypt.gensalt(rounds=rounds))
+                durations.append((time.perf_counter() - started) * 1000)
+            timings[rounds] = sorted(durations)[len(durations) // 2]
+            if timings[rounds] > target_ms:
+                break
+            chosen = rounds
+        return chosen, timings
+
+
+# Singleton instance
+password_hasher = PasswordHasher()
@@ -0,0 +1,86 @@
+"""
+Program Metrics - Batched program progress for workout assignments
+
+A session is a distinct day with at least one logged set for the assignment
+(WorkoutLog rows are individual sets and carry no status). Completed sessions for
+a whole list of assignments come from one grouped query over workout_logs.
+"""
+from datetime import datetime
+from sqlalchemy import func, cast
+from app import db
+from app.models import WorkoutLog
+
+
+class ProgramMetricsCalculator:
+    """Per-request calculator for completed sessions, adherence and time progress"""
+
+    def __init__(self, now=None):
+        self.now = now or datetime.utcnow()
+        self._completed_sessions = {}
+
+    def load(self, assignments):
+        """
+        Count completed sessions for every assignment not loaded yet (one grouped query)
+
+        Args:
+            assignments: List of WorkoutAssignment instances
+
+        Returns:
+            self (chainable)
+        """
+        missing = [a.id for a in assignments if a.id is not None and a.id not in self._completed_sessions]
+        if not missing:
+            return self
+
+        rows = db.session.query(
+            WorkoutLog.assignment_id,
+            func.count(func.distinct(cast(WorkoutLog.logged_at, db.Date)))
+        ).filter(
+            WorkoutLog.assignment_id.in_(missing)
+        ).group_by(WorkoutLog.assignment_id).all()
+
+        self._completed_sessions.update(dict.fromkeys(missing, 0))
+        self._completed_sessions.update({assignment_id: count for assignment_id, count in rows})
+        return self
+
+    def for_assignment(self, assignment):
+        """
+        Metrics for one assignment (loads it on demand if needed)
+
+        Returns:
+            dict with completed_sessions, adherence_percentage, time_progress_percentage
+        """
+        if assignment.id not in self._completed_sessions:
+            self.load([assignment])
+
+        completed_sessions = self._completed_sessions.get(assignment.id, 0)
+        return {
+            'completed_sessions': completed_sessions,
+            'adherence_percentage': self.adherence_percentage(assignment.expected_sessions, completed_sessions),
+            'time_progress_percentage': self.time_progress_percentage(assignment.start_date, assignment.end_date),
+        }
+
+    @staticmethod
+    def adherence_percentage(expected_sessions, completed_sessions):
+        """Program adherence (completed_sessions / expected_sessions × 100)"""
+        if not expected_sessions:
+            return None
+
+        if completed_sessions == 0:
+            return 0.0
+
+        return round((completed_sessions / expected_sessions) * 100, 1)
+
+    def time_progress_percentage(self, start_date, end_date):
+        """Time progress (elapsed_days / total_days × 100), clamped to 0-100"""
+        if not start_date or not end_date:
+            return None
+
+        total_days = (end_date - start_date).days
+        elapsed_days = (self.now - start_date).days
+
+        if total_days == 0:
+            return 0.0
+
+        progress = (elapsed_days / total_days) * 100
+        return round(min(max(progress, 0), 100), 1)
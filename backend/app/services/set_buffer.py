@@ -0,0 +1,267 @@
+"""
+Set Buffer - Write-behind journal for sets logged during a live session
+
+With SET_BUFFER_ENABLED, POST /api/workout-logs/sets appends the set to a local
+SQLite journal (fsynced, shared by the gunicorn workers of one host) instead of
+committing a PostgreSQL transaction per set. Buffered sets are moved into
+workout_logs with the same multi-row INSERT when the workout is completed (status
+change, POST /api/workout-logs or /batch - see take()), or once the
+oldest buffered set of an assignment is SET_BUFFER_FLUSH_AFTER seconds old
+(flush_set_buffer.py, or opportunistically from later requests). Reads merge the
+buffered sets in, so clients see them before they are flushed.
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import select
+from app import db
+from app.models import WorkoutAssignment, WorkoutLog
+from app.services.activity_rollup import activity_rollup
+from app.services.workout_log_writer import workout_log_writer
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ('assignment_id', 'workout_exercise_id', 'set_number', 'reps_completed',
+           'weight_used', 'rpe', 'notes', 'logged_at')
+
+
+class SetBuffer:
+    """Durable per-host journal of unflushed workout_logs rows"""
+
+    FLUSH_CHECK_EVERY = 200  # appends per process between sweeps for expired sessions
+
+    def __init__(self, path=None, flush_after=300, enabled=False):
+        """
+        Args:
+            path: SQLite journal file
+            flush_after: Seconds a set may stay buffered before its session is flushed
+            enabled: Buffer sets in POST /api/workout-logs/sets (flushes and reads work either way)
+        """
+        self.path = path
+        self.flush_after = flush_after
+        self.enabled = enabled and bool(path)
+
+        self._appends = 0
+        self._lock = threading.Lock()
+        self._created = False
+
+    @classmethod
+    def from_env(cls):
+        """Build the buffer from SET_BUFFER_* environment variables"""
+        return cls(
+            path=os.getenv('SET_BUFFER_PATH', os.path.join('instance', 'set_buffer.sqlite3')) or None,
+            flush_after=int(os.getenv('SET_BUFFER_FLUSH_AFTER', 300)),
+            enabled=os.getenv('SET_BUFFER_ENABLED', 'false').lower() in ('1', 'true', 'yes'),
+        )
+
+    def _connect(self):
+        # One short-lived connection per operation; synchronous=FULL makes each append durable
+        conn = sqlite3.connect(self.path, timeout=5)
+        conn.execute('PRAGMA synchronous=FULL')
+        return conn
+
+    def _exists(self):
+        """True once the journal file exists (reads and flushes never create it)"""
+        return bool(self.path) and (self._created or os.path.exists(self.path))
+
+    def _create(self):
+        """Create the journal on the first append"""
+        with self._lock:
+            if self._created:
+                return
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with self._connect() as conn:
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute(
+                    'CREATE TABLE IF NOT EXISTS buffered_sets ('
+                    'id INTEGER PRIMARY KEY AUTOINCREMENT, '
+                    'assignment_id INTEGER NOT NULL, workout_exercise_id INTEGER NOT NULL, '
+                    'set_number INTEGER NOT NULL, reps_completed INTEGER NOT NULL, '
+                    'weight_used REAL, rpe INTEGER, notes TEXT, logged_at TEXT NOT NULL, '
+                    'buffered_at REAL NOT NULL, '
+                    'UNIQUE (assignment_id, workout_exercise_id, set_number))'
+                )
+            self._created = True
+
+    # ==================== JOURNAL ====================
+
+    def append(self, row):
+        """
+        Buffer one validated workout_logs row (see WorkoutLogWriter.build_rows)
+
+        Logging the same set again replaces the buffered values.
+
+        Returns:
+            int journal entry ID
+        """
+        self._create()
+        values = [row[name] for name in COLUMNS]
+        values[4] = float(values[4]) if values[4] is not None else None
+        values[7] = values[7].isoformat()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                f'INSERT OR REPLACE INTO buffered_sets ({", ".join(COLUMNS)}, buffered_at) '
+                f'VALUES ({", ".join("?" * len(COLUMNS))}, ?)',
+                (*values, time.time())
+            )
+            return cursor.lastrowid
+
+    def pending(self, assignment_ids):
+        """
+        Buffered rows of several assignments
+
+        Returns:
+            dict {assignment_id: [(entry ID, row dict)]} ordered by exercise and set number
+        """
+        pending = {assignment_id: [] for assignment_id in assignment_ids}
+        if not pending or not self._exists():
+            return pending
+
+        ids = list(pending)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f'SELECT id, {", ".join(COLUMNS)} FROM buffered_sets '
+                f'WHERE assignment_id IN ({", ".join("?" * len(ids))}) '
+                f'ORDER BY workout_exercise_id, set_number', ids
+            ).fetchall()
+
+        for entry_id, *values in rows:
+            row = dict(zip(COLUMNS, values))
+            row['logged_at'] = datetime.fromisoformat(row['logged_at'])
+            pending[row['assignment_id']].append((entry_id, row))
+        return pending
+
+    def pending_logs(self, assignment_id):
+        """Buffered sets in WorkoutLog.to_dict() shape (id None, pending True)"""
+        return [self.as_log(row) for _, row in self.pending([assignment_id])[assignment_id]]
+
+    @staticmethod
+    def as_log(row):
+        """A buffered row in WorkoutLog.to_dict() shape"""
+        return {**row, 'id': None, 'logged_at': row['logged_at'].isoformat(), 'pending': True}
+
+    def acknowledge(self, entry_ids):
+        """Drop journal entries once their rows are committed to workout_logs"""
+        entry_ids = list(entry_ids)
+        if not entry_ids or not self._exists():
+            return
+        with self._connect() as conn:
+            conn.execute(
+                f'DELETE FROM buffered_sets WHERE id IN ({", ".join("?" * len(entry_ids))})', entry_ids
+            )
+
+    def due_assignment_ids(self, now=None):
+        """Assignments whose oldest buffered set is older than flush_after"""
+        if not self._exists():
+            return []
+        cutoff = (now or time.time()) - self.flush_after
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT assignment_id FROM buffered_sets GROUP BY assignment_id HAVING MIN(buffered_at) < ?',
+                (cutoff,)
+            ).fetchall()
+        return [assignment_id for (assignment_id,) in rows]
+
+    # ==================== FLUSH ====================
+
+    def take(self, assignment_ids):
+        """
+        Buffered sets of assignments about to be completed, still to be written (caller
+        inserts them, tracks the rollup, commits, then calls acknowledge)
+
+        Assignments with buffered sets are locked (then their sets re-read) so two workers
+        never flush the same session twice; sets already in workout_logs (a flush that
+        committed but was not acknowledged yet) are skipped. Nothing is queried in
+        PostgreSQL when none of the assignments has buffered sets.
+
+        Returns:
+            dict {assignment_id: (list of row dicts to insert, list of journal entry IDs)}
+        """
+        taken = {assignment_id: ([], []) for assignment_id in assignment_ids}
+        buffered = [assignment_id for assignment_id, entries in self.pending(list(taken)).items() if entries]
+        if not buffered:
+            return taken
+
+        db.session.execute(
+            select(WorkoutAssignment.id).where(WorkoutAssignment.id.in_(buffered)).with_for_update()
+        )
+        pending = {assignment_id: entries for assignment_id, entries in self.pending(buffered).items() if entries}
+        if not pending:
+            return taken
+
+        existing = set(db.session.execute(
+            select(WorkoutLog.assignment_id, WorkoutLog.workout_exercise_id, WorkoutLog.set_number)
+            .where(WorkoutLog.assignment_id.in_(list(pending)))
+        ).all())
+        for assignment_id, entries in pending.items():
+            taken[assignment_id] = (
+                [row for _, row in entries
+                 if (assignment_id, row['workout_exercise_id'], row['set_number']) not in existing],
+                [entry_id for entry_id, _ in entries]
+            )
+        return taken
+
+    def write(self, assignment):
+        """
+        Insert the assignment's buffered sets into workout_logs (caller tracks the rollup,
+        commits, then calls acknowledge)
+
+        Returns:
+            tuple (list of inserted row dicts, list of journal entry IDs)
+        """
+        rows, entry_ids = self.take([assignment.id])[assignment.id]
+        workout_log_writer.insert_rows(rows)
+        return rows, entry_ids
+
+    def flush(self, assignment):
+        """Move one assignment's buffered sets to workout_logs in its own transaction"""
+        try:
+            rows, entry_ids = self.write(assignment)
+            activity_rollup.track_logs(assignment, rows)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        self.acknowledge(entry_ids)
+        return len(rows)
+
+    def flush_due(self, now=None):
+        """
+        Flush every session with sets older than flush_after (cron / flush_set_buffer.py)
+
+        Returns:
+            int number of sets written
+        """
+        assignment_ids = self.due_assignment_ids(now)
+        if not assignment_ids:
+            return 0
+
+        written = 0
+        assignments = WorkoutAssignment.query.filter(WorkoutAssignment.id.in_(assignment_ids)).all()
+        for assignment in assignments:
+            written += self.flush(assignment)
+
+        # Sets of deleted assignments can never be written
+        orphaned = set(assignment_ids) - {assignment.id for assignment in assignments}
+        if orphaned:
+            self.acknowledge(entry_id for entries in self.pending(orphaned).values() for entry_id, _ in entries)
+        return written
+
+    def maybe_flush_due(self):
+        """Sweep expired sessions every FLUSH_CHECK_EVERY appends (errors are only logged)"""
+        with self._lock:
+            self._appends += 1
+            due = self._appends % self.FLUSH_CHECK_EVERY == 0
+        if not due:
+            return
+        try:
+            self.flush_due()
+        except Exception:
+            logger.exception('Set buffer flush failed')
+
+
+# Singleton instance
+set_buffer = SetBuffer.from_env()
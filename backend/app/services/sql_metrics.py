@@ -0,0 +1,129 @@
+"""
+SQL Metrics - Per-request query counting and timing via SQLAlchemy engine events
+
+Every request records its query count, total DB time and slowest statements.
+They are reported in the Server-Timing response header, kept in a small ring
+buffer for the debug endpoint (GET /api/debug/sql), and requests over their
+query budget are logged - a quick way to spot N+1 patterns.
+"""
+import logging
+import os
+import time
+from collections import deque
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+
+def query_budget(max_queries):
+    """
+    Override the per-request query budget of an endpoint (default SQL_QUERY_BUDGET)
+
+    Apply it closest to the function, below route/auth decorators:
+        @workouts_bp.route('', methods=['GET'])
+        @jwt_required()
+        @query_budget(10)
+        def get_workouts(): ...
+    """
+    def decorator(view):
+        view.query_budget = max_queries  # copied to outer wrappers by functools.wraps
+        return view
+    return decorator
+
+
+class SQLMetrics:
+    """Request-scoped SQL instrumentation"""
+
+    def __init__(self):
+        self.default_budget = int(os.getenv('SQL_QUERY_BUDGET', 50))
+        self.slowest_count = int(os.getenv('SQL_SLOWEST_STATEMENTS', 5))
+        self.server_timing = os.getenv('SQL_SERVER_TIMING', 'true').lower() in ('1', 'true', 'yes')
+        self.recent = deque(maxlen=int(os.getenv('SQL_RECENT_REQUESTS', 100)))
+
+    def init_app(self, app, engine):
+        """Hook the engine events and request handlers (called from create_app)"""
+        if not event.contains(engine, 'before_cursor_execute', self._before_cursor_execute):
+            event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+
+    # ==================== ENGINE EVENTS ====================
+
+    @staticmethod
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._sql_metrics_started = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._sql_metrics_started
+        if not has_request_context():
+            return
+        stats = g.get('sql_metrics')
+        if stats is None:
+            return
+
+        stats['queries'] += 1
+        stats['db_time'] += elapsed
+
+        # Keep only the N slowest statements
+        slowest = stats['slowest']
+        if len(slowest) < self.slowest_count or elapsed > slowest[-1][0]:
+            slowest.append((elapsed, statement))
+            slowest.sort(key=lambda item: item[0], reverse=True)
+            del slowest[self.slowest_count:]
+
+    # ==================== REQUEST HOOKS ====================
+
+    @staticmethod
+    def _start_request():
+        g.sql_metrics = {'started': time.perf_counter(), 'queries': 0, 'db_time': 0.0, 'slowest': []}
+
+    def _finish_request(self, response):
+        stats = g.pop('sql_metrics', None)
+        if stats is None:
+            return response
+
+        total_ms = (time.perf_counter() - stats['started']) * 1000
+        db_ms = stats['db_time'] * 1000
+        budget = self.budget_for(request.endpoint)
+
+        summary = {
+            'method': request.method,
+            'path': request.path,
+            'endpoint': request.endpoint,
+            'status': response.status_code,
+            'queries': stats['queries'],
+            'budget': budget,
+            'db_ms': round(db_ms, 2),
+            'total_ms': round(total_ms, 2),
+            'slowest': [
+                {'ms': round(elapsed * 1000, 2), 'statement': statement[:500]}
+                for elapsed, statement in stats['slowest']
+            ],
+        }
+        if request.endpoint != 'debug.sql_metrics_report':
+            self.recent.append(summary)
+
+        if self.server_timing:
+            response.headers.add(
+                'Server-Timing',
+                f'db;dur={db_ms:.2f};desc="{stats["queries"]} queries", app;dur={total_ms:.2f}'
+            )
+
+        if stats['queries'] > budget:
+            logger.warning(
+                f'Query budget exceeded: {request.method} {request.path} ({request.endpoint}) ran '
+                f'{stats["queries"]} queries (budget {budget}), {db_ms:.1f} ms in the database'
+            )
+        return response
+
+    def budget_for(self, endpoint):
+        """Query budget of an endpoint (@query_budget override or SQL_QUERY_BUDGET)"""
+        view = current_app.view_functions.get(endpoint) if endpoint else None
+        return getattr(view, 'query_budget', self.default_budget)
+
+
+# Singleton instance
+sql_metrics = SQLMetrics()
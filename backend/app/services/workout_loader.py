@@ -0,0 +1,69 @@
+"""
+Workout Loader - Eager loading for workout serialization
+Workout.exercises is a dynamic relationship, so serializing a list of workouts
+one by one costs 1 + N + N×M queries. The loader fetches the workouts' exercise
+rows and the referenced exercises for the whole list (3 queries total).
+"""
+from collections import defaultdict
+from sqlalchemy.orm import selectinload
+from app.models import WorkoutExercise
+
+
+class WorkoutLoader:
+    """Batch loader for Workout.to_dict(include_exercises=True)"""
+
+    def load_exercises(self, workouts, include_exercise_details=True):
+        """
+        Fetch WorkoutExercise rows for a list of workouts
+
+        Args:
+            workouts: List of Workout instances
+            include_exercise_details: Also load each row's Exercise (one extra IN query)
+
+        Returns:
+            dict {workout_id: [WorkoutExercise, ...]} ordered by order_index
+        """
+        by_workout = defaultdict(list)
+        workout_ids = [workout.id for workout in workouts]
+        if not workout_ids:
+            return by_workout
+
+        query = WorkoutExercise.query.filter(
+            WorkoutExercise.workout_id.in_(workout_ids)
+        ).order_by(
+            WorkoutExercise.workout_id, WorkoutExercise.order_index, WorkoutExercise.id
+        )
+        if include_exercise_details:
+            query = query.options(selectinload(WorkoutExercise.exercise))
+
+        for workout_exercise in query.all():
+            by_workout[workout_exercise.workout_id].append(workout_exercise)
+
+        return by_workout
+
+    def serialize(self, workouts, include_exercise_details=True):
+        """
+        Serialize workouts with their exercises
+
+        Args:
+            workouts: List of Workout instances
+            include_exercise_details: Embed the full exercise object in each entry
+                (False keeps the prescription rows and exerciseCount only)
+
+        Returns:
+            list of workout dicts (same shape as Workout.to_dict(include_exercises=True))
+        """
+        by_workout = self.load_exercises(workouts, include_exercise_details)
+
+        return [
+            workout.to_dict(
+                include_exercises=True,
+                workout_exercises=by_workout.get(workout.id, []),
+                include_exercise_details=include_exercise_details
+            )
+            for workout in workouts
+        ]
+
+
+# Singleton instance
+workout_loader = WorkoutLoader()
@@ -0,0 +1,322 @@
+"""
+Workout Log Writer - Bulk write path for logged workout sessions
+Validates a whole session payload up front, then inserts every set with a single
+multi-row INSERT and completes the assignment in the same transaction.
+"""
+import math
+from datetime import datetime, timedelta, timezone
+from numbers import Number
+from sqlalchemy import insert
+from app import db
+from app.models import WorkoutLog, WorkoutExercise, WorkoutAssignment
+from app.services.activity_rollup import activity_rollup
+
+
+class WorkoutLogValidationError(ValueError):
+    """Invalid workout log payload (reported as HTTP 400)"""
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _as_int(value):
+    """An int, or a numeric string such as "10" (accepted by the original ORM path) -> int, else None"""
+    if isinstance(value, str):
+        try:
+            return int(value.strip())
+        except ValueError:
+            return None
+    return value if _is_int(value) else None
+
+
+def _as_number(value):
+    """A number, or a numeric string such as "42.5" -> float / int, else None"""
+    if isinstance(value, str):
+        try:
+            value = float(value.strip())
+        except ValueError:
+            return None
+        return value if math.isfinite(value) else None
+    return value if isinstance(value, Number) and not isinstance(value, bool) else None
+
+
+class WorkoutLogWriter:
+    """Validates and bulk-inserts the sets of logged workout sessions"""
+
+    MAX_BATCH_SESSIONS = 100
+    MAX_CLOCK_SKEW = timedelta(minutes=5)  # tolerated for client-supplied completed_at
+
+    def load_workout_exercise_ids(self, workout_ids):
+        """
+        Load the exercise rows of several workouts in one query
+
+        Returns:
+            dict {workout_id: set of workout_exercise IDs}
+        """
+        exercise_ids = {workout_id: set() for workout_id in workout_ids}
+        if not exercise_ids:
+            return exercise_ids
+
+        rows = db.session.query(WorkoutExercise.workout_id, WorkoutExercise.id).filter(
+            WorkoutExercise.workout_id.in_(list(exercise_ids))
+        ).all()
+        for workout_id, workout_exercise_id in rows:
+            exercise_ids[workout_id].add(workout_exercise_id)
+        return exercise_ids
+
+    def build_rows(self, assignment_id, exercises, valid_exercise_ids, logged_at):
+        """
+        Validate a session payload and turn it into workout_logs rows
+
+        Args:
+            assignment_id: Assignment the sets belong to
+            exercises: [{'workout_exercise_id', 'sets': [{'set_number', 'reps_completed', ...}]}]
+            valid_exercise_ids: workout_exercise IDs of the assignment's workout
+            logged_at: Timestamp stored on every set
+
+        Returns:
+            list of row dicts for WorkoutLog.__table__
+
+        Raises:
+            WorkoutLogValidationError: on the first invalid exercise or set
+        """
+        if not isinstance(exercises, list):
+            raise WorkoutLogValidationError('exercises must be a list')
+
+        rows = []
+        seen = set()
+        for exercise_data in exercises:
+            if not isinstance(exercise_data, dict):
+                raise WorkoutLogValidationError('Each exercise must be an object')
+
+            workout_exercise_id = exercise_data.get('workout_exercise_id')
+            if workout_exercise_id not in valid_exercise_ids:
+                raise WorkoutLogValidationError(
+                    f'workout_exercise_id {workout_exercise_id} does not belong to this workout'
+                )
+
+            sets = exercise_data.get('sets', [])
+            if not isinstance(sets, list):
+                raise WorkoutLogValidationError('sets must be a list')
+
+            for set_data in sets:
+                row = self._build_row(assignment_id, workout_exercise_id, set_data, logged_at)
+                key = (workout_exercise_id, row['set_number'])
+                if key in seen:
+                    raise WorkoutLogValidationError(
+                        f'Duplicate set {row["set_number"]} for workout_exercise_id {workout_exercise_id}'
+                    )
+                seen.add(key)
+                rows.append(row)
+
+        return rows
+
+    def _build_row(self, assignment_id, workout_exercise_id, set_data, logged_at):
+        """Validate one set against the workout_logs constraints (schema.sql)"""
+        if not isinstance(set_data, dict):
+            raise WorkoutLogValidationError('Each set must be an object')
+
+        # Numeric strings are coerced, as PostgreSQL did for the original per-set ORM inserts
+        set_number = _as_int(set_data.get('set_number'))
+        reps_completed = _as_int(set_data.get('reps_completed'))
+        weight_used = set_data.get('weight_used')
+        rpe = set_data.get('rpe')
+
+        if set_number is None or set_number < 1:
+            raise WorkoutLogValidationError('set_number must be an integer >= 1')
+        if reps_completed is None or reps_completed < 0:
+            raise WorkoutLogValidationError('reps_completed must be an integer >= 0')
+        if weight_used is not None:
+            weight_used = _as_number(weight_used)
+            if weight_used is None or not 0 <= weight_used < 1000:
+                raise WorkoutLogValidationError('weight_used must be a number between 0 and 999.99')
+        if rpe is not None:
+            rpe = _as_int(rpe)
+            if rpe is None or not 1 <= rpe <= 10:
+                raise WorkoutLogValidationError('rpe must be an integer between 1 and 10')
+
+        return {
+            'assignment_id': assignment_id,
+            'workout_exercise_id': workout_exercise_id,
+            'set_number': set_number,
+            'reps_completed': reps_completed,
+            'weight_used': weight_used,
+            'rpe': rpe,
+            'notes': set_data.get('notes'),
+            'logged_at': logged_at
+        }
+
+    def build_set(self, assignment, set_data, logged_at=None):
+        """
+        Validate one set of a live session (POST /api/workout-logs/sets)
+
+        Args:
+            assignment: WorkoutAssignment the set belongs to
+            set_data: {'workout_exercise_id', 'set_number', 'reps_completed', 'weight_used', 'rpe', 'notes'}
+
+        Returns:
+            row dict for WorkoutLog.__table__
+
+        Raises:
+            WorkoutLogValidationError
+        """
+        if not isinstance(set_data, dict):
+            raise WorkoutLogValidationError('Each set must be an object')
+        valid_exercise_ids = self.load_workout_exercise_ids([assignment.workout_id])[assignment.workout_id]
+        return self.build_rows(assignment.id, [{
+            'workout_exercise_id': set_data.get('workout_exercise_id'),
+            'sets': [set_data]
+        }], valid_exercise_ids, logged_at or datetime.utcnow())[0]
+
+    def insert_row(self, row):
+        """Insert one workout_logs row and return its ID"""
+        table = WorkoutLog.__table__
+        return db.session.execute(insert(table).values(row).returning(table.c.id)).scalar()
+
+    def insert_rows(self, rows):
+        """Insert workout_logs rows with one multi-row INSERT (executemany -> insertmanyvalues)"""
+        if rows:
+            db.session.execute(insert(WorkoutLog.__table__), rows)
+        return len(rows)
+
+    @staticmethod
+    def _merge_buffered(rows, buffered):
+        """Session rows plus write-behind buffered sets (a set sent in the session wins)"""
+        sent = {(row['workout_exercise_id'], row['set_number']) for row in rows}
+        return rows + [row for row in buffered if (row['workout_exercise_id'], row['set_number']) not in sent]
+
+    def log_session(self, assignment, exercises, logged_at=None, buffered=()):
+        """
+        Validate and write one completed session (caller commits)
+
+        1 query to validate exercise IDs + 1 INSERT for all sets; the assignment is
+        marked completed and the activity rollup updated in the same transaction.
+
+        Args:
+            buffered: Rows taken from the set buffer (SetBuffer.take), written with the session
+
+        Returns:
+            list of inserted row dicts
+
+        Raises:
+            WorkoutLogValidationError: nothing is written
+        """
+        logged_at = logged_at or datetime.utcnow()
+        valid_exercise_ids = self.load_workout_exercise_ids([assignment.workout_id])[assignment.workout_id]
+        rows = self._merge_buffered(
+            self.build_rows(assignment.id, exercises, valid_exercise_ids, logged_at), list(buffered)
+        )
+
+        # Update assignment status to completed
+        assignment.status = 'completed'
+        assignment.completed_at = logged_at
+
+        # Keep daily activity rollup in sync - one upsert for the status change and the sets
+        # (before anything flushes, so the attribute history is still available)
+        activity_rollup.track_assignment(assignment, logs=rows)
+        self.insert_rows(rows)
+
+        return rows
+
+    def log_sessions(self, sessions, user_type, user_id, now=None, buffered=None):
+        """
+        Validate and write many completed sessions (offline sync, caller commits)
+
+        One query authorizes every referenced assignment, one loads their workouts'
+        exercise IDs, then all valid sessions are written with one rollup upsert and
+        one multi-row INSERT. Invalid sessions are reported and skipped.
+
+        Args:
+            sessions: [{'assignment_id', 'exercises', 'completed_at' (optional ISO 8601)}]
+            user_type: 'client' (own assignments) or 'trainer' (assignments they created)
+            user_id: JWT identity
+            buffered: {assignment_id: rows} taken from the set buffer, written with their session
+
+        Returns:
+            list of per-session results, in request order:
+            {'index', 'assignment_id', 'success', 'logs_count'} or {'index', 'assignment_id', 'success', 'error'}
+        """
+        now = now or datetime.utcnow()
+        results = [None] * len(sessions)
+
+        parsed = []
+        for index, session in enumerate(sessions):
+            assignment_id = session.get('assignment_id') if isinstance(session, dict) else None
+            try:
+                if not _is_int(assignment_id):
+                    raise WorkoutLogValidationError('assignment_id is required')
+                logged_at = self._parse_completed_at(session.get('completed_at'), now)
+            except WorkoutLogValidationError as e:
+                results[index] = self._error(index, assignment_id, e)
+                continue
+            parsed.append((index, assignment_id, session.get('exercises', []), logged_at))
+
+        # Authorize every referenced assignment with one query
+        query = WorkoutAssignment.query.filter(WorkoutAssignment.id.in_({item[1] for item in parsed}))
+        if user_type == 'client':
+            query = query.filter(WorkoutAssignment.client_id == user_id)
+        else:
+            query = query.filter(WorkoutAssignment.trainer_id == user_id)
+        assignments = {assignment.id: assignment for assignment in query.all()} if parsed else {}
+
+        exercise_ids = self.load_workout_exercise_ids({a.workout_id for a in assignments.values()})
+
+        all_rows = []
+        changes = []
+        written = set()
+        for index, assignment_id, exercises, logged_at in parsed:
+            assignment = assignments.get(assignment_id)
+            try:
+                if assignment is None:
+                    raise WorkoutLogValidationError('Assignment not found')
+                if assignment_id in written:
+                    raise WorkoutLogValidationError('Assignment appears more than once in this batch')
+                rows = self.build_rows(assignment_id, exercises, exercise_ids[assignment.workout_id], logged_at)
+                rows = self._merge_buffered(rows, (buffered or {}).get(assignment_id, []))
+            except WorkoutLogValidationError as e:
+                results[index] = self._error(index, assignment_id, e)
+                continue
+
+            assignment.status = 'completed'
+            assignment.completed_at = logged_at
+            written.add(assignment_id)
+            changes.append((assignment, rows))
+            all_rows.extend(rows)
+            results[index] = {
+                'index': index,
+                'assignment_id': assignment_id,
+                'success': True,
+                'logs_count': len(rows)
+            }
+
+        # Rollup first (attribute history), then every set of every session at once
+        activity_rollup.track_assignments(changes)
+        self.insert_rows(all_rows)
+
+        return results
+
+    def _parse_completed_at(self, value, now):
+        """Client-supplied completion time (ISO 8601, UTC if no offset) or now"""
+        if value is None:
+            return now
+        if not isinstance(value, str):
+            raise WorkoutLogValidationError('completed_at must be an ISO 8601 string')
+        try:
+            completed_at = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            raise WorkoutLogValidationError('completed_at must be an ISO 8601 string')
+
+        if completed_at.tzinfo is not None:
+            completed_at = completed_at.astimezone(timezone.utc).replace(tzinfo=None)
+        if completed_at > now + self.MAX_CLOCK_SKEW:
+            raise WorkoutLogValidationError('completed_at is in the future')
+        return completed_at
+
+    @staticmethod
+    def _error(index, assignment_id, error):
+        return {'index': index, 'assignment_id': assignment_id, 'success': False, 'error': str(error)}
+
+
+# Singleton instance
+workout_log_writer = WorkoutLogWriter()
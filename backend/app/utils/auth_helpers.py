@@ -80,10 +80,9 @@ def verify_client_access(client_id: int):
     user_type = claims.get('type', 'trainer')
 
     if user_type == 'trainer':
-        # Trainer: verify the client belongs to them
-        from app.models import Client
-        client = Client.query.get(client_id)
-        if not client or client.trainer_id != user_id:
+        # Trainer: verify the client belongs to them (cached ownership set)
+        from app.services.ownership_cache import ownership_cache
+        if not ownership_cache.owns_client(user_id, client_id):
             return jsonify({
                 'success': False,
                 'error': 'Unauthorized - client does not belong to you'
@@ -119,10 +118,9 @@ def verify_client_resource_access(resource, client_id_field='client_id'):
     resource_client_id = getattr(resource, client_id_field, None)
 
     if user_type == 'trainer':
-        # Trainer: verify the resource's client belongs to them
-        from app.models import Client
-        client = Client.query.get(resource_client_id)
-        if not client or client.trainer_id != user_id:
+        # Trainer: verify the resource's client belongs to them (cached ownership set)
+        from app.services.ownership_cache import ownership_cache
+        if not ownership_cache.owns_client(user_id, resource_client_id):
             return jsonify({
                 'success': False,
                 'error': 'Unauthorized - resource does not belong to your client'
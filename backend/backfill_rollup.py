@@ -0,0 +1,34 @@
+"""
+Backfill script for the client_daily_activity rollup
+Recomputes per-client, per-day activity from workout_assignments and workout_logs.
+
+Usage:
+    python backfill_rollup.py                 # rebuild every client
+    python backfill_rollup.py 12 15 40        # rebuild only these client IDs
+"""
+import sys
+from app import create_app, db
+from app.services.activity_rollup import activity_rollup
+
+
+def backfill(client_ids=None):
+    """Rebuild rollup rows (all clients or the given IDs) in a single transaction"""
+    app = create_app()
+
+    with app.app_context():
+        scope = f"{len(client_ids)} clients" if client_ids else "all clients"
+        print(f"📊 Rebuilding daily activity rollup for {scope}...")
+
+        try:
+            rows = activity_rollup.rebuild(client_ids=client_ids)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        print(f"✅ Wrote {rows} rollup rows")
+
+
+if __name__ == '__main__':
+    ids = [int(arg) for arg in sys.argv[1:]] or None
+    backfill(ids)
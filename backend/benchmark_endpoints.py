@@ -0,0 +1,235 @@
+"""
+Endpoint benchmark - latency percentiles, throughput and queries per request
+Starts the app from create_app on a local threaded server, loads a synthetic
+dataset (generate_data.py) and drives every endpoint defined in
+test_health_check.ENDPOINTS with N concurrent workers. Queries and DB time
+per request are read from the Server-Timing header (SQL metrics).
+
+Results are saved as JSON (default benchmark_results/<commit>-<timestamp>.json);
+--compare prints the p95 / throughput change against an earlier run.
+
+Use a throwaway database (DATABASE_URL): the generated dataset and the rows
+created by the write endpoints are kept.
+
+Usage:
+    python benchmark_endpoints.py                                   # 2 trainers x 100 clients x 3 months
+    python benchmark_endpoints.py --clients 1000 --concurrency 16 --requests 500
+    python benchmark_endpoints.py --endpoints clients.list,analytics.trainer --compare benchmark_results/old.json
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import statistics
+import subprocess
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import requests
+from flask_jwt_extended import create_access_token
+from sqlalchemy import func
+from werkzeug.serving import make_server
+from app import create_app, db
+from app.models import Client, Exercise, Workout, WorkoutAssignment
+from generate_data import PASSWORD, DataGenerator
+from test_health_check import ENDPOINTS, auth_header, resolve
+
+SERVER_TIMING = re.compile(r'db;dur=([\d.]+);desc="(\d+) queries"')
+
+
+def start_server(app):
+    """Serve the app on a random local port in a background thread; returns (server, base_url)"""
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}/api'
+
+
+def prepare_context(prefix):
+    """IDs and tokens the endpoint definitions are filled with: the first generated trainer and its busiest client"""
+    trainer_email = f'{prefix}-trainer0@example.test'
+    client = db.session.query(Client).filter(Client.email.like(f'{prefix}-client0-%')).outerjoin(
+        WorkoutAssignment, WorkoutAssignment.client_id == Client.id
+    ).group_by(Client.id).order_by(func.count(WorkoutAssignment.id).desc(), Client.id).first()
+    workout = Workout.query.filter_by(trainer_id=client.trainer_id).order_by(Workout.id).first()
+    exercise = Exercise.query.filter(Exercise.external_id.like(f'{prefix}-ex%')).order_by(Exercise.id).first()
+
+    return {
+        'password': PASSWORD,
+        'trainer_email': trainer_email,
+        'trainer_token': create_access_token(identity=client.trainer_id, additional_claims={'type': 'trainer'}),
+        'client_token': create_access_token(identity=client.id, additional_claims={'type': 'client'}),
+        'client_id': client.id,
+        'workout_id': workout.id,
+        'exercise_id': exercise.id,
+    }
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def bench_endpoint(base_url, endpoint, context, total, concurrency, warmup):
+    """
+    Call one endpoint `total` times from `concurrency` workers
+
+    Returns:
+        dict with request/error counts, throughput, latency percentiles (ms) and queries per request
+    """
+    local = threading.local()
+
+    def call(_):
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+        params = dict(context, unique=uuid.uuid4().hex)
+        started = time.perf_counter()
+        response = local.session.request(
+            endpoint.method, base_url + resolve(endpoint.path, params),
+            json=resolve(endpoint.data, params), headers=auth_header(endpoint.user, params)
+        )
+        elapsed = (time.perf_counter() - started) * 1000
+        timing = SERVER_TIMING.search(response.headers.get('Server-Timing', ''))
+        return (elapsed, response.status_code == endpoint.expected_status,
+                int(timing.group(2)) if timing else None, float(timing.group(1)) if timing else None)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(call, range(warmup)))
+        started = time.perf_counter()
+        samples = list(pool.map(call, range(total)))
+        wall = time.perf_counter() - started
+
+    latencies = sorted(sample[0] for sample in samples)
+    queries = [sample[2] for sample in samples if sample[2] is not None]
+    db_times = [sample[3] for sample in samples if sample[3] is not None]
+    return {
+        'method': endpoint.method,
+        'path': endpoint.path,
+        'requests': total,
+        'errors': sum(1 for sample in samples if not sample[1]),
+        'throughput_rps': round(total / wall, 1),
+        'latency_ms': {
+            'p50': round(percentile(latencies, 50), 2),
+            'p95': round(percentile(latencies, 95), 2),
+            'p99': round(percentile(latencies, 99), 2),
+            'mean': round(statistics.fmean(latencies), 2),
+            'max': round(latencies[-1], 2),
+        },
+        'queries_per_request': {
+            'mean': round(statistics.fmean(queries), 2) if queries else None,
+            'max': max(queries) if queries else None,
+        },
+        'db_ms_mean': round(statistics.fmean(db_times), 2) if db_times else None,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(app, names=None, total=100, concurrency=4, warmup=5, dataset=None, prefix=None):
+    """
+    Generate the dataset, start the server and benchmark the selected endpoints
+
+    Args:
+        names: ENDPOINTS keys (default: all, in definition order)
+        dataset: DataGenerator options (trainers, clients_per_trainer, months, ...)
+
+    Returns:
+        dict ready to be saved as JSON
+    """
+    names = names or list(ENDPOINTS)
+    unknown = [name for name in names if name not in ENDPOINTS]
+    if unknown:
+        raise ValueError(f'Unknown endpoints: {", ".join(unknown)}')
+
+    prefix = prefix or f'bench{int(time.time())}'
+    dataset = dict({'trainers': 2, 'clients_per_trainer': 100, 'months': 3}, **(dataset or {}))
+    with app.app_context():
+        counts = DataGenerator(prefix=prefix, **dataset).run()
+        context = prepare_context(prefix)
+
+    server, base_url = start_server(app)
+    try:
+        results = {name: bench_endpoint(base_url, ENDPOINTS[name], context, total, concurrency, warmup)
+                   for name in names}
+    finally:
+        server.shutdown()
+
+    return {
+        'commit': git_commit(),
+        'timestamp': datetime.utcnow().isoformat(),
+        'settings': {'requests': total, 'concurrency': concurrency, 'warmup': warmup},
+        'dataset': dict(dataset, prefix=prefix, rows=counts),
+        'results': results,
+    }
+
+
+def print_results(report, previous=None):
+    """One line per endpoint; with a previous report, the p95 and throughput change"""
+    print(f"{'endpoint':<20} {'p50':>8} {'p95':>8} {'p99':>8} {'req/s':>8} {'queries':>8} {'errors':>7}")
+    for name, result in report['results'].items():
+        latency = result['latency_ms']
+        line = (f"{name:<20} {latency['p50']:>8.1f} {latency['p95']:>8.1f} {latency['p99']:>8.1f} "
+                f"{result['throughput_rps']:>8.1f} {result['queries_per_request']['mean'] or 0:>8.1f} "
+                f"{result['errors']:>7}")
+        before = (previous or {}).get('results', {}).get(name)
+        if before:
+            p95_change = (latency['p95'] / before['latency_ms']['p95'] - 1) * 100
+            rps_change = (result['throughput_rps'] / before['throughput_rps'] - 1) * 100
+            line += f"   p95 {p95_change:+.0f}%  req/s {rps_change:+.0f}%"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the API endpoints against a generated dataset')
+    parser.add_argument('--endpoints', help=f'comma-separated subset of: {", ".join(ENDPOINTS)}')
+    parser.add_argument('--requests', type=int, default=100, help='measured requests per endpoint')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--warmup', type=int, default=5, help='unmeasured requests per endpoint')
+    parser.add_argument('--trainers', type=int, default=2)
+    parser.add_argument('--clients', type=int, default=100, help='clients per trainer')
+    parser.add_argument('--months', type=float, default=3)
+    parser.add_argument('--output', help='JSON file (default benchmark_results/<commit>-<timestamp>.json)')
+    parser.add_argument('--compare', help='previous JSON results to compare against')
+    args = parser.parse_args()
+
+    app = create_app()
+    print(f"🏗️ Generating {args.trainers} trainers x {args.clients} clients, {args.months} months...")
+    report = run_benchmark(
+        app,
+        names=args.endpoints.split(',') if args.endpoints else None,
+        total=args.requests,
+        concurrency=args.concurrency,
+        warmup=args.warmup,
+        dataset={'trainers': args.trainers, 'clients_per_trainer': args.clients, 'months': args.months},
+    )
+
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+    print(f"⏱️ {args.requests} requests per endpoint, concurrency {args.concurrency} (latencies in ms)")
+    print_results(report, previous)
+
+    output = args.output or os.path.join(
+        'benchmark_results', f"{report['commit'] or 'nocommit'}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Results saved to {output}")
+
+
+if __name__ == '__main__':
+    main()
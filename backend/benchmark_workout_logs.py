@@ -0,0 +1,126 @@
+"""
+Benchmark for the POST /api/workout-logs write path
+Compares the previous per-object ORM inserts with the bulk WorkoutLogWriter path
+(one multi-row INSERT per session) and prints rows per second for each.
+
+Everything runs inside one transaction that is rolled back, so the target
+database (DATABASE_URL) is left untouched.
+
+Usage:
+    python benchmark_workout_logs.py                  # 200 sessions x 30 sets
+    python benchmark_workout_logs.py 500 40           # sessions, sets per session
+"""
+import sys
+import time
+from datetime import datetime
+from app import create_app, db
+from app.models import Trainer, Client, Exercise, Workout, WorkoutExercise, WorkoutAssignment, WorkoutLog
+from app.services.activity_rollup import activity_rollup
+from app.services.workout_log_writer import workout_log_writer
+
+EXERCISES_PER_WORKOUT = 6
+
+
+def create_fixture(sessions):
+    """One trainer/client/workout and one pending assignment per session"""
+    trainer = Trainer(email='bench-trainer@fitcompass.test', name='Bench Trainer', password_hash='x')
+    db.session.add(trainer)
+    db.session.flush()
+
+    client = Client(email='bench-client@fitcompass.test', name='Bench Client', trainer_id=trainer.id)
+    workout = Workout(name='Bench Workout', trainer_id=trainer.id, duration=60)
+    db.session.add_all([client, workout])
+    db.session.flush()
+
+    workout_exercise_ids = []
+    for order in range(EXERCISES_PER_WORKOUT):
+        exercise = Exercise(name=f'Bench Exercise {order}')
+        db.session.add(exercise)
+        db.session.flush()
+        workout_exercise = WorkoutExercise(workout_id=workout.id, exercise_id=exercise.id,
+                                           order_index=order, sets=5, reps=10)
+        db.session.add(workout_exercise)
+        db.session.flush()
+        workout_exercise_ids.append(workout_exercise.id)
+
+    assignments = [
+        WorkoutAssignment(workout_id=workout.id, client_id=client.id, trainer_id=trainer.id, status='pending')
+        for _ in range(sessions)
+    ]
+    db.session.add_all(assignments)
+    db.session.flush()
+    return assignments, workout_exercise_ids
+
+
+def session_payload(workout_exercise_ids, sets_per_session):
+    """Spread sets_per_session sets over the workout's exercises"""
+    exercises = {}
+    for i in range(sets_per_session):
+        workout_exercise_id = workout_exercise_ids[i % len(workout_exercise_ids)]
+        sets = exercises.setdefault(workout_exercise_id, [])
+        sets.append({'set_number': len(sets) + 1, 'reps_completed': 10, 'weight_used': 40, 'rpe': 8})
+    return [{'workout_exercise_id': we_id, 'sets': sets} for we_id, sets in exercises.items()]
+
+
+def orm_path(assignment, exercises):
+    """Previous implementation: one WorkoutLog object per set through the unit of work"""
+    logged_at = datetime.utcnow()
+    logs_created = []
+    for exercise_data in exercises:
+        for set_data in exercise_data['sets']:
+            workout_log = WorkoutLog(
+                assignment_id=assignment.id,
+                workout_exercise_id=exercise_data['workout_exercise_id'],
+                set_number=set_data.get('set_number'),
+                reps_completed=set_data.get('reps_completed'),
+                weight_used=set_data.get('weight_used'),
+                rpe=set_data.get('rpe'),
+                notes=set_data.get('notes'),
+                logged_at=logged_at
+            )
+            db.session.add(workout_log)
+            logs_created.append(workout_log)
+
+    assignment.status = 'completed'
+    assignment.completed_at = datetime.utcnow()
+    activity_rollup.track_assignment(assignment)
+    activity_rollup.track_logs(assignment, logs_created)
+    db.session.flush()
+
+
+def bulk_path(assignment, exercises):
+    """Current implementation: validate, one multi-row INSERT, same-transaction assignment update"""
+    workout_log_writer.log_session(assignment, exercises)
+    db.session.flush()
+
+
+def run(path, assignments, exercises):
+    started = time.perf_counter()
+    for assignment in assignments:
+        path(assignment, exercises)
+    return time.perf_counter() - started
+
+
+def benchmark(sessions=200, sets_per_session=30):
+    app = create_app()
+
+    with app.app_context():
+        try:
+            assignments, workout_exercise_ids = create_fixture(sessions * 2)
+            exercises = session_payload(workout_exercise_ids, sets_per_session)
+            rows = sessions * sets_per_session
+
+            print(f"🏋️ {sessions} sessions x {sets_per_session} sets ({rows} rows per path)")
+            for label, path, batch in [
+                ('ORM per-object', orm_path, assignments[:sessions]),
+                ('Bulk insert', bulk_path, assignments[sessions:]),
+            ]:
+                elapsed = run(path, batch, exercises)
+                print(f"  {label:<15} {elapsed:7.3f}s  {rows / elapsed:10.0f} rows/s")
+        finally:
+            db.session.rollback()
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:3]]
+    benchmark(*args)
@@ -0,0 +1,35 @@
+"""
+bcrypt cost calibration
+Times bcrypt on this host for increasing cost factors and prints the highest one whose
+median hash time stays within the target. Run it on the production instance type and set
+PASSWORD_HASH_ROUNDS to the result; existing hashes are upgraded on the next login.
+
+Usage:
+    python calibrate_bcrypt.py                  # target 250 ms per hash
+    python calibrate_bcrypt.py --target-ms 100 --samples 5
+"""
+import argparse
+from app.services.password_hasher import password_hasher
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pick a bcrypt cost factor for a target latency')
+    parser.add_argument('--target-ms', type=float, default=250, help='latency budget for one hash')
+    parser.add_argument('--min-rounds', type=int, default=10)
+    parser.add_argument('--max-rounds', type=int, default=16)
+    parser.add_argument('--samples', type=int, default=3, help='hashes timed per cost factor')
+    args = parser.parse_args()
+
+    print(f"⏱️  Timing bcrypt (target {args.target_ms:g} ms, current PASSWORD_HASH_ROUNDS={password_hasher.rounds})")
+    rounds, timings = password_hasher.calibrate(args.target_ms, args.min_rounds, args.max_rounds, args.samples)
+    for cost, ms in timings.items():
+        marker = '✅' if ms <= args.target_ms else '❌'
+        print(f"   {marker} cost {cost:>2}: {ms:8.1f} ms")
+
+    if timings[args.min_rounds] > args.target_ms:
+        print(f"⚠️  Even cost {args.min_rounds} is over the target on this host")
+    print(f"\nPASSWORD_HASH_ROUNDS={rounds}")
+
+
+if __name__ == '__main__':
+    main()
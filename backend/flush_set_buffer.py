@@ -0,0 +1,26 @@
+"""
+Flush script for the write-behind set buffer
+Writes sets that have been buffered for longer than SET_BUFFER_FLUSH_AFTER seconds
+(abandoned or very long sessions) into workout_logs. Run it from cron on every app host.
+
+Usage:
+    python flush_set_buffer.py          # sessions past SET_BUFFER_FLUSH_AFTER
+    python flush_set_buffer.py --all    # every buffered session (e.g. before a deploy)
+"""
+import sys
+from app import create_app
+from app.services.set_buffer import set_buffer
+
+
+def flush(flush_all=False):
+    """Flush due (or all) buffered sessions and print the number of sets written"""
+    app = create_app()
+
+    with app.app_context():
+        now = float('inf') if flush_all else None
+        written = set_buffer.flush_due(now)
+        print(f"✅ {written} buffered sets written to workout_logs")
+
+
+if __name__ == '__main__':
+    flush('--all' in sys.argv[1:])
@@ -0,0 +1,407 @@
+"""
+Synthetic dataset generator for load and benchmark testing
+Creates N trainers with M clients each, their workouts and months of assignments
+and per-set logs, streamed into PostgreSQL with COPY (one transaction), then
+indexes the new logins, rebuilds the daily activity rollup and runs ANALYZE.
+
+Distributions: each client has an adherence rate (Beta(4, 2)) and 2-5 sessions
+per week; completed sessions log every prescribed set with a per-exercise
+working weight that progresses week over week, fatigue on later sets and RPE
+rising with the set number. Future sessions stay pending.
+
+Every generated trainer and client can log in with password "bench123"
+(emails <prefix>-trainer<N>@example.test / <prefix>-client<N>-<M>@example.test).
+The tables are locked against concurrent writes while loading; primary keys
+are assigned locally and the sequences moved past them before commit.
+
+Usage:
+    python generate_data.py                                   # 10 trainers x 50 clients x 6 months
+    python generate_data.py --trainers 200 --clients 100 --months 12
+    python generate_data.py --prefix run2 --seed 7 --no-rollup
+"""
+import argparse
+import io
+import queue
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+import bcrypt
+from app import create_app, db
+from app.services.activity_rollup import activity_rollup
+from app.services.identity_index import identity_index
+from app.services.password_hasher import password_hasher
+
+PASSWORD = 'bench123'
+FLUSH_BYTES = 8 * 1024 * 1024  # COPY chunk size
+ID_TABLES = ['exercises', 'trainers', 'clients', 'workouts', 'workout_exercises', 'workout_assignments']
+
+BODY_PARTS = {
+    'chest': ['pectorals'], 'back': ['lats', 'upper back'], 'upper legs': ['quads', 'hamstrings', 'glutes'],
+    'shoulders': ['delts'], 'upper arms': ['biceps', 'triceps'], 'waist': ['abs'],
+}
+EQUIPMENT = ['barbell', 'dumbbell', 'cable', 'machine', 'body weight', 'kettlebell']
+MOVEMENTS = ['press', 'row', 'curl', 'extension', 'raise', 'squat', 'lunge', 'pulldown', 'fly', 'deadlift']
+CATEGORIES = ['strength', 'hybrid', 'cardio', 'flexibility']
+DIFFICULTIES = ['beginner', 'intermediate', 'advanced']
+GOALS = ['Fuerza', 'Hipertrofia', 'Pérdida de grasa', 'Resistencia', 'Movilidad']
+WEEKDAY_SETS = {2: '1,4', 3: '0,2,4', 4: '0,1,3,4', 5: '0,1,2,3,4'}
+
+
+def _copy_value(value):
+    """Python value -> COPY text format"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, str):
+        return value.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n')
+    return str(value)
+
+
+class CopyWriter:
+    """Background thread running the COPY statements in order, so generation and loading overlap"""
+
+    def __init__(self, cursor, depth=4):
+        self.cursor = cursor
+        self.queue = queue.Queue(maxsize=depth)
+        self.error = None
+        self.thread = threading.Thread(target=self._run, name='copy-writer', daemon=True)
+        self.thread.start()
+
+    def submit(self, statement, data):
+        if self.error:
+            raise self.error
+        self.queue.put((statement, data))
+
+    def close(self):
+        """Wait for the pending COPYs; re-raises the first failure"""
+        self.queue.put(None)
+        self.thread.join()
+        if self.error:
+            raise self.error
+
+    def _run(self):
+        while (item := self.queue.get()) is not None:
+            if self.error:
+                continue  # drain after a failure, the transaction is rolled back
+            try:
+                self.cursor.copy_expert(*item)
+            except Exception as e:
+                self.error = e
+
+
+class CopyBuffer:
+    """Rows for one table, handed to the writer every FLUSH_BYTES (parents first)"""
+
+    def __init__(self, writer, table, columns, parents=()):
+        self.writer = writer
+        self.table = table
+        self.statement = f'COPY {table} ({", ".join(columns)}) FROM STDIN'
+        self.parents = parents
+        self.buffer = io.StringIO()
+        self.rows = 0
+
+    def add(self, *values):
+        self.add_line('\t'.join(map(_copy_value, values)) + '\n')
+
+    def add_line(self, line, rows=1):
+        """Append row(s) already in COPY text format (hot path for workout_logs)"""
+        self.buffer.write(line)
+        self.rows += rows
+        if self.buffer.tell() >= FLUSH_BYTES:
+            self.flush()
+
+    def flush(self):
+        for parent in self.parents:
+            parent.flush()
+        if not self.buffer.tell():
+            return
+        self.buffer.seek(0)
+        self.writer.submit(self.statement, self.buffer)
+        self.buffer = io.StringIO()
+
+
+class DataGenerator:
+    """Builds the synthetic dataset and streams it into PostgreSQL"""
+
+    def __init__(self, trainers=10, clients_per_trainer=50, months=6, workouts_per_trainer=6,
+                 exercises=150, seed=42, prefix='bench', now=None):
+        self.trainers = trainers
+        self.clients_per_trainer = clients_per_trainer
+        self.months = months
+        self.workouts_per_trainer = workouts_per_trainer
+        self.exercises = exercises
+        self.rng = random.Random(seed)
+        self.prefix = prefix
+        self.now = (now or datetime.utcnow()).replace(microsecond=0)
+        self.start = self.now - timedelta(days=round(months * 30.4))
+        self.counts = {}
+        self.next_id = {}
+
+    def run(self, rollup=True):
+        """
+        Generate and load everything in one transaction
+
+        Returns:
+            dict {table: rows written} plus 'seconds'
+        """
+        started = time.perf_counter()
+        password_hash = bcrypt.hashpw(PASSWORD.encode('utf-8'), bcrypt.gensalt(rounds=password_hasher.rounds)).decode('utf-8')
+
+        connection = db.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute('SELECT NOT EXISTS (SELECT 1 FROM workout_assignments)')
+            empty_before = cursor.fetchone()[0]
+            self._skip_fk_triggers(cursor)
+            self._lock_tables(cursor)
+
+            writer = CopyWriter(cursor)
+            try:
+                client_ids = self._load(writer, password_hash)
+            finally:
+                writer.close()
+            for table in ID_TABLES:
+                cursor.execute(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), %s, false)",
+                               (self.next_id[table],))
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
+
+        # COPY bypasses the ORM events that index logins
+        self.counts['user_identities'] = identity_index.rebuild()
+        db.session.commit()
+
+        if rollup:
+            # Set-based rebuild (whole table when the database held no activity before)
+            self.counts['client_daily_activity'] = activity_rollup.rebuild(
+                client_ids=None if empty_before else client_ids
+            )
+            db.session.commit()
+
+        with db.engine.connect() as conn:
+            conn.execution_options(isolation_level='AUTOCOMMIT').exec_driver_sql('ANALYZE')
+
+        self.counts['seconds'] = round(time.perf_counter() - started, 1)
+        return self.counts
+
+    @staticmethod
+    def _skip_fk_triggers(cursor):
+        """
+        Skip per-row foreign key checks for this transaction (superuser only)
+
+        Every row references IDs generated in the same transaction, so the checks
+        can't fail - they are just the most expensive part of COPY.
+        """
+        cursor.execute('SELECT rolsuper FROM pg_roles WHERE rolname = current_user')
+        if cursor.fetchone()[0]:
+            cursor.execute("SET LOCAL session_replication_role = 'replica'")
+
+    def _lock_tables(self, cursor):
+        """Block concurrent writers and read the next free ID of each table"""
+        cursor.execute(f'LOCK TABLE {", ".join(ID_TABLES)}, workout_logs IN SHARE ROW EXCLUSIVE MODE')
+        for table in ID_TABLES:
+            cursor.execute(f"SELECT nextval(pg_get_serial_sequence('{table}', 'id'))")
+            self.next_id[table] = cursor.fetchone()[0]
+
+    def _take_ids(self, table, count):
+        """Assign count consecutive IDs; returns the first one"""
+        first = self.next_id[table]
+        self.next_id[table] += count
+        return first
+
+    # ==================== GENERATION ====================
+
+    def _load(self, writer, password_hash):
+        rng = self.rng
+        exercise_ids = self._load_exercises(writer)
+
+        trainers = CopyBuffer(writer, 'trainers', ['id', 'email', 'password_hash', 'name', 'business_name',
+                                                   'created_at', 'updated_at'])
+        clients = CopyBuffer(writer, 'clients', [
+            'id', 'email', 'password_hash', 'name', 'trainer_id', 'is_active', 'gender', 'age', 'goals',
+            'registered_at', 'created_at', 'updated_at'
+        ], parents=[trainers])
+        workouts = CopyBuffer(writer, 'workouts', [
+            'id', 'name', 'description', 'trainer_id', 'category', 'difficulty', 'duration',
+            'program_duration_weeks', 'scheduled_days', 'created_at', 'updated_at'
+        ], parents=[trainers])
+        workout_exercises = CopyBuffer(writer, 'workout_exercises', [
+            'id', 'workout_id', 'exercise_id', 'order_index', 'sets', 'reps', 'rest_seconds'
+        ], parents=[workouts])
+        assignments = CopyBuffer(writer, 'workout_assignments', [
+            'id', 'workout_id', 'client_id', 'trainer_id', 'assigned_date', 'status', 'started_at',
+            'completed_at', 'scheduled_days', 'start_date', 'end_date', 'expected_sessions',
+            'created_at', 'updated_at'
+        ], parents=[clients, workout_exercises])
+        logs = CopyBuffer(writer, 'workout_logs', [
+            'assignment_id', 'workout_exercise_id', 'set_number', 'reps_completed', 'weight_used', 'rpe',
+            'logged_at'
+        ], parents=[assignments])
+
+        total_clients = self.trainers * self.clients_per_trainer
+        next_trainer = self._take_ids('trainers', self.trainers)
+        next_client = first_client = self._take_ids('clients', total_clients)
+        next_workout = self._take_ids('workouts', self.trainers * self.workouts_per_trainer)
+
+        for t in range(self.trainers):
+            trainer_id = next_trainer + t
+            trainers.add(trainer_id, f'{self.prefix}-trainer{t}@example.test', password_hash,
+                         f'Trainer {t}', f'Gym {t}', self.start, self.start)
+
+            # Workouts and their prescriptions
+            plans = []
+            exercise_rows = []
+            for w in range(self.workouts_per_trainer):
+                workout_id = next_workout
+                next_workout += 1
+                prescriptions = [
+                    (exercise_id, order, rng.randint(3, 5), rng.choice([5, 8, 10, 12, 15]))
+                    for order, exercise_id in enumerate(rng.sample(exercise_ids, k=min(len(exercise_ids), rng.randint(4, 7))))
+                ]
+                workouts.add(workout_id, f'Workout {t}-{w}', 'Generated workout', trainer_id,
+                             rng.choice(CATEGORIES), rng.choice(DIFFICULTIES), rng.choice([30, 45, 60, 75]),
+                             rng.choice([4, 8, 12]), '0,2,4', self.start, self.start)
+                plans.append([workout_id, prescriptions])
+                exercise_rows.extend((workout_id, prescription) for prescription in prescriptions)
+
+            first_we = self._take_ids('workout_exercises', len(exercise_rows))
+            we_ids = {}
+            for offset, (workout_id, (exercise_id, order, sets, reps)) in enumerate(exercise_rows):
+                we_id = first_we + offset
+                workout_exercises.add(we_id, workout_id, exercise_id, order, sets, reps, rng.choice([60, 90, 120]))
+                we_ids[(workout_id, order)] = we_id
+            for plan in plans:
+                plan[1] = [(we_ids[(plan[0], order)], sets, reps) for _, order, sets, reps in plan[1]]
+
+            for c in range(self.clients_per_trainer):
+                client_id = next_client
+                next_client += 1
+                joined = self.start - timedelta(days=rng.randint(0, 60))
+                clients.add(client_id, f'{self.prefix}-client{t}-{c}@example.test', password_hash,
+                            f'Client {t}-{c}', trainer_id, rng.random() > 0.1,
+                            rng.choice(['male', 'female', 'other']), rng.randint(18, 65), rng.choice(GOALS),
+                            joined, joined, joined)
+                self._client_history(client_id, trainer_id, plans, assignments, logs)
+
+        for buffer in (logs, trainers, clients, workouts, workout_exercises):
+            buffer.flush()  # no-op for buffers already flushed as parents
+        for buffer in (trainers, clients, workouts, workout_exercises, assignments, logs):
+            self.counts[buffer.table] = buffer.rows
+        return list(range(first_client, next_client))
+
+    def _client_history(self, client_id, trainer_id, plans, assignments, logs):
+        """One client's sessions from start to a few days past now"""
+        rng = self.rng
+        adherence = rng.betavariate(4, 2)
+        per_week = rng.choice([2, 3, 3, 4, 5])
+        weekdays = [int(day) for day in WEEKDAY_SETS[per_week].split(',')]
+        working_weight = {}  # workout_exercise_id -> starting kg
+
+        sessions = []
+        week_start = self.start - timedelta(days=self.start.weekday())
+        end = self.now + timedelta(days=7)
+        week = 0
+        while week_start < end:
+            for weekday in weekdays:
+                day = week_start + timedelta(days=weekday, hours=rng.gauss(18, 2) % 24)
+                if self.start <= day < end:
+                    sessions.append((week, day))
+            week += 1
+            week_start += timedelta(days=7)
+        if not sessions:
+            return
+
+        first_id = self._take_ids('workout_assignments', len(sessions))
+        for offset, (week, assigned) in enumerate(sessions):
+            assignment_id = first_id + offset
+            workout_id, prescriptions = plans[offset % len(plans)]
+
+            started_at = completed_at = None
+            if assigned > self.now:
+                status = 'pending'
+            else:
+                roll = rng.random()
+                if roll < adherence:
+                    status = 'completed'
+                    started_at = assigned + timedelta(minutes=rng.randint(0, 90))
+                    completed_at = min(started_at + timedelta(minutes=rng.randint(35, 80)), self.now)
+                elif roll < adherence + (1 - adherence) * 0.4:
+                    status = 'skipped'
+                else:
+                    status = 'pending'
+
+            assignments.add(assignment_id, workout_id, client_id, trainer_id, assigned, status, started_at,
+                            completed_at, None, assigned, assigned + timedelta(weeks=4), 12, assigned,
+                            completed_at or assigned)
+            if status != 'completed':
+                continue
+
+            # One COPY line per set, written once per session
+            lines = []
+            elapsed = 0
+            random = rng.random
+            duration = (completed_at - started_at).total_seconds()
+            for we_id, sets, reps in prescriptions:
+                base = working_weight.setdefault(we_id, rng.choice([10, 15, 20, 30, 40, 50, 60, 80, 100]))
+                prefix = f'{assignment_id}\t{we_id}\t'
+                weight = f'{min(round(base * (1 + 0.01 * week) / 2.5) * 2.5, 999):.2f}'
+                for set_number in range(1, sets + 1):
+                    elapsed = min(elapsed + 60 + int(random() * 120), duration)
+                    lines.append(
+                        f'{prefix}{set_number}\t{max(1, reps - int(random() * set_number))}\t{weight}\t'
+                        f'{min(10, 5 + set_number + (random() < 0.5))}\t{started_at + timedelta(seconds=elapsed)}\n'
+                    )
+            logs.add_line(''.join(lines), rows=len(lines))
+
+    def _load_exercises(self, writer):
+        """Synthetic exercise catalog (external_id <prefix>-ex<N>)"""
+        first_id = self._take_ids('exercises', self.exercises)
+        exercises = CopyBuffer(writer, 'exercises', [
+            'id', 'external_id', 'name', 'body_part', 'equipment', 'target_muscle', 'instructions',
+            'is_custom', 'created_at', 'updated_at'
+        ])
+        body_parts = list(BODY_PARTS)
+        for i in range(self.exercises):
+            body_part = body_parts[i % len(body_parts)]
+            equipment = self.rng.choice(EQUIPMENT)
+            exercises.add(first_id + i, f'{self.prefix}-ex{i}',
+                          f'{equipment} {self.rng.choice(MOVEMENTS)} {i}', body_part, equipment,
+                          self.rng.choice(BODY_PARTS[body_part]), 'Step 1\nStep 2', False, self.start, self.start)
+        exercises.flush()
+        self.counts['exercises'] = exercises.rows
+        return list(range(first_id, first_id + self.exercises))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic FitCompass dataset')
+    parser.add_argument('--trainers', type=int, default=10)
+    parser.add_argument('--clients', type=int, default=50, help='clients per trainer')
+    parser.add_argument('--months', type=float, default=6, help='months of history')
+    parser.add_argument('--workouts', type=int, default=6, help='workouts per trainer')
+    parser.add_argument('--exercises', type=int, default=150)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--prefix', default='bench', help='email / external_id prefix (unique per run)')
+    parser.add_argument('--no-rollup', action='store_true', help='skip the client_daily_activity rebuild')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        print(f"🏗️ Generating {args.trainers} trainers x {args.clients} clients, {args.months} months...")
+        counts = DataGenerator(
+            trainers=args.trainers, clients_per_trainer=args.clients, months=args.months,
+            workouts_per_trainer=args.workouts, exercises=args.exercises, seed=args.seed, prefix=args.prefix
+        ).run(rollup=not args.no_rollup)
+
+        seconds = counts.pop('seconds')
+        for table, rows in counts.items():
+            print(f"  {table:<24} {rows:>12,}")
+        print(f"✅ Done in {seconds}s ({counts['workout_logs'] / max(seconds, 0.001):,.0f} logs/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""
+Refresh scheduler for the materialized client_adherence / exercise_progress tables
+Refreshes every client whose rows are older than half of ANALYTICS_VIEWS_MAX_STALENESS,
+so the API rarely has to refresh inline; exercise_progress is only re-aggregated for
+clients with writes since their last refresh. Run it from cron, or keep it looping with --every.
+
+Usage:
+    python refresh_views.py              # one pass over the stale clients
+    python refresh_views.py --all        # every client, rebuilding all progress (initial load after migration 006)
+    python refresh_views.py --every 60   # loop, one pass every 60 seconds
+"""
+import argparse
+import time
+from datetime import timedelta
+from app import create_app
+from app.services.analytics_views import analytics_views
+
+
+def refresh_pass(refresh_all=False):
+    """Refresh stale (or all) clients and print how many were refreshed"""
+    started = time.perf_counter()
+    if refresh_all:
+        refreshed = analytics_views.refresh_stale(max_age=timedelta(0), rebuild=True)
+    else:
+        refreshed = analytics_views.refresh_stale()
+    print(f"✅ {refreshed} clients refreshed in {time.perf_counter() - started:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Refresh the materialized analytics tables')
+    parser.add_argument('--all', action='store_true', help='refresh every client')
+    parser.add_argument('--every', type=int, help='keep running, one pass every N seconds')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        refresh_pass(args.all)
+        while args.every:
+            time.sleep(args.every)
+            refresh_pass()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""
+Email outbox sender
+Sends the due rows of email_outbox (new emails and retries whose backoff expired).
+The API processes already send in the background; run this from cron as a safety
+net, or as the only sender with EMAIL_BACKGROUND_WORKER=false.
+
+Usage:
+    python send_emails.py              # one pass over the due emails
+    python send_emails.py --every 10   # loop, one pass every 10 seconds
+"""
+import argparse
+import time
+from app import create_app
+from app.services.email_dispatcher import email_dispatcher
+
+
+def send_pass():
+    """Send due emails and print the outcome"""
+    started = time.perf_counter()
+    totals = email_dispatcher.dispatch_pending()
+    print(f"✅ {totals['sent']} sent, {totals['retried']} to retry, {totals['failed']} failed "
+          f"in {time.perf_counter() - started:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Send queued emails from email_outbox')
+    parser.add_argument('--every', type=int, help='keep running, one pass every N seconds')
+    args = parser.parse_args()
+
+    if not email_dispatcher.enabled:
+        print("❌ No email transport configured (SENDGRID_API_KEY / EMAIL_TRANSPORT)")
+        return
+
+    app = create_app()
+    with app.app_context():
+        send_pass()
+        while args.every:
+            time.sleep(args.every)
+            send_pass()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,31 @@
+"""
+Sync script for the local exercise catalog
+Mirrors ExerciseDB into the exercises table (served by GET /api/exercises).
+
+Usage:
+    python sync_exercises.py            # full catalog
+    python sync_exercises.py 100        # first 100 exercises only
+"""
+import sys
+from app import create_app
+from app.services.exercisedb_service import exercisedb_service
+
+
+def sync(limit=None):
+    """Run the bulk sync and print counts and timings"""
+    app = create_app()
+
+    with app.app_context():
+        print("🏋️ Syncing exercises from ExerciseDB...")
+        result = exercisedb_service.sync_exercises_to_database(limit=limit)
+
+        timings = result['timings']
+        print(
+            f"✅ {result['synced']} new, {result['updated']} updated, "
+            f"{result['unchanged']} unchanged, {result['errors']} errors"
+        )
+        print(f"⏱️ fetch {timings['fetch']}s · diff {timings['diff']}s · write {timings['write']}s")
+
+
+if __name__ == '__main__':
+    sync(int(sys.argv[1]) if len(sys.argv) > 1 else None)
@@ -6,10 +6,11 @@ Valida que todos los endpoints críticos estén funcionando correctamente.
 import requests
 import json
 import sys
+from collections import namedtuple
 from datetime import datetime
 
 # Configuración
-BASE_URL = "http://localhost:5000"
+BASE_URL = "http://localhost:5000/api"
 TIMEOUT = 5  # segundos
 
 class Colors:
@@ -33,11 +34,84 @@ def print_error(text):
 def print_warning(text):
     print(f"{Colors.YELLOW}⚠ {text}{Colors.END}")
 
-# Variables globales para el test
-trainer_token = None
-client_token = None
-client_id = None
-workout_id = None
+# Definición de endpoints: (método, path, status esperado, usuario, body, descripción)
+# Los valores "{nombre}" se completan con el contexto del test (IDs creados, tokens, etc.);
+# también los usa benchmark_endpoints.py, así que cada endpoint nuevo se agrega acá.
+Endpoint = namedtuple('Endpoint', ['method', 'path', 'expected_status', 'user', 'data', 'description'])
+
+ENDPOINTS = {
+    'health': Endpoint('GET', '/health', 200, None, None, 'GET /health'),
+    'auth.register': Endpoint('POST', '/auth/register', 201, None, {
+        'email': 'trainer_test_{unique}@test.com',
+        'password': '{password}',
+        'name': 'Test Trainer'
+    }, 'POST /auth/register (Trainer)'),
+    'auth.login': Endpoint('POST', '/auth/login', 200, None, {
+        'email': '{trainer_email}',
+        'password': '{password}'
+    }, 'POST /auth/login'),
+    'auth.me': Endpoint('GET', '/auth/me', 200, 'trainer', None, 'GET /auth/me'),
+    'auth.me.invalid': Endpoint('GET', '/auth/me', 422, 'invalid', None, 'GET /auth/me (Invalid token)'),
+    'clients.create': Endpoint('POST', '/clients', 201, 'trainer', {
+        'name': 'Test Client for API',
+        'email': 'api_client_{unique}@test.com',
+        'phone': '+54 11 1234-5678'
+    }, 'POST /clients (Create)'),
+    'clients.list': Endpoint('GET', '/clients', 200, 'trainer', None, 'GET /clients (List)'),
+    'clients.get': Endpoint('GET', '/clients/{client_id}', 200, 'trainer', None, 'GET /clients/{id} (Get one)'),
+    'clients.update': Endpoint('PUT', '/clients/{client_id}', 200, 'trainer', {
+        'name': 'Updated Client Name'
+    }, 'PUT /clients/{id} (Update)'),
+    'exercises.list': Endpoint('GET', '/exercises', 200, 'trainer', None, 'GET /exercises (List)'),
+    'workouts.create': Endpoint('POST', '/workouts', 201, 'trainer', {
+        'name': 'Test Workout API',
+        'description': 'Workout de prueba para health check',
+        'exercises': [{'exercise_id': '{exercise_id}', 'sets': 3, 'reps': 10, 'rest_seconds': 60, 'order': 1}]
+    }, 'POST /workouts (Create)'),
+    'workouts.list': Endpoint('GET', '/workouts', 200, 'trainer', None, 'GET /workouts (List)'),
+    'workouts.get': Endpoint('GET', '/workouts/{workout_id}', 200, 'trainer', None, 'GET /workouts/{id} (Get one)'),
+    'assignments.create': Endpoint('POST', '/assignments', 201, 'trainer', {
+        'workout_id': '{workout_id}',
+        'client_id': '{client_id}'
+    }, 'POST /assignments (Assign to client)'),
+    'assignments.client': Endpoint('GET', '/assignments/client/{client_id}', 200, 'trainer', None,
+                                   'GET /assignments/client/{id}'),
+    'sync.changes': Endpoint('GET', '/sync/changes', 200, 'trainer', None, 'GET /sync/changes'),
+    'analytics.trainer': Endpoint('GET', '/trainers/me/analytics', 200, 'trainer', None,
+                                  'GET /trainers/me/analytics (General)'),
+    'analytics.client': Endpoint('GET', '/analytics/client/{client_id}', 200, 'trainer', None,
+                                 'GET /analytics/client/{id}'),
+    'analytics.adherence': Endpoint('GET', '/analytics/adherence', 200, 'trainer', None,
+                                    'GET /analytics/adherence'),
+    'analytics.progress': Endpoint('GET', '/analytics/progress/{client_id}', 200, 'trainer', None,
+                                   'GET /analytics/progress/{id}'),
+}
+
+
+def resolve(value, context):
+    """Completa los "{nombre}" de un path o body con el contexto (un "{id}" solo conserva el tipo)"""
+    if isinstance(value, dict):
+        return {key: resolve(item, context) for key, item in value.items()}
+    if isinstance(value, list):
+        return [resolve(item, context) for item in value]
+    if isinstance(value, str):
+        if value.startswith('{') and value.endswith('}') and value[1:-1] in context:
+            return context[value[1:-1]]
+        return value.format(**context)
+    return value
+
+
+def auth_header(user, context):
+    """Header Authorization para el usuario del endpoint ('trainer', 'client', 'invalid' o None)"""
+    if user == 'invalid':
+        return {"Authorization": "Bearer invalid_token"}
+    if user:
+        return {"Authorization": f"Bearer {context[f'{user}_token']}"}
+    return None
+
+
+# Contexto compartido por los tests (tokens e IDs creados)
+context = {'password': 'Test123!', 'exercise_id': 1}
 errors = []
 
 def test_endpoint(method, endpoint, expected_status, data=None, headers=None, description=""):
@@ -75,228 +149,120 @@ def test_endpoint(method, endpoint, expected_status, data=None, headers=None, de
         errors.append(error_msg)
         return False, None
 
+def run_endpoint(name):
+    """Prueba un endpoint de ENDPOINTS con el contexto actual"""
+    endpoint = ENDPOINTS[name]
+    params = dict(context, unique=datetime.now().timestamp())
+    return test_endpoint(
+        endpoint.method, resolve(endpoint.path, params), endpoint.expected_status,
+        data=resolve(endpoint.data, params),
+        headers=auth_header(endpoint.user, params),
+        description=endpoint.description
+    )
+
 def test_auth_endpoints():
     """Test de endpoints de autenticación"""
-    global trainer_token, client_token
-
     print_header("1. Testing Authentication Endpoints")
 
     # Registro de Trainer
-    trainer_data = {
-        "email": f"trainer_test_{datetime.now().timestamp()}@test.com",
-        "password": "Test123!",
-        "name": "Test Trainer",
-        "role": "trainer"
-    }
-
-    success, response = test_endpoint(
-        "POST", "/auth/register", 201,
-        data=trainer_data,
-        description="POST /auth/register (Trainer)"
-    )
+    success, response = run_endpoint('auth.register')
 
     if success and response:
         data = response.json()
-        if "access_token" in data:
-            trainer_token = data["access_token"]
-            print_success(f"  → Token obtenido: {trainer_token[:20]}...")
-
-    # Registro de Cliente
-    client_data = {
-        "email": f"client_test_{datetime.now().timestamp()}@test.com",
-        "password": "Test123!",
-        "name": "Test Client",
-        "role": "client"
-    }
-
-    success, response = test_endpoint(
-        "POST", "/auth/register", 201,
-        data=client_data,
-        description="POST /auth/register (Client)"
-    )
-
-    if success and response:
-        data = response.json()
-        if "access_token" in data:
-            client_token = data["access_token"]
+        if "token" in data:
+            context['trainer_token'] = data["token"]
+            context['trainer_email'] = data["user"]["email"]
+            print_success(f"  → Token obtenido: {data['token'][:20]}...")
 
     # Login
-    login_data = {
-        "email": trainer_data["email"],
-        "password": trainer_data["password"]
-    }
-
-    test_endpoint(
-        "POST", "/auth/login", 200,
-        data=login_data,
-        description="POST /auth/login"
-    )
+    if 'trainer_email' in context:
+        run_endpoint('auth.login')
+        run_endpoint('auth.me')
 
     # Verificar token inválido
-    test_endpoint(
-        "GET", "/auth/me", 401,
-        headers={"Authorization": "Bearer invalid_token"},
-        description="GET /auth/me (Invalid token)"
-    )
+    run_endpoint('auth.me.invalid')
 
 def test_client_endpoints():
     """Test de endpoints de clientes"""
-    global client_id
-
     print_header("2. Testing Client Endpoints")
 
-    if not trainer_token:
+    if 'trainer_token' not in context:
         print_warning("Saltando tests de clientes (no hay token de trainer)")
         return
 
-    headers = {"Authorization": f"Bearer {trainer_token}"}
-
     # Crear cliente
-    client_data = {
-        "name": "Test Client for API",
-        "email": f"api_client_{datetime.now().timestamp()}@test.com",
-        "phone": "+54 11 1234-5678"
-    }
-
-    success, response = test_endpoint(
-        "POST", "/clients", 201,
-        data=client_data,
-        headers=headers,
-        description="POST /clients (Create)"
-    )
+    success, response = run_endpoint('clients.create')
 
     if success and response:
         data = response.json()
-        if "id" in data:
-            client_id = data["id"]
-            print_success(f"  → Cliente creado con ID: {client_id}")
+        if "data" in data:
+            context['client_id'] = data["data"]["id"]
+            print_success(f"  → Cliente creado con ID: {context['client_id']}")
 
     # Listar clientes
-    test_endpoint(
-        "GET", "/clients", 200,
-        headers=headers,
-        description="GET /clients (List)"
-    )
+    run_endpoint('clients.list')
 
-    # Obtener cliente específico
-    if client_id:
-        test_endpoint(
-            "GET", f"/clients/{client_id}", 200,
-            headers=headers,
-            description=f"GET /clients/{client_id} (Get one)"
-        )
-
-        # Actualizar cliente
-        update_data = {"name": "Updated Client Name"}
-        test_endpoint(
-            "PUT", f"/clients/{client_id}", 200,
-            data=update_data,
-            headers=headers,
-            description=f"PUT /clients/{client_id} (Update)"
-        )
+    # Obtener y actualizar cliente específico
+    if 'client_id' in context:
+        run_endpoint('clients.get')
+        run_endpoint('clients.update')
 
 def test_workout_endpoints():
     """Test de endpoints de workouts"""
-    global workout_id
-
     print_header("3. Testing Workout Endpoints")
 
-    if not trainer_token:
+    if 'trainer_token' not in context:
         print_warning("Saltando tests de workouts (no hay token de trainer)")
         return
 
-    headers = {"Authorization": f"Bearer {trainer_token}"}
+    # Catálogo de ejercicios
+    run_endpoint('exercises.list')
 
     # Crear workout
-    workout_data = {
-        "name": "Test Workout API",
-        "description": "Workout de prueba para health check",
-        "exercises": [
-            {
-                "exercise_id": 1,
-                "sets": 3,
-                "reps": 10,
-                "rest_seconds": 60,
-                "order": 1
-            }
-        ]
-    }
-
-    success, response = test_endpoint(
-        "POST", "/workouts", 201,
-        data=workout_data,
-        headers=headers,
-        description="POST /workouts (Create)"
-    )
+    success, response = run_endpoint('workouts.create')
 
     if success and response:
         data = response.json()
-        if "id" in data:
-            workout_id = data["id"]
-            print_success(f"  → Workout creado con ID: {workout_id}")
+        if "data" in data:
+            context['workout_id'] = data["data"]["id"]
+            print_success(f"  → Workout creado con ID: {context['workout_id']}")
 
     # Listar workouts
-    test_endpoint(
-        "GET", "/workouts", 200,
-        headers=headers,
-        description="GET /workouts (List)"
-    )
+    run_endpoint('workouts.list')
 
     # Obtener workout específico
-    if workout_id:
-        test_endpoint(
-            "GET", f"/workouts/{workout_id}", 200,
-            headers=headers,
-            description=f"GET /workouts/{workout_id} (Get one)"
-        )
+    if 'workout_id' in context:
+        run_endpoint('workouts.get')
 
 def test_assignment_endpoints():
     """Test de endpoints de asignación de workouts"""
     print_header("4. Testing Workout Assignment Endpoints")
 
-    if not trainer_token or not workout_id or not client_id:
+    if 'trainer_token' not in context or 'workout_id' not in context or 'client_id' not in context:
         print_warning("Saltando tests de asignación (faltan datos previos)")
         return
 
-    headers = {"Authorization": f"Bearer {trainer_token}"}
-
     # Asignar workout a cliente
-    assignment_data = {
-        "client_id": client_id,
-        "scheduled_date": datetime.now().strftime("%Y-%m-%d")
-    }
-
-    test_endpoint(
-        "POST", f"/workouts/{workout_id}/assign", 201,
-        data=assignment_data,
-        headers=headers,
-        description="POST /workouts/{id}/assign (Assign to client)"
-    )
+    run_endpoint('assignments.create')
+    run_endpoint('assignments.client')
+    run_endpoint('sync.changes')
 
 def test_analytics_endpoints():
     """Test de endpoints de analytics"""
     print_header("5. Testing Analytics Endpoints")
 
-    if not trainer_token:
+    if 'trainer_token' not in context:
         print_warning("Saltando tests de analytics (no hay token de trainer)")
         return
 
-    headers = {"Authorization": f"Bearer {trainer_token}"}
-
     # Analytics generales
-    test_endpoint(
-        "GET", "/analytics", 200,
-        headers=headers,
-        description="GET /analytics (General)"
-    )
+    run_endpoint('analytics.trainer')
+    run_endpoint('analytics.adherence')
 
     # Analytics por cliente
-    if client_id:
-        test_endpoint(
-            "GET", f"/analytics/clients/{client_id}", 200,
-            headers=headers,
-            description=f"GET /analytics/clients/{client_id}"
-        )
+    if 'client_id' in context:
+        run_endpoint('analytics.client')
+        run_endpoint('analytics.progress')
 
 def test_performance():
     """Test de performance de endpoints críticos"""
@@ -0,0 +1,120 @@
+"""
+Pytest fixtures - FitCompass Pro Backend
+
+Tests run against a real PostgreSQL database (models use ARRAY, date_trunc, etc).
+Set TEST_DATABASE_URL to a throwaway database, e.g.:
+    TEST_DATABASE_URL=postgresql://localhost/fitcompass_test pytest
+"""
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from flask_jwt_extended import create_access_token
+
+TEST_DATABASE_URL = os.getenv('TEST_DATABASE_URL')
+
+
+@pytest.fixture(scope='session')
+def app():
+    """Application configured against TEST_DATABASE_URL (tables created by create_app)"""
+    if not TEST_DATABASE_URL:
+        pytest.skip('TEST_DATABASE_URL not set - skipping database tests')
+
+    os.environ['DATABASE_URL'] = TEST_DATABASE_URL
+
+    from app import create_app
+    app = create_app()
+    app.config['TESTING'] = True
+
+    # Tests dispatch the email outbox explicitly
+    from app.services.email_dispatcher import email_dispatcher
+    email_dispatcher.background = False
+
+    yield app
+
+
+@pytest.fixture
+def db_session(app):
+    """Active app context with every table truncated after the test"""
+    from app import db
+
+    with app.app_context():
+        yield db.session
+
+        db.session.rollback()
+        table_names = ', '.join(table.name for table in db.metadata.sorted_tables)
+        db.session.execute(db.text(f'TRUNCATE {table_names} RESTART IDENTITY CASCADE'))
+        db.session.commit()
+
+        # IDs restart - cached ownership sets would point at the next test's rows
+        from app.services.ownership_cache import ownership_cache
+        ownership_cache.invalidate()
+
+
+@pytest.fixture
+def client(app, db_session):
+    """Flask test client sharing the db_session app context"""
+    return app.test_client()
+
+
+@pytest.fixture
+def auth_headers(db_session):
+    """Factory for Authorization headers carrying a JWT for (user_id, user_type)"""
+    def _auth_headers(user_id, user_type='trainer'):
+        token = create_access_token(identity=user_id, additional_claims={'type': user_type})
+        return {'Authorization': f'Bearer {token}'}
+    return _auth_headers
+
+
+@pytest.fixture
+def fake_exercisedb():
+    """
+    Local HTTP server standing in for RapidAPI ExerciseDB
+
+    Set server.routes[path] to the JSON payload (or an int status code) for a path
+    and server.delays[path] to a response delay in seconds. server.hits counts
+    requests per path; server.connections collects client (host, port) pairs, one
+    per TCP connection (the handler speaks HTTP/1.1 keep-alive).
+    """
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            path = self.path.split('?', 1)[0]
+            with self.server.lock:
+                self.server.hits[path] = self.server.hits.get(path, 0) + 1
+                self.server.connections.add(self.client_address)
+
+            if path in self.server.delays:
+                time.sleep(self.server.delays[path])
+
+            payload = self.server.routes.get(path, 404)
+            status, body = (payload, {}) if isinstance(payload, int) else (200, payload)
+
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.routes = {}
+    server.delays = {}
+    server.hits = {}
+    server.connections = set()
+    server.lock = threading.Lock()
+    server.url = f'http://127.0.0.1:{server.server_port}'
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
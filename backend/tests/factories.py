@@ -0,0 +1,102 @@
+"""
+Test data factories - generated datasets for analytics and query-count tests
+"""
+import random
+from datetime import datetime, timedelta
+from app import db
+from app.services.activity_rollup import activity_rollup
+from app.models import (
+    Trainer, Client, Workout, Exercise, WorkoutExercise, WorkoutAssignment, WorkoutLog
+)
+
+STATUSES = ['pending', 'in_progress', 'completed', 'skipped']
+
+
+def generate_dataset(clients_per_trainer=10, trainers=1, days=21, exercises=6,
+                     workouts_per_trainer=3, seed=42, now=None):
+    """
+    Create trainers, clients, workouts and a random history of assignments/logs
+
+    Returns:
+        dict with lists of created trainers, clients, workouts and assignments
+    """
+    rng = random.Random(seed)
+    now = now or datetime.utcnow()
+
+    exercise_rows = [
+        Exercise(name=f'Exercise {i}', body_part='chest', equipment='barbell', target_muscle='pectorals')
+        for i in range(exercises)
+    ]
+    db.session.add_all(exercise_rows)
+
+    created = {'trainers': [], 'clients': [], 'workouts': [], 'assignments': []}
+
+    for t in range(trainers):
+        trainer = Trainer(email=f'trainer{t}-{seed}@test.com', name=f'Trainer {t}', password_hash='x')
+        db.session.add(trainer)
+        db.session.flush()
+        created['trainers'].append(trainer)
+
+        trainer_workouts = []
+        for w in range(workouts_per_trainer):
+            workout = Workout(name=f'Workout {t}-{w}', trainer_id=trainer.id, duration=45,
+                              program_duration_weeks=4, scheduled_days='0,2,4')
+            db.session.add(workout)
+            db.session.flush()
+            for order, exercise in enumerate(rng.sample(exercise_rows, k=min(3, exercises))):
+                db.session.add(WorkoutExercise(workout_id=workout.id, exercise_id=exercise.id,
+                                               order_index=order, sets=3, reps=10))
+            trainer_workouts.append(workout)
+        created['workouts'].extend(trainer_workouts)
+
+        for c in range(clients_per_trainer):
+            client = Client(email=f'client{t}-{c}-{seed}@test.com', name=f'Client {t}-{c}',
+                            trainer_id=trainer.id, is_active=rng.random() > 0.1)
+            db.session.add(client)
+            created['clients'].append(client)
+        db.session.flush()
+
+        for client in created['clients'][-clients_per_trainer:]:
+            for _ in range(rng.randint(0, days)):
+                assigned = now - timedelta(days=rng.uniform(0, days), hours=rng.uniform(0, 23))
+                status = rng.choice(STATUSES)
+                completed_at = None
+                if status == 'completed':
+                    completed_at = min(assigned + timedelta(hours=rng.uniform(1, 72)), now)
+                assignment = WorkoutAssignment(
+                    workout_id=rng.choice(trainer_workouts).id,
+                    client_id=client.id,
+                    trainer_id=trainer.id,
+                    assigned_date=assigned,
+                    start_date=assigned,
+                    end_date=assigned + timedelta(weeks=4),
+                    expected_sessions=12,
+                    status=status,
+                    started_at=assigned if status in ('in_progress', 'completed') else None,
+                    completed_at=completed_at,
+                )
+                db.session.add(assignment)
+                created['assignments'].append(assignment)
+        db.session.flush()
+
+    for assignment in created['assignments']:
+        if assignment.status not in ('in_progress', 'completed'):
+            continue
+        for we in assignment.workout.exercises.all():
+            for set_number in range(1, we.sets + 1):
+                db.session.add(WorkoutLog(
+                    assignment_id=assignment.id,
+                    workout_exercise_id=we.id,
+                    set_number=set_number,
+                    reps_completed=rng.randint(6, 12),
+                    weight_used=rng.choice([20, 40, 60, 80]),
+                    rpe=rng.randint(5, 9),
+                    logged_at=assignment.started_at,
+                ))
+
+    # Bulk-loaded rows bypass the write paths - backfill the rollup like backfill_rollup.py
+    db.session.flush()
+    activity_rollup.rebuild()
+
+    db.session.commit()
+    return created
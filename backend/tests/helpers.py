@@ -0,0 +1,27 @@
+"""
+Test helpers - SQL statement counting
+"""
+from sqlalchemy import event
+from app import db
+
+
+def capture_queries(fn, *args, **kwargs):
+    """Run fn and return (result, list of SQL statements executed)"""
+    statements = []
+
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.engine
+    event.listen(engine, 'before_cursor_execute', before_execute)
+    try:
+        result = fn(*args, **kwargs)
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_execute)
+    return result, statements
+
+
+def count_queries(fn, *args, **kwargs):
+    """Run fn and return (result, number of SQL statements executed)"""
+    result, statements = capture_queries(fn, *args, **kwargs)
+    return result, len(statements)
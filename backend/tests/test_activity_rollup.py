@@ -0,0 +1,110 @@
+"""
+ActivityRollupService tests - incremental maintenance must match a full rebuild
+"""
+from datetime import datetime, timedelta
+import pytest
+from app import db
+from app.models import ClientDailyActivity, WorkoutAssignment
+from app.services.activity_rollup import RollupOrderError, activity_rollup
+from tests.factories import generate_dataset
+
+
+def rollup_snapshot():
+    """Non-zero rollup rows as comparable tuples"""
+    rows = ClientDailyActivity.query.all()
+    return sorted(
+        (row.trainer_id, row.client_id, row.day, row.assigned, row.completed, row.skipped,
+         row.completions, row.sets_logged, float(row.volume))
+        for row in rows
+        if any([row.assigned, row.completed, row.skipped, row.completions, row.sets_logged, row.volume])
+    )
+
+
+def test_write_paths_keep_rollup_in_sync(client, auth_headers):
+    dataset = generate_dataset(clients_per_trainer=4, seed=11)
+    trainer = dataset['trainers'][0]
+    target = dataset['clients'][0]
+    workout = dataset['workouts'][0]
+    headers = auth_headers(trainer.id)
+
+    response = client.post('/api/assignments', headers=headers, json={
+        'workout_id': workout.id, 'client_id': target.id
+    })
+    assert response.status_code == 201
+    assignment_id = response.get_json()['data']['id']
+
+    response = client.put(f'/api/assignments/{assignment_id}/status', headers=headers,
+                          json={'status': 'completed'})
+    assert response.status_code == 200
+
+    response = client.put(f'/api/assignments/{assignment_id}/status', headers=headers,
+                          json={'status': 'skipped'})
+    assert response.status_code == 200
+
+    workout_exercise = workout.exercises.first()
+    response = client.post('/api/workout-logs', headers=headers, json={
+        'assignment_id': assignment_id,
+        'exercises': [{
+            'workout_exercise_id': workout_exercise.id,
+            'sets': [
+                {'set_number': 1, 'reps_completed': 10, 'weight_used': 50},
+                {'set_number': 2, 'reps_completed': 8, 'weight_used': 55},
+            ]
+        }]
+    })
+    assert response.status_code == 201
+
+    log_id = client.get(f'/api/workout-logs/assignment/{assignment_id}', headers=headers).get_json()['data'][0]['id']
+    assert client.put(f'/api/workout-logs/{log_id}', headers=headers, json={'weight_used': 60}).status_code == 200
+    assert client.delete(f'/api/workout-logs/{log_id}', headers=headers).status_code == 200
+
+    incremental = rollup_snapshot()
+    activity_rollup.rebuild()
+    db.session.commit()
+
+    assert incremental == rollup_snapshot()
+
+
+def test_window_totals_match_raw_queries(db_session):
+    now = datetime.utcnow()
+    dataset = generate_dataset(clients_per_trainer=10, seed=5, now=now)
+    client_ids = [c.id for c in dataset['clients']]
+
+    ranges = [
+        (now - timedelta(days=7), None),
+        (now - timedelta(days=30), None),
+        (now - timedelta(weeks=2), now - timedelta(weeks=1)),
+        (now - timedelta(hours=5), now - timedelta(hours=1)),
+        (None, None),
+    ]
+    for start, end in ranges:
+        totals = activity_rollup.sum_totals(activity_rollup.window_totals(start, end, client_ids=client_ids))
+
+        assigned = WorkoutAssignment.query.filter(WorkoutAssignment.client_id.in_(client_ids))
+        completions = assigned.filter(WorkoutAssignment.status == 'completed')
+        if start:
+            assigned = assigned.filter(WorkoutAssignment.assigned_date >= start)
+            completions = completions.filter(WorkoutAssignment.completed_at >= start)
+        if end:
+            assigned = assigned.filter(WorkoutAssignment.assigned_date < end)
+            completions = completions.filter(WorkoutAssignment.completed_at < end)
+
+        assert totals['assigned'] == assigned.count()
+        assert totals['completed'] == assigned.filter(WorkoutAssignment.status == 'completed').count()
+        assert totals['skipped'] == assigned.filter(WorkoutAssignment.status == 'skipped').count()
+        assert totals['completions'] == completions.count()
+
+
+def test_tracking_after_a_flush_is_rejected(db_session):
+    dataset = generate_dataset(clients_per_trainer=4, seed=16)
+    tracked, flushed = [a for a in dataset['assignments'] if a.status != 'skipped'][:2]
+
+    tracked.status = 'skipped'
+    activity_rollup.track_assignment(tracked)
+    db.session.flush()  # fine: the delta was read before the flush
+
+    flushed.status = 'skipped'
+    db.session.flush()  # e.g. an autoflushing query between the change and track_assignment
+    with pytest.raises(RollupOrderError):
+        activity_rollup.track_assignment(flushed)
+    db.session.rollback()
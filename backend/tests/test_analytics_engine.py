@@ -0,0 +1,119 @@
+"""
+AnalyticsEngine tests - grouped queries must match the per-client loop implementation
+"""
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from app import db
+from app.models import Client, WorkoutAssignment
+from app.services.analytics_engine import analytics_engine
+from tests.factories import generate_dataset
+from tests.helpers import count_queries
+
+
+def legacy_trainer_analytics(trainer_id, now):
+    """Loop implementation previously inlined in get_trainer_analytics (reference)"""
+    seven_days_ago = now - timedelta(days=7)
+
+    total_clients = Client.query.filter_by(trainer_id=trainer_id, is_active=True).count()
+
+    active_clients = db.session.query(
+        func.count(func.distinct(WorkoutAssignment.client_id))
+    ).filter(
+        WorkoutAssignment.trainer_id == trainer_id,
+        WorkoutAssignment.status == 'completed',
+        WorkoutAssignment.completed_at >= seven_days_ago
+    ).scalar() or 0
+
+    workouts_this_week = WorkoutAssignment.query.filter_by(
+        trainer_id=trainer_id, status='completed'
+    ).filter(WorkoutAssignment.completed_at >= seven_days_ago).count()
+
+    total_assignments = WorkoutAssignment.query.filter_by(
+        trainer_id=trainer_id
+    ).filter(WorkoutAssignment.assigned_date >= seven_days_ago).count()
+
+    completed_assignments = WorkoutAssignment.query.filter_by(
+        trainer_id=trainer_id, status='completed'
+    ).filter(WorkoutAssignment.assigned_date >= seven_days_ago).count()
+
+    avg_adherence = (completed_assignments / total_assignments * 100) if total_assignments > 0 else 0
+
+    weekly_activity = []
+    for i in range(7):
+        day = now - timedelta(days=i)
+        day_start = day.replace(hour=0, minute=0, second=0, microsecond=0)
+        day_end = day_start + timedelta(days=1)
+
+        count = WorkoutAssignment.query.filter_by(
+            trainer_id=trainer_id, status='completed'
+        ).filter(
+            WorkoutAssignment.completed_at >= day_start,
+            WorkoutAssignment.completed_at < day_end
+        ).count()
+
+        weekly_activity.append({'date': day_start.isoformat(), 'completed': count})
+
+    clients = Client.query.filter_by(trainer_id=trainer_id, is_active=True).order_by(Client.id).all()
+    clients_adherence = []
+
+    for client in clients:
+        assigned = WorkoutAssignment.query.filter_by(
+            client_id=client.id
+        ).filter(WorkoutAssignment.assigned_date >= seven_days_ago).count()
+
+        completed = WorkoutAssignment.query.filter_by(
+            client_id=client.id, status='completed'
+        ).filter(WorkoutAssignment.assigned_date >= seven_days_ago).count()
+
+        adherence = (completed / assigned * 100) if assigned > 0 else 0
+
+        clients_adherence.append({
+            'clientId': client.id,
+            'name': client.name,
+            'adherence': round(adherence, 1),
+            'workoutsCompleted': completed,
+            'workoutsAssigned': assigned
+        })
+
+    clients_adherence.sort(key=lambda x: x['adherence'])
+
+    return {
+        'totalClients': total_clients,
+        'activeClients': active_clients,
+        'avgAdherence': round(avg_adherence, 1),
+        'workoutsThisWeek': workouts_this_week,
+        'weeklyActivity': list(reversed(weekly_activity)),
+        'clientsAdherence': clients_adherence
+    }
+
+
+def test_trainer_dashboard_matches_legacy_loop(db_session):
+    now = datetime.utcnow()
+    dataset = generate_dataset(clients_per_trainer=25, trainers=2, seed=7, now=now)
+
+    for trainer in dataset['trainers']:
+        expected = legacy_trainer_analytics(trainer.id, now)
+        assert analytics_engine.trainer_dashboard(trainer.id, now=now) == expected
+
+
+def test_trainer_dashboard_query_count_is_constant(db_session):
+    small = generate_dataset(clients_per_trainer=5, seed=1)
+    large = generate_dataset(clients_per_trainer=60, seed=2)
+
+    _, small_queries = count_queries(analytics_engine.trainer_dashboard, small['trainers'][0].id)
+    _, large_queries = count_queries(analytics_engine.trainer_dashboard, large['trainers'][0].id)
+
+    # Active clients, rollup whole days, live partial first day, completions per day
+    assert small_queries == large_queries == 4
+
+
+def test_trainer_analytics_endpoint(client, auth_headers):
+    dataset = generate_dataset(clients_per_trainer=8, seed=3)
+    trainer_id = dataset['trainers'][0].id
+
+    response = client.get('/api/trainers/me/analytics', headers=auth_headers(trainer_id))
+
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert data['totalClients'] == Client.query.filter_by(trainer_id=trainer_id, is_active=True).count()
+    assert len(data['weeklyActivity']) == 7
@@ -0,0 +1,163 @@
+"""
+Materialized client_adherence / exercise_progress - refresh, staleness bound, endpoints
+"""
+from datetime import datetime, timedelta
+from app import db
+from app.models import ClientAdherence, ExerciseProgress, WorkoutAssignment
+from app.services.activity_rollup import activity_rollup
+from app.services.analytics_views import analytics_views
+from tests.factories import generate_dataset
+
+# SELECTs of the plain views in docs/schema.sql
+ADHERENCE_VIEW = """
+SELECT c.id, c.trainer_id, COUNT(wa.id),
+       COUNT(CASE WHEN wa.status = 'completed' THEN 1 END),
+       CASE WHEN COUNT(wa.id) = 0 THEN 0
+            ELSE ROUND((COUNT(CASE WHEN wa.status = 'completed' THEN 1 END)::NUMERIC / COUNT(wa.id)::NUMERIC) * 100, 2)
+       END,
+       MAX(wa.completed_at)
+FROM clients c
+LEFT JOIN workout_assignments wa ON wa.client_id = c.id AND wa.assigned_date >= CURRENT_DATE - INTERVAL '30 days'
+GROUP BY c.id, c.trainer_id
+"""
+PROGRESS_VIEW = """
+SELECT c.id, e.id, wl.logged_at::DATE, ROUND(AVG(wl.weight_used), 2), MAX(wl.weight_used), SUM(wl.reps_completed)
+FROM clients c
+JOIN workout_assignments wa ON wa.client_id = c.id
+JOIN workout_logs wl ON wl.assignment_id = wa.id
+JOIN workout_exercises we ON we.id = wl.workout_exercise_id
+JOIN exercises e ON e.id = we.exercise_id
+GROUP BY c.id, e.id, wl.logged_at::DATE
+"""
+
+
+def test_refresh_matches_schema_views(db_session):
+    generate_dataset(clients_per_trainer=6, days=40, seed=201)
+
+    analytics_views.refresh()
+    db.session.commit()
+
+    adherence = sorted(
+        (row.client_id, row.trainer_id, row.total_assigned, row.total_completed, row.adherence_percentage,
+         row.last_workout_completed)
+        for row in ClientAdherence.query.all()
+    )
+    progress = sorted(
+        (row.client_id, row.exercise_id, row.workout_date, row.avg_weight, row.max_weight, row.total_reps)
+        for row in ExerciseProgress.query.all()
+    )
+    assert adherence == sorted(tuple(row) for row in db.session.execute(db.text(ADHERENCE_VIEW)))
+    assert progress == sorted(tuple(row) for row in db.session.execute(db.text(PROGRESS_VIEW)))
+    assert progress
+
+
+def test_accessors_refresh_rows_older_than_the_bound(db_session):
+    dataset = generate_dataset(clients_per_trainer=2, days=5, seed=202)
+    client = dataset['clients'][0]
+
+    assigned = ClientAdherence.for_client(client.id).total_assigned  # missing row - refreshed inline
+
+    db.session.add(WorkoutAssignment(workout_id=dataset['workouts'][0].id, client_id=client.id,
+                                     trainer_id=client.trainer_id, assigned_date=datetime.utcnow(),
+                                     status='completed', completed_at=datetime.utcnow()))
+    db.session.commit()
+
+    # Within the staleness bound the stored row is served
+    assert ClientAdherence.for_client(client.id).total_assigned == assigned
+
+    ClientAdherence.query.filter_by(client_id=client.id).update(
+        {'refreshed_at': datetime.utcnow() - analytics_views.max_staleness - timedelta(seconds=1)}
+    )
+    db.session.commit()
+    assert ClientAdherence.for_client(client.id).total_assigned == assigned + 1
+
+
+def test_accessors_refresh_clients_with_tracked_writes(db_session):
+    dataset = generate_dataset(clients_per_trainer=2, days=5, seed=206)
+    client = dataset['clients'][0]
+    analytics_views.refresh()
+    db.session.commit()
+    completed = ClientAdherence.for_client(client.id).total_completed
+
+    # A just-completed workout shows up without waiting for the staleness bound
+    assignment = WorkoutAssignment(workout_id=dataset['workouts'][0].id, client_id=client.id,
+                                   trainer_id=client.trainer_id, assigned_date=datetime.utcnow(),
+                                   status='completed', completed_at=datetime.utcnow())
+    db.session.add(assignment)
+    db.session.flush()
+    activity_rollup.track_assignment(assignment, created=True)
+    db.session.commit()
+
+    assert ClientAdherence.for_client(client.id).total_completed == completed + 1
+    adherence = db.session.get(ClientAdherence, client.id)
+    assert adherence.data_version == adherence.progress_version
+    assert analytics_views.stale_client_ids(client_ids=[client.id], include_changed=True) == []
+
+
+def test_scheduler_pass_refreshes_stale_clients_in_batches(db_session, monkeypatch):
+    dataset = generate_dataset(clients_per_trainer=5, days=3, seed=203)
+    monkeypatch.setattr(analytics_views, 'BATCH_SIZE', 2)
+
+    assert analytics_views.refresh_stale() == 5
+    assert analytics_views.refresh_stale() == 0
+    assert ClientAdherence.query.count() == 5
+    assert analytics_views.refresh_stale(max_age=timedelta(0)) == 5
+
+    trainer = dataset['trainers'][0]
+    assert analytics_views.stale_client_ids(trainer_id=trainer.id) == []
+
+
+def test_scheduler_rebuilds_progress_only_after_writes(db_session):
+    dataset = generate_dataset(clients_per_trainer=3, days=10, seed=205)
+    analytics_views.refresh_stale(rebuild=True)
+
+    row = ExerciseProgress.query.first()
+    client = next(c for c in dataset['clients'] if c.id == row.client_id)
+    key = (row.client_id, row.exercise_id, row.workout_date)
+    ExerciseProgress.query.filter_by(client_id=row.client_id).update({'sets': 999})  # marker
+    db.session.commit()
+
+    # No writes since the last rebuild - only adherence is recomputed
+    assert analytics_views.refresh_stale(max_age=timedelta(0)) == 3
+    assert db.session.get(ExerciseProgress, key).sets == 999
+
+    # A tracked write bumps data_version in the rollup statement itself
+    assignment = WorkoutAssignment(workout_id=dataset['workouts'][0].id, client_id=client.id,
+                                   trainer_id=client.trainer_id, assigned_date=datetime.utcnow())
+    db.session.add(assignment)
+    db.session.flush()
+    activity_rollup.track_assignment(assignment, created=True)
+    db.session.commit()
+    adherence = db.session.get(ClientAdherence, client.id)
+    assert adherence.data_version > adherence.progress_version
+
+    assert analytics_views.refresh_stale(max_age=timedelta(0)) == 3
+    db.session.expire_all()
+    assert db.session.get(ExerciseProgress, key).sets != 999
+
+
+def test_adherence_and_progress_endpoints(client, auth_headers, db_session):
+    dataset = generate_dataset(clients_per_trainer=4, days=20, seed=204)
+    trainer = dataset['trainers'][0]
+    headers = auth_headers(trainer.id, 'trainer')
+
+    data = client.get('/api/analytics/adherence', headers=headers).get_json()['data']
+    adherence = [row['adherence'] for row in data['clients']]
+    assert len(adherence) == 4 and adherence == sorted(adherence)
+    assert all(row['name'] for row in data['clients'])
+
+    at_risk = client.get(f'/api/analytics/adherence?below={adherence[-1]}', headers=headers).get_json()['data']
+    assert all(row['adherence'] < adherence[-1] for row in at_risk['clients'])
+
+    target_id = ExerciseProgress.query.first().client_id  # rows refreshed by the adherence call
+    progress = client.get(f'/api/analytics/progress/{target_id}', headers=headers).get_json()['data']
+    assert progress['exercises']
+    for exercise in progress['exercises']:
+        dates = [day['date'] for day in exercise['history']]
+        assert exercise['name'] and dates == sorted(dates)
+
+    # Clients may read their own progress only
+    url = f'/api/analytics/progress/{target_id}'
+    assert client.get(url, headers=auth_headers(target_id, 'client')).status_code == 200
+    other_id = next(c.id for c in dataset['clients'] if c.id != target_id)
+    assert client.get(url, headers=auth_headers(other_id, 'client')).status_code == 403
@@ -0,0 +1,55 @@
+"""
+AssignmentSerializer tests - embedded and side-loaded assignment lists
+"""
+from app.models import WorkoutAssignment
+from app.services.assignment_serializer import assignment_serializer
+from tests.factories import generate_dataset
+from tests.helpers import count_queries
+
+
+def test_embedded_mode_matches_to_dict(db_session):
+    dataset = generate_dataset(clients_per_trainer=3, seed=51)
+    assignments = WorkoutAssignment.query.order_by(WorkoutAssignment.id).all()
+
+    expected = [assignment.to_dict() for assignment in assignments]
+    data, included = assignment_serializer.serialize(assignments)
+
+    assert included is None
+    assert data == expected
+
+
+def test_sideload_mode_references_included_entities(db_session):
+    generate_dataset(clients_per_trainer=3, seed=52)
+    assignments = WorkoutAssignment.query.order_by(WorkoutAssignment.id).all()
+    embedded = [assignment.to_dict() for assignment in assignments]
+
+    data, included = assignment_serializer.serialize(assignments, sideload=True)
+
+    assert len(included['workouts']) == len({a.workout_id for a in assignments})
+    for assignment_data, expected in zip(data, embedded):
+        assert 'workout' not in assignment_data
+        workout = included['workouts'][str(assignment_data['workout_id'])]
+        for entry, expected_entry in zip(workout['exercises'], expected['workout']['exercises']):
+            assert 'exercise' not in entry
+            assert included['exercises'][str(entry['exercise_id'])] == expected_entry['exercise']
+
+
+def test_client_assignments_query_count_is_constant(client, auth_headers):
+    few = generate_dataset(clients_per_trainer=1, days=3, seed=55)
+    many = generate_dataset(clients_per_trainer=1, days=40, seed=54)
+    few_ids = (few['trainers'][0].id, few['clients'][0].id)
+    many_ids = (many['trainers'][0].id, many['clients'][0].id)
+    assert 0 < len(few['assignments']) < len(many['assignments'])
+
+    def list_assignments(ids, sideload):
+        trainer_id, client_id = ids
+        response = client.get(f'/api/assignments/client/{client_id}?sideload={sideload}',
+                              headers=auth_headers(trainer_id))
+        assert response.status_code == 200
+        return response.get_json()
+
+    for sideload in ('false', 'true'):
+        _, few_queries = count_queries(list_assignments, few_ids, sideload)
+        body, many_queries = count_queries(list_assignments, many_ids, sideload)
+        assert few_queries == many_queries
+        assert ('included' in body) == (sideload == 'true')
@@ -0,0 +1,30 @@
+"""
+Endpoint benchmark harness - health check definitions driven against a generated dataset
+"""
+from benchmark_endpoints import percentile, run_benchmark
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert [percentile(values, pct) for pct in (50, 95, 99)] == [50, 95, 99]
+    assert percentile([7], 99) == 7
+    assert percentile([], 50) is None
+
+
+def test_benchmark_reports_latency_and_queries(app, db_session):
+    report = run_benchmark(
+        app, names=['health', 'clients.list', 'auth.me.invalid', 'assignments.create'],
+        total=4, concurrency=2, warmup=1, prefix='harness',
+        dataset={'trainers': 1, 'clients_per_trainer': 2, 'months': 1, 'exercises': 5},
+    )
+
+    assert report['dataset']['rows']['clients'] == 2
+    assert list(report['results']) == ['health', 'clients.list', 'auth.me.invalid', 'assignments.create']
+    for result in report['results'].values():
+        assert result['requests'] == 4
+        assert result['errors'] == 0
+        assert result['throughput_rps'] > 0
+        assert 0 < result['latency_ms']['p50'] <= result['latency_ms']['p95'] <= result['latency_ms']['p99']
+
+    assert report['results']['health']['queries_per_request'] == {'mean': 2, 'max': 2}
+    assert report['results']['clients.list']['queries_per_request']['max'] > 0
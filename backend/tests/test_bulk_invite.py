@@ -0,0 +1,98 @@
+"""
+Bulk client invitations - per-row statuses, JSON and CSV input, constant query count
+"""
+import io
+from app import db
+from app.models import Client, OutboxEmail
+from app.services.email_dispatcher import StubTransport, email_dispatcher
+from app.services.identity_index import identity_index
+from tests.factories import generate_dataset
+from tests.helpers import count_queries
+
+
+def _post(client, headers, **kwargs):
+    return client.post('/api/clients/invite', headers=headers, **kwargs)
+
+
+def test_per_row_statuses(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(email_dispatcher, 'transport', StubTransport())
+    dataset = generate_dataset(clients_per_trainer=3, trainers=2, days=1, seed=251)
+    mine = [c for c in dataset['clients'] if c.trainer_id == dataset['trainers'][0].id]
+    other = next(c for c in dataset['clients'] if c.trainer_id != dataset['trainers'][0].id)
+    mine[1].password_hash = 'x'
+    db.session.commit()
+
+    response = _post(client, auth_headers(dataset['trainers'][0].id), json={
+        'client_ids': [mine[0].id, mine[1].id, other.id, mine[0].id],
+        'clients': [
+            {'email': ' New@Test.com ', 'name': 'New', 'age': '31'},
+            {'email': 'new@test.com', 'name': 'Again'},
+            {'email': other.email, 'name': 'Taken'},
+            {'email': mine[2].email},
+            {'name': 'No email'},
+        ]
+    })
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [row['status'] for row in body['results']] == [
+        'invited', 'already_registered', 'not_found', 'duplicate',
+        'invited', 'duplicate', 'email_taken', 'invited', 'invalid'
+    ]
+    assert body['invited'] == 3 and body['created'] == 1
+
+    created = identity_index.find('new@test.com', 'client')
+    assert created.id == body['results'][4]['clientId'] and created.age == 31
+    assert created.invite_token and mine[2].invite_token and not other.invite_token
+    assert {email.to_email for email in OutboxEmail.query} == {mine[0].email, mine[2].email, 'new@test.com'}
+
+    # The new client can be managed right away (identity + ownership caches were updated)
+    assert client.get(f'/api/clients/{created.id}', headers=auth_headers(dataset['trainers'][0].id)).status_code == 200
+
+
+def test_booleans_are_not_client_ids(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(email_dispatcher, 'transport', StubTransport())
+    generate_dataset(clients_per_trainer=2, days=1, seed=253)
+    first = db.session.get(Client, 1)  # JSON true would compare equal to this ID
+    assert first is not None and not first.password_hash
+
+    response = _post(client, auth_headers(first.trainer_id), json={'client_ids': [True, False, 1]})
+    assert response.status_code == 200
+    assert [row['status'] for row in response.get_json()['results']] == ['not_found', 'not_found', 'invited']
+    assert OutboxEmail.query.count() == 1
+
+
+def test_csv_upload_and_body(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(email_dispatcher, 'transport', None)
+    dataset = generate_dataset(clients_per_trainer=1, days=1, seed=252)
+    headers = auth_headers(dataset['trainers'][0].id)
+
+    upload = _post(client, headers, data={'file': (io.BytesIO(b'email,name,phone\na@test.com,Ana,123\n'), 'c.csv')},
+                   content_type='multipart/form-data').get_json()
+    assert upload['results'][0]['status'] == 'invited' and 'register?token=' in upload['results'][0]['invite_link']
+    assert Client.query.filter_by(email='a@test.com').one().phone == '123'
+
+    raw = _post(client, headers, data='Email,Name\nb@test.com,Bea\n', content_type='text/csv').get_json()
+    assert raw['created'] == 1 and OutboxEmail.query.count() == 0
+
+    assert _post(client, headers, data='name\nNo email\n', content_type='text/csv').status_code == 400
+    assert _post(client, headers, json={}).status_code == 400
+
+
+def test_query_count_does_not_grow(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(email_dispatcher, 'transport', StubTransport())
+    dataset = generate_dataset(clients_per_trainer=40, days=1, seed=253)
+    headers = auth_headers(dataset['trainers'][0].id)
+    ids = [c.id for c in dataset['clients']]
+
+    def invite(prefix, count):
+        db.session.expire_all()  # no rows left over in the identity map from the previous call
+        return _post(client, headers, json={
+            'client_ids': ids[:count],
+            'clients': [{'email': f'{prefix}{n}@test.com', 'name': f'C{n}'} for n in range(count)]
+        })
+
+    small, few = count_queries(invite, 'small', 2)
+    large, many = count_queries(invite, 'large', 40)
+    assert small.get_json()['invited'] == 4 and large.get_json()['invited'] == 80
+    assert few == many
+    assert OutboxEmail.query.count() == 84
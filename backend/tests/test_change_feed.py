@@ -0,0 +1,194 @@
+"""
+Delta sync feed - updated_at watermarks and delete tombstones
+"""
+from datetime import datetime, timedelta
+import pytest
+from app import db
+from app.models import Exercise, SyncTombstone, Workout, WorkoutAssignment, WorkoutExercise
+from app.services.change_feed import change_feed
+from tests.factories import generate_dataset
+from tests.helpers import count_queries
+
+
+@pytest.fixture
+def no_lag(monkeypatch):
+    """Exact watermarks (the default look-back would re-send everything created in the test)"""
+    monkeypatch.setattr(change_feed, 'LAG', timedelta(0))
+
+
+def get_changes(client, headers, **params):
+    response = client.get('/api/sync/changes', headers=headers, query_string=params)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()['data']
+
+
+def ids(rows):
+    return sorted(row['id'] for row in rows)
+
+
+def test_initial_sync_returns_everything_in_scope(client, auth_headers, db_session):
+    dataset = generate_dataset(clients_per_trainer=3, trainers=2, days=4, seed=91)
+    trainer = dataset['trainers'][0]
+
+    data = get_changes(client, auth_headers(trainer.id, 'trainer'))
+
+    assert data['reset'] is True
+    assert ids(data['changes']['clients']) == sorted(c.id for c in dataset['clients'] if c.trainer_id == trainer.id)
+    assert ids(data['changes']['workouts']) == sorted(w.id for w in dataset['workouts'] if w.trainer_id == trainer.id)
+    assert ids(data['changes']['assignments']) == sorted(
+        a.id for a in WorkoutAssignment.query.filter_by(trainer_id=trainer.id)
+    )
+    assert data['deleted'] == {'clients': [], 'workouts': [], 'assignments': []}
+
+
+def test_watermark_returns_only_changed_rows(client, auth_headers, db_session, no_lag):
+    dataset = generate_dataset(clients_per_trainer=3, days=4, seed=92)
+    trainer = dataset['trainers'][0]
+    headers = auth_headers(trainer.id, 'trainer')
+
+    watermark = get_changes(client, headers)['watermark']
+    assert get_changes(client, headers, since=watermark)['changes'] == {
+        'clients': [], 'workouts': [], 'assignments': []
+    }
+
+    changed = dataset['clients'][1]
+    changed.goals = 'Run a marathon'
+    db.session.commit()
+
+    data = get_changes(client, headers, since=watermark + 'Z')
+    assert data['reset'] is False
+    assert ids(data['changes']['clients']) == [changed.id]
+    assert data['changes']['workouts'] == []
+    assert data['changes']['assignments'] == []
+
+
+def test_deletes_produce_tombstones_for_cascaded_rows(client, auth_headers, db_session, no_lag):
+    dataset = generate_dataset(clients_per_trainer=3, days=6, seed=93)
+    trainer = dataset['trainers'][0]
+    headers = auth_headers(trainer.id, 'trainer')
+    removed_client = dataset['clients'][0]
+    removed_assignments = sorted(a.id for a in WorkoutAssignment.query.filter_by(client_id=removed_client.id))
+    removed_workouts = {a.workout_id for a in WorkoutAssignment.query.filter_by(client_id=removed_client.id)}
+    assert removed_assignments
+
+    watermark = get_changes(client, headers)['watermark']
+    response = client.delete(f'/api/clients/{removed_client.id}', headers=headers)
+    assert response.status_code == 200
+
+    data = get_changes(client, headers, since=watermark)
+    assert data['deleted']['clients'] == [removed_client.id]
+    assert sorted(data['deleted']['assignments']) == removed_assignments
+
+    # The deleted client sees its own tombstones, other trainers see nothing
+    assert SyncTombstone.query.filter_by(client_id=removed_client.id).count() == (
+        1 + len(removed_assignments) + len(removed_workouts)  # workouts leave the client's scope
+    )
+    other = generate_dataset(clients_per_trainer=1, days=1, seed=94)['trainers'][0]
+    assert get_changes(client, auth_headers(other.id, 'trainer'), since=watermark)['deleted']['clients'] == []
+
+
+def test_nested_writes_mark_the_workout_changed(client, auth_headers, db_session, no_lag):
+    dataset = generate_dataset(clients_per_trainer=2, days=4, seed=97)
+    trainer = dataset['trainers'][0]
+    headers = auth_headers(trainer.id, 'trainer')
+    edited, referencing = [w for w in dataset['workouts'] if w.trainer_id == trainer.id][:2]
+    watermark = get_changes(client, headers)['watermark']
+
+    # Editing one of the workout's exercise rows bumps the workout
+    workout_exercise = WorkoutExercise.query.filter_by(workout_id=edited.id).first()
+    workout_exercise.reps += 2
+    db.session.commit()
+    assert ids(get_changes(client, headers, since=watermark)['changes']['workouts']) == [edited.id]
+
+    # Changing a referenced exercise reaches every workout that embeds it
+    watermark = get_changes(client, headers)['watermark']
+    exercise = db.session.get(Exercise, WorkoutExercise.query.filter_by(workout_id=referencing.id).first().exercise_id)
+    exercise.instructions = 'Updated cues'
+    db.session.commit()
+    expected = sorted({we.workout_id for we in WorkoutExercise.query.filter_by(exercise_id=exercise.id)}
+                      & {w.id for w in dataset['workouts'] if w.trainer_id == trainer.id})
+    assert referencing.id in expected
+    assert ids(get_changes(client, headers, since=watermark)['changes']['workouts']) == expected
+
+
+def test_workout_entering_client_scope_is_returned(client, auth_headers, db_session, no_lag):
+    dataset = generate_dataset(clients_per_trainer=2, days=6, seed=99)
+    member = dataset['clients'][0]
+    headers = auth_headers(member.id, 'client')
+    workout = Workout(name='Older program', trainer_id=member.trainer_id)
+    db.session.add(workout)
+    db.session.commit()
+    watermark = get_changes(client, headers)['watermark']
+
+    # Created before the watermark, assigned after it
+    db.session.add(WorkoutAssignment(workout_id=workout.id, client_id=member.id, trainer_id=member.trainer_id,
+                                     assigned_date=datetime.utcnow()))
+    db.session.commit()
+
+    data = get_changes(client, headers, since=watermark)
+    assert ids(data['changes']['workouts']) == [workout.id]
+    assert len(data['changes']['assignments']) == 1
+
+
+def test_workout_leaving_client_scope_is_tombstoned(client, auth_headers, db_session, no_lag):
+    dataset = generate_dataset(clients_per_trainer=2, days=6, seed=98)
+    member = dataset['clients'][0]
+    headers = auth_headers(member.id, 'client')
+    assignments = WorkoutAssignment.query.filter_by(client_id=member.id).order_by(WorkoutAssignment.id).all()
+    workout_id = assignments[0].workout_id
+    same_workout = [a for a in assignments if a.workout_id == workout_id]
+    watermark = get_changes(client, headers)['watermark']
+
+    # Still assigned through another assignment: no workout tombstone yet
+    for assignment in same_workout[:-1]:
+        db.session.delete(assignment)
+    db.session.commit()
+    assert get_changes(client, headers, since=watermark)['deleted']['workouts'] == []
+
+    db.session.delete(same_workout[-1])
+    db.session.commit()
+    data = get_changes(client, headers, since=watermark)
+    assert data['deleted']['workouts'] == [workout_id]
+    assert sorted(data['deleted']['assignments']) == sorted(a.id for a in same_workout)
+
+
+def test_client_scope(client, auth_headers, db_session):
+    dataset = generate_dataset(clients_per_trainer=2, days=5, seed=95)
+    member = dataset['clients'][0]
+
+    data = get_changes(client, auth_headers(member.id, 'client'), resources='clients,assignments,workouts,trainers')
+
+    assignments = WorkoutAssignment.query.filter_by(client_id=member.id).all()
+    assert ids(data['changes']['clients']) == [member.id]
+    assert ids(data['changes']['assignments']) == sorted(a.id for a in assignments)
+    assert ids(data['changes']['workouts']) == sorted({a.workout_id for a in assignments})
+    assert ids(data['changes']['trainers']) == [member.trainer_id]
+
+
+def test_invalid_params(client, auth_headers, db_session):
+    headers = auth_headers(1, 'trainer')
+    assert client.get('/api/sync/changes?since=yesterday', headers=headers).status_code == 400
+    assert client.get('/api/sync/changes?resources=clients,logs', headers=headers).status_code == 400
+
+
+def test_stale_watermark_forces_full_sync(db_session):
+    dataset = generate_dataset(clients_per_trainer=2, days=2, seed=96)
+    trainer = dataset['trainers'][0]
+
+    since = datetime.utcnow() - change_feed.RETENTION - timedelta(days=1)
+    data = change_feed.changes('trainer', trainer.id, since=since)
+
+    assert data['reset'] is True
+    assert len(data['changes']['clients']) == 2
+
+
+def test_query_count_does_not_grow_with_rows(db_session):
+    small = generate_dataset(clients_per_trainer=2, days=3, seed=97)['trainers'][0]
+    large = generate_dataset(clients_per_trainer=12, days=10, seed=98)['trainers'][0]
+    db.session.expire_all()
+
+    _, small_queries = count_queries(change_feed.changes, 'trainer', small.id)
+    db.session.expire_all()
+    _, large_queries = count_queries(change_feed.changes, 'trainer', large.id)
+
+    assert small_queries == large_queries
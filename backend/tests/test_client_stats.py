@@ -0,0 +1,45 @@
+"""
+ClientStatsLoader tests - batched stats must match the single-client serialization
+"""
+from datetime import datetime, timedelta
+from app.models import Client
+from app.services.client_stats import client_stats_loader
+from tests.factories import generate_dataset
+from tests.helpers import count_queries
+
+
+def test_batched_stats_match_single_client_path(db_session):
+    dataset = generate_dataset(clients_per_trainer=15, seed=21)
+    clients = dataset['clients']
+
+    for period in (None, 7, 30):
+        stats = client_stats_loader.load([c.id for c in clients], period)
+        for client in clients:
+            batched = client.to_dict(include_stats=True, stats_period_days=period, stats=stats[client.id])
+            assert batched == client.to_dict(include_stats=True, stats_period_days=period)
+
+
+def test_format_last_activity_strings():
+    now = datetime.utcnow()
+
+    assert Client.format_last_activity(None) == 'Nunca'
+    assert Client.format_last_activity(now - timedelta(minutes=5)) == 'Hace minutos'
+    assert Client.format_last_activity(now - timedelta(hours=3, minutes=1)) == 'Hace 3 horas'
+    assert Client.format_last_activity(now - timedelta(days=1, hours=1)) == 'Hace 1 día'
+    assert Client.format_last_activity(now - timedelta(days=4, hours=1)) == 'Hace 4 días'
+
+
+def test_get_clients_query_count_is_constant(client, auth_headers):
+    small = generate_dataset(clients_per_trainer=3, seed=31)
+    large = generate_dataset(clients_per_trainer=40, seed=32)
+
+    def list_clients(trainer_id):
+        response = client.get('/api/clients?stats_period_days=30', headers=auth_headers(trainer_id))
+        assert response.status_code == 200
+        return response.get_json()['data']
+
+    small_data, small_queries = count_queries(list_clients, small['trainers'][0].id)
+    large_data, large_queries = count_queries(list_clients, large['trainers'][0].id)
+
+    assert len(large_data) == 40
+    assert small_queries == large_queries
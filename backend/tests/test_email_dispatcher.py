@@ -0,0 +1,85 @@
+"""
+Email outbox - enqueue-only invites, batched delivery, retries with backoff (stub transport)
+"""
+import time
+from datetime import datetime, timedelta
+from app import db
+from app.models import OutboxEmail
+from app.services.email_dispatcher import StubTransport, email_dispatcher
+from tests.factories import generate_dataset
+
+
+def _enqueue(count):
+    for i in range(count):
+        email_dispatcher.enqueue('client_invitation', f'client{i}@test.com', 'Invitación', '<p>Hola</p>')
+    db.session.commit()
+
+
+def test_invite_only_enqueues(client, auth_headers, monkeypatch):
+    transport = StubTransport()
+    monkeypatch.setattr(email_dispatcher, 'transport', transport)
+    dataset = generate_dataset(clients_per_trainer=1, days=1, seed=241)
+    trainer, target = dataset['trainers'][0], dataset['clients'][0]
+
+    response = client.post(f'/api/clients/{target.id}/invite', headers=auth_headers(trainer.id))
+    assert response.status_code == 200
+    email = db.session.get(OutboxEmail, response.get_json()['email_id'])
+    assert email.status == 'pending' and email.to_email == target.email and not transport.sent
+
+    assert email_dispatcher.dispatch_pending() == {'sent': 1, 'retried': 0, 'failed': 0}
+    db.session.refresh(email)
+    assert email.status == 'sent' and email.attempts == 1
+    assert 'register?token=' in transport.sent[0]['html_content']
+
+
+def test_invite_without_transport_returns_the_link(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(email_dispatcher, 'transport', None)
+    dataset = generate_dataset(clients_per_trainer=1, days=1, seed=242)
+
+    response = client.post(f'/api/clients/{dataset["clients"][0].id}/invite',
+                           headers=auth_headers(dataset['trainers'][0].id))
+    assert 'invite_link' in response.get_json() and OutboxEmail.query.count() == 0
+
+
+def test_failed_sends_back_off_then_fail(db_session, monkeypatch):
+    monkeypatch.setattr(email_dispatcher, 'transport', StubTransport(fail=lambda message: True))
+    monkeypatch.setattr(email_dispatcher, 'max_attempts', 2)
+    _enqueue(3)
+    now = datetime.utcnow() + timedelta(seconds=1)
+
+    assert email_dispatcher.dispatch_pending(now=now) == {'sent': 0, 'retried': 3, 'failed': 0}
+    assert email_dispatcher.dispatch_pending(now=now) == {'sent': 0, 'retried': 0, 'failed': 0}  # backing off
+
+    later = now + email_dispatcher.backoff
+    assert email_dispatcher.dispatch_pending(now=later) == {'sent': 0, 'retried': 0, 'failed': 3}
+    assert {(email.status, email.attempts) for email in OutboxEmail.query} == {('failed', 2)}
+    assert 'stub failure' in OutboxEmail.query.first().last_error
+
+
+def test_batches_are_sent_concurrently(db_session, monkeypatch):
+    transport = StubTransport(latency=0.01)
+    monkeypatch.setattr(email_dispatcher, 'transport', transport)
+    monkeypatch.setattr(email_dispatcher, 'batch_size', 50)
+    monkeypatch.setattr(email_dispatcher, 'workers', 8)
+    monkeypatch.setattr(email_dispatcher, '_executor', None)
+    _enqueue(200)
+
+    started = time.perf_counter()
+    totals = email_dispatcher.dispatch_pending(now=datetime.utcnow() + timedelta(seconds=1))
+    elapsed = time.perf_counter() - started
+
+    assert totals['sent'] == 200 and len(transport.sent) == 200
+    assert len({message['id'] for message in transport.sent}) == 200
+    assert elapsed < 200 * transport.latency / 2, f'{200 / elapsed:.0f} emails/s'
+
+
+def test_stats_are_reported_by_health(client, db_session, monkeypatch):
+    monkeypatch.setattr(email_dispatcher, 'transport', StubTransport())
+    _enqueue(3)
+
+    stats = client.get('/api/health').get_json()['email_dispatcher']
+    assert stats['transport'] == 'StubTransport'
+    assert stats['pending'] == 3
+
+    email_dispatcher.dispatch_pending()
+    assert client.get('/api/health').get_json()['email_dispatcher']['pending'] == 0
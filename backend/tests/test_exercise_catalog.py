@@ -0,0 +1,110 @@
+"""
+Exercise catalog tests - GET /api/exercises served from the local exercises table
+"""
+from app import db
+from app.models import Exercise, Trainer
+from app.services.exercise_catalog import exercise_catalog
+
+
+def seed_catalog():
+    trainers = [Trainer(name=f'Trainer {i}', email=f'catalog{i}@test.com', password_hash='x') for i in range(2)]
+    db.session.add_all(trainers)
+    db.session.flush()
+
+    rows = [
+        ('0001', '3/4 sit-up', 'waist', 'body weight', 'abs'),
+        ('0002', 'barbell bench press', 'chest', 'barbell', 'pectorals'),
+        ('0003', 'dumbbell bench press', 'chest', 'dumbbell', 'pectorals'),
+        ('0004', 'barbell full squat', 'upper legs', 'barbell', 'glutes'),
+        ('0005', 'push-up', 'chest', 'body weight', 'pectorals'),
+        ('0006', 'sentadilla búlgara', 'upper legs', 'dumbbell', 'quads'),
+    ]
+    for external_id, name, body_part, equipment, target in rows:
+        db.session.add(Exercise(
+            external_id=external_id, name=name, body_part=body_part, equipment=equipment,
+            target_muscle=target, instructions='Step one\nStep two', is_custom=False
+        ))
+    for trainer in trainers:
+        db.session.add(Exercise(
+            name=f'Custom press {trainer.id}', body_part='chest', equipment='cable',
+            target_muscle='pectorals', is_custom=True, trainer_id=trainer.id
+        ))
+    db.session.commit()
+    return trainers
+
+
+def names(response):
+    assert response.status_code == 200
+    return [exercise['name'] for exercise in response.get_json()]
+
+
+def test_filters_and_search(client):
+    seed_catalog()
+
+    assert names(client.get('/api/exercises?bodyPart=chest')) == [
+        'Barbell Bench Press', 'Dumbbell Bench Press', 'Push-Up'
+    ]
+    assert names(client.get('/api/exercises?bodyPart=chest&equipment=barbell')) == ['Barbell Bench Press']
+    assert names(client.get('/api/exercises?target=glutes')) == ['Barbell Full Squat']
+    assert names(client.get('/api/exercises?search=bench')) == ['Barbell Bench Press', 'Dumbbell Bench Press']
+    assert names(client.get('/api/exercises?search=barb pres')) == ['Barbell Bench Press']
+    assert names(client.get('/api/exercises?search=sentadilla')) == ['Sentadilla Búlgara']
+    assert names(client.get('/api/exercises?search=!!')) == []
+
+    exercise = client.get('/api/exercises?search=sit').get_json()[0]
+    assert exercise == {
+        'id': 'exercisedb-0001',
+        'externalId': '0001',
+        'name': '3/4 Sit-Up',
+        'bodyPart': 'waist',
+        'equipment': 'body weight',
+        'target': 'abs',
+        'gifUrl': '',
+        'instructions': ['Step one', 'Step two'],
+        'isCustom': False
+    }
+    assert client.get('/api/exercises/exercisedb-0001').get_json() == exercise
+
+
+def test_custom_exercises_only_for_their_trainer(client, auth_headers):
+    trainers = seed_catalog()
+
+    anonymous = names(client.get('/api/exercises?bodyPart=chest'))
+    own = names(client.get('/api/exercises?bodyPart=chest', headers=auth_headers(trainers[0].id)))
+
+    assert own == anonymous + [f'Custom press {trainers[0].id}']
+
+
+def test_offset_and_keyset_pagination(client):
+    seed_catalog()
+    all_names = names(client.get('/api/exercises'))
+    assert len(all_names) == 6
+
+    assert names(client.get('/api/exercises?limit=2&offset=2')) == all_names[2:4]
+
+    pages = []
+    cursor = None
+    while True:
+        url = '/api/exercises?limit=4' + (f'&after={cursor}' if cursor else '')
+        response = client.get(url)
+        pages.append(names(response))
+        cursor = response.headers.get('X-Next-Cursor')
+        if cursor is None:
+            break
+
+    assert pages == [all_names[:4], all_names[4:]]
+
+
+def test_name_search_can_use_gin_index(db_session):
+    seed_catalog()
+    query = exercise_catalog.search(search='bench')
+
+    # Planner may prefer a seq scan on a tiny table - disable it to prove the index matches
+    db.session.execute(db.text('SET LOCAL enable_seqscan = off'))
+    plan = '\n'.join(row[0] for row in db.session.execute(db.text(
+        "EXPLAIN SELECT id FROM exercises "
+        "WHERE to_tsvector('spanish', name) @@ to_tsquery('spanish', 'bench:*')"
+    )))
+
+    assert len(query[0]) == 2
+    assert 'idx_exercises_name_search' in plan
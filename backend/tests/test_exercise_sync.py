@@ -0,0 +1,51 @@
+"""
+ExerciseDB sync tests - bulk upsert with content-hash diffing
+"""
+from app.models import Exercise
+from app.services.exercisedb_service import ExerciseDBService
+from tests.helpers import count_queries
+
+
+def api_exercise(i, name=None):
+    return {
+        'id': f'{i:04d}',
+        'name': name or f'exercise {i}',
+        'bodyPart': 'chest' if i % 2 else 'back',
+        'equipment': 'barbell',
+        'target': 'pectorals',
+        'gifUrl': f'https://example.com/{i}.gif',
+        'secondaryMuscles': ['triceps'],
+        'instructions': ['Step one', 'Step two, slowly']
+    }
+
+
+def test_sync_inserts_updates_and_skips_unchanged(db_session, fake_exercisedb):
+    catalog = [api_exercise(i) for i in range(1, 1201)]
+    fake_exercisedb.routes['/exercises'] = catalog
+    service = ExerciseDBService(api_url=fake_exercisedb.url)
+
+    result, queries = count_queries(service.sync_exercises_to_database)
+    assert (result['synced'], result['updated'], result['unchanged'], result['errors']) == (1200, 0, 0, 0)
+    assert set(result['timings']) == {'fetch', 'diff', 'write'}
+    assert queries <= 1 + 3  # existing catalog + one upsert per 500 rows
+
+    exercise = Exercise.query.filter_by(external_id='0007').one()
+    assert exercise.instructions == 'Step one\nStep two, slowly'
+    assert exercise.secondary_muscles == ['triceps']
+
+    # Unchanged catalog: nothing is written
+    result, queries = count_queries(service.sync_exercises_to_database)
+    assert (result['synced'], result['updated'], result['unchanged']) == (0, 0, 1200)
+    assert queries == 1
+
+    # Two edits, one new exercise, one malformed entry
+    catalog[6] = api_exercise(7, name='renamed press')
+    catalog[9] = dict(catalog[9], secondaryMuscles=[])
+    fake_exercisedb.routes['/exercises'] = catalog + [api_exercise(5000), {'name': 'no id'}]
+    result = service.sync_exercises_to_database()
+
+    assert (result['synced'], result['updated'], result['unchanged'], result['errors']) == (1, 2, 1198, 1)
+    db_session.expire_all()
+    assert Exercise.query.filter_by(external_id='0007').one().name == 'renamed press'
+    assert Exercise.query.filter_by(external_id='0010').one().secondary_muscles == []
+    assert Exercise.query.count() == 1201
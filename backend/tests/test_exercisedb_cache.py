@@ -0,0 +1,200 @@
+"""
+ExerciseDB cache - fresh hits, persistence across instances, stale-while-revalidate
+"""
+import time
+from flask import Flask
+from app.services.exercise_cache import ExerciseCache
+from app.services.exercisedb import ExerciseDBService
+
+RAW_EXERCISE = {
+    'id': '0001',
+    'name': '3/4 sit-up',
+    'bodyPart': 'waist',
+    'equipment': 'body weight',
+    'target': 'abs',
+    'gifUrl': 'https://example.com/0001.gif',
+    'instructions': ['Lie flat', 'Sit up']
+}
+
+
+def make_service(server, path, **cache_kwargs):
+    return ExerciseDBService(base_url=server.url, cache=ExerciseCache(path=path, **cache_kwargs))
+
+
+def test_fresh_entries_served_from_memory_and_disk(fake_exercisedb, tmp_path):
+    fake_exercisedb.routes['/exercises/bodyPartList'] = ['back', 'chest']
+    fake_exercisedb.routes['/exercises/bodyPart/waist'] = [RAW_EXERCISE]
+    store = str(tmp_path / 'cache.sqlite3')
+
+    service = make_service(fake_exercisedb, store)
+    assert service.get_body_parts() == ['back', 'chest']
+    assert service.get_body_parts() == ['back', 'chest']
+    exercises = service.get_by_body_part('waist', limit=10)
+    assert exercises[0]['id'] == 'exercisedb-0001'
+    assert exercises[0]['name'] == '3/4 Sit-Up'
+    assert fake_exercisedb.hits == {'/exercises/bodyPartList': 1, '/exercises/bodyPart/waist': 1}
+
+    # A new instance (another worker / after a restart) reads the on-disk store
+    other = make_service(fake_exercisedb, store)
+    assert other.get_by_body_part('waist', limit=10) == exercises
+    assert fake_exercisedb.hits['/exercises/bodyPart/waist'] == 1
+
+    # Different params are a different entry
+    other.get_by_body_part('waist', limit=20)
+    assert fake_exercisedb.hits['/exercises/bodyPart/waist'] == 2
+
+
+def test_stale_entry_served_while_refreshing(fake_exercisedb, tmp_path):
+    fake_exercisedb.routes['/exercises/target/abs'] = [RAW_EXERCISE]
+    service = make_service(fake_exercisedb, str(tmp_path / 'cache.sqlite3'), ttl=60, stale_ttl=3600)
+    first = service.get_by_target('abs')
+    assert first[0]['name'] == '3/4 Sit-Up'
+
+    # Age the entry past its TTL and change the upstream payload
+    key = service.cache.make_key('exercises/target/abs', {'limit': 50})
+    service.cache.set(key, first, fetched_at=time.time() - 120)
+    fake_exercisedb.routes['/exercises/target/abs'] = [dict(RAW_EXERCISE, name='crunch')]
+
+    assert service.get_by_target('abs') == first  # stale value, no waiting
+    service.cache.wait_for_refreshes(timeout=5)
+    assert fake_exercisedb.hits['/exercises/target/abs'] == 2
+    assert service.get_by_target('abs')[0]['name'] == 'Crunch'
+    assert fake_exercisedb.hits['/exercises/target/abs'] == 2
+
+
+def test_expired_entry_refetched_and_errors_not_cached(fake_exercisedb, tmp_path):
+    service = make_service(fake_exercisedb, str(tmp_path / 'cache.sqlite3'), ttl=60, stale_ttl=60)
+    key = service.cache.make_key('exercises/target/abs', {'limit': 50})
+
+    # Upstream failure with nothing cached: empty result, nothing stored
+    fake_exercisedb.routes['/exercises/target/abs'] = 500
+    assert service.get_by_target('abs') == []
+    assert service.cache.get(key) is None
+
+    # Past ttl + stale_ttl the entry is fetched synchronously...
+    fake_exercisedb.routes['/exercises/target/abs'] = [RAW_EXERCISE]
+    service.cache.set(key, ['old'], fetched_at=time.time() - 600)
+    assert service.get_by_target('abs')[0]['externalId'] == '0001'
+
+    # ...but still served if the API is down
+    service.cache.set(key, ['old'], fetched_at=time.time() - 600)
+    fake_exercisedb.routes['/exercises/target/abs'] = 503
+    assert service.get_by_target('abs') == ['old']
+
+
+def test_filter_lists_use_their_own_ttl(fake_exercisedb):
+    fake_exercisedb.routes['/exercises/targetList'] = ['abs', 'biceps']
+    service = make_service(fake_exercisedb, None, ttl=60, stale_ttl=60)
+    service.cache.set(service.cache.make_key('exercises/targetList'), ['abs'], fetched_at=time.time() - 600)
+
+    assert service.get_target_muscles() == ['abs']  # still fresh under FILTER_LISTS_TTL
+    assert fake_exercisedb.hits == {}
+
+
+def test_search_not_found_is_empty_list(fake_exercisedb, tmp_path):
+    service = make_service(fake_exercisedb, None)
+    assert service.search_exercises('nothing') == []
+    assert service.search_exercises('nothing') == []
+    assert fake_exercisedb.hits['/exercises/name/nothing'] == 1
+
+
+def test_lru_evicts_oldest_entries():
+    cache = ExerciseCache(path=None, max_entries=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a')[0] == 1
+    assert cache.get('c')[0] == 3
+
+
+def test_store_created_on_first_write_under_instance_path(tmp_path, monkeypatch):
+    store = tmp_path / 'cache.sqlite3'
+    cache = ExerciseCache(path=str(store))
+    assert cache.get('a') is None
+    cache.clear()
+    assert not store.exists()
+    cache.set('a', 1)
+    assert store.exists() and ExerciseCache(path=str(store)).get('a')[0] == 1
+
+    # Without EXERCISEDB_CACHE_PATH the store lives in the app's instance folder, not the cwd
+    monkeypatch.delenv('EXERCISEDB_CACHE_PATH', raising=False)
+    monkeypatch.chdir(tmp_path)
+    cache = ExerciseCache.from_env()
+    cache.set('outside', 1)
+    assert cache.path is None and not (tmp_path / 'instance').exists()
+
+    app = Flask(__name__, instance_path=str(tmp_path / 'app-instance'))
+    with app.app_context():
+        cache.set('b', 2)
+    assert cache.path == str(tmp_path / 'app-instance' / 'exercisedb_cache.sqlite3')
+    assert ExerciseCache(path=cache.path).get('b')[0] == 2
+
+
+def filter_routes(server, delay=0.0):
+    server.routes.update({
+        '/exercises/bodyPartList': ['back', 'chest'],
+        '/exercises/targetList': ['abs', 'biceps'],
+        '/exercises/equipmentList': ['barbell'],
+    })
+    for path in server.routes:
+        server.delays[path] = delay
+
+
+def test_filters_fetched_concurrently_over_one_pool(fake_exercisedb):
+    filter_routes(fake_exercisedb, delay=0.4)
+    service = make_service(fake_exercisedb, None)
+
+    started = time.monotonic()
+    filters, missing = service.get_filters(deadline=5)
+    elapsed = time.monotonic() - started
+
+    assert filters == {'bodyParts': ['back', 'chest'], 'targets': ['abs', 'biceps'], 'equipment': ['barbell']}
+    assert missing == []
+    assert elapsed < 1.0  # three 0.4s calls in parallel, not 1.2s in sequence
+
+    # Cached afterwards - no more API calls
+    assert service.get_filters(deadline=5) == (filters, [])
+    assert sum(fake_exercisedb.hits.values()) == 3
+
+    # Sequential calls reuse the pooled keep-alive connections
+    fake_exercisedb.delays.clear()
+    for body_part in ['waist', 'chest', 'back', 'neck']:
+        fake_exercisedb.routes[f'/exercises/bodyPart/{body_part}'] = []
+        service.get_by_body_part(body_part)
+    assert len(fake_exercisedb.connections) <= 3
+
+
+def test_filters_deadline_returns_partial_result(fake_exercisedb):
+    filter_routes(fake_exercisedb)
+    fake_exercisedb.delays['/exercises/equipmentList'] = 1.5
+    service = make_service(fake_exercisedb, None)
+    service.cache.set(service.cache.make_key('exercises/equipmentList'), ['old'], fetched_at=0)
+
+    started = time.monotonic()
+    filters, missing = service.get_filters(deadline=0.3)
+
+    assert time.monotonic() - started < 1.0
+    assert missing == ['equipment']
+    assert filters == {'bodyParts': ['back', 'chest'], 'targets': ['abs', 'biceps'], 'equipment': ['old']}
+
+    # The slow fetch finishes in the background and lands in the cache
+    service._executor.shutdown(wait=True)
+    assert service.cache.get(service.cache.make_key('exercises/equipmentList'))[0] == ['barbell']
+
+
+def test_failed_filter_fetch_is_reported_as_partial(fake_exercisedb):
+    filter_routes(fake_exercisedb)
+    fake_exercisedb.routes['/exercises/targetList'] = 500
+    fake_exercisedb.routes['/exercises/equipmentList'] = 503
+    service = make_service(fake_exercisedb, None)
+    service.cache.set(service.cache.make_key('exercises/equipmentList'), ['old'], fetched_at=0)
+
+    # Errors fall back to the cache (even expired) or [] and are named, like a missed deadline
+    filters, missing = service.get_filters(deadline=5)
+    assert missing == ['targets', 'equipment']
+    assert filters == {'bodyParts': ['back', 'chest'], 'targets': [], 'equipment': ['old']}
+
+    # The single-list accessors keep returning [] on errors
+    assert service.get_target_muscles() == []
@@ -0,0 +1,37 @@
+"""
+Synthetic dataset generator - COPY load, ID bookkeeping and generated history
+"""
+from datetime import datetime
+from app import db
+from app.models import Client, ClientDailyActivity, Trainer, WorkoutAssignment, WorkoutLog
+from generate_data import DataGenerator
+
+
+def test_generator_loads_consistent_dataset(client, db_session):
+    now = datetime(2026, 6, 1, 12)
+    counts = DataGenerator(trainers=2, clients_per_trainer=3, months=2, exercises=20, seed=5, now=now).run()
+
+    assert counts['trainers'] == Trainer.query.count() == 2
+    assert counts['clients'] == Client.query.count() == 6
+    assert counts['workout_assignments'] == WorkoutAssignment.query.count()
+    assert counts['workout_logs'] == WorkoutLog.query.count() > 0
+    assert counts['client_daily_activity'] == ClientDailyActivity.query.count()
+
+    # Logs only for completed sessions, inside the session window
+    outside = WorkoutLog.query.join(WorkoutAssignment).filter(db.or_(
+        WorkoutAssignment.status != 'completed',
+        WorkoutLog.logged_at < WorkoutAssignment.started_at,
+        WorkoutLog.logged_at > WorkoutAssignment.completed_at,
+    )).count()
+    assert outside == 0
+    assert WorkoutAssignment.query.filter(WorkoutAssignment.assigned_date > now,
+                                          WorkoutAssignment.status != 'pending').count() == 0
+
+    # Sequences moved past the generated IDs; a second run does not collide
+    DataGenerator(trainers=1, clients_per_trainer=1, months=1, exercises=5, prefix='again', now=now).run()
+    assert Client.query.count() == 7
+
+    response = client.post('/api/auth/login', json={
+        'email': 'bench-client1-2@example.test', 'password': 'bench123', 'user_type': 'client'
+    })
+    assert response.status_code == 200
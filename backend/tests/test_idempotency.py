@@ -0,0 +1,122 @@
+"""
+Idempotency-Key tests - retried log uploads replay the original response
+"""
+from datetime import datetime, timedelta
+from app import db
+from app.models import IdempotencyKey, WorkoutExercise, WorkoutLog
+from app.services.idempotency import idempotency_service
+from tests.factories import generate_dataset
+from tests.helpers import capture_queries
+
+
+def log_count(assignment_id):
+    return WorkoutLog.query.filter_by(assignment_id=assignment_id).count()
+
+
+def setup_session(seed=71):
+    dataset = generate_dataset(clients_per_trainer=6, days=5, seed=seed)
+    assignment = dataset['assignments'][0]
+    exercise_id = WorkoutExercise.query.filter_by(workout_id=assignment.workout_id).first().id
+    payload = {
+        'assignment_id': assignment.id,
+        'exercises': [{
+            'workout_exercise_id': exercise_id,
+            'sets': [{'set_number': n, 'reps_completed': 10, 'weight_used': 20} for n in (1, 2, 3)]
+        }]
+    }
+    return assignment.id, assignment.client_id, payload
+
+
+def test_retry_replays_original_response(client, auth_headers, db_session):
+    assignment_id, client_id, payload = setup_session()
+    headers = dict(auth_headers(client_id, 'client'), **{'Idempotency-Key': 'session-1'})
+
+    before = log_count(assignment_id)
+    first = client.post('/api/workout-logs', headers=headers, json=payload)
+    assert first.status_code == 201
+
+    retry, statements = capture_queries(client.post, '/api/workout-logs', headers=headers, json=payload)
+    assert retry.status_code == 201
+    assert retry.headers['Idempotent-Replayed'] == 'true'
+    assert retry.get_json() == first.get_json()
+    assert not any('workout_logs' in statement for statement in statements)
+    assert len(statements) <= 2  # claim + indexed lookup
+
+    assert log_count(assignment_id) == before + 3
+
+    # Same key, different body
+    payload['exercises'][0]['sets'].pop()
+    conflict = client.post('/api/workout-logs', headers=headers, json=payload)
+    assert conflict.status_code == 422
+
+    # A new key is a new request
+    headers['Idempotency-Key'] = 'session-2'
+    assert client.post('/api/workout-logs', headers=headers, json=payload).status_code == 201
+    assert log_count(assignment_id) == before + 5
+
+
+def test_keys_are_scoped_per_user(client, auth_headers, db_session):
+    _, client_a, payload_a = setup_session(seed=72)
+    _, client_b, payload_b = setup_session(seed=73)
+
+    for client_id, payload in ((client_a, payload_a), (client_b, payload_b)):
+        headers = dict(auth_headers(client_id, 'client'), **{'Idempotency-Key': 'shared-key'})
+        response = client.post('/api/workout-logs', headers=headers, json=payload)
+        assert response.status_code == 201
+        assert 'Idempotent-Replayed' not in response.headers
+
+    assert IdempotencyKey.query.filter_by(key='shared-key').count() == 2
+
+
+def test_failed_requests_release_the_key(client, auth_headers, db_session):
+    assignment_id, client_id, payload = setup_session()
+    headers = dict(auth_headers(client_id, 'client'), **{'Idempotency-Key': 'retry-after-fix'})
+    before = log_count(assignment_id)
+
+    bad = dict(payload, exercises=[{'workout_exercise_id': -1, 'sets': [{'set_number': 1, 'reps_completed': 1}]}])
+    assert client.post('/api/workout-logs', headers=headers, json=bad).status_code == 400
+    assert IdempotencyKey.query.count() == 0
+
+    missing = dict(payload, assignment_id=999999)
+    assert client.post('/api/workout-logs', headers=headers, json=missing).status_code == 404
+    assert IdempotencyKey.query.count() == 0
+
+    assert client.post('/api/workout-logs', headers=headers, json=payload).status_code == 201
+    assert log_count(assignment_id) == before + 3
+
+
+def test_expired_keys_are_reused_and_purged(client, auth_headers, db_session):
+    assignment_id, client_id, payload = setup_session()
+    headers = dict(auth_headers(client_id, 'client'), **{'Idempotency-Key': 'old-key'})
+    assert client.post('/api/workout-logs', headers=headers, json=payload).status_code == 201
+
+    expired = datetime.utcnow() - timedelta(seconds=idempotency_service.TTL_SECONDS + 60)
+    IdempotencyKey.query.update({'created_at': expired})
+    db.session.commit()
+
+    response = client.post('/api/workout-logs', headers=headers, json=payload)
+    assert response.status_code == 201
+    assert 'Idempotent-Replayed' not in response.headers
+    assert IdempotencyKey.query.count() == 1
+
+    IdempotencyKey.query.update({'created_at': expired})
+    assert idempotency_service.purge_expired() == 1
+    db.session.commit()
+    assert IdempotencyKey.query.count() == 0
+
+
+def test_retried_set_is_logged_once(client, auth_headers, db_session):
+    assignment_id, client_id, payload = setup_session(seed=74)
+    headers = dict(auth_headers(client_id, 'client'), **{'Idempotency-Key': 'set-1'})
+    exercise = payload['exercises'][0]
+    body = dict(exercise['sets'][0], assignment_id=assignment_id,
+                workout_exercise_id=exercise['workout_exercise_id'])
+    before = log_count(assignment_id)
+
+    first = client.post('/api/workout-logs/sets', headers=headers, json=body)
+    assert first.status_code == 201
+
+    retry = client.post('/api/workout-logs/sets', headers=headers, json=body)
+    assert retry.headers['Idempotent-Replayed'] == 'true'
+    assert retry.get_json() == first.get_json()
+    assert log_count(assignment_id) == before + 1
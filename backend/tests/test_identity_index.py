@@ -0,0 +1,86 @@
+"""
+Identity index - one probe per login, same email in both roles, maintenance on writes
+"""
+import bcrypt
+import pytest
+from sqlalchemy import insert, select
+from app import db
+from app.models import Client, Trainer, UserIdentity
+from app.services.identity_index import IdentityCollisionError, identity_index
+from tests.helpers import count_queries
+
+
+def _hash(password):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=4)).decode('utf-8')
+
+
+def _same_email_in_both_roles():
+    trainer = Trainer(email='Both@Test.com', name='Coach', password_hash=_hash('coach-pass'))
+    db.session.add(trainer)
+    db.session.flush()
+    client = Client(email='both@test.com', name='Athlete', trainer_id=trainer.id, password_hash=_hash('client-pass'))
+    db.session.add(client)
+    db.session.commit()
+    return trainer, client
+
+
+def test_find_is_one_query_per_role(db_session):
+    trainer, client = _same_email_in_both_roles()
+    db.session.expire_all()
+
+    user, queries = count_queries(identity_index.find, ' BOTH@test.com ', 'trainer')
+    assert queries == 1
+    assert user.id == trainer.id
+    assert identity_index.find('both@test.com', 'client').id == client.id
+    assert identity_index.find('nobody@test.com', 'trainer') is None
+
+
+def test_login_picks_the_requested_role(client, db_session):
+    trainer, athlete = _same_email_in_both_roles()
+
+    response = client.post('/api/auth/login', json={'email': 'both@test.com', 'password': 'coach-pass'})
+    assert response.status_code == 200 and response.get_json()['user']['id'] == trainer.id
+
+    response = client.post('/api/auth/login', json={'email': 'both@test.com', 'password': 'client-pass',
+                                                    'user_type': 'client'})
+    assert response.status_code == 200 and response.get_json()['user']['id'] == athlete.id
+
+    response = client.post('/api/auth/login', json={'email': 'both@test.com', 'password': 'client-pass'})
+    assert response.status_code == 401
+
+
+def test_index_follows_writes(db_session):
+    trainer, client = _same_email_in_both_roles()
+
+    client.email = 'renamed@test.com'
+    db.session.commit()
+    assert identity_index.find('renamed@test.com', 'client').id == client.id
+    assert identity_index.find('both@test.com', 'client') is None
+    assert identity_index.find('both@test.com', 'trainer').id == trainer.id
+
+    db.session.delete(client)
+    db.session.commit()
+    assert UserIdentity.query.filter_by(user_type='client').count() == 0
+
+    # Rows loaded outside the ORM are picked up by rebuild()
+    db.session.execute(insert(Trainer.__table__).values(email='bulk@test.com', name='Bulk', password_hash='x'))
+    assert identity_index.find('bulk@test.com', 'trainer') is None
+    assert identity_index.rebuild() == 1
+    assert identity_index.rebuild() == 0
+    assert identity_index.find('bulk@test.com', 'trainer').name == 'Bulk'
+
+
+def test_rebuild_refuses_colliding_emails(db_session):
+    trainers = Trainer.__table__
+    db.session.execute(insert(trainers), [
+        {'email': 'Dup@test.com', 'name': 'Upper', 'password_hash': 'x'},
+        {'email': 'dup@test.com ', 'name': 'Lower', 'password_hash': 'x'},
+    ])
+    ids = sorted(db.session.execute(select(trainers.c.id).where(trainers.c.name.in_(['Upper', 'Lower']))).scalars())
+
+    assert identity_index.collisions() == {'trainer': {'dup@test.com': ids}}
+    with pytest.raises(IdentityCollisionError) as error:
+        identity_index.rebuild()
+    assert error.value.collisions == {'trainer': {'dup@test.com': ids}}
+    assert 'dup@test.com' in str(error.value)
+    assert UserIdentity.query.filter_by(email='dup@test.com').count() == 0
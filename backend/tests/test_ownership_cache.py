@@ -0,0 +1,59 @@
+"""
+Ownership cache - membership tests without queries, create/delete events, fallback on misses
+"""
+from sqlalchemy import insert
+from app import db
+from app.models import Client
+from app.services.ownership_cache import ownership_cache
+from tests.factories import generate_dataset
+from tests.helpers import count_queries
+
+
+def test_checks_hit_the_cached_set(db_session):
+    dataset = generate_dataset(trainers=2, clients_per_trainer=3, days=1, seed=231)
+    trainer, other = dataset['trainers']
+    mine = [c for c in dataset['clients'] if c.trainer_id == trainer.id]
+    theirs = next(c for c in dataset['clients'] if c.trainer_id == other.id)
+
+    owned, queries = count_queries(ownership_cache.owns_client, trainer.id, mine[0].id)
+    assert owned and queries == 1  # set loaded once
+
+    for client in mine:
+        owned, queries = count_queries(ownership_cache.owns_client, trainer.id, client.id)
+        assert owned and queries == 0
+
+    # Misses fall back to one point query
+    owned, queries = count_queries(ownership_cache.owns_client, trainer.id, theirs.id)
+    assert not owned and queries == 1
+    assert not ownership_cache.owns_client(trainer.id, 'not-an-id')
+
+
+def test_sets_follow_creates_and_deletes(db_session, monkeypatch):
+    dataset = generate_dataset(clients_per_trainer=2, days=1, seed=232)
+    trainer = dataset['trainers'][0]
+    assert ownership_cache.owns_client(trainer.id, dataset['clients'][0].id)
+
+    client = Client(email='new-owned@test.com', name='New', trainer_id=trainer.id)
+    db.session.add(client)
+    db.session.commit()
+    owned, queries = count_queries(ownership_cache.owns_client, trainer.id, client.id)
+    assert owned and queries == 0
+
+    db.session.delete(client)
+    db.session.commit()
+    assert not ownership_cache.owns_client(trainer.id, client.id)
+
+    # Rows created outside this process's ORM are found by the fallback, then cached
+    client_id = db.session.execute(
+        insert(Client.__table__).values(trainer_id=trainer.id, email='elsewhere@test.com', name='Elsewhere')
+        .returning(Client.id)
+    ).scalar()
+    owned, queries = count_queries(ownership_cache.owns_client, trainer.id, client_id)
+    assert owned and queries == 1
+    owned, queries = count_queries(ownership_cache.owns_client, trainer.id, client_id)
+    assert owned and queries == 0
+
+    # Expired sets are reloaded
+    monkeypatch.setattr(ownership_cache, 'ttl', 0)
+    owned, queries = count_queries(ownership_cache.owns_client, trainer.id, client_id)
+    assert owned and queries == 1
@@ -0,0 +1,105 @@
+"""
+Password hashing pool - bounded queue, rehash on login, 503 when saturated
+"""
+import threading
+import time
+import bcrypt
+import pytest
+from app import db
+from app.models import Trainer
+from app.services.password_hasher import HasherBusy, PasswordHasher, password_hasher
+
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=rounds)).decode('utf-8')
+
+
+def test_hash_verify_and_queue_limit():
+    hasher = PasswordHasher()
+    hasher.rounds, hasher.workers, hasher.max_queue = 4, 1, 1
+
+    password_hash = hasher.hash('secret')
+    assert hasher.verify('secret', password_hash) and not hasher.verify('wrong', password_hash)
+    assert not hasher.verify('secret', None)
+    assert not hasher.needs_rehash(password_hash) and hasher.needs_rehash(_hash('secret', 5))
+
+    # One call running and one queued fill the pool - the next one is rejected
+    release = threading.Event()
+    blockers = []
+    for stat in ('running', 'queue_depth'):
+        blockers.append(threading.Thread(target=hasher._run, args=(release.wait,)))
+        blockers[-1].start()
+        while hasher.stats()[stat] < 1:
+            time.sleep(0.001)
+    with pytest.raises(HasherBusy):
+        hasher.hash('secret')
+    release.set()
+    for thread in blockers:
+        thread.join()
+
+    stats = hasher.stats()
+    assert stats['rejected'] == 1 and stats['max_queue_depth'] == 1 and stats['queue_depth'] == 0
+    assert stats['completed'] == 5
+
+
+def test_timed_out_call_is_cancelled_while_queued():
+    hasher = PasswordHasher()
+    hasher.rounds, hasher.workers, hasher.max_queue, hasher.timeout = 4, 1, 1, 0.05
+
+    release = threading.Event()
+    busy = []
+
+    def block():
+        try:
+            hasher._run(release.wait)
+        except HasherBusy as e:
+            busy.append(e)
+
+    blocker = threading.Thread(target=block)
+    blocker.start()
+    while hasher.stats()['running'] < 1:
+        time.sleep(0.001)
+
+    calls = []
+    with pytest.raises(HasherBusy):
+        hasher._run(calls.append, 'queued')
+    assert hasher.stats()['queue_depth'] == 0  # cancelled, not left waiting for the worker
+
+    release.set()
+    blocker.join()
+    hasher._pool().shutdown(wait=True)
+    assert calls == []
+    stats = hasher.stats()
+    # The running call timed out as well but could not be cancelled, so it still completed
+    assert len(busy) == 1 and stats['timed_out'] == 2 and stats['completed'] == 1 and stats['running'] == 0
+
+
+def test_login_rehashes_when_cost_changes(client, monkeypatch):
+    monkeypatch.setattr(password_hasher, 'rounds', 5)
+    trainer = Trainer(email='rehash@test.com', name='Rehash', password_hash=_hash('secret', 4))
+    db.session.add(trainer)
+    db.session.commit()
+
+    response = client.post('/api/auth/login', json={'email': 'rehash@test.com', 'password': 'secret'})
+    assert response.status_code == 200
+    db.session.refresh(trainer)
+    assert trainer.password_hash.startswith('$2b$05$') and trainer.verify_password('secret')
+
+    # Wrong passwords never touch the stored hash
+    monkeypatch.setattr(password_hasher, 'rounds', 6)
+    response = client.post('/api/auth/login', json={'email': 'rehash@test.com', 'password': 'nope'})
+    assert response.status_code == 401
+    db.session.refresh(trainer)
+    assert trainer.password_hash.startswith('$2b$05$')
+
+
+def test_login_answers_503_when_pool_is_saturated(client, monkeypatch):
+    db.session.add(Trainer(email='busy@test.com', name='Busy', password_hash=_hash('secret', 4)))
+    db.session.commit()
+
+    def busy(*args):
+        raise HasherBusy('full')
+    monkeypatch.setattr(password_hasher, '_run', busy)
+
+    response = client.post('/api/auth/login', json={'email': 'busy@test.com', 'password': 'secret'})
+    assert response.status_code == 503 and response.headers['Retry-After'] == '1'
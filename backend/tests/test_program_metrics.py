@@ -0,0 +1,53 @@
+"""
+ProgramMetricsCalculator tests - session counting and batched assignment metrics
+"""
+from datetime import datetime, timedelta
+from app import db
+from app.models import WorkoutAssignment, WorkoutLog
+from app.services.program_metrics import ProgramMetricsCalculator
+from tests.factories import generate_dataset
+from tests.helpers import count_queries
+
+
+def test_sessions_are_distinct_logged_days(db_session):
+    dataset = generate_dataset(clients_per_trainer=1, days=0, seed=61)
+    workout = dataset['workouts'][0]
+    workout_exercise = workout.exercises.first()
+    start = datetime.utcnow() - timedelta(days=10)
+
+    assignment = WorkoutAssignment(
+        workout_id=workout.id, client_id=dataset['clients'][0].id, trainer_id=dataset['trainers'][0].id,
+        start_date=start, end_date=start + timedelta(days=20), expected_sessions=8, status='in_progress'
+    )
+    db.session.add(assignment)
+    db.session.flush()
+
+    for day_offset, set_number in [(0, 1), (0, 2), (2, 1), (5, 1), (5, 2), (5, 3)]:
+        db.session.add(WorkoutLog(
+            assignment_id=assignment.id, workout_exercise_id=workout_exercise.id,
+            set_number=set_number, reps_completed=10, logged_at=start + timedelta(days=day_offset, hours=1)
+        ))
+    db.session.commit()
+
+    metrics = ProgramMetricsCalculator(now=start + timedelta(days=10)).for_assignment(assignment)
+
+    assert metrics == {
+        'completed_sessions': 3,
+        'adherence_percentage': 37.5,
+        'time_progress_percentage': 50.0,
+    }
+    assert assignment.to_dict()['completedSessions'] == 3
+
+
+def test_batched_metrics_use_one_query(db_session):
+    dataset = generate_dataset(clients_per_trainer=6, seed=62)
+    assignments = WorkoutAssignment.query.all()
+    assert assignments
+
+    calculator = ProgramMetricsCalculator()
+    _, queries = count_queries(calculator.load, assignments)
+    assert queries == 1
+
+    for assignment in assignments:
+        batched = assignment.to_dict(include_workout=False, metrics=calculator.for_assignment(assignment))
+        assert batched == assignment.to_dict(include_workout=False)
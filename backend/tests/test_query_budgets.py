@@ -0,0 +1,157 @@
+"""
+Query-count regression suite - every route issues a fixed number of SQL statements
+
+A small trainer (10 clients) and a large one (1,000 clients, more history per
+client) are seeded once; each route is called as both and must run the same
+number of statements, at or below its budget. An N+1 pattern makes the large
+call issue more queries and fails here.
+"""
+from datetime import datetime, timedelta
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import func
+from app import db
+from app.models import Exercise, WorkoutAssignment, WorkoutExercise, WorkoutLog
+from app.services.analytics_views import analytics_views
+from app.services.ownership_cache import ownership_cache
+from tests.factories import generate_dataset
+from tests.helpers import count_queries
+
+SIZES = {
+    'small': {'clients_per_trainer': 10, 'days': 3, 'seed': 301},
+    'large': {'clients_per_trainer': 1000, 'days': 6, 'seed': 302},
+}
+
+
+def busiest(column, trainer_id, skip=0):
+    """Value of column with the most assignments for the trainer"""
+    return db.session.query(column).filter(
+        WorkoutAssignment.trainer_id == trainer_id
+    ).group_by(column).order_by(func.count().desc(), column).offset(skip).limit(1).scalar()
+
+
+def seed_scope(name):
+    """Seed one trainer and pick the busiest rows for the per-entity routes"""
+    dataset = generate_dataset(**SIZES[name])
+    trainer_id = dataset['trainers'][0].id
+    analytics_views.refresh()  # steady state: the scheduler keeps the materialized views fresh
+    db.session.commit()
+
+    assignment = WorkoutAssignment.query.filter(
+        WorkoutAssignment.trainer_id == trainer_id,
+        WorkoutAssignment.status.in_(['in_progress', 'completed'])
+    ).order_by(WorkoutAssignment.id).first()
+    logs = WorkoutLog.query.filter_by(assignment_id=assignment.id).order_by(WorkoutLog.id).all()
+    pending = WorkoutAssignment.query.filter_by(trainer_id=trainer_id, status='pending').first()
+
+    return {
+        'trainer_id': trainer_id,
+        'client_id': busiest(WorkoutAssignment.client_id, trainer_id),
+        'deleted_client_id': busiest(WorkoutAssignment.client_id, trainer_id, skip=1),
+        'workout_id': busiest(WorkoutAssignment.workout_id, trainer_id),
+        'deleted_workout_id': busiest(WorkoutAssignment.workout_id, trainer_id, skip=1),
+        'assignment_id': assignment.id,
+        'assignment_client_id': assignment.client_id,
+        'pending_assignment_id': pending.id,
+        'pending_client_id': pending.client_id,
+        'workout_exercise_id': WorkoutExercise.query.filter_by(workout_id=pending.workout_id).first().id,
+        'log_id': logs[0].id,
+        'deleted_log_id': logs[1].id,
+        'exercise_id': Exercise.query.order_by(Exercise.id).first().id,
+        'email_prefix': name,
+    }
+
+
+@pytest.fixture(scope='module')
+def scopes(app):
+    """Both datasets, seeded once for the module (tables truncated afterwards)"""
+    with app.app_context():
+        yield {name: seed_scope(name) for name in SIZES}
+
+        db.session.rollback()
+        table_names = ', '.join(table.name for table in db.metadata.sorted_tables)
+        db.session.execute(db.text(f'TRUNCATE {table_names} RESTART IDENTITY CASCADE'))
+        db.session.commit()
+
+
+def trainer(ids):
+    return ids['trainer_id'], 'trainer'
+
+
+# (name, user, method, url, json body, budget) - callables receive the scope ids.
+# Order matters: routes that delete rows run last.
+CASES = [
+    ('health', None, 'GET', lambda ids: '/api/health', None, 2),
+    ('auth.me', trainer, 'GET', lambda ids: '/api/auth/me', None, 3),
+    ('clients.list', trainer, 'GET', lambda ids: '/api/clients', None, 3),
+    ('clients.get', trainer, 'GET', lambda ids: f'/api/clients/{ids["client_id"]}', None, 3),
+    ('clients.analytics', trainer, 'GET', lambda ids: f'/api/clients/{ids["client_id"]}/analytics', None, 11),
+    ('analytics.client', trainer, 'GET', lambda ids: f'/api/analytics/client/{ids["client_id"]}', None, 11),
+    ('analytics.adherence', trainer, 'GET', lambda ids: '/api/analytics/adherence', None, 2),
+    ('analytics.progress', trainer, 'GET', lambda ids: f'/api/analytics/progress/{ids["client_id"]}', None, 3),
+    ('trainers.analytics', trainer, 'GET', lambda ids: '/api/trainers/me/analytics', None, 4),
+    ('workouts.list', trainer, 'GET', lambda ids: '/api/workouts', None, 3),
+    ('workouts.get', trainer, 'GET', lambda ids: f'/api/workouts/{ids["workout_id"]}', None, 3),
+    ('assignments.client', trainer, 'GET', lambda ids: f'/api/assignments/client/{ids["client_id"]}', None, 5),
+    ('assignments.client.sideload', trainer, 'GET',
+     lambda ids: f'/api/assignments/client/{ids["client_id"]}?sideload=true', None, 5),
+    ('logs.assignment', trainer, 'GET', lambda ids: f'/api/workout-logs/assignment/{ids["assignment_id"]}', None, 2),
+    ('exercises.list', trainer, 'GET', lambda ids: '/api/exercises', None, 1),
+    ('exercises.get', trainer, 'GET', lambda ids: f'/api/exercises/{ids["exercise_id"]}', None, 1),
+    ('sync.changes', trainer, 'GET', lambda ids: '/api/sync/changes', None, 9),
+    ('clients.create', trainer, 'POST', lambda ids: '/api/clients',
+     lambda ids: {'email': f'{ids["email_prefix"]}-new@test.com', 'name': 'New Client'}, 4),
+    ('clients.bulk_invite', trainer, 'POST', lambda ids: '/api/clients/invite', lambda ids: {
+        'client_ids': [ids['client_id'], ids['deleted_client_id']],
+        'clients': [{'email': f'{ids["email_prefix"]}-bulk{n}@test.com', 'name': f'Bulk {n}'} for n in range(3)]
+    }, 6),
+    ('clients.update', trainer, 'PUT', lambda ids: f'/api/clients/{ids["client_id"]}',
+     lambda ids: {'goals': 'Hypertrophy'}, 3),
+    ('workouts.create', trainer, 'POST', lambda ids: '/api/workouts', lambda ids: {
+        'name': 'New Workout', 'exercises': [{'exercise_id': ids['exercise_id'], 'order': 1, 'sets': 3, 'reps': 10}]
+    }, 5),
+    ('workouts.update', trainer, 'PUT', lambda ids: f'/api/workouts/{ids["workout_id"]}',
+     lambda ids: {'description': 'Updated'}, 7),
+    ('assignments.create', trainer, 'POST', lambda ids: '/api/assignments',
+     lambda ids: {'workout_id': ids['workout_id'], 'client_id': ids['client_id']}, 12),
+    ('assignments.status', trainer, 'PUT', lambda ids: f'/api/assignments/{ids["pending_assignment_id"]}/status',
+     lambda ids: {'status': 'in_progress'}, 8),
+    ('logs.set', lambda ids: (ids['pending_client_id'], 'client'), 'POST', lambda ids: '/api/workout-logs/sets',
+     lambda ids: {'assignment_id': ids['pending_assignment_id'], 'workout_exercise_id': ids['workout_exercise_id'],
+                  'set_number': 1, 'reps_completed': 10, 'weight_used': 40}, 5),
+    ('logs.create', lambda ids: (ids['pending_client_id'], 'client'), 'POST', lambda ids: '/api/workout-logs',
+     lambda ids: {'assignment_id': ids['pending_assignment_id'], 'exercises': [{
+         'workout_exercise_id': ids['workout_exercise_id'],
+         'sets': [{'set_number': n, 'reps_completed': 10, 'weight_used': 40} for n in (1, 2, 3)]
+     }]}, 12),
+    ('logs.update', trainer, 'PUT', lambda ids: f'/api/workout-logs/{ids["log_id"]}',
+     lambda ids: {'reps_completed': 11}, 7),
+    ('logs.batch', lambda ids: (ids['assignment_client_id'], 'client'), 'POST', lambda ids: '/api/workout-logs/batch',
+     lambda ids: {'sessions': [{'assignment_id': ids['assignment_id'], 'exercises': [],
+                                'completed_at': (datetime.utcnow() - timedelta(hours=1)).isoformat()}]}, 4),
+    ('logs.delete', trainer, 'DELETE', lambda ids: f'/api/workout-logs/{ids["deleted_log_id"]}', None, 4),
+    ('workouts.delete', trainer, 'DELETE', lambda ids: f'/api/workouts/{ids["deleted_workout_id"]}', None, 18),
+    ('clients.delete', trainer, 'DELETE', lambda ids: f'/api/clients/{ids["deleted_client_id"]}', None, 9),
+]
+
+
+@pytest.mark.parametrize('name, user, method, url, body, budget', CASES, ids=[case[0] for case in CASES])
+def test_query_count_is_constant(app, scopes, name, user, method, url, body, budget):
+    counts = {}
+    with app.app_context():
+        for size, ids in scopes.items():
+            headers = {}
+            if user:
+                user_id, user_type = user(ids)
+                token = create_access_token(identity=user_id, additional_claims={'type': user_type})
+                headers['Authorization'] = f'Bearer {token}'
+
+            ownership_cache.invalidate()  # measure the cold path
+            response, counts[size] = count_queries(
+                app.test_client().open, url(ids), method=method, headers=headers,
+                json=body(ids) if body else None
+            )
+            assert response.status_code < 400, (size, response.get_json())
+
+    assert counts['small'] == counts['large'], f'{name}: query count grows with rows {counts}'
+    assert counts['large'] <= budget, f'{name}: {counts["large"]} queries, budget {budget}'
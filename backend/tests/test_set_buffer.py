@@ -0,0 +1,153 @@
+"""
+Write-behind set buffer - journaled sets, reads before flush, flush on completion / timeout
+"""
+import time
+from datetime import datetime, timedelta
+import pytest
+from app import db
+from app.models import ClientDailyActivity, WorkoutAssignment, WorkoutExercise, WorkoutLog
+from app.services.activity_rollup import activity_rollup
+from app.services.set_buffer import SetBuffer
+from tests.factories import generate_dataset
+
+
+@pytest.fixture
+def buffer(tmp_path, monkeypatch):
+    """Enabled buffer on a temporary journal, used by the routes"""
+    buffer = SetBuffer(path=str(tmp_path / 'set_buffer.sqlite3'), flush_after=300, enabled=True)
+    for module in ('app.routes.workouts', 'app.routes.workout_logs'):
+        monkeypatch.setattr(f'{module}.set_buffer', buffer)
+    return buffer
+
+
+def in_progress_assignment(dataset):
+    client = dataset['clients'][0]
+    workout = dataset['workouts'][0]
+    assignment = WorkoutAssignment(workout_id=workout.id, client_id=client.id, trainer_id=client.trainer_id,
+                                   assigned_date=datetime.utcnow() - timedelta(days=1), status='in_progress')
+    db.session.add(assignment)
+    activity_rollup.track_assignment(assignment, created=True)
+    db.session.commit()
+    workout_exercise_ids = [we.id for we in WorkoutExercise.query.filter_by(workout_id=workout.id)]
+    return assignment, workout_exercise_ids
+
+
+def post_sets(client, headers, assignment, workout_exercise_id, count, reps=10):
+    """Log sets through POST /api/workout-logs/sets -> list of responses"""
+    return [
+        client.post('/api/workout-logs/sets', headers=headers, json={
+            'assignment_id': assignment.id, 'workout_exercise_id': workout_exercise_id,
+            'set_number': n, 'reps_completed': reps, 'weight_used': 50
+        })
+        for n in range(1, count + 1)
+    ]
+
+
+def rollup_snapshot():
+    return sorted(
+        (row.trainer_id, row.client_id, row.day, row.assigned, row.completed, row.skipped,
+         row.completions, row.sets_logged, row.volume)
+        for row in ClientDailyActivity.query.all()
+    )
+
+
+def test_buffered_sets_are_readable_and_flushed_on_completion(client, auth_headers, db_session, buffer):
+    dataset = generate_dataset(clients_per_trainer=1, days=2, seed=101)
+    assignment, (first_exercise, *_) = in_progress_assignment(dataset)
+    headers = auth_headers(assignment.client_id, 'client')
+
+    responses = post_sets(client, headers, assignment, first_exercise, 3)
+    responses += post_sets(client, headers, assignment, first_exercise, 1, reps=12)  # set 1 again: replaced
+    assert {response.status_code for response in responses} == {202}
+    assert responses[-1].get_json()['data']['pending'] is True
+
+    assert WorkoutLog.query.filter_by(assignment_id=assignment.id).count() == 0
+    logs = client.get(f'/api/workout-logs/assignment/{assignment.id}', headers=headers).get_json()['data']
+    assert [(log['set_number'], log['reps_completed'], log['pending']) for log in logs] == [
+        (1, 12, True), (2, 10, True), (3, 10, True)
+    ]
+
+    response = client.put(f'/api/assignments/{assignment.id}/status', headers=headers,
+                          json={'status': 'completed'})
+    assert response.status_code == 200
+
+    stored = WorkoutLog.query.filter_by(assignment_id=assignment.id).order_by(WorkoutLog.set_number).all()
+    assert [(log.set_number, log.reps_completed) for log in stored] == [(1, 12), (2, 10), (3, 10)]
+    assert buffer.pending([assignment.id]) == {assignment.id: []}
+
+    # Incremental rollup matches a rebuild
+    incremental = rollup_snapshot()
+    activity_rollup.rebuild()
+    db.session.commit()
+    assert incremental == rollup_snapshot()
+
+
+@pytest.mark.parametrize('route', ['session', 'batch'])
+def test_logging_the_session_flushes_buffered_sets(client, auth_headers, db_session, buffer, route):
+    dataset = generate_dataset(clients_per_trainer=1, days=2, seed=105)
+    assignment, (first_exercise, second_exercise, *_) = in_progress_assignment(dataset)
+    headers = auth_headers(assignment.client_id, 'client')
+    post_sets(client, headers, assignment, first_exercise, 2)
+
+    # The completed session also sends set 2 of the first exercise: the sent values win
+    session = {'assignment_id': assignment.id, 'exercises': [
+        {'workout_exercise_id': first_exercise, 'sets': [{'set_number': 2, 'reps_completed': 12}]},
+        {'workout_exercise_id': second_exercise, 'sets': [{'set_number': 1, 'reps_completed': 8}]},
+    ]}
+    if route == 'session':
+        response = client.post('/api/workout-logs', headers=headers, json=session)
+        assert response.status_code == 201
+        assert response.get_json()['data']['logs_count'] == 3
+    else:
+        response = client.post('/api/workout-logs/batch', headers=headers, json={'sessions': [session]})
+        assert response.status_code == 200
+        assert response.get_json()['data']['results'][0]['logs_count'] == 3
+
+    stored = WorkoutLog.query.filter_by(assignment_id=assignment.id).all()
+    assert sorted((log.workout_exercise_id, log.set_number, log.reps_completed) for log in stored) == sorted([
+        (first_exercise, 1, 10), (first_exercise, 2, 12), (second_exercise, 1, 8)
+    ])
+    assert buffer.pending([assignment.id]) == {assignment.id: []}
+
+    incremental = rollup_snapshot()
+    activity_rollup.rebuild()
+    db.session.commit()
+    assert incremental == rollup_snapshot()
+
+
+def test_flush_due_writes_only_expired_sessions(client, auth_headers, buffer):
+    dataset = generate_dataset(clients_per_trainer=1, days=2, seed=102)
+    assignment, (first_exercise, *_) = in_progress_assignment(dataset)
+    post_sets(client, auth_headers(assignment.client_id, 'client'), assignment, first_exercise, 2)
+
+    assert buffer.flush_due() == 0
+    assert buffer.flush_due(now=time.time() + buffer.flush_after + 1) == 2
+    assert WorkoutLog.query.filter_by(assignment_id=assignment.id).count() == 2
+    assert buffer.due_assignment_ids(now=float('inf')) == []
+
+
+def test_flush_skips_sets_already_written(client, auth_headers, buffer):
+    dataset = generate_dataset(clients_per_trainer=1, days=2, seed=103)
+    assignment, (first_exercise, *_) = in_progress_assignment(dataset)
+    post_sets(client, auth_headers(assignment.client_id, 'client'), assignment, first_exercise, 2)
+
+    # A flush committed to PostgreSQL but crashed before clearing the journal
+    rows, _ = buffer.write(assignment)
+    db.session.commit()
+    assert len(rows) == 2
+
+    assert buffer.flush(assignment) == 0
+    assert WorkoutLog.query.filter_by(assignment_id=assignment.id).count() == 2
+    assert buffer.pending([assignment.id]) == {assignment.id: []}
+
+
+def test_disabled_buffer_writes_sets_directly(client, auth_headers, tmp_path, monkeypatch):
+    buffer = SetBuffer(path=str(tmp_path / 'set_buffer.sqlite3'), enabled=False)
+    monkeypatch.setattr('app.routes.workout_logs.set_buffer', buffer)
+    dataset = generate_dataset(clients_per_trainer=1, days=2, seed=104)
+    assignment, (first_exercise, *_) = in_progress_assignment(dataset)
+
+    response, = post_sets(client, auth_headers(assignment.client_id, 'client'), assignment, first_exercise, 1)
+    assert response.status_code == 201
+    assert response.get_json()['data']['id'] == WorkoutLog.query.filter_by(assignment_id=assignment.id).one().id
+    assert not (tmp_path / 'set_buffer.sqlite3').exists()  # the journal is only created by an append
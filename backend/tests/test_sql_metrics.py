@@ -0,0 +1,57 @@
+"""
+Per-request SQL metrics - Server-Timing header, query budgets, debug endpoint
+"""
+import logging
+import re
+from app.services.sql_metrics import sql_metrics
+from tests.factories import generate_dataset
+
+
+def server_timing(response):
+    header = response.headers['Server-Timing']
+    match = re.search(r'db;dur=([\d.]+);desc="(\d+) queries", app;dur=([\d.]+)', header)
+    assert match, header
+    return float(match.group(1)), int(match.group(2)), float(match.group(3))
+
+
+def test_server_timing_reports_query_count(client, auth_headers, db_session):
+    dataset = generate_dataset(clients_per_trainer=3, days=3, seed=111)
+    trainer = dataset['trainers'][0]
+
+    db_ms, queries, total_ms = server_timing(client.get('/api/health'))
+    assert queries == 2  # SELECT 1 + email outbox backlog
+    assert 0 <= db_ms <= total_ms
+
+    _, queries, _ = server_timing(client.get('/api/workouts', headers=auth_headers(trainer.id, 'trainer')))
+    assert queries >= 1
+
+
+def test_requests_over_budget_are_logged(client, db_session, monkeypatch, caplog):
+    monkeypatch.setattr(sql_metrics, 'default_budget', 0)
+
+    with caplog.at_level(logging.WARNING, logger='app.services.sql_metrics'):
+        client.get('/api/health')
+
+    assert 'Query budget exceeded: GET /api/health (health.api_health_check) ran 2 queries (budget 0)' in caplog.text
+
+
+def test_query_budget_decorator_overrides_default(app, db_session):
+    with app.test_request_context():
+        assert sql_metrics.budget_for('sync.get_changes') == app.view_functions['sync.get_changes'].query_budget
+        assert sql_metrics.budget_for('health.api_health_check') == sql_metrics.default_budget
+
+
+def test_debug_endpoint_is_disabled_by_default(client, db_session):
+    assert client.get('/api/debug/sql').status_code == 404
+
+
+def test_debug_endpoint_lists_recent_requests(app, client, db_session, monkeypatch):
+    monkeypatch.setitem(app.config, 'SQL_DEBUG_ENDPOINT', True)
+    client.get('/api/health')
+
+    response = client.get('/api/debug/sql?endpoint=health.api_health_check')
+    assert response.status_code == 200
+    latest = response.get_json()['data'][0]
+    assert latest['path'] == '/api/health'
+    assert latest['queries'] == 2
+    assert 'SELECT 1' in [statement['statement'] for statement in latest['slowest']]
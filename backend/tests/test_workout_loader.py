@@ -0,0 +1,46 @@
+"""
+WorkoutLoader tests - eager-loaded serialization must match Workout.to_dict
+"""
+from app.models import Workout
+from app.services.workout_loader import workout_loader
+from tests.factories import generate_dataset
+from tests.helpers import count_queries
+
+
+def test_serialize_matches_to_dict(db_session):
+    dataset = generate_dataset(clients_per_trainer=1, workouts_per_trainer=5, seed=41)
+    workouts = dataset['workouts']
+
+    expected = [workout.to_dict(include_exercises=True) for workout in workouts]
+    db_session.expire_all()
+
+    assert workout_loader.serialize(workouts) == expected
+
+
+def test_summary_mode_leaves_out_exercise_objects(db_session):
+    dataset = generate_dataset(clients_per_trainer=1, workouts_per_trainer=4, seed=42)
+    workouts = Workout.query.filter_by(trainer_id=dataset['trainers'][0].id).all()
+
+    data, queries = count_queries(workout_loader.serialize, workouts, include_exercise_details=False)
+
+    assert queries == 1  # exercise rows only - no Exercise lookups
+    for workout in data:
+        assert workout['exerciseCount'] == len(workout['exercises'])
+        assert all('exercise' not in entry for entry in workout['exercises'])
+
+
+def test_get_workouts_query_count_is_constant(client, auth_headers):
+    small = generate_dataset(clients_per_trainer=1, workouts_per_trainer=2, seed=43)
+    large = generate_dataset(clients_per_trainer=1, workouts_per_trainer=25, seed=44)
+
+    def list_workouts(trainer_id):
+        response = client.get('/api/workouts', headers=auth_headers(trainer_id))
+        assert response.status_code == 200
+        return response.get_json()['data']
+
+    _, small_queries = count_queries(list_workouts, small['trainers'][0].id)
+    large_data, large_queries = count_queries(list_workouts, large['trainers'][0].id)
+
+    assert len(large_data) == 25
+    assert all('exercise' in entry for workout in large_data for entry in workout['exercises'])
+    assert small_queries == large_queries
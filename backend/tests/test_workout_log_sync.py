@@ -0,0 +1,109 @@
+"""
+Offline batch sync - many sessions in one request, per-item results
+"""
+from datetime import datetime, timedelta
+from app import db
+from app.models import ClientDailyActivity, WorkoutAssignment, WorkoutExercise, WorkoutLog
+from app.services.activity_rollup import activity_rollup
+from tests.factories import generate_dataset
+from tests.helpers import capture_queries
+
+
+def make_assignments(client, workout, count):
+    assignments = [
+        WorkoutAssignment(workout_id=workout.id, client_id=client.id, trainer_id=client.trainer_id,
+                          assigned_date=datetime.utcnow() - timedelta(days=3), status='pending')
+        for _ in range(count)
+    ]
+    db.session.add_all(assignments)
+    for assignment in assignments:
+        activity_rollup.track_assignment(assignment, created=True)
+    db.session.commit()
+    return [assignment.id for assignment in assignments]
+
+
+def session(assignment_id, workout_exercise_id, completed_at=None, sets=3):
+    item = {
+        'assignment_id': assignment_id,
+        'exercises': [{
+            'workout_exercise_id': workout_exercise_id,
+            'sets': [{'set_number': n, 'reps_completed': 8, 'weight_used': 30} for n in range(1, sets + 1)]
+        }]
+    }
+    if completed_at:
+        item['completed_at'] = completed_at
+    return item
+
+
+def rollup_snapshot():
+    return sorted(
+        (row.trainer_id, row.client_id, row.day, row.assigned, row.completed, row.skipped,
+         row.completions, row.sets_logged, row.volume)
+        for row in ClientDailyActivity.query.all()
+    )
+
+
+def test_batch_writes_valid_sessions_and_reports_failures(client, auth_headers, db_session):
+    dataset = generate_dataset(clients_per_trainer=2, days=3, seed=81)
+    owner, other = dataset['clients']
+    workout = dataset['workouts'][0]
+    workout_exercise_id = WorkoutExercise.query.filter_by(workout_id=workout.id).first().id
+    own_ids = make_assignments(owner, workout, 3)
+    foreign_id = make_assignments(other, workout, 1)[0]
+
+    yesterday = (datetime.utcnow() - timedelta(days=1)).replace(microsecond=0)
+    response = client.post('/api/workout-logs/batch', headers=auth_headers(owner.id, 'client'), json={
+        'sessions': [
+            session(own_ids[0], workout_exercise_id, completed_at=yesterday.isoformat() + 'Z'),
+            session(own_ids[1], workout_exercise_id, sets=5),
+            session(foreign_id, workout_exercise_id),
+            session(own_ids[2], -1),
+            session(own_ids[0], workout_exercise_id),
+            {'exercises': []},
+        ]
+    })
+    assert response.status_code == 200
+    data = response.get_json()['data']
+
+    assert (data['synced'], data['failed']) == (2, 4)
+    assert [result['success'] for result in data['results']] == [True, True, False, False, False, False]
+    assert [result.get('logs_count') for result in data['results'][:2]] == [3, 5]
+    assert data['results'][2]['error'] == 'Assignment not found'
+
+    first = WorkoutAssignment.query.get(own_ids[0])
+    assert first.status == 'completed' and first.completed_at == yesterday
+    assert {log.logged_at for log in first.workout_logs} == {yesterday}
+    assert WorkoutAssignment.query.get(own_ids[2]).status == 'pending'
+    assert WorkoutLog.query.filter_by(assignment_id=foreign_id).count() == 0
+
+    # Incremental rollup matches a rebuild
+    incremental = rollup_snapshot()
+    activity_rollup.rebuild()
+    db.session.commit()
+    assert incremental == rollup_snapshot()
+
+
+def test_batch_query_count_is_constant(client, auth_headers, db_session):
+    dataset = generate_dataset(clients_per_trainer=1, days=3, seed=82)
+    owner = dataset['clients'][0]
+    workout = dataset['workouts'][0]
+    workout_exercise_id = WorkoutExercise.query.filter_by(workout_id=workout.id).first().id
+    headers = auth_headers(owner.id, 'client')
+    ids = make_assignments(owner, workout, 22)
+
+    def sync(assignment_ids):
+        payload = {'sessions': [session(assignment_id, workout_exercise_id) for assignment_id in assignment_ids]}
+        response = client.post('/api/workout-logs/batch', headers=headers, json=payload)
+        assert response.status_code == 200
+        assert response.get_json()['data']['failed'] == 0
+
+    _, small = capture_queries(sync, ids[:2])
+    _, large = capture_queries(sync, ids[2:])
+    assert len(small) == len(large)
+
+
+def test_batch_rejects_bad_envelopes(client, auth_headers, db_session):
+    headers = auth_headers(1, 'client')
+    assert client.post('/api/workout-logs/batch', headers=headers, json={}).status_code == 400
+    too_many = {'sessions': [{'assignment_id': 1}] * 101}
+    assert client.post('/api/workout-logs/batch', headers=headers, json=too_many).status_code == 400
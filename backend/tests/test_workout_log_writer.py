@@ -0,0 +1,115 @@
+"""
+Workout log bulk write path - validation up front, one INSERT for every set
+"""
+from app.models import WorkoutAssignment, WorkoutExercise, WorkoutLog
+from tests.factories import generate_dataset
+from tests.helpers import capture_queries
+
+
+def pending_assignment(dataset):
+    assignment = next(a for a in dataset['assignments'] if a.status == 'pending')
+    exercise_ids = [
+        we.id for we in WorkoutExercise.query.filter_by(workout_id=assignment.workout_id).order_by(WorkoutExercise.id)
+    ]
+    return assignment.id, assignment.client_id, exercise_ids
+
+
+def session_payload(assignment_id, exercise_ids, sets_per_exercise):
+    return {
+        'assignment_id': assignment_id,
+        'exercises': [
+            {
+                'workout_exercise_id': exercise_id,
+                'sets': [
+                    {'set_number': n, 'reps_completed': 10, 'weight_used': 42.5, 'rpe': 8}
+                    for n in range(1, sets_per_exercise + 1)
+                ]
+            }
+            for exercise_id in exercise_ids
+        ]
+    }
+
+
+def test_session_written_with_constant_query_count(client, auth_headers, db_session):
+    dataset = generate_dataset(clients_per_trainer=6, days=5, seed=61)
+    assignment_id, client_id, exercise_ids = pending_assignment(dataset)
+    headers = auth_headers(client_id, 'client')
+
+    def post(payload):
+        response = client.post('/api/workout-logs', headers=headers, json=payload)
+        assert response.status_code == 201, response.get_json()
+        return response.get_json()
+
+    data = post(session_payload(assignment_id, exercise_ids, 10))
+    assert data['data']['logs_count'] == 30
+    assert data['data']['assignment']['status'] == 'completed'
+
+    logs = WorkoutLog.query.filter_by(assignment_id=assignment_id).all()
+    assert len(logs) == 30
+    assert len({log.logged_at for log in logs}) == 1
+    assert WorkoutAssignment.query.get(assignment_id).completed_at == logs[0].logged_at
+
+    # Same statements for 3 sets or 60, with a single INSERT for the sets
+    _, small = capture_queries(post, session_payload(assignment_id, exercise_ids[:1], 3))
+    _, large = capture_queries(post, session_payload(assignment_id, exercise_ids, 20))
+    assert len(small) == len(large)
+    assert sum(statement.startswith('INSERT INTO workout_logs') for statement in large) == 1
+
+
+def test_invalid_payload_writes_nothing(client, auth_headers, db_session):
+    dataset = generate_dataset(clients_per_trainer=6, days=5, seed=61)
+    assignment_id, client_id, exercise_ids = pending_assignment(dataset)
+    foreign_exercise_id = WorkoutExercise.query.filter(
+        WorkoutExercise.id.notin_(exercise_ids)
+    ).first().id
+    headers = auth_headers(client_id, 'client')
+
+    invalid_payloads = [
+        session_payload(assignment_id, exercise_ids + [foreign_exercise_id], 2),
+        {'assignment_id': assignment_id, 'exercises': [
+            {'workout_exercise_id': exercise_ids[0], 'sets': [{'set_number': 1}]}
+        ]},
+        {'assignment_id': assignment_id, 'exercises': [
+            {'workout_exercise_id': exercise_ids[0], 'sets': [{'set_number': 1, 'reps_completed': 5, 'rpe': 11}]}
+        ]},
+        {'assignment_id': assignment_id, 'exercises': [
+            {'workout_exercise_id': exercise_ids[0], 'sets': [
+                {'set_number': 1, 'reps_completed': 5}, {'set_number': 1, 'reps_completed': 6}
+            ]}
+        ]},
+    ]
+    for payload in invalid_payloads:
+        response = client.post('/api/workout-logs', headers=headers, json=payload)
+        assert response.status_code == 400
+        assert response.get_json()['success'] is False
+
+    assert WorkoutLog.query.filter_by(assignment_id=assignment_id).count() == 0
+    assert WorkoutAssignment.query.get(assignment_id).status == 'pending'
+
+
+def test_numeric_strings_are_coerced(client, auth_headers, db_session):
+    dataset = generate_dataset(clients_per_trainer=6, days=5, seed=62)
+    assignment_id, client_id, exercise_ids = pending_assignment(dataset)
+    headers = auth_headers(client_id, 'client')
+
+    # Accepted by the original per-set ORM path (PostgreSQL casts the strings)
+    response = client.post('/api/workout-logs', headers=headers, json={'assignment_id': assignment_id, 'exercises': [
+        {'workout_exercise_id': exercise_ids[0], 'sets': [
+            {'set_number': '1', 'reps_completed': '10', 'weight_used': '50', 'rpe': '7'},
+            {'set_number': 2, 'reps_completed': ' 8 ', 'weight_used': '42.5'},
+        ]}
+    ]})
+    assert response.status_code == 201, response.get_json()
+
+    logs = WorkoutLog.query.filter_by(assignment_id=assignment_id).order_by(WorkoutLog.set_number).all()
+    assert [(log.set_number, log.reps_completed, float(log.weight_used), log.rpe) for log in logs] == [
+        (1, 10, 50.0, 7), (2, 8, 42.5, None)
+    ]
+
+    # Non-numeric strings are still rejected
+    for bad_set in ({'set_number': 3, 'reps_completed': 'ten'},
+                    {'set_number': 3, 'reps_completed': 5, 'weight_used': 'nan'},
+                    {'set_number': 3, 'reps_completed': '5.5'}):
+        response = client.post('/api/workout-logs/sets', headers=headers,
+                               json={'assignment_id': assignment_id, 'workout_exercise_id': exercise_ids[0], **bad_set})
+        assert response.status_code == 400, bad_set
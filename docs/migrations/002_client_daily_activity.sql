@@ -0,0 +1,34 @@
+-- =====================================================
+-- MIGRACIÓN 002: Rollup diario de actividad por cliente
+-- =====================================================
+-- Tabla mantenida incrementalmente por los endpoints de escritura
+-- (assignments, workout logs). Después de aplicar esta migración,
+-- poblarla con: python backend/backfill_rollup.py
+
+CREATE TABLE IF NOT EXISTS client_daily_activity (
+    id SERIAL PRIMARY KEY,
+    trainer_id INTEGER NOT NULL REFERENCES trainers(id) ON DELETE CASCADE,
+    client_id INTEGER NOT NULL REFERENCES clients(id) ON DELETE CASCADE,
+    day DATE NOT NULL,
+    assigned INTEGER NOT NULL DEFAULT 0,
+    completed INTEGER NOT NULL DEFAULT 0,
+    skipped INTEGER NOT NULL DEFAULT 0,
+    completions INTEGER NOT NULL DEFAULT 0,
+    sets_logged INTEGER NOT NULL DEFAULT 0,
+    volume NUMERIC(12,2) NOT NULL DEFAULT 0,
+    CONSTRAINT uq_client_daily_activity UNIQUE (client_id, trainer_id, day)
+);
+
+CREATE INDEX IF NOT EXISTS idx_client_daily_activity_trainer_day ON client_daily_activity(trainer_id, day);
+
+-- Índices para los bordes (días parciales) que se leen en vivo
+CREATE INDEX IF NOT EXISTS idx_assignments_date ON workout_assignments(assigned_date);
+CREATE INDEX IF NOT EXISTS idx_assignments_completed_at ON workout_assignments(completed_at);
+
+COMMENT ON TABLE client_daily_activity IS 'Rollup diario por cliente: asignaciones, completados, salteados, sets y volumen';
+COMMENT ON COLUMN client_daily_activity.assigned IS 'Asignaciones con assigned_date en este día';
+COMMENT ON COLUMN client_daily_activity.completed IS 'De esas asignaciones, cuántas están completadas';
+COMMENT ON COLUMN client_daily_activity.skipped IS 'De esas asignaciones, cuántas fueron salteadas';
+COMMENT ON COLUMN client_daily_activity.completions IS 'Asignaciones completadas en este día (por completed_at)';
+COMMENT ON COLUMN client_daily_activity.sets_logged IS 'Sets registrados en este día (workout_logs.logged_at)';
+COMMENT ON COLUMN client_daily_activity.volume IS 'Volumen registrado en este día (reps × kg)';
@@ -0,0 +1,14 @@
+-- =====================================================
+-- MIGRACIÓN 003: Índices para la búsqueda local de ejercicios
+-- =====================================================
+-- GET /api/exercises se sirve desde la tabla exercises (sincronizada
+-- con ExerciseDB). Los filtros bodyPart / target / equipment y la
+-- búsqueda por nombre usan estos índices.
+
+CREATE INDEX IF NOT EXISTS idx_exercises_body_part ON exercises(body_part);
+CREATE INDEX IF NOT EXISTS idx_exercises_equipment ON exercises(equipment);
+CREATE INDEX IF NOT EXISTS idx_exercises_target_muscle ON exercises(target_muscle);
+CREATE INDEX IF NOT EXISTS idx_exercises_name_search ON exercises USING gin(to_tsvector('spanish', name));
+
+-- Las instrucciones sincronizadas pasan a separarse por salto de línea
+-- (antes ', '). Volver a ejecutar la sincronización para actualizarlas.
@@ -0,0 +1,26 @@
+-- =====================================================
+-- MIGRACIÓN 004: Claves de idempotencia
+-- =====================================================
+-- Guarda la respuesta de cada request aceptado con header Idempotency-Key
+-- (POST /api/workout-logs, POST /api/workout-logs/sets y POST /api/workout-logs/batch).
+-- Un reintento con la misma clave devuelve la respuesta original sin volver a escribir.
+-- Las claves expiran después de IDEMPOTENCY_KEY_TTL segundos (default 24 h).
+
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    id SERIAL PRIMARY KEY,
+    user_type VARCHAR(20) NOT NULL,
+    user_id INTEGER NOT NULL,
+    key VARCHAR(255) NOT NULL,
+    endpoint VARCHAR(100) NOT NULL,
+    request_hash VARCHAR(64) NOT NULL,
+    status_code INTEGER,
+    response_body TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_idempotency_keys_scope_key UNIQUE (user_type, user_id, key)
+);
+
+-- Limpieza de claves expiradas
+CREATE INDEX IF NOT EXISTS ix_idempotency_keys_created_at ON idempotency_keys(created_at);
+
+COMMENT ON TABLE idempotency_keys IS 'Respuestas de requests idempotentes (reintentos de la app móvil)';
+COMMENT ON COLUMN idempotency_keys.status_code IS 'NULL mientras el request original sigue en curso';
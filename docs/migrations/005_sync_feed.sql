@@ -0,0 +1,29 @@
+-- =====================================================
+-- MIGRACIÓN 005: Feed de sincronización incremental
+-- =====================================================
+-- GET /api/sync/changes devuelve solo las filas creadas o modificadas desde
+-- un watermark (updated_at) y los IDs eliminados desde entonces (tombstones).
+
+-- Índices sobre updated_at, con el mismo scope que usa el feed
+CREATE INDEX IF NOT EXISTS idx_clients_trainer_updated ON clients(trainer_id, updated_at);
+CREATE INDEX IF NOT EXISTS idx_workouts_trainer_updated ON workouts(trainer_id, updated_at);
+CREATE INDEX IF NOT EXISTS idx_assignments_trainer_updated ON workout_assignments(trainer_id, updated_at);
+CREATE INDEX IF NOT EXISTS idx_assignments_client_updated ON workout_assignments(client_id, updated_at);
+CREATE INDEX IF NOT EXISTS idx_exercises_updated_at ON exercises(updated_at);
+CREATE INDEX IF NOT EXISTS ix_trainers_updated_at ON trainers(updated_at);
+
+-- Registro de eliminaciones (sin FK: la fila original ya no existe)
+CREATE TABLE IF NOT EXISTS sync_tombstones (
+    id SERIAL PRIMARY KEY,
+    resource VARCHAR(30) NOT NULL,
+    resource_id INTEGER NOT NULL,
+    trainer_id INTEGER,
+    client_id INTEGER,
+    deleted_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_sync_tombstones_trainer_deleted ON sync_tombstones(trainer_id, deleted_at);
+CREATE INDEX IF NOT EXISTS idx_sync_tombstones_client_deleted ON sync_tombstones(client_id, deleted_at);
+
+COMMENT ON TABLE sync_tombstones IS 'Filas eliminadas, para que los clientes del feed las borren localmente';
+COMMENT ON COLUMN sync_tombstones.resource IS 'clients, workouts, assignments, exercises o trainers';
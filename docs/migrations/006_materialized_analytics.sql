@@ -0,0 +1,44 @@
+-- =====================================================
+-- MIGRACIÓN 006: Vistas de analytics materializadas
+-- =====================================================
+-- client_adherence y exercise_progress pasan de vistas a tablas refrescadas por
+-- cliente (app/services/analytics_views.py). refresh_views.py las mantiene al día
+-- y los endpoints refrescan en línea cualquier cliente más viejo que
+-- ANALYTICS_VIEWS_MAX_STALENESS segundos. exercise_progress solo se vuelve a
+-- agregar para los clientes con escrituras nuevas (data_version > progress_version).
+
+DROP VIEW IF EXISTS client_adherence;
+DROP VIEW IF EXISTS exercise_progress;
+
+-- Adherencia de los últimos 30 días (una fila por cliente)
+CREATE TABLE IF NOT EXISTS client_adherence (
+    client_id INTEGER PRIMARY KEY REFERENCES clients(id) ON DELETE CASCADE,
+    trainer_id INTEGER NOT NULL REFERENCES trainers(id) ON DELETE CASCADE,
+    total_assigned INTEGER NOT NULL DEFAULT 0,
+    total_completed INTEGER NOT NULL DEFAULT 0,
+    adherence_percentage NUMERIC(5, 2) NOT NULL DEFAULT 0,
+    last_workout_completed TIMESTAMP,
+    refreshed_at TIMESTAMP NOT NULL,
+    data_version INTEGER NOT NULL DEFAULT 0,      -- se incrementa en cada escritura del cliente
+    progress_version INTEGER NOT NULL DEFAULT 0   -- data_version con la que se armó exercise_progress
+);
+
+CREATE INDEX IF NOT EXISTS idx_client_adherence_trainer ON client_adherence(trainer_id, adherence_percentage);
+CREATE INDEX IF NOT EXISTS idx_client_adherence_refreshed ON client_adherence(refreshed_at);
+
+-- Progreso por cliente, ejercicio y día
+CREATE TABLE IF NOT EXISTS exercise_progress (
+    client_id INTEGER NOT NULL REFERENCES clients(id) ON DELETE CASCADE,
+    exercise_id INTEGER NOT NULL REFERENCES exercises(id) ON DELETE CASCADE,
+    workout_date DATE NOT NULL,
+    avg_weight NUMERIC(7, 2),
+    max_weight NUMERIC(5, 2),
+    total_reps INTEGER NOT NULL DEFAULT 0,
+    sets INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (client_id, exercise_id, workout_date)
+);
+
+COMMENT ON TABLE client_adherence IS 'Adherencia de clientes (últimos 30 días), materializada - refreshed_at marca la frescura';
+COMMENT ON TABLE exercise_progress IS 'Progreso de clientes por ejercicio a lo largo del tiempo, materializado';
+
+-- Carga inicial: python refresh_views.py --all
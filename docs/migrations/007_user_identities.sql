@@ -0,0 +1,52 @@
+-- =====================================================
+-- MIGRACIÓN 007: Índice unificado de identidades
+-- =====================================================
+-- Una fila por trainer y por cliente, por email: el login, el registro y el
+-- alta de clientes resuelven el email con una sola búsqueda indexada en lugar
+-- de consultar trainers y clients por separado. La app la mantiene en cada
+-- alta o cambio de email; las bajas se propagan por las FK.
+--
+-- El email se normaliza (LOWER + TRIM): si dos trainers o dos clientes tienen
+-- emails que solo difieren en mayúsculas/espacios (A@x.com y a@x.com) solo uno
+-- podría indexarse y el otro dejaría de poder hacer login, así que la migración
+-- falla listándolos. Hay que unificarlos o corregirlos y volver a ejecutarla.
+
+DO $$
+DECLARE
+    collisions TEXT;
+BEGIN
+    SELECT string_agg(format('%s %s: ids %s', user_type, email, ids), E'\n')
+    INTO collisions
+    FROM (
+        SELECT 'trainer' AS user_type, LOWER(TRIM(email)) AS email, string_agg(id::TEXT, ', ' ORDER BY id) AS ids
+        FROM trainers GROUP BY LOWER(TRIM(email)) HAVING COUNT(*) > 1
+        UNION ALL
+        SELECT 'client', LOWER(TRIM(email)), string_agg(id::TEXT, ', ' ORDER BY id)
+        FROM clients GROUP BY LOWER(TRIM(email)) HAVING COUNT(*) > 1
+    ) duplicated;
+
+    IF collisions IS NOT NULL THEN
+        RAISE EXCEPTION 'Emails duplicados al normalizar (LOWER/TRIM), corregirlos antes de migrar:%', E'\n' || collisions;
+    END IF;
+END $$;
+
+CREATE TABLE IF NOT EXISTS user_identities (
+    id SERIAL PRIMARY KEY,
+    email VARCHAR(120) NOT NULL,
+    user_type VARCHAR(10) NOT NULL,  -- 'trainer' | 'client'
+    trainer_id INTEGER UNIQUE REFERENCES trainers(id) ON DELETE CASCADE,
+    client_id INTEGER UNIQUE REFERENCES clients(id) ON DELETE CASCADE,
+    CONSTRAINT uq_user_identities_email_type UNIQUE (email, user_type),
+    CONSTRAINT ck_user_identities_one_user CHECK ((trainer_id IS NULL) <> (client_id IS NULL))
+);
+
+COMMENT ON TABLE user_identities IS 'Email -> trainer o cliente; el mismo email puede existir una vez por rol';
+
+-- Carga inicial (ON CONFLICT: filas ya indexadas si se vuelve a ejecutar)
+INSERT INTO user_identities (email, user_type, trainer_id)
+SELECT LOWER(TRIM(email)), 'trainer', id FROM trainers
+ON CONFLICT DO NOTHING;
+
+INSERT INTO user_identities (email, user_type, client_id)
+SELECT LOWER(TRIM(email)), 'client', id FROM clients
+ON CONFLICT DO NOTHING;
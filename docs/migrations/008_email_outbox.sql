@@ -0,0 +1,28 @@
+-- =====================================================
+-- MIGRACIÓN 008: Outbox de emails
+-- =====================================================
+-- Los requests solo encolan el email (en la misma transacción que el cambio que
+-- lo dispara); un worker en segundo plano lo envía en lotes, con reintentos y
+-- backoff exponencial (backend/app/services/email_dispatcher.py).
+
+CREATE TABLE IF NOT EXISTS email_outbox (
+    id SERIAL PRIMARY KEY,
+    kind VARCHAR(30) NOT NULL,              -- 'client_invitation'
+    to_email VARCHAR(120) NOT NULL,
+    subject VARCHAR(200) NOT NULL,
+    html_content TEXT NOT NULL,
+    status VARCHAR(10) NOT NULL DEFAULT 'pending',  -- 'pending' | 'sent' | 'failed'
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    last_error TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    sent_at TIMESTAMP
+);
+
+-- Solo las filas pendientes, en el orden en que se reclaman
+CREATE INDEX IF NOT EXISTS idx_email_outbox_due ON email_outbox(next_attempt_at) WHERE status = 'pending';
+
+COMMENT ON TABLE email_outbox IS 'Emails pendientes de envío y su estado de entrega';
+
+-- El JWT de invitación supera los 255 caracteres
+ALTER TABLE clients ALTER COLUMN invite_token TYPE TEXT;
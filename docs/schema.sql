@@ -85,6 +85,7 @@ CREATE TABLE exercises (
 -- Indexes for exercises
 CREATE INDEX idx_exercises_body_part ON exercises(body_part);
 CREATE INDEX idx_exercises_equipment ON exercises(equipment);
+CREATE INDEX idx_exercises_target_muscle ON exercises(target_muscle);
 CREATE INDEX idx_exercises_trainer ON exercises(trainer_id) WHERE is_custom = TRUE;
 CREATE INDEX idx_exercises_name_search ON exercises USING gin(to_tsvector('spanish', name));
 
@@ -242,6 +243,9 @@ CREATE TRIGGER update_workouts_updated_at BEFORE UPDATE ON workouts
 -- =====================================================
 -- VIEWS (Para queries comunes)
 -- =====================================================
+-- docs/migrations/006_materialized_analytics.sql reemplaza estas vistas por tablas
+-- materializadas (backend/app/services/analytics_views.py). Las definiciones quedan
+-- como referencia de lo que calcula el refresh.
 
 -- View: Client adherence (% workouts completed)
 CREATE OR REPLACE VIEW client_adherence AS